@@ -5,29 +5,30 @@ HTML dashboard for viewing metrics and broadcast messaging
 
 import secrets
 import asyncio
-import threading
-import time
+import json
 from datetime import datetime
 from html import escape as html_escape
 import pytz
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from pydantic import BaseModel
 from typing import Optional
 from services.metrics_service import get_all_metrics, get_cost_analytics
-from services.sms_service import send_sms
+from services.broadcast_service import DEFAULT_TIMEZONE, create_broadcast, timezone_windows
+from services.customer_search_service import MIN_QUERY_LENGTH, cache_params, get_search_cache, search_customers
 from database import (
     get_db_connection, return_db_connection, get_setting, set_setting,
-    get_recent_logs, get_flagged_conversations, mark_analysis_reviewed,
+    get_recent_logs, iter_recent_logs, get_flagged_conversations, mark_analysis_reviewed,
     manual_flag_conversation, mark_conversation_good, get_good_conversations,
     dismiss_conversation,
-    get_monitoring_connection, return_monitoring_connection
+    get_monitoring_connection, return_monitoring_connection, prefer_read_replica
 )
 from config import ADMIN_USERNAME, ADMIN_PASSWORD, logger
 from utils.validation import log_security_event, mask_phone_number
 from utils.encryption import safe_decrypt
 from utils.auth import enforce_auth_rate_limit, record_auth_failure
+from utils.response_cache import cached_json_response
 import re
 
 def parse_date_filter(start_date: Optional[str], end_date: Optional[str]):
@@ -37,23 +38,6 @@ def parse_date_filter(start_date: Optional[str], end_date: Optional[str]):
     return sd, ed
 
 
-# Broadcast time window (8am - 8pm in user's local timezone)
-BROADCAST_START_HOUR = 8
-BROADCAST_END_HOUR = 20  # 8pm
-DEFAULT_TIMEZONE = 'America/New_York'
-
-
-def is_within_broadcast_window(timezone_str: str) -> bool:
-    """Check if current time is within 8am-8pm for the given timezone"""
-    try:
-        tz = pytz.timezone(timezone_str or DEFAULT_TIMEZONE)
-    except pytz.UnknownTimezoneError:
-        tz = pytz.timezone(DEFAULT_TIMEZONE)
-
-    local_time = datetime.now(tz)
-    return BROADCAST_START_HOUR <= local_time.hour < BROADCAST_END_HOUR
-
-
 def validate_e164_phone(phone: str) -> str:
     """Validate and normalize a phone number to E.164 format. Returns normalized number or raises HTTPException."""
     digits = re.sub(r'\D', '', phone)
@@ -99,8 +83,9 @@ def verify_admin(credentials: HTTPBasicCredentials = Depends(security)):
 # OVERVIEW STATS API ENDPOINT
 # =====================================================
 
-@router.get("/admin/stats/overview")
+@router.get("/admin/stats/overview", dependencies=[Depends(prefer_read_replica)])
 async def get_overview_stats(
+    request: Request,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     admin: str = Depends(verify_admin)
@@ -108,8 +93,10 @@ async def get_overview_stats(
     """Get all overview metrics with optional date filtering"""
     try:
         sd, ed = parse_date_filter(start_date, end_date)
-        metrics = get_all_metrics(start_date=sd, end_date=ed)
-        return JSONResponse(content=metrics)
+        return cached_json_response(
+            request, 'overview', lambda: get_all_metrics(start_date=sd, end_date=ed),
+            params={'start_date': sd, 'end_date': ed}
+        )
     except Exception as e:
         logger.error(f"Error getting overview stats: {e}")
         raise HTTPException(status_code=500, detail="Error getting overview stats")
@@ -119,7 +106,18 @@ async def get_overview_stats(
 # BROADCAST API ENDPOINTS
 # =====================================================
 
-@router.get("/admin/broadcast/stats")
+# Recipient previews list at most this many users per table; their counts are exact
+PREVIEW_LIST_LIMIT = 200
+
+# Audience filters for recipient previews ('free' is everyone who isn't premium)
+_PREVIEW_AUDIENCE_SQL = {
+    "all": "",
+    "free": " AND COALESCE(premium_status, 'free') <> 'premium'",
+    "premium": " AND premium_status = 'premium'",
+}
+
+
+@router.get("/admin/broadcast/stats", dependencies=[Depends(prefer_read_replica)])
 async def get_broadcast_stats(admin: str = Depends(verify_admin)):
     """Get user counts by plan type for broadcast targeting, including timezone-aware counts"""
     conn = None
@@ -127,17 +125,19 @@ async def get_broadcast_stats(admin: str = Depends(verify_admin)):
         conn = get_db_connection()
         c = conn.cursor()
 
-        # Get users with their timezones and plan types (exclude opted-out users)
+        # Count users per timezone and plan (exclude opted-out users)
         c.execute('''
             SELECT
-                phone_number,
+                COALESCE(timezone, '') as timezone,
                 COALESCE(premium_status, 'free') as plan,
-                timezone
+                COUNT(*)
             FROM users
             WHERE onboarding_complete = TRUE
             AND (opted_out = FALSE OR opted_out IS NULL)
+            GROUP BY 1, 2
         ''')
-        results = c.fetchall()
+        groups = c.fetchall()
+        windows = timezone_windows({timezone for timezone, _, _ in groups})
 
         # Total counts and in-window counts
         stats = {
@@ -145,21 +145,17 @@ async def get_broadcast_stats(admin: str = Depends(verify_admin)):
             "all_in_window": 0, "free_in_window": 0, "premium_in_window": 0
         }
 
-        for phone, plan, timezone in results:
-            in_window = is_within_broadcast_window(timezone)
+        for timezone, plan, count in groups:
+            in_window = windows[timezone]
 
-            if plan == 'free':
-                stats['free'] += 1
+            if plan in ('free', 'premium'):
+                stats[plan] += count
                 if in_window:
-                    stats['free_in_window'] += 1
-            elif plan == 'premium':
-                stats['premium'] += 1
-                if in_window:
-                    stats['premium_in_window'] += 1
+                    stats[f'{plan}_in_window'] += count
 
-            stats['all'] += 1
+            stats['all'] += count
             if in_window:
-                stats['all_in_window'] += 1
+                stats['all_in_window'] += count
 
         return JSONResponse(content=stats)
     except Exception as e:
@@ -170,9 +166,13 @@ async def get_broadcast_stats(admin: str = Depends(verify_admin)):
             return_db_connection(conn)
 
 
-@router.get("/admin/broadcast/recipients-preview")
+@router.get("/admin/broadcast/recipients-preview", dependencies=[Depends(prefer_read_replica)])
 async def get_recipients_preview(audience: str = "all", admin: str = Depends(verify_admin)):
-    """Preview which users will receive a broadcast and who's excluded (and why)"""
+    """Preview which users will receive a broadcast and who's excluded (and why)
+
+    The summary is counted per timezone in SQL; the included and excluded
+    lists show at most PREVIEW_LIST_LIMIT users each.
+    """
     if audience not in ("all", "free", "premium"):
         raise HTTPException(status_code=400, detail="Invalid audience. Must be all, free, or premium.")
 
@@ -180,67 +180,80 @@ async def get_recipients_preview(audience: str = "all", admin: str = Depends(ver
     try:
         conn = get_db_connection()
         c = conn.cursor()
+        audience_filter = _PREVIEW_AUDIENCE_SQL[audience]
 
-        # Get all onboarded users with relevant fields
-        c.execute('''
-            SELECT phone_number, first_name, timezone,
-                   COALESCE(premium_status, 'free') as plan,
-                   COALESCE(opted_out, FALSE) as opted_out
+        c.execute(f'''
+            SELECT COALESCE(timezone, ''), COALESCE(opted_out, FALSE), COUNT(*)
             FROM users
-            WHERE onboarding_complete = TRUE
+            WHERE onboarding_complete = TRUE{audience_filter}
+            GROUP BY 1, 2
         ''')
-        rows = c.fetchall()
-
-        included = []
-        excluded = []
-        excluded_opted_out = 0
-        excluded_outside_window = 0
+        groups = c.fetchall()
+        windows = timezone_windows({timezone for timezone, _, _ in groups})
+        in_window_timezones = [timezone for timezone, in_window in windows.items() if in_window]
 
-        for phone, first_name, timezone_str, plan, opted_out in rows:
-            # Apply audience filter
-            if audience == "free" and plan == "premium":
-                continue
-            if audience == "premium" and plan != "premium":
-                continue
+        excluded_opted_out = sum(count for _, opted_out, count in groups if opted_out)
+        excluded_outside_window = sum(
+            count for timezone, opted_out, count in groups if not opted_out and not windows[timezone]
+        )
+        total_onboarded = sum(count for _, _, count in groups)
 
-            masked = mask_phone_number(phone)
-            name = safe_decrypt(first_name, "") if first_name else None
+        # Local time for display, once per timezone
+        local_times = {}
 
-            # Determine local time for display
-            try:
-                tz = pytz.timezone(timezone_str or DEFAULT_TIMEZONE)
-            except pytz.UnknownTimezoneError:
-                tz = pytz.timezone(DEFAULT_TIMEZONE)
-            local_now = datetime.now(tz)
-            local_time_str = local_now.strftime("%I:%M %p").lstrip("0")
-
-            user_info = {
-                "phone": masked,
-                "name": name,
+        def user_info(phone, first_name, timezone_str, plan):
+            if timezone_str not in local_times:
+                try:
+                    tz = pytz.timezone(timezone_str or DEFAULT_TIMEZONE)
+                except pytz.UnknownTimezoneError:
+                    tz = pytz.timezone(DEFAULT_TIMEZONE)
+                local_times[timezone_str] = datetime.now(tz).strftime("%I:%M %p").lstrip("0")
+            return {
+                "phone": mask_phone_number(phone),
+                "name": safe_decrypt(first_name, "") if first_name else None,
                 "tier": plan,
                 "timezone": timezone_str or DEFAULT_TIMEZONE,
-                "local_time": local_time_str
+                "local_time": local_times[timezone_str]
             }
 
+        c.execute(f'''
+            SELECT phone_number, first_name, timezone, COALESCE(premium_status, 'free')
+            FROM users
+            WHERE onboarding_complete = TRUE{audience_filter}
+            AND NOT COALESCE(opted_out, FALSE)
+            AND COALESCE(timezone, '') = ANY(%s)
+            ORDER BY created_at DESC
+            LIMIT %s
+        ''', (in_window_timezones, PREVIEW_LIST_LIMIT))
+        included = [user_info(*row) for row in c.fetchall()]
+
+        # Opted-out users first (they can be cleared from the preview)
+        c.execute(f'''
+            SELECT phone_number, first_name, timezone, COALESCE(premium_status, 'free'),
+                   COALESCE(opted_out, FALSE)
+            FROM users
+            WHERE onboarding_complete = TRUE{audience_filter}
+            AND (COALESCE(opted_out, FALSE) OR NOT COALESCE(timezone, '') = ANY(%s))
+            ORDER BY COALESCE(opted_out, FALSE) DESC, created_at DESC
+            LIMIT %s
+        ''', (in_window_timezones, PREVIEW_LIST_LIMIT))
+        excluded = []
+        for phone, first_name, timezone_str, plan, opted_out in c.fetchall():
             if opted_out:
-                excluded.append({**user_info, "reason": "opted_out", "phone_full": phone})
-                excluded_opted_out += 1
-            elif not is_within_broadcast_window(timezone_str):
-                excluded.append({**user_info, "reason": "outside_window"})
-                excluded_outside_window += 1
+                excluded.append({**user_info(phone, first_name, timezone_str, plan),
+                                 "reason": "opted_out", "phone_full": phone})
             else:
-                included.append(user_info)
-
-        total_onboarded = len(included) + len(excluded)
+                excluded.append({**user_info(phone, first_name, timezone_str, plan), "reason": "outside_window"})
 
         return JSONResponse(content={
             "included": included,
             "excluded": excluded,
             "summary": {
                 "total_onboarded": total_onboarded,
-                "included": len(included),
+                "included": total_onboarded - excluded_opted_out - excluded_outside_window,
                 "excluded_opted_out": excluded_opted_out,
-                "excluded_outside_window": excluded_outside_window
+                "excluded_outside_window": excluded_outside_window,
+                "list_limit": PREVIEW_LIST_LIMIT
             }
         })
     except Exception as e:
@@ -251,7 +264,7 @@ async def get_recipients_preview(audience: str = "all", admin: str = Depends(ver
             return_db_connection(conn)
 
 
-@router.get("/admin/broadcast/history")
+@router.get("/admin/broadcast/history", dependencies=[Depends(prefer_read_replica)])
 async def get_broadcast_history(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
@@ -385,152 +398,48 @@ async def get_recent_user_messages(admin: str = Depends(verify_admin)):
             return_db_connection(conn)
 
 
-BROADCAST_PREFIX = "[Remyndrs System Message] "
-
-def send_broadcast_messages(broadcast_id: int, phone_numbers: list, message: str):
-    """Background task to send broadcast messages with rate limiting"""
-    import time
-
-    conn = None
-    success_count = 0
-    fail_count = 0
-
-    # Prepend the broadcast prefix to the message
-    full_message = BROADCAST_PREFIX + message
-
-    try:
-        conn = get_db_connection()
-        c = conn.cursor()
-
-        # Update status to sending
-        c.execute(
-            "UPDATE broadcast_logs SET status = 'sending' WHERE id = %s",
-            (broadcast_id,)
-        )
-        conn.commit()
-
-        for i, phone in enumerate(phone_numbers):
-            try:
-                send_sms(phone, full_message)
-                success_count += 1
-            except Exception as e:
-                logger.error(f"Failed to send broadcast to {phone}: {e}")
-                fail_count += 1
-
-            # Update progress every 10 messages
-            if (i + 1) % 10 == 0:
-                c.execute(
-                    "UPDATE broadcast_logs SET success_count = %s, fail_count = %s WHERE id = %s",
-                    (success_count, fail_count, broadcast_id)
-                )
-                conn.commit()
-
-            # Rate limit: 100ms delay between messages to avoid Twilio limits
-            time.sleep(0.1)
-
-        # Final update
-        c.execute('''
-            UPDATE broadcast_logs
-            SET success_count = %s, fail_count = %s, status = 'completed', completed_at = NOW()
-            WHERE id = %s
-        ''', (success_count, fail_count, broadcast_id))
-        conn.commit()
-
-        logger.info(f"Broadcast {broadcast_id} completed: {success_count} success, {fail_count} failed")
-
-    except Exception as e:
-        logger.error(f"Broadcast {broadcast_id} error: {e}")
-        if conn:
-            c = conn.cursor()
-            c.execute(
-                "UPDATE broadcast_logs SET status = 'failed', completed_at = NOW() WHERE id = %s",
-                (broadcast_id,)
-            )
-            conn.commit()
-    finally:
-        if conn:
-            return_db_connection(conn)
-
-
 @router.post("/admin/broadcast/send")
-async def send_broadcast(request: BroadcastRequest, background_tasks: BackgroundTasks, admin: str = Depends(verify_admin)):
+async def send_broadcast(request: BroadcastRequest, admin: str = Depends(verify_admin)):
     """Send a broadcast message to selected audience (only users within 8am-8pm local time)"""
+    from tasks.broadcast_tasks import send_broadcast as send_broadcast_task
+
     conn = None
     try:
-        conn = get_db_connection()
-        c = conn.cursor()
-
-        skipped_count = 0
-
+        target_phone = None
         if request.audience == "single":
-            # Single number test mode - skip user query, send directly
+            # Single number test mode - no audience query or time window
             if not request.phone_number:
                 raise HTTPException(status_code=400, detail="Phone number required for single number mode")
-            phone = validate_e164_phone(request.phone_number)
-            phone_numbers = [phone]
-        else:
-            # Build query based on audience - include timezone for filtering
-            # Exclude opted-out users (STOP command compliance)
-            if request.audience == "all":
-                c.execute('''
-                    SELECT phone_number, timezone FROM users
-                    WHERE onboarding_complete = TRUE
-                    AND (opted_out = FALSE OR opted_out IS NULL)
-                ''')
-            elif request.audience == "free":
-                c.execute('''
-                    SELECT phone_number, timezone FROM users
-                    WHERE onboarding_complete = TRUE
-                    AND (premium_status = 'free' OR premium_status IS NULL)
-                    AND (opted_out = FALSE OR opted_out IS NULL)
-                ''')
-            elif request.audience == "premium":
-                c.execute('''
-                    SELECT phone_number, timezone FROM users
-                    WHERE onboarding_complete = TRUE
-                    AND premium_status = 'premium'
-                    AND (opted_out = FALSE OR opted_out IS NULL)
-                ''')
-            else:
-                raise HTTPException(status_code=400, detail="Invalid audience")
-
-            results = c.fetchall()
-
-            # Filter to only users within the 8am-8pm window in their timezone
-            phone_numbers = [
-                r[0] for r in results
-                if is_within_broadcast_window(r[1])
-            ]
-
-            total_audience = len(results)
-            skipped_count = total_audience - len(phone_numbers)
+            target_phone = validate_e164_phone(request.phone_number)
 
-            if not phone_numbers:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"No recipients currently in the 8am-8pm window. {total_audience} users are outside the allowed time."
-                )
+        conn = get_db_connection()
+        c = conn.cursor()
+        try:
+            broadcast_id, recipient_count, total_audience = create_broadcast(
+                c, admin, request.message, request.audience, target_phone=target_phone
+            )
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid audience")
 
-        # Create broadcast log entry
-        c.execute('''
-            INSERT INTO broadcast_logs (sender, message, audience, recipient_count, status, source)
-            VALUES (%s, %s, %s, %s, 'pending', 'immediate')
-            RETURNING id
-        ''', (admin, request.message, request.audience, len(phone_numbers)))
-        broadcast_id = c.fetchone()[0]
+        if broadcast_id is None:
+            raise HTTPException(
+                status_code=400,
+                detail=f"No recipients currently in the 8am-8pm window. {total_audience} users are outside the allowed time."
+            )
         conn.commit()
 
-        # Start background task to send messages
-        background_tasks.add_task(send_broadcast_messages, broadcast_id, phone_numbers, request.message)
+        # Delivery runs on the broadcasts worker and resumes after restarts
+        send_broadcast_task.delay(broadcast_id)
 
-        logger.info(f"Broadcast {broadcast_id} started by {admin}: {len(phone_numbers)} recipients ({skipped_count} skipped - outside time window)")
+        skipped_count = total_audience - recipient_count
+        logger.info(f"Broadcast {broadcast_id} started by {admin}: {recipient_count} recipients ({skipped_count} skipped - outside time window)")
 
         return JSONResponse(content={
             "broadcast_id": broadcast_id,
-            "recipient_count": len(phone_numbers),
+            "recipient_count": recipient_count,
             "skipped_count": skipped_count,
             "status": "started",
-            "message": f"Sending to {len(phone_numbers)} recipients..." + (f" ({skipped_count} skipped - outside 8am-8pm)" if skipped_count > 0 else "")
+            "message": f"Sending to {recipient_count} recipients..." + (f" ({skipped_count} skipped - outside 8am-8pm)" if skipped_count > 0 else "")
         })
 
     except HTTPException:
@@ -677,13 +586,15 @@ async def cancel_scheduled_broadcast(broadcast_id: int, admin: str = Depends(ver
         if result[0] != 'scheduled':
             raise HTTPException(status_code=400, detail=f"Cannot cancel broadcast with status '{result[0]}'")
 
-        # Update status to cancelled
+        # Update status to cancelled, unless the checker claimed it in the meantime
         c.execute('''
             UPDATE scheduled_broadcasts
             SET status = 'cancelled'
-            WHERE id = %s
+            WHERE id = %s AND status = 'scheduled'
         ''', (broadcast_id,))
         conn.commit()
+        if c.rowcount == 0:
+            raise HTTPException(status_code=400, detail="Cannot cancel broadcast with status 'sending'")
 
         return JSONResponse(content={
             "success": True,
@@ -700,203 +611,6 @@ async def cancel_scheduled_broadcast(broadcast_id: int, admin: str = Depends(ver
             return_db_connection(conn)
 
 
-# =====================================================
-# SCHEDULED BROADCAST CHECKER
-# =====================================================
-
-def send_scheduled_broadcast(broadcast_id: int, message: str, audience: str, sender: str = 'system', target_phone: str = None):
-    """Send a scheduled broadcast - filters recipients and sends messages"""
-    conn = None
-    success_count = 0
-    fail_count = 0
-
-    full_message = BROADCAST_PREFIX + message
-
-    try:
-        conn = get_db_connection()
-        c = conn.cursor()
-
-        # Update status to sending
-        c.execute(
-            "UPDATE scheduled_broadcasts SET status = 'sending' WHERE id = %s",
-            (broadcast_id,)
-        )
-        conn.commit()
-
-        if audience == "single" and target_phone:
-            # Single number mode - send directly, skip user query
-            phone_numbers = [target_phone]
-        else:
-            # Get recipients based on audience (exclude opted-out users)
-            if audience == "all":
-                c.execute('''
-                    SELECT phone_number, timezone FROM users
-                    WHERE onboarding_complete = TRUE
-                    AND (opted_out = FALSE OR opted_out IS NULL)
-                ''')
-            elif audience == "free":
-                c.execute('''
-                    SELECT phone_number, timezone FROM users
-                    WHERE onboarding_complete = TRUE
-                    AND (premium_status = 'free' OR premium_status IS NULL)
-                    AND (opted_out = FALSE OR opted_out IS NULL)
-                ''')
-            elif audience == "premium":
-                c.execute('''
-                    SELECT phone_number, timezone FROM users
-                    WHERE onboarding_complete = TRUE
-                    AND premium_status = 'premium'
-                    AND (opted_out = FALSE OR opted_out IS NULL)
-                ''')
-            else:
-                logger.error(f"Invalid audience for scheduled broadcast {broadcast_id}: {audience}")
-                return
-
-            results = c.fetchall()
-
-            # Filter to only users within the 8am-8pm window
-            phone_numbers = [r[0] for r in results if is_within_broadcast_window(r[1])]
-
-        if not phone_numbers:
-            logger.info(f"Scheduled broadcast {broadcast_id}: No recipients in time window")
-            c.execute('''
-                UPDATE scheduled_broadcasts
-                SET status = 'completed', recipient_count = 0, sent_at = NOW()
-                WHERE id = %s
-            ''', (broadcast_id,))
-            conn.commit()
-            # Still log to broadcast_logs so it appears in history
-            c.execute('''
-                INSERT INTO broadcast_logs (sender, message, audience, recipient_count, success_count, fail_count, status, completed_at, source)
-                VALUES (%s, %s, %s, 0, 0, 0, 'completed', NOW(), 'scheduled')
-            ''', (sender, message, audience))
-            conn.commit()
-            return
-
-        # Update recipient count
-        c.execute(
-            "UPDATE scheduled_broadcasts SET recipient_count = %s WHERE id = %s",
-            (len(phone_numbers), broadcast_id)
-        )
-        conn.commit()
-
-        # Send messages with rate limiting
-        for i, phone in enumerate(phone_numbers):
-            try:
-                send_sms(phone, full_message)
-                success_count += 1
-            except Exception as e:
-                logger.error(f"Failed to send scheduled broadcast to {phone}: {e}")
-                fail_count += 1
-
-            # Update progress every 10 messages
-            if (i + 1) % 10 == 0:
-                c.execute(
-                    "UPDATE scheduled_broadcasts SET success_count = %s, fail_count = %s WHERE id = %s",
-                    (success_count, fail_count, broadcast_id)
-                )
-                conn.commit()
-
-            # Rate limit: 100ms delay
-            time.sleep(0.1)
-
-        # Final update on scheduled_broadcasts
-        c.execute('''
-            UPDATE scheduled_broadcasts
-            SET success_count = %s, fail_count = %s, status = 'completed', sent_at = NOW()
-            WHERE id = %s
-        ''', (success_count, fail_count, broadcast_id))
-        conn.commit()
-
-        # Also insert into broadcast_logs so it appears in Broadcast History
-        c.execute('''
-            INSERT INTO broadcast_logs (sender, message, audience, recipient_count, success_count, fail_count, status, completed_at, source)
-            VALUES (%s, %s, %s, %s, %s, %s, 'completed', NOW(), 'scheduled')
-        ''', (sender, message, audience, len(phone_numbers), success_count, fail_count))
-        conn.commit()
-
-        logger.info(f"Scheduled broadcast {broadcast_id} completed: {success_count} success, {fail_count} failed")
-
-    except Exception as e:
-        logger.error(f"Scheduled broadcast {broadcast_id} error: {e}")
-        if conn:
-            try:
-                c = conn.cursor()
-                c.execute(
-                    "UPDATE scheduled_broadcasts SET status = 'failed', sent_at = NOW() WHERE id = %s",
-                    (broadcast_id,)
-                )
-                conn.commit()
-            except Exception:
-                pass
-    finally:
-        if conn:
-            return_db_connection(conn)
-
-
-def check_scheduled_broadcasts():
-    """Background thread that checks for due scheduled broadcasts"""
-    logger.info("Starting scheduled broadcast checker")
-    consecutive_failures = 0
-    max_consecutive_failures = 10
-
-    while True:
-        conn = None
-        try:
-            now = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
-            logger.info(f"Checking for scheduled broadcasts at {now}")
-
-            try:
-                conn = get_db_connection()
-                c = conn.cursor()
-
-                # Find broadcasts that are due
-                c.execute('''
-                    SELECT id, message, audience, sender, target_phone
-                    FROM scheduled_broadcasts
-                    WHERE scheduled_date <= %s AND status = 'scheduled'
-                ''', (now,))
-
-                due_broadcasts = c.fetchall()
-            except Exception as db_err:
-                logger.error(f"DB error in scheduled broadcast checker: {db_err}")
-                due_broadcasts = []
-            finally:
-                if conn:
-                    return_db_connection(conn)
-                    conn = None
-
-            if due_broadcasts:
-                logger.info(f"Found {len(due_broadcasts)} scheduled broadcasts to send")
-
-            for broadcast_id, message, audience, sender, target_phone in due_broadcasts:
-                logger.info(f"Sending scheduled broadcast {broadcast_id}")
-                try:
-                    send_scheduled_broadcast(broadcast_id, message, audience, sender=sender or 'system', target_phone=target_phone)
-                except Exception as send_err:
-                    logger.error(f"Error sending scheduled broadcast {broadcast_id}: {send_err}")
-
-            consecutive_failures = 0  # Reset on successful loop
-
-        except Exception as e:
-            consecutive_failures += 1
-            logger.error(f"Error in scheduled broadcast checker ({consecutive_failures}/{max_consecutive_failures}): {e}")
-            if consecutive_failures >= max_consecutive_failures:
-                logger.critical(f"Broadcast checker exceeded {max_consecutive_failures} consecutive failures, stopping thread")
-                return
-
-        # Backoff on repeated failures (60s normal, up to 5min on failures)
-        sleep_time = min(60 * (2 ** min(consecutive_failures, 3)), 300) if consecutive_failures > 0 else 60
-        time.sleep(sleep_time)
-
-
-def start_broadcast_checker():
-    """Start the scheduled broadcast checker in a daemon thread"""
-    thread = threading.Thread(target=check_scheduled_broadcasts, daemon=True)
-    thread.start()
-    logger.info("Scheduled broadcast checker thread started")
-
-
 # =====================================================
 # FEEDBACK API ENDPOINTS
 # =====================================================
@@ -1030,8 +744,9 @@ async def reply_to_contact_message_endpoint(message_id: int, request: Request, a
 # COST ANALYTICS API ENDPOINT
 # =====================================================
 
-@router.get("/admin/costs")
+@router.get("/admin/costs", dependencies=[Depends(prefer_read_replica)])
 async def get_costs(
+    request: Request,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
     admin: str = Depends(verify_admin)
@@ -1039,8 +754,10 @@ async def get_costs(
     """Get cost analytics broken down by plan tier and time period"""
     try:
         sd, ed = parse_date_filter(start_date, end_date)
-        costs = get_cost_analytics(start_date=sd, end_date=ed)
-        return JSONResponse(content=costs)
+        return cached_json_response(
+            request, 'costs', lambda: get_cost_analytics(start_date=sd, end_date=ed),
+            params={'start_date': sd, 'end_date': ed}
+        )
     except Exception as e:
         logger.error(f"Error getting cost analytics: {e}")
         raise HTTPException(status_code=500, detail="Error getting cost analytics")
@@ -1246,6 +963,16 @@ async def update_maintenance_message(request: Request, admin: str = Depends(veri
 # CONVERSATION LOGS API ENDPOINTS
 # =====================================================
 
+def _log_cursor(before_created_at: Optional[str], before_id: Optional[int]):
+    """(created_at, id) keyset cursor from the last row of the previous page, or None"""
+    if before_created_at is None and before_id is None:
+        return None
+    try:
+        return datetime.fromisoformat(before_created_at), int(before_id)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="before_created_at and before_id must be given together")
+
+
 @router.get("/admin/conversations")
 async def get_conversations(
     limit: int = 100,
@@ -1255,18 +982,54 @@ async def get_conversations(
     hide_reviewed: bool = True,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    before_created_at: Optional[str] = None,
+    before_id: Optional[int] = None,
     admin: str = Depends(verify_admin)
 ):
-    """Get recent conversation logs"""
+    """Get recent conversation logs (pass the last row's created_at and id as before_* for the next page)"""
     try:
         sd, ed = parse_date_filter(start_date, end_date)
-        logs = get_recent_logs(limit=limit, offset=offset, phone_filter=phone, intent_filter=intent, hide_reviewed=hide_reviewed, start_date=sd, end_date=ed)
+        before = _log_cursor(before_created_at, before_id)
+        logs = get_recent_logs(limit=limit, offset=offset, phone_filter=phone, intent_filter=intent, hide_reviewed=hide_reviewed, start_date=sd, end_date=ed, before=before)
         return JSONResponse(content=logs)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting conversations: {e}")
         raise HTTPException(status_code=500, detail="Error getting conversations")
 
 
+@router.get("/admin/conversations/export")
+async def export_conversations(
+    phone: Optional[str] = None,
+    intent: Optional[str] = None,
+    hide_reviewed: bool = False,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    admin: str = Depends(verify_admin)
+):
+    """Stream every matching conversation log as NDJSON (one JSON object per line, newest first)"""
+    try:
+        sd, ed = parse_date_filter(start_date, end_date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD")
+
+    def lines():
+        try:
+            for log in iter_recent_logs(phone_filter=phone, intent_filter=intent, hide_reviewed=hide_reviewed, start_date=sd, end_date=ed):
+                yield json.dumps(log) + '\n'
+        except Exception as e:
+            # Headers are already sent; the truncated body is all we can signal
+            logger.error(f"Error exporting conversations: {e}")
+
+    log_security_event("CONVERSATION_EXPORT", {"admin": admin, "phone": phone})
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=conversations.ndjson"},
+    )
+
+
 @router.get("/admin/conversations/flagged")
 async def get_flagged(
     include_reviewed: bool = False,
@@ -1775,9 +1538,8 @@ async def mark_issue_false_positive(
             return_monitoring_connection(conn)
 
 
-@router.get("/admin/monitoring/stats")
-async def get_monitoring_stats(admin: str = Depends(verify_admin)):
-    """Get monitoring statistics"""
+def _monitoring_stats():
+    """Monitoring statistics (served through the response cache)"""
     conn = None
     try:
         conn = get_monitoring_connection()
@@ -1827,15 +1589,22 @@ async def get_monitoring_stats(admin: str = Depends(verify_admin)):
             for r in c.fetchall()
         ]
 
-        return JSONResponse(content=stats)
-    except Exception as e:
-        logger.error(f"Error getting monitoring stats: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+        return stats
     finally:
         if conn:
             return_monitoring_connection(conn)
 
 
+@router.get("/admin/monitoring/stats")
+async def get_monitoring_stats(request: Request, admin: str = Depends(verify_admin)):
+    """Get monitoring statistics"""
+    try:
+        return cached_json_response(request, 'monitoring_stats', _monitoring_stats)
+    except Exception as e:
+        logger.error(f"Error getting monitoring stats: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 # =====================================================
 # AGENT 2: ISSUE VALIDATOR API ENDPOINTS
 # =====================================================
@@ -1878,9 +1647,8 @@ async def get_issue_patterns(admin: str = Depends(verify_admin)):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.get("/admin/validator/stats")
-async def get_validator_stats(admin: str = Depends(verify_admin)):
-    """Get validator statistics"""
+def _validator_stats():
+    """Validator statistics (served through the response cache)"""
     conn = None
     try:
         conn = get_db_connection()
@@ -1934,43 +1702,55 @@ async def get_validator_stats(admin: str = Depends(verify_admin)):
             for r in c.fetchall()
         ]
 
-        return JSONResponse(content=stats)
-    except Exception as e:
-        logger.error(f"Error getting validator stats: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+        return stats
     finally:
         if conn:
             return_db_connection(conn)
 
 
+@router.get("/admin/validator/stats")
+async def get_validator_stats(request: Request, admin: str = Depends(verify_admin)):
+    """Get validator statistics"""
+    try:
+        return cached_json_response(request, 'validator_stats', _validator_stats)
+    except Exception as e:
+        logger.error(f"Error getting validator stats: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 # =====================================================
 # AGENT 3: RESOLUTION TRACKER API ENDPOINTS
 # =====================================================
 
+def _system_health(days: int):
+    """System health metrics, JSON-ready (served through the response cache)"""
+    from agents.interaction_monitor import init_monitoring_tables
+    from agents.issue_validator import init_validator_tables
+    from agents.resolution_tracker import calculate_health_metrics, init_tracker_tables
+    init_monitoring_tables()  # Base tables (monitoring_issues)
+    init_validator_tables()   # Pattern tables (issue_patterns)
+    init_tracker_tables()     # Tracker tables (health_snapshots, issue_resolutions, pattern_resolutions)
+    metrics = calculate_health_metrics(days=days)
+    # Convert Decimal values for JSON serialization
+    from decimal import Decimal
+    def sanitize(obj):
+        if isinstance(obj, dict):
+            return {k: sanitize(v) for k, v in obj.items()}
+        elif isinstance(obj, list):
+            return [sanitize(i) for i in obj]
+        elif isinstance(obj, Decimal):
+            return float(obj)
+        elif hasattr(obj, 'isoformat'):
+            return obj.isoformat()
+        return obj
+    return sanitize(metrics)
+
+
 @router.get("/admin/tracker/health")
-async def get_system_health(days: int = 7, admin: str = Depends(verify_admin)):
+async def get_system_health(request: Request, days: int = 7, admin: str = Depends(verify_admin)):
     """Get system health metrics"""
     try:
-        from agents.interaction_monitor import init_monitoring_tables
-        from agents.issue_validator import init_validator_tables
-        from agents.resolution_tracker import calculate_health_metrics, init_tracker_tables
-        init_monitoring_tables()  # Base tables (monitoring_issues)
-        init_validator_tables()   # Pattern tables (issue_patterns)
-        init_tracker_tables()     # Tracker tables (health_snapshots, issue_resolutions, pattern_resolutions)
-        metrics = calculate_health_metrics(days=days)
-        # Convert Decimal values for JSON serialization
-        from decimal import Decimal
-        def sanitize(obj):
-            if isinstance(obj, dict):
-                return {k: sanitize(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [sanitize(i) for i in obj]
-            elif isinstance(obj, Decimal):
-                return float(obj)
-            elif hasattr(obj, 'isoformat'):
-                return obj.isoformat()
-            return obj
-        return JSONResponse(content=sanitize(metrics))
+        return cached_json_response(request, 'tracker_health', lambda: _system_health(days), params={'days': days})
     except Exception as e:
         logger.error(f"Error getting health metrics: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -2251,9 +2031,8 @@ async def mark_analysis_applied(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-@router.get("/admin/analyzer/stats")
-async def get_analyzer_stats(admin: str = Depends(verify_admin)):
-    """Get code analyzer statistics"""
+def _analyzer_stats():
+    """Code analyzer statistics (served through the response cache)"""
     conn = None
     try:
         # Ensure tables exist
@@ -2300,15 +2079,22 @@ async def get_analyzer_stats(admin: str = Depends(verify_admin)):
             for r in c.fetchall()
         ]
 
-        return JSONResponse(content=stats)
-    except Exception as e:
-        logger.error(f"Error getting analyzer stats: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+        return stats
     finally:
         if conn:
             return_monitoring_connection(conn)
 
 
+@router.get("/admin/analyzer/stats")
+async def get_analyzer_stats(request: Request, admin: str = Depends(verify_admin)):
+    """Get code analyzer statistics"""
+    try:
+        return cached_json_response(request, 'analyzer_stats', _analyzer_stats)
+    except Exception as e:
+        logger.error(f"Error getting analyzer stats: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 # =====================================================
 # ALERT SETTINGS (Teams + Email)
 # =====================================================
@@ -2432,7 +2218,7 @@ async def clear_teams_webhook(admin: str = Depends(verify_admin)):
 # RECURRING REMINDERS MANAGEMENT
 # =====================================================
 
-@router.get("/admin/recurring")
+@router.get("/admin/recurring", dependencies=[Depends(prefer_read_replica)])
 async def get_all_recurring_reminders(
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
@@ -2898,7 +2684,7 @@ class SupportReplyRequest(BaseModel):
     message: str
 
 
-@router.get("/admin/support/tickets")
+@router.get("/admin/support/tickets", dependencies=[Depends(prefer_read_replica)])
 async def get_support_tickets(
     include_closed: bool = False,
     start_date: Optional[str] = None,
@@ -2965,24 +2751,13 @@ async def reopen_support_ticket(ticket_id: int, admin: str = Depends(verify_admi
 # CUSTOMER SERVICE API ENDPOINTS
 # =====================================================
 
-@router.get("/admin/cs/search")
-async def cs_search_customers(
-    q: str = "",
-    admin: str = Depends(verify_admin)
-):
-    """Search customers by phone number or name"""
+def _cs_search(q: str):
     conn = None
     try:
         conn = get_db_connection()
-        c = conn.cursor()
-
-        if not q or len(q) < 2:
-            return {"customers": [], "message": "Enter at least 2 characters to search"}
-
-        # Search by phone (partial) or name
-        search_pattern = f"%{q}%"
-        c.execute('''
-            SELECT
+        results = search_customers(
+            conn.cursor(), q,
+            columns='''
                 phone_number,
                 first_name,
                 last_name,
@@ -2992,15 +2767,9 @@ async def cs_search_customers(
                 last_active_at,
                 timezone,
                 onboarding_complete
-            FROM users
-            WHERE phone_number LIKE %s
-               OR LOWER(first_name) LIKE LOWER(%s)
-               OR LOWER(last_name) LIKE LOWER(%s)
-            ORDER BY last_active_at DESC NULLS LAST
-            LIMIT 50
-        ''', (search_pattern, search_pattern, search_pattern))
-
-        results = c.fetchall()
+            ''',
+            order_by='last_active_at DESC NULLS LAST',
+        )
         customers = []
         for row in results:
             customers.append({
@@ -3015,17 +2784,31 @@ async def cs_search_customers(
                 "timezone": row[7],
                 "onboarding_complete": row[8],
             })
-
         return {"customers": customers, "count": len(customers)}
-    except Exception as e:
-        logger.error(f"CS search error: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error")
     finally:
         if conn:
             return_db_connection(conn)
 
 
-@router.get("/admin/cs/customer/{phone_number}")
+@router.get("/admin/cs/search", dependencies=[Depends(prefer_read_replica)])
+async def cs_search_customers(
+    request: Request,
+    q: str = "",
+    admin: str = Depends(verify_admin)
+):
+    """Search customers by phone number or name"""
+    if not q or len(q.strip()) < MIN_QUERY_LENGTH:
+        return {"customers": [], "message": "Enter at least 2 characters to search"}
+    try:
+        return cached_json_response(
+            request, 'admin_cs_search', lambda: _cs_search(q), params=cache_params(q), cache=get_search_cache()
+        )
+    except Exception as e:
+        logger.error(f"CS search error: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/admin/cs/customer/{phone_number}", dependencies=[Depends(prefer_read_replica)])
 async def cs_get_customer(phone_number: str, admin: str = Depends(verify_admin)):
     """Get full customer profile"""
     conn = None
@@ -3132,7 +2915,7 @@ async def cs_get_customer(phone_number: str, admin: str = Depends(verify_admin))
             return_db_connection(conn)
 
 
-@router.get("/admin/cs/customer/{phone_number}/reminders")
+@router.get("/admin/cs/customer/{phone_number}/reminders", dependencies=[Depends(prefer_read_replica)])
 async def cs_get_customer_reminders(phone_number: str, admin: str = Depends(verify_admin)):
     """Get customer's reminders"""
     conn = None
@@ -3166,7 +2949,7 @@ async def cs_get_customer_reminders(phone_number: str, admin: str = Depends(veri
             return_db_connection(conn)
 
 
-@router.get("/admin/cs/customer/{phone_number}/lists")
+@router.get("/admin/cs/customer/{phone_number}/lists", dependencies=[Depends(prefer_read_replica)])
 async def cs_get_customer_lists(phone_number: str, admin: str = Depends(verify_admin)):
     """Get customer's lists and items"""
     conn = None
@@ -3204,7 +2987,7 @@ async def cs_get_customer_lists(phone_number: str, admin: str = Depends(verify_a
             return_db_connection(conn)
 
 
-@router.get("/admin/cs/customer/{phone_number}/memories")
+@router.get("/admin/cs/customer/{phone_number}/memories", dependencies=[Depends(prefer_read_replica)])
 async def cs_get_customer_memories(phone_number: str, admin: str = Depends(verify_admin)):
     """Get customer's memories"""
     conn = None
@@ -4654,9 +4437,9 @@ async def admin_dashboard(admin: str = Depends(verify_admin)):
             </table>
 
             <div class="pagination">
-                <button class="btn btn-secondary" id="prevBtn" onclick="loadConversations(currentOffset - 50)" disabled>Previous</button>
+                <button class="btn btn-secondary" id="prevBtn" onclick="loadConversations(currentPage - 1)" disabled>Previous</button>
                 <span id="pageInfo" style="padding: 8px;">Page 1</span>
-                <button class="btn btn-secondary" id="nextBtn" onclick="loadConversations(currentOffset + 50)">Next</button>
+                <button class="btn btn-secondary" id="nextBtn" onclick="loadConversations(currentPage + 1)">Next</button>
             </div>
         </div>
 
@@ -5594,8 +5377,10 @@ async def admin_dashboard(admin: str = Depends(verify_admin)):
                 (excludedTotal > 0 ? ` &nbsp;|&nbsp; <span style="color: #e74c3c;">${{excludedTotal}} excluded</span>` : '') +
                 ` &nbsp;|&nbsp; <span style="color: #7f8c8d;">${{summary.total_onboarded}} total onboarded</span>`;
 
-            document.getElementById('includedCount').textContent = `(${{data.included.length}})`;
-            document.getElementById('excludedCount').textContent = `(${{data.excluded.length}})`;
+            // Lists are capped at summary.list_limit; counts come from the summary
+            const countLabel = (shown, total) => shown < total ? `(${{total}}, showing ${{shown}})` : `(${{total}})`;
+            document.getElementById('includedCount').textContent = countLabel(data.included.length, summary.included);
+            document.getElementById('excludedCount').textContent = countLabel(data.excluded.length, excludedTotal);
 
             // Render included table
             const includedBody = document.getElementById('includedTableBody');
@@ -6265,7 +6050,9 @@ async def admin_dashboard(admin: str = Depends(verify_admin)):
         }}
 
         // Conversation Viewer Functions
-        let currentOffset = 0;
+        let currentPage = 0;
+        // Keyset cursor (last row's created_at and id) that starts each page seen so far
+        let pageCursors = [null];
         const PAGE_SIZE = 50;
         let hideReviewed = true;  // Default to hiding reviewed conversations
 
@@ -6279,7 +6066,6 @@ async def admin_dashboard(admin: str = Depends(verify_admin)):
                 btn.textContent = 'Hide Reviewed';
                 btn.style.background = '#95a5a6';
             }}
-            currentOffset = 0;
             loadConversations();
         }}
 
@@ -6297,8 +6083,10 @@ async def admin_dashboard(admin: str = Depends(verify_admin)):
             }}
         }}
 
-        async function loadConversations(offset = 0) {{
-            currentOffset = Math.max(0, offset);
+        async function loadConversations(page = 0) {{
+            if (page === 0) pageCursors = [null];
+            currentPage = Math.max(0, Math.min(page, pageCursors.length - 1));
+            const cursor = pageCursors[currentPage];
             const phone = document.getElementById('phoneFilter').value.trim();
             const intent = document.getElementById('intentFilter').value;
             const table = document.getElementById('conversationTable');
@@ -6310,7 +6098,10 @@ async def admin_dashboard(admin: str = Depends(verify_admin)):
             }}
 
             try {{
-                let url = `/admin/conversations?limit=${{PAGE_SIZE}}&offset=${{currentOffset}}&hide_reviewed=${{hideReviewed}}`;
+                let url = `/admin/conversations?limit=${{PAGE_SIZE}}&hide_reviewed=${{hideReviewed}}`;
+                if (cursor) {{
+                    url += `&before_created_at=${{encodeURIComponent(cursor.created_at)}}&before_id=${{cursor.id}}`;
+                }}
                 if (phone) {{
                     url += `&phone=${{encodeURIComponent(phone)}}`;
                 }}
@@ -6378,9 +6169,13 @@ async def admin_dashboard(admin: str = Depends(verify_admin)):
 
                 // Update UI
                 document.getElementById('conversationCount').textContent = conversations.length;
-                document.getElementById('prevBtn').disabled = currentOffset === 0;
+                if (conversations.length === PAGE_SIZE) {{
+                    const last = conversations[conversations.length - 1];
+                    pageCursors[currentPage + 1] = {{ created_at: last.created_at, id: last.id }};
+                }}
+                document.getElementById('prevBtn').disabled = currentPage === 0;
                 document.getElementById('nextBtn').disabled = conversations.length < PAGE_SIZE;
-                document.getElementById('pageInfo').textContent = `Page ${{Math.floor(currentOffset / PAGE_SIZE) + 1}}`;
+                document.getElementById('pageInfo').textContent = `Page ${{currentPage + 1}}`;
 
             }} catch (e) {{
                 console.error('Error loading conversations:', e);
@@ -6392,7 +6187,6 @@ async def admin_dashboard(admin: str = Depends(verify_admin)):
         function clearFilter() {{
             document.getElementById('phoneFilter').value = '';
             document.getElementById('intentFilter').value = '';
-            currentOffset = 0;
             loadConversations();
         }}
 
@@ -27,7 +27,7 @@ from typing import Optional, List, Dict
 # Add parent directory to path for imports
 sys.path.insert(0, '.')
 
-from database import get_monitoring_cursor, logger
+from database import get_monitoring_cursor, ensure_monitoring_schema, logger
 from config import ENVIRONMENT, OPENAI_API_KEY
 
 
@@ -102,60 +102,7 @@ DEFAULT_CODE_MAPPING = {
 
 def init_analyzer_tables():
     """Create code analyzer tables if they don't exist"""
-    with get_monitoring_cursor() as cursor:
-        # Code analysis results table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS code_analysis (
-                id SERIAL PRIMARY KEY,
-                issue_id INTEGER REFERENCES monitoring_issues(id),
-                pattern_id INTEGER,
-                root_cause_summary TEXT NOT NULL,
-                root_cause_details TEXT,
-                likely_files JSONB,
-                claude_prompt TEXT NOT NULL,
-                confidence_score INTEGER DEFAULT 50,
-                analysis_model TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                status TEXT DEFAULT 'pending',
-                applied_at TIMESTAMP,
-                applied_by TEXT
-            )
-        ''')
-
-        # Code analysis runs audit table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS code_analysis_runs (
-                id SERIAL PRIMARY KEY,
-                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                completed_at TIMESTAMP,
-                issues_analyzed INTEGER DEFAULT 0,
-                analyses_generated INTEGER DEFAULT 0,
-                use_ai BOOLEAN DEFAULT TRUE,
-                status TEXT DEFAULT 'running'
-            )
-        ''')
-
-        # Indexes
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_code_analysis_issue
-            ON code_analysis(issue_id)
-        ''')
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_code_analysis_pattern
-            ON code_analysis(pattern_id) WHERE pattern_id IS NOT NULL
-        ''')
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_code_analysis_status
-            ON code_analysis(status)
-        ''')
-
-        # Unique constraint to prevent duplicate analyses
-        cursor.execute('''
-            CREATE UNIQUE INDEX IF NOT EXISTS idx_code_analysis_unique_issue
-            ON code_analysis(issue_id) WHERE issue_id IS NOT NULL
-        ''')
-
-        logger.info("Code analyzer tables initialized")
+    ensure_monitoring_schema()
 
 
 def get_conversation_context(phone_number: str, log_id: int, context_size: int = 10) -> List[Dict]:
@@ -211,7 +158,7 @@ def get_conversation_context(phone_number: str, log_id: int, context_size: int =
     # Fall back to main database
     conn = None
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -517,8 +464,7 @@ def generate_ai_analysis(issue: Dict) -> Dict:
         return generate_rule_based_analysis(issue)
 
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
+        from services.openai_client import chat_completion
     except ImportError:
         logger.warning("OpenAI not installed, falling back to rule-based")
         return generate_rule_based_analysis(issue)
@@ -572,7 +518,8 @@ Provide a brief analysis in JSON format:
 """
 
     try:
-        response = client.chat.completions.create(
+        response = chat_completion(
+            'generate_ai_analysis',
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are an expert software engineer analyzing bugs in a Python/FastAPI SMS service. Be specific and actionable."},
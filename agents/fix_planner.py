@@ -30,7 +30,7 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, '.')
 
-from database import get_monitoring_cursor, logger
+from database import get_monitoring_cursor, ensure_monitoring_schema, logger
 from config import ENVIRONMENT
 
 # ============================================================================
@@ -124,44 +124,7 @@ PATTERN_TO_FILES = {
 
 def init_fix_planner_tables():
     """Create fix planner tables if they don't exist"""
-    with get_monitoring_cursor() as cursor:
-        # Fix proposals table - stores generated prompts
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS fix_proposals (
-                id SERIAL PRIMARY KEY,
-                issue_id INTEGER REFERENCES monitoring_issues(id),
-                pattern_id INTEGER,
-                affected_files JSONB,
-                code_context TEXT,
-                claude_prompt TEXT NOT NULL,
-                status TEXT DEFAULT 'pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Fix proposal runs table - audit trail
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS fix_proposal_runs (
-                id SERIAL PRIMARY KEY,
-                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                completed_at TIMESTAMP,
-                issues_analyzed INTEGER DEFAULT 0,
-                proposals_generated INTEGER DEFAULT 0,
-                status TEXT DEFAULT 'running'
-            )
-        ''')
-
-        # Indexes
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_fix_proposals_issue
-            ON fix_proposals(issue_id)
-        ''')
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_fix_proposals_status
-            ON fix_proposals(status)
-        ''')
-
-        logger.info("Fix planner tables initialized")
+    ensure_monitoring_schema()
 
 
 def get_unresolved_issues(limit: int = 20, issue_id: int = None,
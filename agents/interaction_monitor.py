@@ -24,7 +24,7 @@ from collections import defaultdict
 # Add parent directory to path for imports
 sys.path.insert(0, '.')
 
-from database import get_monitoring_cursor, logger
+from database import get_monitoring_cursor, ensure_monitoring_schema, logger
 from config import ENVIRONMENT
 
 
@@ -96,89 +96,7 @@ NOT_FOUND_PATTERNS = [
 
 def init_monitoring_tables():
     """Create monitoring tables if they don't exist"""
-    with get_monitoring_cursor() as cursor:
-        # Main issues table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS monitoring_issues (
-                id SERIAL PRIMARY KEY,
-                log_id INTEGER REFERENCES logs(id),
-                phone_number TEXT NOT NULL,
-                issue_type TEXT NOT NULL,
-                severity TEXT NOT NULL DEFAULT 'medium',
-                details JSONB,
-                detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                validated BOOLEAN DEFAULT FALSE,
-                validated_by TEXT,
-                validated_at TIMESTAMP,
-                resolution TEXT,
-                resolved_at TIMESTAMP,
-                false_positive BOOLEAN DEFAULT FALSE
-            )
-        ''')
-
-        # Index for efficient queries
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_monitoring_issues_type
-            ON monitoring_issues(issue_type, detected_at DESC)
-        ''')
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_monitoring_issues_validated
-            ON monitoring_issues(validated) WHERE validated = FALSE
-        ''')
-
-        # Unique constraint to prevent duplicate issues for same log
-        # First, check if index exists
-        cursor.execute('''
-            SELECT 1 FROM pg_indexes
-            WHERE indexname = 'idx_monitoring_issues_log_type'
-        ''')
-        if not cursor.fetchone():
-            # Find duplicate issue IDs to delete (keep the one with highest id)
-            cursor.execute('''
-                SELECT a.id FROM monitoring_issues a
-                JOIN monitoring_issues b ON a.log_id = b.log_id
-                  AND a.issue_type = b.issue_type
-                  AND a.id < b.id
-                WHERE a.log_id IS NOT NULL
-            ''')
-            duplicate_ids = [row[0] for row in cursor.fetchall()]
-
-            if duplicate_ids:
-                # First delete references from issue_pattern_links
-                cursor.execute('''
-                    DELETE FROM issue_pattern_links
-                    WHERE issue_id = ANY(%s)
-                ''', (duplicate_ids,))
-                logger.info(f"Removed {cursor.rowcount} pattern links for duplicate issues")
-
-                # Now delete the duplicate monitoring issues
-                cursor.execute('''
-                    DELETE FROM monitoring_issues
-                    WHERE id = ANY(%s)
-                ''', (duplicate_ids,))
-                logger.info(f"Removed {cursor.rowcount} duplicate monitoring issues")
-
-            # Now create the unique index
-            cursor.execute('''
-                CREATE UNIQUE INDEX IF NOT EXISTS idx_monitoring_issues_log_type
-                ON monitoring_issues(log_id, issue_type) WHERE log_id IS NOT NULL
-            ''')
-
-        # Monitoring runs table (audit trail)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS monitoring_runs (
-                id SERIAL PRIMARY KEY,
-                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                completed_at TIMESTAMP,
-                logs_analyzed INTEGER DEFAULT 0,
-                issues_found INTEGER DEFAULT 0,
-                time_range_start TIMESTAMP,
-                time_range_end TIMESTAMP,
-                status TEXT DEFAULT 'running'
-            )
-        ''')
-
-        logger.info("Monitoring tables initialized")
+    ensure_monitoring_schema()
 
 
 # ============================================================================
@@ -502,7 +420,7 @@ def detect_delivery_failures(hours: int) -> list:
     """Check for reminder delivery failures"""
     issues = []
 
-    with get_monitoring_cursor() as cursor:
+    with get_monitoring_cursor(readonly=True) as cursor:
         cursor.execute('''
             SELECT id, phone_number, reminder_text, reminder_date,
                    delivery_status, error_message, created_at
@@ -569,7 +487,7 @@ def analyze_interactions(hours: int = 24, dry_run: bool = False) -> dict:
 
     try:
         # Fetch recent logs
-        with get_monitoring_cursor() as cursor:
+        with get_monitoring_cursor(readonly=True) as cursor:
             cursor.execute('''
                 SELECT id, phone_number, message_in, message_out, intent, success, created_at
                 FROM logs
@@ -583,7 +501,7 @@ def analyze_interactions(hours: int = 24, dry_run: bool = False) -> dict:
         results['logs_analyzed'] = len(logs)
 
         # Fetch recent confidence logs for correlation
-        with get_monitoring_cursor() as cursor:
+        with get_monitoring_cursor(readonly=True) as cursor:
             cursor.execute('''
                 SELECT phone_number, action_type, confidence_score, threshold,
                        confirmed, user_message, created_at
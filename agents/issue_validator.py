@@ -28,7 +28,7 @@ from collections import defaultdict
 # Add parent directory to path for imports
 sys.path.insert(0, '.')
 
-from database import get_monitoring_cursor, logger
+from database import get_monitoring_cursor, ensure_monitoring_schema, logger
 from config import ENVIRONMENT, OPENAI_API_KEY
 
 
@@ -118,60 +118,7 @@ SEVERITY_ADJUSTMENTS = {
 
 def init_validator_tables():
     """Create validator-specific tables if they don't exist"""
-    with get_monitoring_cursor() as cursor:
-        # Issue patterns table - groups related issues
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS issue_patterns (
-                id SERIAL PRIMARY KEY,
-                pattern_name TEXT NOT NULL,
-                description TEXT,
-                issue_count INTEGER DEFAULT 0,
-                first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                status TEXT DEFAULT 'active',
-                root_cause TEXT,
-                suggested_fix TEXT,
-                priority TEXT DEFAULT 'medium'
-            )
-        ''')
-
-        # Link issues to patterns
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS issue_pattern_links (
-                id SERIAL PRIMARY KEY,
-                issue_id INTEGER REFERENCES monitoring_issues(id),
-                pattern_id INTEGER REFERENCES issue_patterns(id),
-                confidence FLOAT DEFAULT 1.0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Validation runs audit
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS validation_runs (
-                id SERIAL PRIMARY KEY,
-                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                completed_at TIMESTAMP,
-                issues_processed INTEGER DEFAULT 0,
-                validated_count INTEGER DEFAULT 0,
-                false_positive_count INTEGER DEFAULT 0,
-                patterns_found INTEGER DEFAULT 0,
-                ai_used BOOLEAN DEFAULT FALSE,
-                status TEXT DEFAULT 'running'
-            )
-        ''')
-
-        # Indexes
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_issue_patterns_status
-            ON issue_patterns(status) WHERE status = 'active'
-        ''')
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_issue_pattern_links_issue
-            ON issue_pattern_links(issue_id)
-        ''')
-
-        logger.info("Validator tables initialized")
+    ensure_monitoring_schema()
 
 
 def get_pending_issues(limit: int = 50) -> List[Dict]:
@@ -362,8 +309,7 @@ def validate_with_ai(issues: List[Dict]) -> Dict:
         return {}
 
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
+        from services.openai_client import chat_completion
     except ImportError:
         logger.warning("OpenAI not installed, skipping AI validation")
         return {}
@@ -406,7 +352,8 @@ Respond in JSON format:
 """
 
     try:
-        response = client.chat.completions.create(
+        response = chat_completion(
+            'validate_with_ai',
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are an expert at analyzing user interaction issues in software. Be concise and practical."},
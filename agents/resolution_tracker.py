@@ -28,7 +28,7 @@ from collections import defaultdict
 # Add parent directory to path for imports
 sys.path.insert(0, '.')
 
-from database import get_monitoring_cursor, logger
+from database import get_monitoring_cursor, ensure_monitoring_schema, logger
 from config import ENVIRONMENT
 
 
@@ -100,67 +100,7 @@ HEALTH_THRESHOLDS = {
 
 def init_tracker_tables():
     """Create resolution tracker tables if they don't exist"""
-    with get_monitoring_cursor() as cursor:
-        # Resolutions table - tracks how issues were resolved
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS issue_resolutions (
-                id SERIAL PRIMARY KEY,
-                issue_id INTEGER REFERENCES monitoring_issues(id),
-                resolution_type TEXT NOT NULL,
-                description TEXT,
-                commit_ref TEXT,
-                resolved_by TEXT,
-                resolved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                verified BOOLEAN DEFAULT FALSE,
-                verified_at TIMESTAMP
-            )
-        ''')
-
-        # Health snapshots - periodic system health metrics
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS health_snapshots (
-                id SERIAL PRIMARY KEY,
-                snapshot_date DATE NOT NULL UNIQUE,
-                total_interactions INTEGER DEFAULT 0,
-                total_issues INTEGER DEFAULT 0,
-                false_positives INTEGER DEFAULT 0,
-                resolved_issues INTEGER DEFAULT 0,
-                open_issues INTEGER DEFAULT 0,
-                health_score FLOAT,
-                issue_rate FLOAT,
-                resolution_rate FLOAT,
-                avg_resolution_hours FLOAT,
-                top_issue_types JSONB,
-                top_patterns JSONB,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Pattern resolutions - tracks when patterns are addressed
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS pattern_resolutions (
-                id SERIAL PRIMARY KEY,
-                pattern_id INTEGER REFERENCES issue_patterns(id),
-                resolution_type TEXT NOT NULL,
-                description TEXT,
-                resolved_by TEXT,
-                resolved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                recurrence_count INTEGER DEFAULT 0,
-                last_recurrence TIMESTAMP
-            )
-        ''')
-
-        # Indexes
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_resolutions_issue
-            ON issue_resolutions(issue_id)
-        ''')
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_health_snapshots_date
-            ON health_snapshots(snapshot_date DESC)
-        ''')
-
-        logger.info("Resolution tracker tables initialized")
+    ensure_monitoring_schema()
 
 
 def resolve_issue(issue_id: int, resolution_type: str, description: str = None,
@@ -267,7 +207,7 @@ def get_resolved_issues(days: int = 7, limit: int = 50) -> List[Dict]:
 
 def calculate_health_metrics(days: int = 7) -> Dict:
     """Calculate system health metrics for a time period"""
-    with get_monitoring_cursor() as cursor:
+    with get_monitoring_cursor(readonly=True) as cursor:
         metrics = {}
 
         # Total interactions
@@ -0,0 +1,5 @@
+"""
+Benchmarks
+Standalone timing scripts for database and AI hot paths.
+Run against a disposable database (they create and delete synthetic rows).
+"""
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+AI cache benchmark.
+Replays a stream of list messages that the local splitter cannot decide
+(so parse_list_items would call OpenAI for each), with the skewed repetition
+real users show ("milk and eggs"-style phrases recur constantly), against
+the local OpenAI stub server. Compares the AI cache off and on: OpenAI calls
+made, hit rate, tokens saved and time per parse.
+
+Usage:
+    python benchmarks/ai_cache.py              # 500 messages
+    python benchmarks/ai_cache.py 2000         # custom message count
+"""
+
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_environment, summarize
+
+setup_environment()
+
+import time
+
+import services.openai_client as openai_client
+import utils.ai_cache as ai_cache
+from database import init_db
+from services.ai_service import parse_list_items
+from utils.openai_stub import OpenAIStubServer
+
+BENCH_PHONE = '+15550390000'
+PHRASES = [
+    "strawberries and cream", "chicken and rice soup", "sunscreen and bug spray",
+    "dog food and cat litter", "hammer and wood glue", "shrimp and grits", "chips and guac",
+    "peaches and cream", "burgers and buns", "paper plates and cups", "wine and cheese",
+    "soap and sponges", "tacos and salsa verde", "bagels and cream cheese", "lemons and limes",
+    "ice and sparkling water", "pens and notebooks", "charcoal and lighter fluid",
+    "milk and cookies", "hot dogs and buns",
+]
+
+
+def run(count):
+    init_db()
+    rng = random.Random(39)
+    weights = [1 / (rank + 1) for rank in range(len(PHRASES))]
+    stream = rng.choices(PHRASES, weights=weights, k=count)
+
+    with OpenAIStubServer(content='["stub item"]') as stub:
+        openai_client.OPENAI_BASE_URL = stub.base_url
+        print(f"\nAI cache benchmark ({count} messages, {len(PHRASES)} distinct phrases)")
+        print("=" * 100)
+        for label, enabled in (('cache off (previous)', False), ('cache on', True)):
+            ai_cache.AI_CACHE_ENABLED = enabled
+            ai_cache.get_ai_cache().clear()
+            requests_before = len(stub.requests)
+            timings = []
+            for text in stream:
+                start = time.perf_counter()
+                parse_list_items(text, BENCH_PHONE)
+                timings.append((time.perf_counter() - start) * 1000)
+            print(summarize(label, timings))
+            print(f"{'':<40} OpenAI calls={len(stub.requests) - requests_before}")
+        stats = ai_cache.get_ai_cache_stats()['tasks']['parse_list_items']
+        print(f"\nhit rate={stats['hit_rate']:.1%} tokens saved={stats['tokens_saved']} "
+              f"(stub reports 60 tokens per call)")
+
+    from database import get_db_connection, return_db_connection, flush_write_buffer
+    flush_write_buffer()
+    conn = get_db_connection()
+    try:
+        conn.cursor().execute('DELETE FROM api_usage WHERE phone_number = %s', (BENCH_PHONE,))
+        conn.commit()
+    finally:
+        return_db_connection(conn)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,53 @@
+"""
+Shared helpers for benchmark scripts
+"""
+
+import os
+import sys
+import time
+import statistics
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_environment():
+    """Load .env.test (like the test suite) and put the project root on sys.path"""
+    env_path = os.path.join(ROOT_DIR, '.env.test')
+    if os.path.exists(env_path):
+        with open(env_path) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#') and '=' in line:
+                    key, value = line.split('=', 1)
+                    os.environ.setdefault(key.strip(), value.strip())
+
+    # config.py refuses to load without these; benchmarks never call out
+    for key, value in (
+        ("TWILIO_ACCOUNT_SID", "bench_sid"),
+        ("TWILIO_AUTH_TOKEN", "bench_token"),
+        ("TWILIO_PHONE_NUMBER", "+15550000000"),
+        ("OPENAI_API_KEY", "sk-bench-not-real"),
+        ("DATABASE_URL", "postgresql://localhost/remyndrs_test"),
+    ):
+        os.environ.setdefault(key, value)
+
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+
+
+def time_calls(func, iterations):
+    """Call func repeatedly and return per-call timings in milliseconds"""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(label, timings):
+    """Format a one-line timing summary"""
+    ordered = sorted(timings)
+    p95 = ordered[int(len(ordered) * 0.95) - 1] if len(ordered) >= 20 else ordered[-1]
+    return (f"{label:<40} mean={statistics.mean(timings):7.3f}ms "
+            f"p50={statistics.median(timings):7.3f}ms p95={p95:7.3f}ms n={len(timings)}")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+Customer search benchmark.
+Seeds a large users table and times services.customer_search_service for
+each query shape the CS search box sends (full phone number, partial
+digits, name substring, two-letter name prefix), printing the plan each
+one gets. Then times the cached endpoint path for a repeated query.
+
+Usage:
+    python benchmarks/customer_search.py              # 200000 users, 50 iterations
+    python benchmarks/customer_search.py 1000000 20   # custom users / iterations
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_environment, time_calls, summarize
+
+setup_environment()
+
+from fastapi import Request
+
+from database import get_db_connection, return_db_connection, init_db
+from services.customer_search_service import search_customers
+
+BENCH_PREFIX = '+1999'
+FIRST_NAMES = ['Olivia', 'Liam', 'Emma', 'Noah', 'Amelia', 'Oliver', 'Sophia', 'Elijah', 'Charlotte', 'James',
+               'Mia', 'Lucas', 'Harper', 'Mateo', 'Evelyn', 'Theodore', 'Abigail', 'Henry', 'Ellie', 'Levi']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez',
+              'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore']
+COLUMNS = 'phone_number, first_name, last_name, premium_status, last_active_at'
+ORDER_BY = 'last_active_at DESC NULLS LAST'
+
+
+def seed(cursor, count):
+    cleanup(cursor)
+    print(f"Seeding {count} users...")
+    cursor.execute('''
+        INSERT INTO users (phone_number, first_name, last_name, onboarding_complete, last_active_at)
+        SELECT %s || LPAD(n::text, 7, '0'),
+               (%s::text[])[1 + n %% array_length(%s::text[], 1)] || CASE WHEN n %% 1000 = 0 THEN 'ina' ELSE '' END,
+               (%s::text[])[1 + (n / 7) %% array_length(%s::text[], 1)],
+               TRUE, NOW() - (n %% 5000) * INTERVAL '1 hour'
+        FROM generate_series(1, %s) n
+    ''', (BENCH_PREFIX, FIRST_NAMES, FIRST_NAMES, LAST_NAMES, LAST_NAMES, count))
+    cursor.execute('ANALYZE users')
+
+
+def cleanup(cursor):
+    cursor.execute('DELETE FROM users WHERE phone_number LIKE %s', (BENCH_PREFIX + '%',))
+
+
+def run(count, iterations):
+    init_db()
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        seed(c, count)
+        conn.commit()
+
+        queries = [
+            ('full phone number', '(999) 000-1234'),
+            ('partial digits', '0012345'),
+            ('name substring', 'liaina'),
+            ('two-letter prefix', 'ab'),
+        ]
+        print(f"\nCustomer search benchmark ({count} users, {iterations} iterations)")
+        print("=" * 100)
+        for label, query in queries:
+            rows = search_customers(c, query, COLUMNS, ORDER_BY)
+            timings = time_calls(lambda: search_customers(c, query, COLUMNS, ORDER_BY), iterations)
+            print(summarize(f"{label} {query!r} ({len(rows)} rows)", timings))
+            # cursor.query is the last statement search_customers ran
+            c.execute('EXPLAIN ' + c.query.decode())
+            plan = [line for (line,) in c.fetchall() if 'Scan' in line]
+            print(f"{'':<40} plan: {' / '.join(p.strip().split('  (')[0].lstrip('-> ') for p in plan)}")
+
+        # Repeated keystrokes through the endpoint: the first call misses, the rest hit the cache
+        import asyncio
+        from admin_dashboard import cs_search_customers
+        request = Request({'type': 'http', 'method': 'GET', 'path': '/admin/cs/search', 'headers': []})
+        cached = time_calls(lambda: asyncio.run(cs_search_customers(request, q='liaina', admin='admin')), iterations)
+        print(summarize("endpoint, repeated query", cached))
+    finally:
+        conn.rollback()
+        c = conn.cursor()
+        cleanup(c)
+        conn.commit()
+        return_db_connection(conn)
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+    )
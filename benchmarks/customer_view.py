@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+"""
+CS customer view benchmark.
+Seeds one heavy customer (reminders, lists of items, memories, tickets,
+notes) and times opening them in the CS portal: the per-tab endpoints
+(profile, reminders, lists, memories, tickets) versus the single
+/cs/customer/{phone}/full view, uncached and served from the
+version-keyed cache.
+
+Usage:
+    python benchmarks/customer_view.py            # 20 lists, 50 iterations
+    python benchmarks/customer_view.py 100 20     # custom lists / iterations
+"""
+
+import sys
+import os
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_environment, time_calls, summarize
+
+setup_environment()
+
+from fastapi import Request
+
+from database import get_db_connection, return_db_connection, init_db
+
+BENCH_PHONE = '+15550490000'
+ITEMS_PER_LIST = 25
+
+
+def seed(cursor, list_count):
+    cleanup(cursor)
+    print(f"Seeding a customer with {list_count} lists of {ITEMS_PER_LIST} items...")
+    cursor.execute("INSERT INTO users (phone_number, first_name, premium_status) VALUES (%s, 'Bench', 'premium')",
+                   (BENCH_PHONE,))
+    cursor.execute('''
+        INSERT INTO reminders (phone_number, reminder_text, reminder_date, sent)
+        SELECT %s, 'bench reminder ' || n, NOW() + n * INTERVAL '1 hour', n %% 3 = 0
+        FROM generate_series(1, 500) n
+    ''', (BENCH_PHONE,))
+    cursor.execute('''
+        INSERT INTO lists (phone_number, list_name)
+        SELECT %s, 'bench list ' || n FROM generate_series(1, %s) n
+    ''', (BENCH_PHONE, list_count))
+    cursor.execute('''
+        INSERT INTO list_items (list_id, phone_number, item_text, completed)
+        SELECT l.id, l.phone_number, 'item ' || n, n %% 4 = 0
+        FROM lists l, generate_series(1, %s) n
+        WHERE l.phone_number = %s
+    ''', (ITEMS_PER_LIST, BENCH_PHONE))
+    cursor.execute('''
+        INSERT INTO memories (phone_number, memory_text)
+        SELECT %s, 'bench memory ' || n FROM generate_series(1, 200) n
+    ''', (BENCH_PHONE,))
+    cursor.execute('''
+        INSERT INTO support_tickets (phone_number, status, message_count)
+        SELECT %s, CASE WHEN n %% 2 = 0 THEN 'closed' ELSE 'open' END, 5 FROM generate_series(1, 10) n
+    ''', (BENCH_PHONE,))
+    cursor.execute('''
+        INSERT INTO support_messages (ticket_id, phone_number, message, direction)
+        SELECT t.id, t.phone_number, 'message ' || n, 'inbound'
+        FROM support_tickets t, generate_series(1, 5) n
+        WHERE t.phone_number = %s
+    ''', (BENCH_PHONE,))
+    cursor.execute('''
+        INSERT INTO customer_notes (phone_number, note, created_by)
+        SELECT %s, 'note ' || n, 'bench' FROM generate_series(1, 10) n
+    ''', (BENCH_PHONE,))
+    for table in ('reminders', 'lists', 'list_items', 'memories', 'support_tickets', 'customer_notes'):
+        cursor.execute(f'ANALYZE {table}')
+
+
+def cleanup(cursor):
+    cursor.execute('DELETE FROM support_messages WHERE phone_number = %s', (BENCH_PHONE,))
+    for table in ('support_tickets', 'customer_notes', 'list_items', 'lists', 'memories', 'reminders', 'users'):
+        cursor.execute(f'DELETE FROM {table} WHERE phone_number = %s', (BENCH_PHONE,))
+
+
+def run(list_count, iterations):
+    init_db()
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        seed(c, list_count)
+        conn.commit()
+
+        import admin_dashboard
+        import cs_portal
+        import services.customer_view_service as customer_view_service
+        import utils.response_cache as response_cache
+
+        def per_tab():
+            asyncio.run(admin_dashboard.cs_get_customer(BENCH_PHONE, admin='admin'))
+            asyncio.run(admin_dashboard.cs_get_customer_reminders(BENCH_PHONE, admin='admin'))
+            asyncio.run(admin_dashboard.cs_get_customer_lists(BENCH_PHONE, admin='admin'))
+            asyncio.run(admin_dashboard.cs_get_customer_memories(BENCH_PHONE, admin='admin'))
+            asyncio.run(cs_portal.get_customer_tickets(BENCH_PHONE, user='cs'))
+
+        request = Request({'type': 'http', 'method': 'GET', 'path': f'/cs/customer/{BENCH_PHONE}/full', 'headers': []})
+
+        def full_view():
+            return asyncio.run(cs_portal.cs_get_customer_full(
+                BENCH_PHONE, request, reminder_limit=50, reminder_offset=0, user='cs'))
+
+        tabs = time_calls(per_tab, iterations)
+        response_cache.ADMIN_CACHE_ENABLED = False
+        uncached = time_calls(full_view, iterations)
+        response_cache.ADMIN_CACHE_ENABLED = True
+        customer_view_service.get_view_cache().clear()
+        cached = time_calls(full_view, iterations)
+
+        print(f"\nCustomer view benchmark ({list_count} lists x {ITEMS_PER_LIST} items, {iterations} iterations)")
+        print("=" * 100)
+        print(summarize(f"per-tab endpoints ({list_count + 12} queries)", tabs))
+        print(summarize("/full, uncached (2 queries)", uncached))
+        print(summarize("/full, cached by data version (1 query)", cached))
+        speedup = sum(tabs) / max(sum(uncached), 1e-9)
+        print(f"{'':<40} single-query speedup={speedup:.2f}x")
+    finally:
+        conn.rollback()
+        c = conn.cursor()
+        cleanup(c)
+        conn.commit()
+        return_db_connection(conn)
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+    )
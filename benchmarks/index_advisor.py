@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+"""
+Index advisor.
+EXPLAINs the catalogued hot model queries against the current database and
+proposes indexes for sequential scans and sorts it finds on large tables:
+composite (equality columns, then range/sort columns), partial (boolean
+filters) and pg_trgm GIN (LIKE '%term%'). Also prints the top statements
+from pg_stat_statements when that extension is installed.
+
+Proposals are a starting point: review them, then ship the chosen set as a
+ConcurrentIndex migration in migrations/app.py.
+
+Usage:
+    python benchmarks/index_advisor.py                 # EXPLAIN only
+    python benchmarks/index_advisor.py --analyze       # EXPLAIN ANALYZE (runs the queries)
+    python benchmarks/index_advisor.py --min-rows 500  # flag smaller tables too
+"""
+
+import sys
+import os
+import re
+import json
+import argparse
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_environment
+
+setup_environment()
+
+from database import get_db_connection, return_db_connection
+
+# Hot queries, copied from the model/service functions that run them
+WORKLOAD = {
+    'get_reminders_for_date': '''
+        SELECT id, reminder_text, reminder_date
+        FROM reminders
+        WHERE phone_hash = %(phone_hash)s
+          AND sent = FALSE
+          AND reminder_date >= %(day_start)s
+          AND reminder_date < %(day_end)s
+        ORDER BY reminder_date ASC
+    ''',
+    'get_memories': '''
+        SELECT id, memory_text, parsed_data, created_at FROM memories
+        WHERE phone_hash = %(phone_hash)s ORDER BY created_at DESC
+    ''',
+    'get_all_tickets': '''
+        SELECT t.id, t.phone_number, t.status, t.created_at, t.updated_at,
+               u.first_name,
+               (SELECT COUNT(*) FROM support_messages WHERE ticket_id = t.id) as message_count,
+               (SELECT message FROM support_messages WHERE ticket_id = t.id ORDER BY created_at DESC LIMIT 1) as last_message
+        FROM support_tickets t
+        LEFT JOIN users u ON t.phone_number = u.phone_number
+        WHERE t.status = 'open'
+        ORDER BY t.updated_at DESC
+    ''',
+    'cs_search_customers': '''
+        SELECT phone_number, first_name, last_name, created_at, last_active_at
+        FROM users
+        WHERE phone_number LIKE %(pattern)s
+           OR LOWER(first_name) LIKE LOWER(%(pattern)s)
+           OR LOWER(last_name) LIKE LOWER(%(pattern)s)
+        ORDER BY last_active_at DESC NULLS LAST
+        LIMIT 50
+    ''',
+    'analyze_interactions_logs': '''
+        SELECT id, phone_number, message_in, message_out, intent, success, created_at
+        FROM logs
+        WHERE created_at > NOW() - INTERVAL '24 hours'
+        ORDER BY created_at ASC
+    ''',
+    'analyze_interactions_confidence': '''
+        SELECT phone_number, action_type, confidence_score, threshold,
+               confirmed, user_message, created_at
+        FROM confidence_logs
+        WHERE created_at > NOW() - INTERVAL '24 hours'
+    ''',
+    'check_delivery_failures': '''
+        SELECT id, phone_number, reminder_text, reminder_date,
+               delivery_status, error_message, created_at
+        FROM reminders
+        WHERE delivery_status = 'failed'
+          AND created_at > NOW() - INTERVAL '24 hours'
+        ORDER BY created_at DESC
+    ''',
+}
+
+_EQUALITY = re.compile(r'\((?:\w+\.)?(\w+) = ')
+_RANGE = re.compile(r'\((?:\w+\.)?(\w+) (?:>=|<=|>|<) ')
+_LIKE = re.compile(r'\((lower\()?(?:\w+\.)?(\w+)\)?(?:::text)? ~~ ')
+_NEGATED_BOOL = re.compile(r'\(NOT (?:\w+\.)?(\w+)\)')
+
+
+def sample_params(cursor, phone_number=None):
+    """Query parameters for one user (a random one unless given)"""
+    if phone_number:
+        cursor.execute('SELECT phone_number, phone_hash FROM users WHERE phone_number = %s', (phone_number,))
+    else:
+        cursor.execute('SELECT phone_number, phone_hash FROM users TABLESAMPLE SYSTEM (1) LIMIT 1')
+    row = cursor.fetchone() or ('+15550000000', None)
+    today = datetime.combine(date.today(), datetime.min.time())
+    return {
+        'phone_hash': row[1],
+        'day_start': today + timedelta(days=1),
+        'day_end': today + timedelta(days=2),
+        'pattern': f"%{row[0][-6:]}%",
+    }
+
+
+def _walk(plan, parent=None):
+    yield plan, parent
+    for child in plan.get('Plans', []):
+        yield from _walk(child, plan)
+
+
+def _propose_from_scan(node, sort_keys):
+    """Turn a sequential scan's filter (and the sort above it) into index proposals"""
+    table = node['Relation Name']
+    condition = node.get('Filter', '')
+    proposals = []
+
+    likes = _LIKE.findall(condition)
+    for lowered, column in likes:
+        expr = f"LOWER({column})" if lowered else column
+        proposals.append(f"CREATE INDEX CONCURRENTLY ON {table} USING gin ({expr} gin_trgm_ops)  -- needs pg_trgm")
+    if likes:
+        return proposals
+
+    columns = []
+    for column in _EQUALITY.findall(condition) + _RANGE.findall(condition):
+        if column not in columns:
+            columns.append(column)
+    for key in sort_keys:
+        column = key.split('.')[-1]
+        if column.split()[0] not in columns:
+            columns.append(column)
+    flags = [c for c in _NEGATED_BOOL.findall(condition) if c not in columns]
+    if not columns and flags:
+        return proposals
+
+    where = f" WHERE {' AND '.join(f'{flag} = FALSE' for flag in flags)}" if flags else ''
+    if columns:
+        proposals.append(f"CREATE INDEX CONCURRENTLY ON {table} ({', '.join(columns)}){where}")
+    return proposals
+
+
+def advise(cursor, name, query, params, analyze, min_rows):
+    explain = 'EXPLAIN (ANALYZE, FORMAT JSON)' if analyze else 'EXPLAIN (FORMAT JSON)'
+    cursor.execute(f"{explain} {query}", params)
+    result = cursor.fetchone()[0]
+    result = result[0] if isinstance(result, list) else json.loads(result)[0]
+    plan = result['Plan']
+
+    indexes_used, proposals = set(), []
+    for node, parent in _walk(plan):
+        if 'Index Name' in node:
+            indexes_used.add(node['Index Name'])
+        if node['Node Type'] != 'Seq Scan':
+            continue
+        cursor.execute('SELECT reltuples FROM pg_class WHERE relname = %s', (node['Relation Name'],))
+        reltuples = cursor.fetchone()[0]
+        if reltuples < min_rows:
+            continue
+        sort_keys = parent.get('Sort Key', []) if parent and parent['Node Type'] == 'Sort' else []
+        proposals.extend(_propose_from_scan(node, sort_keys))
+
+    timing = f" {result['Execution Time']:.2f}ms" if analyze else ''
+    print(f"\n{name}: cost={plan['Total Cost']:.0f}{timing}")
+    print(f"  indexes used: {', '.join(sorted(indexes_used)) or 'none'}")
+    for proposal in proposals:
+        print(f"  propose: {proposal}")
+    return proposals
+
+
+def print_top_statements(cursor, limit=10):
+    cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")
+    if not cursor.fetchone():
+        print("\npg_stat_statements is not installed; skipping workload statistics")
+        return
+    cursor.execute('''
+        SELECT calls, total_exec_time, mean_exec_time, query
+        FROM pg_stat_statements
+        WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+        ORDER BY total_exec_time DESC
+        LIMIT %s
+    ''', (limit,))
+    print(f"\nTop {limit} statements by total time (pg_stat_statements)")
+    print("=" * 100)
+    for calls, total, mean, query in cursor.fetchall():
+        print(f"{total:10.0f}ms total {mean:8.2f}ms mean {calls:8d} calls  {' '.join(query.split())[:60]}")
+
+
+def run(analyze, min_rows):
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        params = sample_params(c)
+        print(f"Index advisor ({'EXPLAIN ANALYZE' if analyze else 'EXPLAIN'}, tables >= {min_rows} rows)")
+        print("=" * 100)
+        proposals = []
+        for name, query in WORKLOAD.items():
+            proposals.extend(advise(c, name, query, params, analyze, min_rows))
+        print_top_statements(c)
+        if not proposals:
+            print("\nNo missing indexes found for the catalogued queries")
+    finally:
+        conn.rollback()
+        return_db_connection(conn)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--analyze', action='store_true', help='run EXPLAIN ANALYZE')
+    parser.add_argument('--min-rows', type=int, default=10000, help='ignore seq scans on smaller tables')
+    args = parser.parse_args()
+    run(args.analyze, args.min_rows)
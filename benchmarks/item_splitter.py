@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+"""
+Item splitter benchmark.
+Runs the local splitter over labelled inputs that contain " and " (every one
+of which parse_list_items used to send to OpenAI): the examples from the
+parse_list_items prompt plus held-out phrases that were not used to build
+the lexicon.
+
+Reports, per set, the share of OpenAI calls avoided (inputs split locally),
+accuracy of the local splits, the ambiguous inputs that still escalate, and
+the time per local split.
+
+Usage:
+    python benchmarks/item_splitter.py              # 1000 iterations
+    python benchmarks/item_splitter.py 200          # custom iterations
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_environment, time_calls, summarize
+
+setup_environment()
+
+from database import init_db
+from utils.item_splitter import split_list_text
+
+PROMPT_EXAMPLES = [
+    ("ham and cheese sandwich", ["ham and cheese sandwich"]),
+    ("peanut butter and jelly, milk, ham and cheese sandwich", ["peanut butter and jelly", "milk", "ham and cheese sandwich"]),
+    ("mac and cheese, bread and butter, eggs", ["mac and cheese", "bread and butter", "eggs"]),
+    ("apples, oranges and bananas", ["apples", "oranges", "bananas"]),
+    ("chips and salsa", ["chips and salsa"]),
+    ("milk and eggs", ["milk", "eggs"]),
+    ("soap, shampoo and conditioner", ["soap", "shampoo", "conditioner"]),
+    ("tape and stick", ["tape", "stick"]),
+    ("gloves and helmet", ["gloves", "helmet"]),
+    ("pants and jersey", ["pants", "jersey"]),
+]
+
+HELD_OUT = [
+    ("coffee, tea and sugar", ["coffee", "tea", "sugar"]),
+    ("butter and flour", ["butter", "flour"]),
+    ("batteries and diapers", ["batteries", "diapers"]),
+    ("paper towels and toilet paper", ["paper towels", "toilet paper"]),
+    ("lettuce, tomatoes and onions", ["lettuce", "tomatoes", "onions"]),
+    ("fish and chips, juice", ["fish and chips", "juice"]),
+    ("salt and vinegar chips", ["salt and vinegar chips"]),
+    ("cookies and cream ice cream", ["cookies and cream ice cream"]),
+    ("rice and beans and tortillas", ["rice and beans", "tortillas"]),
+    ("strawberries and cream", ["strawberries and cream"]),
+    ("chicken and rice soup", ["chicken and rice soup"]),
+    ("dog food and cat litter", ["dog food", "cat litter"]),
+    ("hammer, nails and wood glue", ["hammer", "nails", "wood glue"]),
+    ("sunscreen and bug spray", ["sunscreen", "bug spray"]),
+]
+
+
+def evaluate(label, cases, iterations):
+    local, correct, escalated = 0, 0, []
+    for text, expected in cases:
+        result = split_list_text(text)
+        if result is None:
+            escalated.append(text)
+            continue
+        local += 1
+        correct += [r.lower() for r in result] == expected
+
+    timings = time_calls(lambda: [split_list_text(text) for text, _ in cases], iterations)
+    per_split = [t / len(cases) for t in timings]
+
+    print(f"{label}: {len(cases)} inputs with ' and '")
+    print(f"  OpenAI calls avoided: {local}/{len(cases)} ({local / len(cases):.0%})")
+    print(f"  local accuracy:       {correct}/{local}" + (f" ({correct / local:.0%})" if local else ""))
+    print(f"  escalated:            {', '.join(escalated) or '-'}")
+    print(summarize("  local split", per_split))
+    print()
+
+
+def run(iterations):
+    init_db()
+    print(f"\nItem splitter benchmark ({iterations} iterations)")
+    print("=" * 100)
+    evaluate("prompt examples", PROMPT_EXAMPLES, iterations)
+    evaluate("held-out phrases", HELD_OUT, iterations)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+List bulk add benchmark.
+Times adding one multi-item message ("milk, eggs, bread, ...") to a list the
+way the handlers used to (can_add_list_item + get_item_count, then
+add_list_item per item, then a recount for the item counter) against
+add_list_items, which checks capacity, dedupes and inserts in one statement.
+
+Each iteration starts from an empty list.
+
+Usage:
+    python benchmarks/list_bulk_add.py              # 8 items, 100 iterations
+    python benchmarks/list_bulk_add.py 20 50        # custom items / iterations
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_environment, time_calls, summarize
+
+setup_environment()
+
+from database import init_db
+from config import MAX_ITEMS_PER_LIST
+from models.list_model import (
+    create_list, delete_list, clear_list, add_list_item, add_list_items, get_item_count
+)
+from services.tier_service import can_add_list_item
+
+BENCH_PHONE = '+15550360000'
+BENCH_LIST = 'Bench Grocery List'
+
+
+def per_item(list_id, items):
+    can_add_list_item(BENCH_PHONE, list_id)
+    available_slots = MAX_ITEMS_PER_LIST - get_item_count(list_id)
+    added = 0
+    for item in items:
+        if added < available_slots:
+            add_list_item(list_id, BENCH_PHONE, item)
+            added += 1
+    return get_item_count(list_id)
+
+
+def bulk(list_id, items):
+    return add_list_items(list_id, BENCH_PHONE, items)['item_count']
+
+
+def run(item_count, iterations):
+    init_db()
+    delete_list(BENCH_PHONE, BENCH_LIST)
+    list_id = create_list(BENCH_PHONE, BENCH_LIST)
+    items = [f"item {i}" for i in range(item_count)]
+
+    try:
+        print(f"\nList bulk add benchmark ({item_count} items per message, {iterations} iterations)")
+        print("=" * 100)
+        for label, strategy in (('per-item add_list_item (previous)', per_item), ('add_list_items', bulk)):
+            def add_message():
+                clear_list(BENCH_PHONE, BENCH_LIST)
+                strategy(list_id, items)
+
+            clear_timings = time_calls(lambda: clear_list(BENCH_PHONE, BENCH_LIST), iterations)
+            timings = time_calls(add_message, iterations)
+            clear_ms = sum(clear_timings) / len(clear_timings)
+            # Report the add alone by taking out the average cost of the reset
+            print(summarize(label, [t - clear_ms for t in timings]))
+    finally:
+        delete_list(BENCH_PHONE, BENCH_LIST)
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 8,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100,
+    )
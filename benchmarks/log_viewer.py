@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+Conversation log viewer benchmark.
+Seeds a long run of logs (a few of them reviewed) and times the admin
+viewer's first page and a deep page, reached with OFFSET versus with a
+(created_at, id) keyset cursor, plus a full NDJSON-style export.
+
+Usage:
+    python benchmarks/log_viewer.py              # 30000 logs, page 500, 50 iterations
+    python benchmarks/log_viewer.py 10000 150 20 # custom logs / deep page / iterations
+"""
+
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_environment, time_calls, summarize
+
+setup_environment()
+
+from database import get_db_connection, return_db_connection, init_db, get_recent_logs, iter_recent_logs
+
+BENCH_PHONE = '+15550470000'
+PAGE_SIZE = 50
+
+
+def seed(cursor, count):
+    cleanup(cursor)
+    print(f"Seeding {count} logs...")
+    cursor.execute('''
+        INSERT INTO logs (phone_number, message_in, message_out, intent, success, created_at)
+        SELECT %s, 'bench message ' || n, 'bench reply ' || n, 'help', TRUE,
+               NOW() - n * INTERVAL '1 second'
+        FROM generate_series(1, %s) n
+    ''', (BENCH_PHONE, count))
+    cursor.execute('''
+        INSERT INTO conversation_analysis (log_id, phone_number, issue_type, source)
+        SELECT id, phone_number, 'good', 'manual' FROM logs
+        WHERE phone_number = %s AND id %% 7 = 0
+    ''', (BENCH_PHONE,))
+    cursor.execute('ANALYZE logs')
+    cursor.execute('ANALYZE conversation_analysis')
+
+
+def cleanup(cursor):
+    cursor.execute('''
+        DELETE FROM conversation_analysis
+        WHERE log_id IN (SELECT id FROM logs WHERE phone_number = %s)
+    ''', (BENCH_PHONE,))
+    cursor.execute('DELETE FROM logs WHERE phone_number = %s', (BENCH_PHONE,))
+
+
+def run(count, deep_page, iterations):
+    init_db()
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        seed(c, count)
+        conn.commit()
+
+        offset = deep_page * PAGE_SIZE
+        previous = get_recent_logs(limit=PAGE_SIZE, offset=offset - PAGE_SIZE, hide_reviewed=True)
+        cursor = (datetime.fromisoformat(previous[-1]['created_at']), previous[-1]['id'])
+
+        first = time_calls(lambda: get_recent_logs(limit=PAGE_SIZE, hide_reviewed=True), iterations)
+        deep_offset = time_calls(lambda: get_recent_logs(limit=PAGE_SIZE, offset=offset, hide_reviewed=True), iterations)
+        deep_keyset = time_calls(lambda: get_recent_logs(limit=PAGE_SIZE, before=cursor, hide_reviewed=True), iterations)
+        export = time_calls(lambda: sum(1 for _ in iter_recent_logs(phone_filter=BENCH_PHONE)), 3)
+
+        assert get_recent_logs(limit=PAGE_SIZE, offset=offset, hide_reviewed=True) == \
+            get_recent_logs(limit=PAGE_SIZE, before=cursor, hide_reviewed=True)
+
+        print(f"\nLog viewer benchmark ({count} logs, page {deep_page + 1} of {PAGE_SIZE}, {iterations} iterations)")
+        print("=" * 100)
+        print(summarize("page 1", first))
+        print(summarize(f"page {deep_page + 1} (OFFSET {offset})", deep_offset))
+        print(summarize(f"page {deep_page + 1} (keyset cursor)", deep_keyset))
+        print(summarize(f"export {count} logs (NDJSON batches)", export))
+        speedup = sum(deep_offset) / max(sum(deep_keyset), 1e-9)
+        print(f"{'':<40} deep page speedup={speedup:.2f}x")
+    finally:
+        conn.rollback()
+        c = conn.cursor()
+        cleanup(c)
+        conn.commit()
+        return_db_connection(conn)
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 30000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 499,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 50,
+    )
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+Memory context benchmark.
+Seeds one user with many memories, then asks questions about older ones and
+compares the memory section process_with_ai would send: the most recent
+MAX_MEMORIES_IN_CONTEXT (previous behavior), all memories (the only way the
+old approach could see everything), and get_relevant_memories.
+
+Reports how often the memory a question is about made it into the prompt,
+the prompt size (tokens estimated at ~4 characters each) and retrieval time.
+
+Usage:
+    python benchmarks/memory_context.py              # 500 memories, 50 iterations
+    python benchmarks/memory_context.py 2000 20      # custom memories / iterations
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_environment, time_calls, summarize
+
+setup_environment()
+
+from database import get_db_connection, return_db_connection, init_db
+from config import MAX_MEMORIES_IN_CONTEXT
+from models.memory import save_memory, get_memories, get_relevant_memories
+from utils.embeddings import embeddings_available
+
+BENCH_PHONE = '+15550340000'
+
+# Saved first, so they're the oldest memories; (memory, question about it)
+TARGETS = [
+    ("Garage door code is 4512", "what's the code for the garage?"),
+    ("Dentist is Dr. Patel on Main Street", "who is my dentist"),
+    ("Passport number is X1234567", "what is my passport number"),
+    ("WiFi password at the cabin is pinecone42", "cabin wifi password?"),
+    ("Mom's birthday is March 3rd", "when is mom's birthday"),
+    ("Car insurance policy is with Geico, renews June", "who is my car insurance with"),
+    ("Bike lock combination is 9182", "bike lock combo"),
+    ("Neighbor Sam has the spare house key", "who has the spare key"),
+]
+FILLER_TOPICS = ['recipe', 'podcast', 'movie', 'book', 'restaurant', 'song', 'hike', 'gift', 'quote', 'app']
+
+
+def seed(count):
+    cleanup()
+    print(f"Seeding {count} memories...")
+    for text, _ in TARGETS:
+        save_memory(BENCH_PHONE, text, {})
+    for i in range(count - len(TARGETS)):
+        topic = FILLER_TOPICS[i % len(FILLER_TOPICS)]
+        save_memory(BENCH_PHONE, f"Liked {topic} suggestion {i}: item{i} from friend{i % 37}", {})
+
+
+def cleanup():
+    conn = get_db_connection()
+    try:
+        conn.cursor().execute('DELETE FROM memories WHERE phone_number = %s', (BENCH_PHONE,))
+        conn.commit()
+    finally:
+        return_db_connection(conn)
+
+
+def context_tokens(memories):
+    return sum(len(f"- {m[1]} (recorded on January 01, 2026)\n") for m in memories) / 4
+
+
+def run(count, iterations):
+    init_db()
+    conn = get_db_connection()
+    try:
+        if not embeddings_available(conn.cursor()):
+            print("pgvector is not installed; get_relevant_memories falls back to the most recent memories")
+    finally:
+        return_db_connection(conn)
+
+    try:
+        seed(count)
+        strategies = {
+            'most recent (previous)': lambda q: get_memories(BENCH_PHONE)[:MAX_MEMORIES_IN_CONTEXT],
+            'all memories': lambda q: get_memories(BENCH_PHONE),
+            'relevant (embeddings)': lambda q: get_relevant_memories(BENCH_PHONE, q, MAX_MEMORIES_IN_CONTEXT),
+        }
+
+        print(f"\nMemory context benchmark ({count} memories, {len(TARGETS)} questions, {iterations} iterations)")
+        print("=" * 100)
+        for label, strategy in strategies.items():
+            hits, tokens = 0, 0.0
+            for text, question in TARGETS:
+                memories = strategy(question)
+                hits += any(m[1] == text for m in memories)
+                tokens += context_tokens(memories)
+            question = TARGETS[0][1]
+            timings = time_calls(lambda: strategy(question), iterations)
+            print(summarize(label, timings))
+            print(f"{'':<40} recall={hits}/{len(TARGETS)} context_tokens~{tokens / len(TARGETS):.0f}\n")
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+    )
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Memory dedup benchmark.
+Seeds one user with many unrelated memories and times the similarity lookup
+save_memory runs first: keyword-indexed candidates (_find_similar_memory)
+versus the previous approach of loading and re-tokenizing every memory.
+
+Usage:
+    python benchmarks/memory_dedup.py              # 5,000 memories, 200 iterations
+    python benchmarks/memory_dedup.py 20000 100    # custom memories / iterations
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_environment, time_calls, summarize
+
+setup_environment()
+
+from database import get_db_connection, return_db_connection, init_db
+from models.memory import _extract_keywords, _keyword_similarity, _find_similar_memory
+
+BENCH_PHONE = '+15550320000'
+NEW_MEMORY = "Spare key is under the blue flower pot"
+
+
+def seed(cursor, count):
+    cleanup(cursor)
+    print(f"Seeding {count} memories...")
+    cursor.execute('''
+        INSERT INTO memories (phone_number, memory_text, keywords)
+        SELECT %s, 'Note ' || m || ': item' || m || ' stored in drawer' || (m %% 50),
+               ARRAY['note', m::text, 'item' || m, 'stored', 'drawer' || (m %% 50)]
+        FROM generate_series(1, %s) m
+    ''', (BENCH_PHONE, count))
+
+
+def cleanup(cursor):
+    cursor.execute('DELETE FROM memories WHERE phone_number = %s', (BENCH_PHONE,))
+
+
+def full_scan(cursor):
+    """The pre-index approach: every memory, tokenized in Python"""
+    cursor.execute('SELECT id, memory_text FROM memories WHERE phone_number = %s', (BENCH_PHONE,))
+    new_keywords = _extract_keywords(NEW_MEMORY)
+    best = max(
+        (_keyword_similarity(new_keywords, _extract_keywords(text)) for _, text in cursor.fetchall()),
+        default=0.0,
+    )
+    return best
+
+
+def run(count, iterations):
+    init_db()
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        seed(c, count)
+        conn.commit()
+        # Merge the GIN pending list so lookups see the built index
+        conn.autocommit = True
+        c.execute('VACUUM ANALYZE memories')
+        conn.autocommit = False
+
+        full_timings = time_calls(lambda: full_scan(c), iterations)
+        indexed_timings = time_calls(lambda: _find_similar_memory(c, BENCH_PHONE, NEW_MEMORY), iterations)
+
+        print(f"\nMemory dedup benchmark ({count} memories, {iterations} iterations)")
+        print("=" * 100)
+        print(summarize("full scan + re-tokenize", full_timings))
+        print(summarize("keyword candidates", indexed_timings))
+        speedup = sum(full_timings) / max(sum(indexed_timings), 1e-9)
+        print(f"{'':<40} speedup={speedup:.2f}x")
+    finally:
+        conn.rollback()
+        c = conn.cursor()
+        cleanup(c)
+        conn.commit()
+        return_db_connection(conn)
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+    )
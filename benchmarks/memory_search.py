@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Memory search benchmark.
+Seeds one heavy user (and background users so the table isn't just theirs)
+and times the ranked search behind search_memories against the
+LOWER(memory_text) LIKE '%term%' query it replaced, for a hit, a multi-word
+partial hit and a miss.
+
+Usage:
+    python benchmarks/memory_search.py              # 1,000 memories, 200 iterations
+    python benchmarks/memory_search.py 500 100      # custom memories / iterations
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_environment, time_calls, summarize
+
+setup_environment()
+
+from database import get_db_connection, return_db_connection, init_db
+from utils.text_search import ranked_search
+
+BENCH_PHONE_PREFIX = '+1555033'
+BENCH_PHONE = BENCH_PHONE_PREFIX + '0000'
+BACKGROUND_USERS = 2000
+SEARCHES = {
+    'hit': 'garage code',
+    'partial': 'wifi password',
+    'miss': 'plumber',
+}
+
+LIKE_QUERY = '''
+    SELECT id, memory_text, created_at FROM memories
+    WHERE phone_number = %s AND LOWER(memory_text) LIKE LOWER(%s)
+    ORDER BY created_at DESC
+'''
+
+
+def seed(cursor, count):
+    cleanup(cursor)
+    print(f"Seeding {count} memories for one user plus {BACKGROUND_USERS} background users...")
+    cursor.execute('''
+        INSERT INTO memories (phone_number, memory_text, created_at)
+        SELECT %s, 'Note ' || m || ': the ' || (ARRAY['blue', 'red', 'green', 'spare'])[m %% 4 + 1]
+                   || ' box is on shelf ' || m || ' in the ' || (ARRAY['attic', 'basement', 'shed'])[m %% 3 + 1],
+               NOW() - m * INTERVAL '1 hour'
+        FROM generate_series(1, %s) m
+    ''', (BENCH_PHONE, count))
+    cursor.execute(
+        "INSERT INTO memories (phone_number, memory_text) VALUES (%s, 'Garage code is 4512'), (%s, 'The WiFi pw is hunter2')",
+        (BENCH_PHONE, BENCH_PHONE)
+    )
+    cursor.execute('''
+        INSERT INTO memories (phone_number, memory_text)
+        SELECT %s || LPAD((m %% %s + 1)::text, 4, '0'), 'Background memory ' || m || ' about the garage'
+        FROM generate_series(1, %s) m
+    ''', (BENCH_PHONE_PREFIX, BACKGROUND_USERS, BACKGROUND_USERS * 20))
+
+
+def cleanup(cursor):
+    cursor.execute('DELETE FROM memories WHERE phone_number LIKE %s', (BENCH_PHONE_PREFIX + '%',))
+
+
+def run(count, iterations):
+    init_db()
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        seed(c, count)
+        conn.commit()
+        conn.autocommit = True
+        c.execute('VACUUM ANALYZE memories')
+        conn.autocommit = False
+
+        print(f"\nMemory search benchmark ({count} memories, {iterations} iterations)")
+        print("=" * 100)
+        for label, term in SEARCHES.items():
+            def like():
+                c.execute(LIKE_QUERY, (BENCH_PHONE, f'%{term}%'))
+                return c.fetchall()
+
+            def ranked():
+                return ranked_search(
+                    c, 'memories', 'id, memory_text, created_at', 'memory_text',
+                    BENCH_PHONE, term, order_by='created_at DESC'
+                )
+
+            like_rows, ranked_rows = like(), ranked()
+            like_timings = time_calls(like, iterations)
+            ranked_timings = time_calls(ranked, iterations)
+            print(summarize(f"{label} LIKE ({len(like_rows)} rows)", like_timings))
+            print(summarize(f"{label} ranked ({len(ranked_rows)} rows)", ranked_timings))
+            if ranked_rows:
+                print(f"{'':<40} top: {ranked_rows[0][1]}")
+            print()
+        conn.rollback()
+    finally:
+        conn.rollback()
+        conn.autocommit = False
+        c = conn.cursor()
+        cleanup(c)
+        conn.commit()
+        conn.autocommit = True
+        c.execute('VACUUM ANALYZE memories')
+        conn.autocommit = False
+        return_db_connection(conn)
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+    )
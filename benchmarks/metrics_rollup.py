@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Admin overview metrics benchmark.
+Seeds a year of synthetic users, memories, reminders and lists, then times
+get_all_metrics (what /admin/stats/overview serves) with no rollups (every
+day computed live from the raw tables, as before metrics_daily) and with
+metrics_daily refreshed (only today's creation counts computed live; user
+and reminder status counts are always live), unfiltered and for a 90-day
+range. Also checks both give the same answer.
+
+Usage:
+    python benchmarks/metrics_rollup.py              # 20000 users
+    python benchmarks/metrics_rollup.py 100000       # custom user count
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_environment, time_calls, summarize
+
+setup_environment()
+
+import time
+from datetime import datetime, timedelta
+
+from database import init_db, get_db_connection, return_db_connection
+from services.metrics_service import get_all_metrics, refresh_metrics_rollups
+
+PHONE_PREFIX = '+1555041'
+
+
+def _execute(sql, params=None):
+    conn = get_db_connection()
+    try:
+        conn.cursor().execute(sql, params)
+        conn.commit()
+    finally:
+        return_db_connection(conn)
+
+
+def cleanup():
+    for table in ('list_items', 'lists', 'reminders', 'memories', 'users'):
+        _execute(f"DELETE FROM {table} WHERE phone_number LIKE %s", (PHONE_PREFIX + '%',))
+    _execute('DELETE FROM metrics_daily')
+
+
+def seed(users):
+    _execute('''
+        INSERT INTO users (phone_number, onboarding_complete, onboarding_step, premium_status,
+                           referral_source, total_messages, created_at, last_active_at)
+        SELECT %s || LPAD(n::text, 6, '0'), n %% 10 <> 0, n %% 5,
+               (ARRAY['free', 'free', 'premium', 'churned'])[n %% 4 + 1],
+               (ARRAY['friend', 'ad', NULL])[n %% 3 + 1], n %% 50,
+               NOW() - (n %% 365) * INTERVAL '1 day', NOW() - (n %% 60) * INTERVAL '1 day'
+        FROM generate_series(1, %s) AS n
+    ''', (PHONE_PREFIX, users))
+    for table, columns, values, per_user in (
+        ('memories', 'memory_text', "'memory ' || n", 5),
+        ('reminders', 'reminder_text, reminder_date, delivery_status',
+         "'reminder ' || n, NOW(), (ARRAY['pending', 'sent', 'failed'])[n % 3 + 1]", 3),
+        ('lists', 'list_name', "'list ' || n", 1),
+    ):
+        _execute(f'''
+            INSERT INTO {table} (phone_number, {columns}, created_at)
+            SELECT %s || LPAD((n %% %s + 1)::text, 6, '0'), {values.replace('%', '%%')},
+                   NOW() - (n %% 365) * INTERVAL '1 day'
+            FROM generate_series(1, %s) AS n
+        ''', (PHONE_PREFIX, users, users * per_user))
+    _execute('''
+        INSERT INTO list_items (list_id, phone_number, item_text, created_at)
+        SELECT l.id, l.phone_number, 'item ' || i, l.created_at
+        FROM lists l, generate_series(1, 5) AS i
+        WHERE l.phone_number LIKE %s
+    ''', (PHONE_PREFIX + '%',))
+    _execute('ANALYZE')
+
+
+def run(users):
+    init_db()
+    cleanup()
+    print(f"\nSeeding {users} users (x5 memories, x3 reminders, x1 list of 5 items) over 365 days...")
+    seed(users)
+    try:
+        start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=90)
+        print(f"\nAdmin overview benchmark ({users} users)")
+        print("=" * 100)
+        results = {}
+        for label, refresh in (('live (no rollups)', False), ('metrics_daily rollups', True)):
+            if refresh:
+                began = time.perf_counter()
+                days = refresh_metrics_rollups(None)
+                print(f"{'full rollup refresh':<40} {days} days in {(time.perf_counter() - began) * 1000:.0f}ms")
+            for range_label, kwargs in (('all time', {}), ('last 90 days', {'start_date': start})):
+                results[(refresh, range_label)] = get_all_metrics(**kwargs)
+                print(summarize(f"{label}, {range_label}", time_calls(lambda: get_all_metrics(**kwargs), 10)))
+        for range_label in ('all time', 'last 90 days'):
+            same = results[(False, range_label)] == results[(True, range_label)]
+            print(f"{range_label}: rollup and live results {'match' if same else 'DIFFER'}")
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
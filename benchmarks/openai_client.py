@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+OpenAI client benchmark.
+Times chat completions against the local OpenAI stub server (utils.openai_stub)
+with a new OpenAI(...) client per call (previous behavior at every call site)
+against the shared pooled client from services.openai_client.
+
+The stub answers instantly over plain HTTP on localhost, so this measures
+client construction and connection setup only; against api.openai.com each
+new connection also pays DNS, TCP and a TLS handshake.
+
+Usage:
+    python benchmarks/openai_client.py              # 200 iterations
+    python benchmarks/openai_client.py 500          # custom iterations
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_environment, time_calls, summarize
+
+setup_environment()
+
+from openai import OpenAI
+
+import services.openai_client as openai_client
+from config import OPENAI_API_KEY, OPENAI_TIMEOUT
+from utils.openai_stub import OpenAIStubServer
+
+MESSAGES = [{"role": "user", "content": "milk, eggs and bread"}]
+
+
+def run(iterations):
+    with OpenAIStubServer() as stub:
+        openai_client.OPENAI_BASE_URL = stub.base_url
+
+        def fresh_client():
+            client = OpenAI(api_key=OPENAI_API_KEY, timeout=OPENAI_TIMEOUT, base_url=stub.base_url)
+            client.chat.completions.create(model='gpt-4o-mini', messages=MESSAGES)
+
+        def shared_client():
+            openai_client.chat_completion('parse_list_items', model='gpt-4o-mini', messages=MESSAGES)
+
+        print(f"\nOpenAI client benchmark ({iterations} iterations, local stub)")
+        print("=" * 100)
+        for label, call in (('new client per call (previous)', fresh_client), ('shared pooled client', shared_client)):
+            call()
+            connections = stub.connections
+            timings = time_calls(call, iterations)
+            print(summarize(label, timings))
+            print(f"{'':<40} new connections={stub.connections - connections}")
+
+        latency = openai_client.get_openai_call_stats()['parse_list_items']['latency_ms']
+        print(f"\nparse_list_items latency histogram: {latency['buckets']}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
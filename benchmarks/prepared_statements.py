@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Prepared statement benchmark.
+Compares plain execute (parse + plan + execute per call) against
+execute_prepared (PREPARE once per connection, then EXECUTE) for the hot
+per-message queries.
+
+Usage:
+    python benchmarks/prepared_statements.py              # 2000 iterations
+    python benchmarks/prepared_statements.py 5000         # custom iterations
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_environment, time_calls, summarize
+
+setup_environment()
+
+from database import get_db_connection, return_db_connection, execute_prepared, _prepared_statements
+import models.user  # noqa: F401 - registers the user lookups
+import models.reminder  # noqa: F401 - registers claim_due_reminders
+
+BENCH_PHONE_PREFIX = '+1555019'
+USER_COUNT = 5000
+
+
+def seed_users(cursor):
+    """Insert synthetic users so lookups hit a realistically sized index"""
+    cursor.execute('DELETE FROM users WHERE phone_number LIKE %s', (BENCH_PHONE_PREFIX + '%',))
+    cursor.execute('''
+        INSERT INTO users (phone_number, phone_hash, first_name, timezone, onboarding_complete)
+        SELECT %s || LPAD(g::text, 4, '0'), md5(g::text), 'Bench', 'America/New_York', TRUE
+        FROM generate_series(1, %s) g
+    ''', (BENCH_PHONE_PREFIX, USER_COUNT))
+
+
+def run(iterations):
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        seed_users(c)
+        conn.commit()
+
+        phone = BENCH_PHONE_PREFIX + '0042'
+        c.execute("SELECT md5('42')")
+        phone_hash = c.fetchone()[0]
+
+        cases = [
+            ('user_by_phone', (phone,)),
+            ('user_by_hash', (phone_hash,)),
+            ('pending_reminder_date_by_phone', (phone,)),
+            ('claim_due_reminders', ('1970-01-01 00:00:00', 10)),
+        ]
+
+        print(f"\nPrepared statement benchmark ({iterations} iterations per case)")
+        print("=" * 100)
+        for name, params in cases:
+            plain_query = _prepared_statements[name][0]
+
+            def plain():
+                c.execute(plain_query, params)
+                c.fetchall()
+
+            def prepared():
+                execute_prepared(c, name, params)
+                c.fetchall()
+
+            # Warm caches (and PREPARE) before timing
+            plain()
+            prepared()
+            plain_timings = time_calls(plain, iterations)
+            prepared_timings = time_calls(prepared, iterations)
+            conn.rollback()
+
+            print(summarize(f"{name} (plain)", plain_timings))
+            print(summarize(f"{name} (prepared)", prepared_timings))
+            speedup = sum(plain_timings) / max(sum(prepared_timings), 1e-9)
+            print(f"{'':<40} speedup={speedup:.2f}x\n")
+    finally:
+        c = conn.cursor()
+        c.execute('DELETE FROM users WHERE phone_number LIKE %s', (BENCH_PHONE_PREFIX + '%',))
+        conn.commit()
+        return_db_connection(conn)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
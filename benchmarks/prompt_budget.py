@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Prompt budget benchmark.
+Seeds a heavy user (MAX_LISTS_PER_USER lists, each full) and sends
+process_with_ai messages to the local OpenAI stub server, with the section
+budgets lifted (previous behaviour: every item in the prompt) and with the
+configured budgets. Reports the prompt tokens sent per call (counted
+locally) and the time per call, including prompt assembly.
+
+Usage:
+    python benchmarks/prompt_budget.py              # 20 calls per mode
+    python benchmarks/prompt_budget.py 100          # custom call count
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_environment, time_calls, summarize
+
+setup_environment()
+
+import services.ai_service as ai_service
+import services.openai_client as openai_client
+from config import MAX_LISTS_PER_USER, MAX_ITEMS_PER_LIST
+from database import init_db, get_db_connection, return_db_connection, flush_write_buffer
+from models.list_model import add_list_items, create_list
+from models.user import create_or_update_user
+from utils.openai_stub import OpenAIStubServer
+from utils.prompt_budget import count_message_tokens
+
+BENCH_PHONE = '+15550400000'
+
+
+def cleanup():
+    flush_write_buffer()
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        for table in ('list_items', 'lists', 'api_usage', 'users'):
+            c.execute(f'DELETE FROM {table} WHERE phone_number = %s', (BENCH_PHONE,))
+        conn.commit()
+    finally:
+        return_db_connection(conn)
+
+
+def run(iterations):
+    init_db()
+    cleanup()
+    create_or_update_user(BENCH_PHONE, first_name="Bench", timezone="America/New_York", onboarding_complete=True)
+    for n in range(MAX_LISTS_PER_USER):
+        list_id = create_list(BENCH_PHONE, f"Project {n} List")
+        add_list_items(list_id, BENCH_PHONE, [f"project {n} supply item {i}" for i in range(MAX_ITEMS_PER_LIST)])
+
+    budgets = dict(ai_service.PROMPT_SECTION_BUDGETS)
+    max_input = ai_service.PROMPT_MAX_INPUT_TOKENS
+    try:
+        with OpenAIStubServer() as stub:
+            openai_client.OPENAI_BASE_URL = stub.base_url
+            print(f"\nPrompt budget benchmark ({MAX_LISTS_PER_USER} lists x {MAX_ITEMS_PER_LIST} items, "
+                  f"{iterations} calls per mode)")
+            print("=" * 100)
+            for label, unlimited in (('no budgets (previous)', True), ('section budgets', False)):
+                for name in budgets:
+                    ai_service.PROMPT_SECTION_BUDGETS[name] = 10 ** 6 if unlimited else budgets[name]
+                ai_service.PROMPT_MAX_INPUT_TOKENS = 10 ** 6 if unlimited else max_input
+                first = len(stub.requests)
+                timings = time_calls(lambda: ai_service.process_with_ai("what's on my project 3 list?", BENCH_PHONE, {}),
+                                     iterations)
+                tokens = count_message_tokens(stub.requests[first]['messages'])
+                print(summarize(label, timings))
+                print(f"{'':<40} prompt tokens={tokens}")
+    finally:
+        ai_service.PROMPT_SECTION_BUDGETS.update(budgets)
+        ai_service.PROMPT_MAX_INPUT_TOKENS = max_input
+        cleanup()
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""
+Reminder history benchmark.
+Seeds one heavy user (a long run of daily sent reminders plus a few dozen
+pending ones) and compares what each inbound message fetches for AI context:
+the full history from get_user_reminders versus the bounded window from
+get_reminder_window.
+
+Usage:
+    python benchmarks/reminder_history.py              # 3 years of history, 200 iterations
+    python benchmarks/reminder_history.py 365 100      # custom days of history / iterations
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_environment, time_calls, summarize
+
+setup_environment()
+
+from database import get_db_connection, return_db_connection, init_db
+from config import MAX_COMPLETED_REMINDERS_DISPLAY, MAX_PENDING_REMINDERS_IN_CONTEXT
+from models.reminder import get_user_reminders, get_reminder_window
+
+BENCH_PHONE = '+15550310000'
+PENDING_COUNT = 40
+
+
+def seed(cursor, days):
+    cleanup(cursor)
+    print(f"Seeding {days} sent and {PENDING_COUNT} pending reminders...")
+    cursor.execute('''
+        INSERT INTO reminders (phone_number, reminder_text, reminder_date, sent, delivery_status)
+        SELECT %s, 'Take the bench medication with breakfast, day ' || d,
+               NOW() - d * INTERVAL '1 day', TRUE, 'delivered'
+        FROM generate_series(1, %s) d
+    ''', (BENCH_PHONE, days))
+    cursor.execute('''
+        INSERT INTO reminders (phone_number, reminder_text, reminder_date, sent)
+        SELECT %s, 'Upcoming bench appointment ' || d, NOW() + d * INTERVAL '1 day', FALSE
+        FROM generate_series(1, %s) d
+    ''', (BENCH_PHONE, PENDING_COUNT))
+    cursor.execute('ANALYZE reminders')
+
+
+def cleanup(cursor):
+    cursor.execute('DELETE FROM reminders WHERE phone_number = %s', (BENCH_PHONE,))
+
+
+def payload_size(rows):
+    return sum(len(repr(row)) for row in rows)
+
+
+def run(days, iterations):
+    init_db()
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        seed(c, days)
+        conn.commit()
+
+        def full_history():
+            return get_user_reminders(BENCH_PHONE)
+
+        def window():
+            w = get_reminder_window(
+                BENCH_PHONE,
+                pending_limit=MAX_PENDING_REMINDERS_IN_CONTEXT,
+                sent_limit=MAX_COMPLETED_REMINDERS_DISPLAY,
+            )
+            return w['pending'] + w['sent']
+
+        full_rows, window_rows = full_history(), window()
+        full_timings = time_calls(full_history, iterations)
+        window_timings = time_calls(window, iterations)
+
+        print(f"\nReminder history benchmark ({days} sent + {PENDING_COUNT} pending, {iterations} iterations)")
+        print("=" * 100)
+        print(f"{'get_user_reminders':<40} rows={len(full_rows):6d} bytes={payload_size(full_rows):9d}")
+        print(f"{'get_reminder_window':<40} rows={len(window_rows):6d} bytes={payload_size(window_rows):9d}")
+        print(summarize("get_user_reminders", full_timings))
+        print(summarize("get_reminder_window", window_timings))
+        speedup = sum(full_timings) / max(sum(window_timings), 1e-9)
+        print(f"{'':<40} speedup={speedup:.2f}x")
+    finally:
+        conn.rollback()
+        c = conn.cursor()
+        cleanup(c)
+        conn.commit()
+        return_db_connection(conn)
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1095,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+    )
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+Startup schema benchmark.
+Compares replaying every schema statement on each start (what init_db and
+the agents' init_*_tables used to do) against the versioned migration check
+on an up-to-date database.
+
+Usage:
+    python benchmarks/startup_schema.py              # 50 iterations
+    python benchmarks/startup_schema.py 200          # custom iterations
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_environment, time_calls, summarize
+
+setup_environment()
+
+from database import get_db_connection, return_db_connection, init_db
+from migrations import APP_MIGRATIONS, MONITORING_MIGRATIONS, run_migrations
+from migrations.runner import _run_step
+
+
+def run(iterations):
+    # Make sure both scopes are current so we measure the steady state
+    init_db()
+    conn = get_db_connection()
+    try:
+        run_migrations(conn, MONITORING_MIGRATIONS, 'monitoring')
+        c = conn.cursor()
+        steps = [step for m in APP_MIGRATIONS + MONITORING_MIGRATIONS for step in m.steps]
+
+        def replay_ddl():
+            # ALTER TABLE ... IF NOT EXISTS still takes ACCESS EXCLUSIVE locks
+            for step in steps:
+                _run_step(c, step)
+            conn.commit()
+
+        def migration_check():
+            run_migrations(conn, APP_MIGRATIONS, 'app')
+            run_migrations(conn, MONITORING_MIGRATIONS, 'monitoring')
+
+        replay_ddl()
+        migration_check()
+        replay_timings = time_calls(replay_ddl, iterations)
+        check_timings = time_calls(migration_check, iterations)
+
+        print(f"\nStartup schema benchmark ({iterations} iterations, {len(steps)} statements replayed)")
+        print("=" * 100)
+        print(summarize("replay all DDL (old init_db)", replay_timings))
+        print(summarize("run_migrations (schema current)", check_timings))
+        speedup = sum(replay_timings) / max(sum(check_timings), 1e-9)
+        print(f"{'':<40} speedup={speedup:.2f}x\n")
+    finally:
+        conn.rollback()
+        return_db_connection(conn)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+Support queue benchmark.
+Seeds thousands of tickets with message threads and times the CS queue
+(get_all_tickets) and SLA summary (get_ticket_sla_info), which read the
+ticket activity columns, against the per-ticket message subqueries they
+used to run.
+
+Usage:
+    python benchmarks/support_queue.py            # 5000 tickets, 20 iterations
+    python benchmarks/support_queue.py 20000 10   # custom tickets / iterations
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_environment, time_calls, summarize
+
+setup_environment()
+
+from database import get_db_connection, return_db_connection, init_db
+from migrations.app import _SUPPORT_TICKET_ACTIVITY
+from services.support_service import get_all_tickets, get_ticket_sla_info
+
+BENCH_PREFIX = '+1555050'
+MESSAGES_PER_TICKET = 8
+
+# The queries the queue and SLA summary ran before the activity columns
+SUBQUERY_QUEUE = '''
+    SELECT t.id, t.phone_number, t.status, t.created_at, t.updated_at, u.first_name,
+           (SELECT COUNT(*) FROM support_messages WHERE ticket_id = t.id),
+           (SELECT message FROM support_messages WHERE ticket_id = t.id ORDER BY created_at DESC LIMIT 1)
+    FROM support_tickets t
+    LEFT JOIN users u ON t.phone_number = u.phone_number
+    WHERE t.status = 'open'
+    ORDER BY t.updated_at DESC
+'''
+SUBQUERY_SLA = '''
+    SELECT t.id, t.created_at,
+           (SELECT MAX(sm.created_at) FROM support_messages sm WHERE sm.ticket_id = t.id AND sm.direction = 'inbound'),
+           (SELECT MAX(sm.created_at) FROM support_messages sm WHERE sm.ticket_id = t.id AND sm.direction = 'outbound')
+    FROM support_tickets t
+    WHERE t.status = 'open'
+'''
+
+
+def seed(cursor, count):
+    cleanup(cursor)
+    print(f"Seeding {count} tickets with {MESSAGES_PER_TICKET} messages each...")
+    cursor.execute('''
+        INSERT INTO support_tickets (phone_number, status, updated_at)
+        SELECT %s || LPAD(n::text, 5, '0'), CASE WHEN n %% 4 = 0 THEN 'closed' ELSE 'open' END,
+               NOW() - n * INTERVAL '1 minute'
+        FROM generate_series(1, %s) n
+    ''', (BENCH_PREFIX, count))
+    cursor.execute('''
+        INSERT INTO support_messages (ticket_id, phone_number, message, direction, created_at)
+        SELECT t.id, t.phone_number, 'bench message ' || n || ' ' || REPEAT('x', 120),
+               CASE WHEN (t.id + n) %% 3 = 0 THEN 'outbound' ELSE 'inbound' END,
+               t.updated_at - (%s - n) * INTERVAL '1 minute'
+        FROM support_tickets t, generate_series(1, %s) n
+        WHERE t.phone_number LIKE %s
+    ''', (MESSAGES_PER_TICKET, MESSAGES_PER_TICKET, BENCH_PREFIX + '%'))
+    # Same backfill the migration runs
+    cursor.execute(next(step for step in _SUPPORT_TICKET_ACTIVITY if isinstance(step, str) and step.startswith('UPDATE')))
+    cursor.execute('ANALYZE support_tickets')
+    cursor.execute('ANALYZE support_messages')
+
+
+def cleanup(cursor):
+    cursor.execute('DELETE FROM support_messages WHERE phone_number LIKE %s', (BENCH_PREFIX + '%',))
+    cursor.execute('DELETE FROM support_tickets WHERE phone_number LIKE %s', (BENCH_PREFIX + '%',))
+
+
+def run(count, iterations):
+    init_db()
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        seed(c, count)
+        conn.commit()
+
+        def query(sql):
+            c.execute(sql)
+            return c.fetchall()
+
+        old_queue = time_calls(lambda: query(SUBQUERY_QUEUE), iterations)
+        queue = time_calls(get_all_tickets, iterations)
+        old_sla = time_calls(lambda: query(SUBQUERY_SLA), iterations)
+        sla = time_calls(get_ticket_sla_info, iterations)
+
+        print(f"\nSupport queue benchmark ({count} tickets, {iterations} iterations)")
+        print("=" * 100)
+        print(summarize("queue, per-ticket subqueries", old_queue))
+        print(summarize("queue, activity columns", queue))
+        print(summarize("SLA rows, per-ticket subqueries", old_sla))
+        print(summarize("SLA summary, one aggregate", sla))
+        print(f"{'':<40} queue speedup={sum(old_queue) / max(sum(queue), 1e-9):.2f}x "
+              f"SLA speedup={sum(old_sla) / max(sum(sla), 1e-9):.2f}x")
+    finally:
+        conn.rollback()
+        c = conn.cursor()
+        cleanup(c)
+        conn.commit()
+        return_db_connection(conn)
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+    )
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+"""
+Workload index regression benchmark.
+Seeds a synthetic dataset, then times the catalogued hot queries (see
+benchmarks/index_advisor.py) with the workload_indexes migration in place
+and again with those indexes dropped inside a rolled-back transaction.
+
+Usage:
+    python benchmarks/workload_indexes.py                  # 1,000,000 users, 50 iterations
+    python benchmarks/workload_indexes.py 100000 20        # custom users / iterations
+    python benchmarks/workload_indexes.py 100000 20 --keep # leave seeded data in place
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_environment, time_calls, summarize
+
+setup_environment()
+
+from database import get_db_connection, return_db_connection, init_db
+from migrations.app import _WORKLOAD_INDEXES
+from migrations.runner import ConcurrentIndex
+from benchmarks.index_advisor import WORKLOAD, sample_params
+
+BENCH_PHONE_PREFIX = '+1555021'
+SEARCH_SUFFIX = '777'
+
+
+def seed(cursor, user_count):
+    """Users with 3 reminders, 3 memories and 2 logs each; 1% have a support ticket"""
+    cleanup(cursor)
+    print(f"Seeding {user_count} users...")
+    cursor.execute('''
+        INSERT INTO users (phone_number, phone_hash, first_name, last_name, timezone,
+                           onboarding_complete, created_at, last_active_at)
+        SELECT %s || LPAD(g::text, 7, '0'), md5('bench' || g), 'Bench' || (g %% 5000), 'User' || (g %% 7919),
+               'America/New_York', TRUE, NOW() - (g %% 365) * INTERVAL '1 day', NOW() - (g %% 90) * INTERVAL '1 day'
+        FROM generate_series(1, %s) g
+    ''', (BENCH_PHONE_PREFIX, user_count))
+    cursor.execute('''
+        INSERT INTO reminders (phone_number, phone_hash, reminder_text, reminder_date, sent, delivery_status, created_at)
+        SELECT u.phone_number, u.phone_hash, 'Bench reminder ' || r,
+               CURRENT_DATE + (r * 7 + length(u.phone_number)) %% 30 * INTERVAL '1 day' + r * INTERVAL '5 hours',
+               r = 1, CASE WHEN r = 1 AND random() < 0.01 THEN 'failed' ELSE 'pending' END,
+               NOW() - random() * INTERVAL '60 days'
+        FROM users u, generate_series(1, 3) r
+        WHERE u.phone_number LIKE %s
+    ''', (BENCH_PHONE_PREFIX + '%',))
+    cursor.execute('''
+        INSERT INTO memories (phone_number, phone_hash, memory_text, created_at)
+        SELECT u.phone_number, u.phone_hash, 'Bench memory ' || m, NOW() - random() * INTERVAL '365 days'
+        FROM users u, generate_series(1, 3) m
+        WHERE u.phone_number LIKE %s
+    ''', (BENCH_PHONE_PREFIX + '%',))
+    cursor.execute('''
+        INSERT INTO logs (phone_number, phone_hash, message_in, message_out, intent, success, created_at)
+        SELECT u.phone_number, u.phone_hash, 'bench in', 'bench out', 'bench', TRUE,
+               NOW() - random() * INTERVAL '30 days'
+        FROM users u, generate_series(1, 2) l
+        WHERE u.phone_number LIKE %s
+    ''', (BENCH_PHONE_PREFIX + '%',))
+    cursor.execute('''
+        INSERT INTO support_tickets (phone_number, status, created_at, updated_at)
+        SELECT phone_number, CASE WHEN random() < 0.3 THEN 'open' ELSE 'closed' END,
+               NOW() - random() * INTERVAL '90 days', NOW() - random() * INTERVAL '30 days'
+        FROM users
+        WHERE phone_number LIKE %s AND right(phone_number, 2) = '00'
+    ''', (BENCH_PHONE_PREFIX + '%',))
+    cursor.execute('''
+        INSERT INTO support_messages (ticket_id, phone_number, message, direction, created_at)
+        SELECT t.id, t.phone_number, 'Bench support message ' || m, 'inbound',
+               t.created_at + m * INTERVAL '1 hour'
+        FROM support_tickets t, generate_series(1, 5) m
+        WHERE t.phone_number LIKE %s
+    ''', (BENCH_PHONE_PREFIX + '%',))
+    for table in ('users', 'reminders', 'memories', 'logs', 'support_tickets', 'support_messages'):
+        cursor.execute(f'ANALYZE {table}')
+
+
+def cleanup(cursor):
+    pattern = BENCH_PHONE_PREFIX + '%'
+    cursor.execute('''
+        DELETE FROM support_messages WHERE ticket_id IN
+            (SELECT id FROM support_tickets WHERE phone_number LIKE %s)
+    ''', (pattern,))
+    for table in ('support_tickets', 'logs', 'memories', 'reminders', 'users'):
+        cursor.execute(f'DELETE FROM {table} WHERE phone_number LIKE %s', (pattern,))
+
+
+def time_workload(cursor, params_list, iterations):
+    results = {}
+    for name, query in WORKLOAD.items():
+        position = iter(range(10 ** 9))
+
+        def call():
+            cursor.execute(query, params_list[next(position) % len(params_list)])
+            cursor.fetchall()
+
+        # Warm the buffer cache for every sampled user before timing
+        for _ in params_list:
+            call()
+        results[name] = time_calls(call, iterations)
+    return results
+
+
+def run(user_count, iterations, keep):
+    init_db()
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        seed(c, user_count)
+        conn.commit()
+
+        params_list = []
+        for i in range(1, 51):
+            n = (i * 7919) % user_count + 1
+            params_list.append(sample_params(c, f"{BENCH_PHONE_PREFIX}{n:07d}"))
+        for params in params_list:
+            params['pattern'] = f"%{SEARCH_SUFFIX}%"
+
+        with_indexes = time_workload(c, params_list, iterations)
+
+        # Drop the workload indexes (restoring the one they superseded) and roll back afterwards
+        c.execute('CREATE INDEX IF NOT EXISTS idx_memories_phone_hash ON memories(phone_hash)')
+        for step in _WORKLOAD_INDEXES:
+            if isinstance(step, ConcurrentIndex):
+                c.execute(f'DROP INDEX IF EXISTS {step.name}')
+        without_indexes = time_workload(c, params_list, iterations)
+        conn.rollback()
+
+        print(f"\nWorkload index benchmark ({user_count} users, {iterations} iterations per query)")
+        print("=" * 100)
+        for name in WORKLOAD:
+            print(summarize(f"{name} (without)", without_indexes[name]))
+            print(summarize(f"{name} (with)", with_indexes[name]))
+            speedup = sum(without_indexes[name]) / max(sum(with_indexes[name]), 1e-9)
+            print(f"{'':<40} speedup={speedup:.2f}x\n")
+    finally:
+        conn.rollback()
+        if not keep:
+            c = conn.cursor()
+            cleanup(c)
+            conn.commit()
+            # Reclaim the deleted rows so the tables don't stay bloated
+            conn.autocommit = True
+            for table in ('users', 'reminders', 'memories', 'logs', 'support_tickets', 'support_messages'):
+                c.execute(f'VACUUM ANALYZE {table}')
+            conn.autocommit = False
+        return_db_connection(conn)
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    run(
+        int(args[0]) if len(args) > 0 else 1000000,
+        int(args[1]) if len(args) > 1 else 50,
+        '--keep' in sys.argv,
+    )
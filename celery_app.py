@@ -18,7 +18,8 @@ celery_app = Celery(
     "sms_reminders",
     broker=REDIS_URL,
     backend=REDIS_URL,
-    include=["tasks.reminder_tasks", "tasks.monitoring_tasks", "tasks.twilio_tasks"],
+    include=["tasks.reminder_tasks", "tasks.monitoring_tasks", "tasks.twilio_tasks", "tasks.metrics_tasks",
+             "tasks.broadcast_tasks", "tasks.list_tasks"],
 )
 
 # SSL configuration for Upstash (uses rediss:// protocol)
@@ -40,10 +41,12 @@ celery_app.conf.update(
     task_reject_on_worker_lost=True,  # Re-queue if worker dies
     worker_prefetch_multiplier=1,     # Fetch one task at a time
 
-    # Queue routing: monitoring tasks go to dedicated 'monitoring' queue
+    # Queue routing: monitoring tasks go to dedicated 'monitoring' queue,
+    # broadcast sends to the 'broadcasts' queue so they never delay reminders
     # All other tasks (reminders) stay on the default 'celery' queue
     task_routes={
         "tasks.monitoring_tasks.*": {"queue": "monitoring"},
+        "tasks.broadcast_tasks.*": {"queue": "broadcasts"},
     },
 
     # Result settings
@@ -186,6 +186,54 @@ beat_schedule = {
         "options": {"expires": 3600},
     },
 
+    # ===========================================
+    # BROADCASTS
+    # ===========================================
+
+    # Start due scheduled broadcasts every minute
+    "check-scheduled-broadcasts": {
+        "task": "tasks.broadcast_tasks.check_scheduled_broadcasts",
+        "schedule": timedelta(minutes=1),
+        "options": {
+            "expires": 55,  # Task expires if not picked up in 55 seconds
+        },
+    },
+    # Re-dispatch broadcasts whose send jobs were lost (worker restarts, deploys)
+    "resume-stalled-broadcasts": {
+        "task": "tasks.broadcast_tasks.resume_stalled_broadcasts",
+        "schedule": timedelta(minutes=5),
+        "options": {"expires": 240},
+    },
+
+    # ===========================================
+    # ADMIN METRICS ROLLUPS
+    # ===========================================
+
+    # Recompute the recent metrics_daily buckets every 15 minutes
+    "refresh-metrics-rollups": {
+        "task": "tasks.metrics_tasks.refresh_metrics_rollups",
+        "schedule": timedelta(minutes=15),
+        "options": {"expires": 840},
+    },
+    # Reconcile every day's bucket nightly (changes to old rows: plan changes, deletions)
+    "reconcile-metrics-rollups-daily": {
+        "task": "tasks.metrics_tasks.refresh_metrics_rollups",
+        "schedule": crontab(hour=0, minute=20),  # 12:20 AM UTC
+        "kwargs": {"full": True},
+        "options": {"expires": 3600},
+    },
+
+    # ===========================================
+    # LIST ITEM SPLITTER
+    # ===========================================
+
+    # Re-mine the phrases users store as single list items (off the SMS path)
+    "mine-list-phrases": {
+        "task": "tasks.list_tasks.mine_list_phrases",
+        "schedule": timedelta(hours=1),
+        "options": {"expires": 3000},
+    },
+
     # ===========================================
     # MONITORING PIPELINE TASKS (Agent 1 + 2 + 3)
     # ===========================================
@@ -59,23 +59,92 @@ LOG_FILE_PATH = 'app.log'
 OPENAI_MODEL = "gpt-4o-mini"
 OPENAI_TEMPERATURE = 0.3
 OPENAI_MAX_TOKENS = 800
+# Point every OpenAI client at another server, e.g. the local stub (python -m utils.openai_stub)
+OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL") or None
+OPENAI_POOL_MAX_CONNECTIONS = int(os.environ.get("OPENAI_POOL_MAX_CONNECTIONS", "20"))
+OPENAI_POOL_KEEPALIVE_CONNECTIONS = int(os.environ.get("OPENAI_POOL_KEEPALIVE_CONNECTIONS", "10"))
+OPENAI_POOL_KEEPALIVE_EXPIRY = 120  # seconds an idle connection is kept open
+# Cache for AI sub-tasks that are pure functions of their input (see utils.ai_cache)
+AI_CACHE_ENABLED = os.environ.get("AI_CACHE_ENABLED", "true").lower() == "true"
+AI_CACHE_TTL = int(os.environ.get("AI_CACHE_TTL", str(7 * 24 * 3600)))
+AI_CACHE_MAX_ENTRIES = int(os.environ.get("AI_CACHE_MAX_ENTRIES", "5000"))  # in-process LRU tier
+# process_with_ai prompt budgets in tokens, counted locally before each call (see utils.prompt_budget).
+# Compare projected vs actual prompt tokens in /admin/stats before changing these.
+PROMPT_MAX_INPUT_TOKENS = int(os.environ.get("PROMPT_MAX_INPUT_TOKENS", "12000"))
+PROMPT_SECTION_BUDGETS = {
+    'memories': int(os.environ.get("PROMPT_BUDGET_MEMORIES", "1200")),
+    'reminders': int(os.environ.get("PROMPT_BUDGET_REMINDERS", "1000")),
+    'lists': int(os.environ.get("PROMPT_BUDGET_LISTS", "2000")),
+}
+# Admin dashboard JSON responses (see utils.response_cache): seconds each endpoint's response
+# is served fresh, then for up to ADMIN_CACHE_MAX_STALE more seconds while a background refresh runs
+ADMIN_CACHE_ENABLED = os.environ.get("ADMIN_CACHE_ENABLED", "true").lower() == "true"
+ADMIN_CACHE_TTLS = {
+    'overview': int(os.environ.get("ADMIN_CACHE_TTL_OVERVIEW", "60")),
+    'costs': int(os.environ.get("ADMIN_CACHE_TTL_COSTS", "300")),
+    'monitoring_stats': int(os.environ.get("ADMIN_CACHE_TTL_MONITORING", "30")),
+    'validator_stats': int(os.environ.get("ADMIN_CACHE_TTL_VALIDATOR", "60")),
+    'tracker_health': int(os.environ.get("ADMIN_CACHE_TTL_TRACKER", "120")),
+    'analyzer_stats': int(os.environ.get("ADMIN_CACHE_TTL_ANALYZER", "60")),
+    # Customer search (CS portal and admin CS tab): short, it only absorbs repeated keystrokes
+    'cs_search': int(os.environ.get("ADMIN_CACHE_TTL_CS_SEARCH", "15")),
+    'admin_cs_search': int(os.environ.get("ADMIN_CACHE_TTL_CS_SEARCH", "15")),
+    # CS customer view: keyed by the customer's data version, so any change is a new entry
+    'cs_customer_view': int(os.environ.get("ADMIN_CACHE_TTL_CS_CUSTOMER_VIEW", "600")),
+}
+ADMIN_CACHE_MAX_STALE = int(os.environ.get("ADMIN_CACHE_MAX_STALE", "600"))
+ADMIN_CACHE_MAX_ENTRIES = int(os.environ.get("ADMIN_CACHE_MAX_ENTRIES", "256"))
+CS_SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get("CS_SEARCH_CACHE_MAX_ENTRIES", "1024"))
+CS_CUSTOMER_VIEW_CACHE_MAX_ENTRIES = int(os.environ.get("CS_CUSTOMER_VIEW_CACHE_MAX_ENTRIES", "256"))
 
 # Reminder Configuration
 REMINDER_CHECK_INTERVAL = 30  # seconds (used by Celery Beat)
 
+# Database Configuration
+# Named server-side prepared statements for hot queries. Disable when running
+# behind a transaction-mode pooler (e.g. PgBouncer) that doesn't keep sessions.
+PREPARED_STATEMENTS_ENABLED = os.environ.get("PREPARED_STATEMENTS_ENABLED", "true").lower() == "true"
+
+# Write-behind buffer for analytics inserts (logs, api_usage, confidence_logs).
+# Rows are queued in-process and written in batches by a background thread;
+# overflow and failed batches spill to a Redis list and are replayed later.
+WRITE_BUFFER_ENABLED = os.environ.get("WRITE_BUFFER_ENABLED", "true").lower() == "true"
+WRITE_BUFFER_FLUSH_INTERVAL_MS = int(os.environ.get("WRITE_BUFFER_FLUSH_INTERVAL_MS", "500"))
+WRITE_BUFFER_BATCH_SIZE = int(os.environ.get("WRITE_BUFFER_BATCH_SIZE", "200"))
+WRITE_BUFFER_MAX_ROWS = int(os.environ.get("WRITE_BUFFER_MAX_ROWS", "5000"))
+WRITE_BUFFER_SPILL_KEY = os.environ.get("WRITE_BUFFER_SPILL_KEY", "remyndrs:write_buffer:spill")
+
+# Optional read replica for heavy dashboard/analytics reads. Reads fall back to
+# the primary when the replica is unreachable or lags more than the threshold.
+READ_REPLICA_URL = os.environ.get("READ_REPLICA_URL")
+REPLICA_MAX_LAG_SECONDS = float(os.environ.get("REPLICA_MAX_LAG_SECONDS", "30"))
+REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get("REPLICA_LAG_CHECK_INTERVAL", "10"))
+
 # Celery/Redis Configuration (Upstash)
 UPSTASH_REDIS_URL = os.environ.get("UPSTASH_REDIS_URL", "redis://localhost:6379/0")
 
 # Memory Configuration
 MAX_MEMORIES_TO_DISPLAY = 20
 MAX_MEMORIES_IN_CONTEXT = 10
+MEMORY_CONTEXT_RECENT = 3  # Always included; the rest are picked by relevance to the message
 
 # Reminder Formatting
 MAX_COMPLETED_REMINDERS_DISPLAY = 5
+MAX_PENDING_REMINDERS_IN_CONTEXT = 25
 
 # List Configuration
 MAX_LISTS_PER_USER = 20
 MAX_ITEMS_PER_LIST = 40
+ITEM_SPLITTER_MIN_USERS = 3      # Distinct users who stored a phrase before the splitter trusts it
+ITEM_SPLITTER_REFRESH = 300      # Seconds a process keeps the mined phrases before re-reading them from Redis
+
+# Admin Metrics Rollups (metrics_daily, refreshed by tasks.metrics_tasks)
+METRICS_ROLLUP_REFRESH_DAYS = 7  # Recent days recomputed on every refresh; older days are reconciled nightly
+
+# Broadcast delivery (broadcast_recipients, sent by tasks.broadcast_tasks)
+BROADCAST_CHUNK_SIZE = int(os.environ.get("BROADCAST_CHUNK_SIZE", "100"))  # Recipients per send task
+BROADCAST_SEND_RATE = int(os.environ.get("BROADCAST_SEND_RATE", "10"))  # Messages per second, shared by all workers
+BROADCAST_STALL_MINUTES = 15  # Unfinished broadcasts with no sends for this long are resumed
 
 # Admin Authentication
 ADMIN_USERNAME = os.environ.get("ADMIN_USERNAME", "admin")
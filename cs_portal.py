@@ -5,12 +5,17 @@ A standalone portal for CS reps to search customers and handle support tickets
 
 import secrets
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import HTMLResponse
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from database import get_db_connection, return_db_connection
+from database import get_db_connection, return_db_connection, prefer_read_replica
 from config import logger, CS_USERNAME, CS_PASSWORD, ADMIN_USERNAME, ADMIN_PASSWORD
 from utils.auth import enforce_auth_rate_limit, record_auth_failure
+from utils.response_cache import cached_json_response
+from services.customer_search_service import MIN_QUERY_LENGTH, cache_params, get_search_cache, search_customers
+from services.customer_view_service import (
+    REMINDER_PAGE_SIZE, MAX_REMINDER_PAGE_SIZE, get_customer_view, get_data_version, get_view_cache,
+)
 
 router = APIRouter()
 security = HTTPBasic()
@@ -843,6 +848,7 @@ async def cs_portal(request: Request, user: str = Depends(verify_cs_auth)):
 
     <script>
         let currentCustomer = null;
+        let customerView = null;
         let currentTicketId = null;
         let currentTicketStatus = null;
         let ticketRefreshInterval = null;
@@ -912,11 +918,21 @@ async def cs_portal(request: Request, user: str = Depends(verify_cs_auth)):
             }}
         }}
 
-        // Customer Profile
+        // Customer Profile: one request loads every tab
+        async function fetchCustomerView(phone, reminderOffset = 0) {{
+            const response = await fetch(`/cs/customer/${{encodeURIComponent(phone)}}/full?reminder_offset=${{reminderOffset}}`);
+            if (!response.ok) throw new Error('Failed to load customer');
+            return response.json();
+        }}
+
+        async function refreshCustomerView() {{
+            customerView = await fetchCustomerView(currentCustomer.phone);
+        }}
+
         async function viewCustomer(phone) {{
             try {{
-                const response = await fetch(`/admin/cs/customer/${{encodeURIComponent(phone)}}`);
-                const customer = await response.json();
+                customerView = await fetchCustomerView(phone);
+                const customer = {{...customerView.profile, tier: customerView.subscription.tier}};
 
                 currentCustomer = customer;
 
@@ -992,6 +1008,7 @@ async def cs_portal(request: Request, user: str = Depends(verify_cs_auth)):
         function closeProfile() {{
             document.getElementById('customerProfile').style.display = 'none';
             currentCustomer = null;
+            customerView = null;
         }}
 
         async function showProfileTab(tab) {{
@@ -1011,17 +1028,12 @@ async def cs_portal(request: Request, user: str = Depends(verify_cs_auth)):
                     await loadCustomerTickets();
                 }} else if (tab === 'notes') {{
                     await loadCustomerNotes();
-                }} else {{
-                    const response = await fetch(`/admin/cs/customer/${{encodeURIComponent(currentCustomer.phone)}}/${{tab}}`);
-                    const data = await response.json();
-
-                    if (tab === 'reminders') {{
-                        renderReminders(data);
-                    }} else if (tab === 'lists') {{
-                        renderLists(data);
-                    }} else if (tab === 'memories') {{
-                        renderMemories(data);
-                    }}
+                }} else if (tab === 'reminders') {{
+                    renderReminders(customerView.reminders.items);
+                }} else if (tab === 'lists') {{
+                    renderLists(customerView.lists);
+                }} else if (tab === 'memories') {{
+                    renderMemories(customerView.memories);
                 }}
             }} catch (e) {{
                 container.innerHTML = '<div class="empty-state">Error loading data</div>';
@@ -1045,9 +1057,25 @@ async def cs_portal(request: Request, user: str = Depends(verify_cs_auth)):
                         </tr>
                     `).join('')}}
                 </table>
+                ${{customerView.reminders.has_more ? `
+                    <button class="btn btn-primary" style="margin-top: 10px;" onclick="loadMoreReminders()">Load more</button>
+                ` : ''}}
             `;
         }}
 
+        async function loadMoreReminders() {{
+            try {{
+                const page = await fetchCustomerView(currentCustomer.phone, customerView.reminders.items.length);
+                customerView.reminders = {{
+                    ...page.reminders,
+                    items: customerView.reminders.items.concat(page.reminders.items)
+                }};
+                renderReminders(customerView.reminders.items);
+            }} catch (e) {{
+                alert('Error loading reminders');
+            }}
+        }}
+
         function renderLists(lists) {{
             const container = document.getElementById('tab-lists');
             if (!lists || lists.length === 0) {{
@@ -1088,8 +1116,8 @@ async def cs_portal(request: Request, user: str = Depends(verify_cs_auth)):
         async function loadCustomerTickets() {{
             const container = document.getElementById('tab-tickets');
             try {{
-                const response = await fetch(`/cs/customer/${{encodeURIComponent(currentCustomer.phone)}}/tickets`);
-                const tickets = await response.json();
+                await refreshCustomerView();
+                const tickets = customerView.tickets;
 
                 if (!tickets || tickets.length === 0) {{
                     container.innerHTML = '<div class="empty-state">No support tickets</div>';
@@ -1118,8 +1146,8 @@ async def cs_portal(request: Request, user: str = Depends(verify_cs_auth)):
         async function loadCustomerNotes() {{
             const container = document.getElementById('tab-notes');
             try {{
-                const response = await fetch(`/admin/cs/customer/${{encodeURIComponent(currentCustomer.phone)}}`);
-                const customer = await response.json();
+                await refreshCustomerView();
+                const customer = customerView;
 
                 if (!customer.notes || customer.notes.length === 0) {{
                     container.innerHTML = '<div class="empty-state">No notes yet</div>';
@@ -1630,8 +1658,42 @@ async def cs_portal(request: Request, user: str = Depends(verify_cs_auth)):
     return HTMLResponse(content=html_content)
 
 
+@router.get("/cs/customer/{phone_number}/full", dependencies=[Depends(prefer_read_replica)])
+async def cs_get_customer_full(
+    phone_number: str,
+    request: Request,
+    reminder_limit: int = Query(REMINDER_PAGE_SIZE, ge=1, le=MAX_REMINDER_PAGE_SIZE),
+    reminder_offset: int = Query(0, ge=0),
+    user: str = Depends(verify_cs_auth)
+):
+    """Get a customer's profile, subscription, reminders, lists, memories, tickets and notes at once"""
+    conn = None
+    try:
+        conn = get_db_connection()
+        c = conn.cursor()
+
+        version = get_data_version(c, phone_number)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Customer not found")
+
+        return cached_json_response(
+            request, 'cs_customer_view',
+            lambda: get_customer_view(c, phone_number, reminder_limit, reminder_offset),
+            params={'phone': phone_number, 'version': version, 'limit': reminder_limit, 'offset': reminder_offset},
+            cache=get_view_cache(),
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting customer view: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    finally:
+        if conn:
+            return_db_connection(conn)
+
+
 # API endpoint to get customer tickets
-@router.get("/cs/customer/{phone_number}/tickets")
+@router.get("/cs/customer/{phone_number}/tickets", dependencies=[Depends(prefer_read_replica)])
 async def get_customer_tickets(phone_number: str, user: str = Depends(verify_cs_auth)):
     """Get support tickets for a specific customer"""
     conn = None
@@ -1640,8 +1702,7 @@ async def get_customer_tickets(phone_number: str, user: str = Depends(verify_cs_
         c = conn.cursor()
 
         c.execute("""
-            SELECT id, status, created_at, updated_at,
-                   (SELECT COUNT(*) FROM support_messages WHERE ticket_id = support_tickets.id) as message_count
+            SELECT id, status, created_at, updated_at, message_count
             FROM support_tickets
             WHERE phone_number = %s
             ORDER BY updated_at DESC
@@ -1670,7 +1731,7 @@ async def get_customer_tickets(phone_number: str, user: str = Depends(verify_cs_
 # SUPPORT TICKET ENDPOINTS (CS Auth)
 # =====================================================
 
-@router.get("/cs/support/tickets")
+@router.get("/cs/support/tickets", dependencies=[Depends(prefer_read_replica)])
 async def cs_get_all_tickets(
     include_closed: bool = False,
     category: str = None,
@@ -1784,46 +1845,17 @@ async def cs_reopen_ticket(ticket_id: int, user: str = Depends(verify_cs_auth)):
 # CUSTOMER SERVICE ENDPOINTS (CS Auth)
 # =====================================================
 
-@router.get("/cs/search")
-async def cs_search_customers(q: str = "", user: str = Depends(verify_cs_auth)):
-    """Search customers by phone number or name"""
+def _cs_search(q: str):
     conn = None
     try:
         conn = get_db_connection()
-        c = conn.cursor()
-
-        if not q or len(q) < 2:
-            return {'results': [], 'message': 'Enter at least 2 characters to search'}
-
-        # Clean up search term - remove common phone formatting
-        clean_query = q.strip().replace('-', '').replace('(', '').replace(')', '').replace(' ', '')
-
-        # Build search pattern
-        search_term = f"%{clean_query}%"
-
-        # Also try with + prefix for phone numbers (digits only)
-        if clean_query.isdigit():
-            # Search for phone with or without + prefix
-            c.execute("""
-                SELECT phone_number, first_name, premium_status, active, created_at
-                FROM users
-                WHERE phone_number LIKE %s
-                   OR phone_number LIKE %s
-                ORDER BY created_at DESC
-                LIMIT 50
-            """, (search_term, f"%+{clean_query}%"))
-        else:
-            # Search by name or phone
-            c.execute("""
-                SELECT phone_number, first_name, premium_status, active, created_at
-                FROM users
-                WHERE phone_number LIKE %s
-                   OR LOWER(first_name) LIKE LOWER(%s)
-                ORDER BY created_at DESC
-                LIMIT 50
-            """, (search_term, search_term))
-
-        results = c.fetchall()
+        results = search_customers(
+            conn.cursor(), q,
+            # users has no active column: a customer is active until they opt out
+            columns='phone_number, first_name, premium_status, NOT COALESCE(opted_out, FALSE), created_at',
+            order_by='created_at DESC',
+            name_columns=('first_name',),
+        )
         logger.info(f"CS search for '{q}' returned {len(results)} results")
 
         return {
@@ -1838,15 +1870,26 @@ async def cs_search_customers(q: str = "", user: str = Depends(verify_cs_auth)):
                 for r in results
             ]
         }
-    except Exception as e:
-        logger.error(f"Error searching customers: {e}")
-        return {'results': [], 'error': str(e)}
     finally:
         if conn:
             return_db_connection(conn)
 
 
-@router.get("/cs/customer/{phone_number}")
+@router.get("/cs/search", dependencies=[Depends(prefer_read_replica)])
+async def cs_search_customers(request: Request, q: str = "", user: str = Depends(verify_cs_auth)):
+    """Search customers by phone number or name"""
+    if not q or len(q.strip()) < MIN_QUERY_LENGTH:
+        return {'results': [], 'message': 'Enter at least 2 characters to search'}
+    try:
+        return cached_json_response(
+            request, 'cs_search', lambda: _cs_search(q), params=cache_params(q), cache=get_search_cache()
+        )
+    except Exception as e:
+        logger.error(f"Error searching customers: {e}")
+        return {'results': [], 'error': str(e)}
+
+
+@router.get("/cs/customer/{phone_number}", dependencies=[Depends(prefer_read_replica)])
 async def cs_get_customer(phone_number: str, user: str = Depends(verify_cs_auth)):
     """Get customer details"""
     conn = None
@@ -1895,7 +1938,7 @@ async def cs_get_customer(phone_number: str, user: str = Depends(verify_cs_auth)
             return_db_connection(conn)
 
 
-@router.get("/cs/customer/{phone_number}/reminders")
+@router.get("/cs/customer/{phone_number}/reminders", dependencies=[Depends(prefer_read_replica)])
 async def cs_get_customer_reminders(phone_number: str, user: str = Depends(verify_cs_auth)):
     """Get customer reminders"""
     conn = None
@@ -1928,7 +1971,7 @@ async def cs_get_customer_reminders(phone_number: str, user: str = Depends(verif
             return_db_connection(conn)
 
 
-@router.get("/cs/customer/{phone_number}/lists")
+@router.get("/cs/customer/{phone_number}/lists", dependencies=[Depends(prefer_read_replica)])
 async def cs_get_customer_lists(phone_number: str, user: str = Depends(verify_cs_auth)):
     """Get customer lists with items"""
     conn = None
@@ -1967,7 +2010,7 @@ async def cs_get_customer_lists(phone_number: str, user: str = Depends(verify_cs
             return_db_connection(conn)
 
 
-@router.get("/cs/customer/{phone_number}/memories")
+@router.get("/cs/customer/{phone_number}/memories", dependencies=[Depends(prefer_read_replica)])
 async def cs_get_customer_memories(phone_number: str, user: str = Depends(verify_cs_auth)):
     """Get customer memories"""
     conn = None
@@ -2212,7 +2255,7 @@ async def cs_toggle_contact_message(message_id: int, user: str = Depends(verify_
 # SLA INFO ENDPOINT
 # =====================================================
 
-@router.get("/cs/support/sla")
+@router.get("/cs/support/sla", dependencies=[Depends(prefer_read_replica)])
 async def cs_get_sla_info(user: str = Depends(verify_cs_auth)):
     """Get SLA metrics for the ticket dashboard"""
     from services.support_service import get_ticket_sla_info
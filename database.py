@@ -3,10 +3,23 @@ Database Module
 Handles database initialization and connection management for PostgreSQL
 """
 
+import re
+import time
+import threading
+import weakref
+import contextvars
+from datetime import datetime
 import psycopg2
 from psycopg2 import pool
+from psycopg2.extras import execute_values
 from contextlib import contextmanager
-from config import DATABASE_URL, MONITORING_DATABASE_URL, ENCRYPTION_ENABLED, logger
+from config import (
+    DATABASE_URL, MONITORING_DATABASE_URL, ENCRYPTION_ENABLED, PREPARED_STATEMENTS_ENABLED, logger,
+    UPSTASH_REDIS_URL, WRITE_BUFFER_ENABLED, WRITE_BUFFER_FLUSH_INTERVAL_MS, WRITE_BUFFER_BATCH_SIZE,
+    WRITE_BUFFER_MAX_ROWS, WRITE_BUFFER_SPILL_KEY,
+    READ_REPLICA_URL, REPLICA_MAX_LAG_SECONDS, REPLICA_LAG_CHECK_INTERVAL,
+)
+from migrations import APP_MIGRATIONS, MONITORING_MIGRATIONS, run_migrations
 
 # Connection pool settings
 MIN_CONNECTIONS = 2
@@ -31,17 +44,36 @@ def init_connection_pool():
         raise
 
 
-def get_db_connection():
-    """Get a database connection from the pool"""
+def get_db_connection(readonly=None):
+    """Get a database connection from the pool.
+
+    readonly=True routes to the read replica when one is configured and caught
+    up, falling back to the primary. None uses the current route's default
+    (see prefer_read_replica).
+    """
     global _connection_pool
+    if readonly is None:
+        readonly = _read_replica_preferred.get()
+    if readonly:
+        conn = _get_replica_connection()
+        if conn is not None:
+            return conn
     if _connection_pool is None:
         init_connection_pool()
     return _connection_pool.getconn()
 
 
 def return_db_connection(conn):
-    """Return a connection to the pool, rolling back any aborted transaction first"""
+    """Return a connection to its pool, rolling back any aborted transaction first"""
     global _connection_pool
+    if conn is not None and conn in _replica_connections:
+        _replica_connections.discard(conn)
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        _replica_pool.putconn(conn, close=bool(conn.closed))
+        return
     if _connection_pool and conn:
         try:
             conn.rollback()
@@ -51,11 +83,11 @@ def return_db_connection(conn):
 
 
 @contextmanager
-def get_db_cursor():
+def get_db_cursor(readonly=None):
     """Context manager for database operations - handles connection lifecycle"""
     conn = None
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(readonly)
         cursor = conn.cursor()
         yield cursor
         conn.commit()
@@ -68,6 +100,195 @@ def get_db_cursor():
             return_db_connection(conn)
 
 
+# =====================================================
+# READ REPLICA ROUTING
+# =====================================================
+# Heavy dashboard, CS and analytics reads go to READ_REPLICA_URL when set.
+# Replica lag is checked at most every REPLICA_LAG_CHECK_INTERVAL seconds;
+# while it is unreachable or too far behind, reads use the primary.
+REPLICA_MAX_CONNECTIONS = 5
+
+_replica_pool = None
+_replica_lock = threading.Lock()
+_replica_connections = weakref.WeakSet()
+_read_replica_preferred = contextvars.ContextVar('read_replica_preferred', default=False)
+_replica_state = {
+    'healthy': False,
+    'lag_seconds': None,
+    'checked_at': float('-inf'),
+    'replica_reads': 0,
+    'primary_fallbacks': 0,
+    'last_error': None,
+}
+
+
+def init_replica_pool():
+    """Initialize the read replica connection pool"""
+    global _replica_pool
+    try:
+        _replica_pool = pool.ThreadedConnectionPool(1, REPLICA_MAX_CONNECTIONS, READ_REPLICA_URL)
+        logger.info(f"Read replica pool initialized (max={REPLICA_MAX_CONNECTIONS})")
+    except Exception as e:
+        logger.error(f"Failed to initialize read replica pool: {e}")
+        raise
+
+
+def _replica_lag_seconds(conn):
+    """Replay lag in seconds (0 when the replica has replayed everything it received)"""
+    c = conn.cursor()
+    c.execute('''
+        SELECT CASE
+            WHEN NOT pg_is_in_recovery() THEN 0
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE COALESCE(EXTRACT(EPOCH FROM NOW() - pg_last_xact_replay_timestamp()), 0)
+        END
+    ''')
+    lag = float(c.fetchone()[0])
+    conn.rollback()
+    return lag
+
+
+def _get_replica_connection():
+    """A read-only replica connection, or None to fall back to the primary"""
+    global _replica_pool
+    if not READ_REPLICA_URL:
+        return None
+
+    now = time.monotonic()
+    due_for_check = now >= _replica_state['checked_at'] + REPLICA_LAG_CHECK_INTERVAL
+    if not _replica_state['healthy'] and not due_for_check:
+        _replica_state['primary_fallbacks'] += 1
+        return None
+
+    conn = None
+    try:
+        if _replica_pool is None:
+            with _replica_lock:
+                if _replica_pool is None:
+                    init_replica_pool()
+        conn = _replica_pool.getconn()
+        if not conn.readonly:
+            conn.readonly = True
+
+        if due_for_check:
+            lag = _replica_lag_seconds(conn)
+            _replica_state['lag_seconds'] = round(lag, 3)
+            _replica_state['checked_at'] = now
+            was_healthy = _replica_state['healthy']
+            _replica_state['healthy'] = lag <= REPLICA_MAX_LAG_SECONDS
+            if not _replica_state['healthy']:
+                if was_healthy:
+                    logger.warning(f"Read replica lag {lag:.1f}s exceeds {REPLICA_MAX_LAG_SECONDS}s, reading from primary")
+                _replica_pool.putconn(conn)
+                _replica_state['primary_fallbacks'] += 1
+                return None
+
+        _replica_connections.add(conn)
+        _replica_state['replica_reads'] += 1
+        return conn
+    except Exception as e:
+        if _replica_state['healthy'] or _replica_state['last_error'] is None:
+            logger.warning(f"Read replica unavailable, reading from primary: {e}")
+        _replica_state['healthy'] = False
+        _replica_state['checked_at'] = now
+        _replica_state['last_error'] = str(e)[:200]
+        _replica_state['primary_fallbacks'] += 1
+        if conn is not None:
+            _replica_pool.putconn(conn, close=True)
+        return None
+
+
+async def prefer_read_replica():
+    """FastAPI route dependency: get_db_connection() defaults to readonly=True for this request.
+
+    Only use on routes that never write through get_db_connection/get_db_cursor.
+    Async so the context variable is set in the request's own context.
+    """
+    token = _read_replica_preferred.set(True)
+    try:
+        yield
+    finally:
+        _read_replica_preferred.reset(token)
+
+
+def get_read_replica_stats():
+    """Replica health and routing counters for the admin stats endpoint"""
+    return {
+        'configured': bool(READ_REPLICA_URL),
+        'healthy': _replica_state['healthy'],
+        'lag_seconds': _replica_state['lag_seconds'],
+        'max_lag_seconds': REPLICA_MAX_LAG_SECONDS,
+        'replica_reads': _replica_state['replica_reads'],
+        'primary_fallbacks': _replica_state['primary_fallbacks'],
+        'last_error': _replica_state['last_error'],
+    }
+
+
+# =====================================================
+# PREPARED STATEMENTS
+# =====================================================
+# Hot queries are registered once by name and PREPAREd lazily on each pooled
+# connection the first time they run there. Later calls on the same connection
+# EXECUTE the stored plan, so Postgres skips parse/plan on every message.
+_prepared_statements = {}  # name -> (%s query, $n query, param count)
+_prepared_on_connection = weakref.WeakKeyDictionary()  # connection -> set of names
+_PLACEHOLDER_PATTERN = re.compile(r'%%|%s')
+
+
+def _to_positional_params(query):
+    """Convert psycopg2 %s placeholders to Postgres $1, $2, ... for PREPARE"""
+    counter = 0
+
+    def replace(match):
+        nonlocal counter
+        if match.group(0) == '%%':
+            return '%'
+        counter += 1
+        return f'${counter}'
+
+    return _PLACEHOLDER_PATTERN.sub(replace, query), counter
+
+
+def register_prepared_statement(name, query):
+    """Register a named query for execute_prepared().
+
+    The query uses regular %s placeholders, so it still runs unchanged when
+    prepared statements are disabled.
+    """
+    if not re.fullmatch(r'[a-z_][a-z0-9_]*', name):
+        raise ValueError(f"Invalid prepared statement name: {name}")
+    positional, param_count = _to_positional_params(query)
+    existing = _prepared_statements.get(name)
+    if existing and existing[0] != query:
+        raise ValueError(f"Prepared statement {name} already registered with a different query")
+    _prepared_statements[name] = (query, positional, param_count)
+
+
+def execute_prepared(cursor, name, params=()):
+    """Execute a registered query by name on the cursor's connection.
+
+    PREPAREs the statement on first use per connection. Falls back to a plain
+    execute when PREPARED_STATEMENTS_ENABLED is off.
+    """
+    query, positional, param_count = _prepared_statements[name]
+    if len(params) != param_count:
+        raise ValueError(f"Prepared statement {name} expects {param_count} params, got {len(params)}")
+
+    if not PREPARED_STATEMENTS_ENABLED:
+        cursor.execute(query, params)
+        return
+
+    prepared = _prepared_on_connection.setdefault(cursor.connection, set())
+    if name not in prepared:
+        cursor.execute(f'PREPARE {name} AS {positional}')
+        prepared.add(name)
+
+    if param_count:
+        cursor.execute(f'EXECUTE {name} ({", ".join(["%s"] * param_count)})', params)
+    else:
+        cursor.execute(f'EXECUTE {name}')
+
+
 # =====================================================
 # MONITORING DATABASE CONNECTION (for staging to monitor production)
 # =====================================================
@@ -111,8 +332,16 @@ def return_monitoring_connection(conn):
 
 
 @contextmanager
-def get_monitoring_cursor():
-    """Context manager for monitoring database operations"""
+def get_monitoring_cursor(readonly=False):
+    """Context manager for monitoring database operations.
+
+    readonly=True reads from the read replica when the monitoring database is
+    the main database; use it only for reads of the app tables (logs, etc.).
+    """
+    if readonly and MONITORING_DATABASE_URL == DATABASE_URL:
+        with get_db_cursor(readonly=True) as cursor:
+            yield cursor
+        return
     conn = None
     try:
         conn = get_monitoring_connection()
@@ -129,530 +358,289 @@ def get_monitoring_cursor():
 
 
 def init_db():
-    """Initialize all database tables"""
+    """Bring the database schema up to date (see migrations/app.py)"""
+    conn = None
     try:
         logger.info("Initializing database...")
         conn = get_db_connection()
-        c = conn.cursor()
+        applied = run_migrations(conn, APP_MIGRATIONS, 'app')
+        if applied:
+            logger.info(f"Database initialized successfully ({applied} migrations applied)")
+        else:
+            logger.info("Database schema is up to date")
+    except Exception as e:
+        logger.error(f"Database initialization failed: {e}")
+        raise
+    finally:
+        if conn:
+            return_db_connection(conn)
 
-        # Memories table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS memories (
-                id SERIAL PRIMARY KEY,
-                phone_number TEXT NOT NULL,
-                memory_text TEXT NOT NULL,
-                parsed_data TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
 
-        # Reminders table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS reminders (
-                id SERIAL PRIMARY KEY,
-                phone_number TEXT NOT NULL,
-                reminder_text TEXT NOT NULL,
-                reminder_date TIMESTAMP NOT NULL,
-                sent BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                delivery_status TEXT DEFAULT 'pending',
-                sent_at TIMESTAMP,
-                error_message TEXT
-            )
-        ''')
+_monitoring_schema_ready = False
 
-        # Users table with onboarding info
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                phone_number TEXT PRIMARY KEY,
-                first_name TEXT,
-                last_name TEXT,
-                email TEXT,
-                zip_code TEXT,
-                timezone TEXT,
-                onboarding_complete BOOLEAN DEFAULT FALSE,
-                onboarding_step INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                pending_delete BOOLEAN DEFAULT FALSE,
-                pending_reminder_text TEXT,
-                pending_reminder_time TEXT,
-                referral_source TEXT,
-                premium_status TEXT DEFAULT 'free',
-                premium_since TIMESTAMP,
-                last_active_at TIMESTAMP,
-                signup_source TEXT,
-                total_messages INTEGER DEFAULT 0
-            )
-        ''')
 
-        # Onboarding progress tracking for abandoned signup recovery
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS onboarding_progress (
-                id SERIAL PRIMARY KEY,
-                phone_number TEXT NOT NULL UNIQUE,
-                current_step INTEGER DEFAULT 1,
-                first_name TEXT,
-                last_name TEXT,
-                email TEXT,
-                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_activity_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                followup_24h_sent BOOLEAN DEFAULT FALSE,
-                followup_7d_sent BOOLEAN DEFAULT FALSE,
-                cancelled BOOLEAN DEFAULT FALSE
-            )
-        ''')
+def ensure_monitoring_schema():
+    """Bring the agents' monitoring schema up to date (see migrations/monitoring.py).
 
-        # Logs table for monitoring
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS logs (
-                id SERIAL PRIMARY KEY,
-                phone_number TEXT NOT NULL,
-                message_in TEXT NOT NULL,
-                message_out TEXT NOT NULL,
-                intent TEXT,
-                success BOOLEAN,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+    Only checks the database once per process; later calls return immediately.
+    """
+    global _monitoring_schema_ready
+    if _monitoring_schema_ready:
+        return
+    conn = None
+    try:
+        conn = get_monitoring_connection()
+        applied = run_migrations(conn, MONITORING_MIGRATIONS, 'monitoring')
+        if applied:
+            logger.info(f"Monitoring tables initialized ({applied} migrations applied)")
+        _monitoring_schema_ready = True
+    except Exception as e:
+        logger.error(f"Monitoring schema initialization failed: {e}")
+        raise
+    finally:
+        if conn:
+            return_monitoring_connection(conn)
 
-        # Lists table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS lists (
-                id SERIAL PRIMARY KEY,
-                phone_number TEXT NOT NULL,
-                list_name TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(phone_number, list_name)
-            )
-        ''')
+register_prepared_statement(
+    'insert_log',
+    'INSERT INTO logs (phone_number, message_in, message_out, intent, success) VALUES (%s, %s, %s, %s, %s)'
+)
+register_prepared_statement(
+    'insert_log_encrypted',
+    '''INSERT INTO logs (phone_number, phone_hash, message_in, message_out,
+       message_in_encrypted, message_out_encrypted, intent, success)
+       VALUES (%s, %s, %s, %s, %s, %s, %s, %s)'''
+)
 
-        # List items table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS list_items (
-                id SERIAL PRIMARY KEY,
-                list_id INTEGER NOT NULL REFERENCES lists(id) ON DELETE CASCADE,
-                phone_number TEXT NOT NULL,
-                item_text TEXT NOT NULL,
-                completed BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
 
-        # Broadcast logs table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS broadcast_logs (
-                id SERIAL PRIMARY KEY,
-                sender TEXT NOT NULL,
-                message TEXT NOT NULL,
-                audience TEXT NOT NULL,
-                recipient_count INTEGER DEFAULT 0,
-                success_count INTEGER DEFAULT 0,
-                fail_count INTEGER DEFAULT 0,
-                status TEXT DEFAULT 'pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                completed_at TIMESTAMP,
-                source TEXT DEFAULT 'immediate'
-            )
-        ''')
+# =====================================================
+# WRITE-BEHIND ANALYTICS INSERTS
+# =====================================================
+# log_interaction, log_api_usage and log_confidence queue rows here instead of
+# inserting inline. Each buffered row carries its own UTC timestamp so
+# created_at reflects when the event happened, not when the batch was written.
+_UTC_CREATED_AT = "(%s::timestamp AT TIME ZONE 'UTC')"
+_write_buffer = None
+
+
+def _seal(value):
+    """Encrypt a queued field so the buffer's Redis spill never holds plaintext"""
+    if ENCRYPTION_ENABLED and value:
+        from utils.encryption import encrypt_field
+        return encrypt_field(value)
+    return value
+
+
+def _unseal(value):
+    """Decrypt a queued field (rows spilled before sealing pass through unchanged)"""
+    if ENCRYPTION_ENABLED and value:
+        from utils.encryption import safe_decrypt
+        return safe_decrypt(value)
+    return value
+
+
+def _open_log_rows(rows):
+    """Turn buffered logs rows into insert values (phone first, created_at last)"""
+    if not ENCRYPTION_ENABLED:
+        # (phone, msg_in, msg_out, intent, success, created_at)
+        return [tuple(row) for row in rows]
+    from utils.encryption import encrypt_field, hash_phone
+    values = []
+    for row in rows:
+        if len(row) == 7:
+            # Sealed in log_interaction: (phone, phone_hash, msg_in, msg_out) are ciphertext/hash
+            phone, phone_hash, msg_in_encrypted, msg_out_encrypted, intent, success, created_at = row
+            msg_in, msg_out = _unseal(msg_in_encrypted), _unseal(msg_out_encrypted)
+            phone = _unseal(phone)
+        else:
+            # Plaintext row spilled before sealing
+            phone, msg_in, msg_out, intent, success, created_at = row
+            phone_hash = hash_phone(phone)
+            msg_in_encrypted, msg_out_encrypted = encrypt_field(msg_in), encrypt_field(msg_out)
+        values.append((phone, phone_hash, msg_in, msg_out, msg_in_encrypted, msg_out_encrypted,
+                       intent, success, created_at))
+    return values
+
+
+def _write_log_rows(cursor, values):
+    """Batch insert logs values from _open_log_rows"""
+    if ENCRYPTION_ENABLED:
+        execute_values(
+            cursor,
+            '''INSERT INTO logs (phone_number, phone_hash, message_in, message_out,
+               message_in_encrypted, message_out_encrypted, intent, success, created_at) VALUES %s''',
+            values,
+            template=f"(%s, %s, %s, %s, %s, %s, %s, %s, {_UTC_CREATED_AT})"
+        )
+    else:
+        execute_values(
+            cursor,
+            'INSERT INTO logs (phone_number, message_in, message_out, intent, success, created_at) VALUES %s',
+            values,
+            template=f"(%s, %s, %s, %s, %s, {_UTC_CREATED_AT})"
+        )
 
-        # Scheduled broadcasts table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS scheduled_broadcasts (
-                id SERIAL PRIMARY KEY,
-                sender TEXT NOT NULL,
-                message TEXT NOT NULL,
-                audience TEXT NOT NULL,
-                scheduled_date TIMESTAMP NOT NULL,
-                status TEXT DEFAULT 'scheduled',
-                recipient_count INTEGER DEFAULT 0,
-                success_count INTEGER DEFAULT 0,
-                fail_count INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                sent_at TIMESTAMP,
-                target_phone TEXT
-            )
-        ''')
 
-        # User feedback table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS feedback (
-                id SERIAL PRIMARY KEY,
-                user_phone TEXT NOT NULL,
-                message TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                resolved BOOLEAN DEFAULT FALSE
-            )
-        ''')
+def _open_api_usage_rows(rows):
+    """Turn buffered api_usage rows into insert values"""
+    # Rows spilled to Redis before the cached column existed have no cached flag
+    rows = [tuple(row) if len(row) == 8 else tuple(row[:6]) + (False,) + tuple(row[6:]) for row in rows]
+    return [(_unseal(row[0]),) + row[1:] for row in rows]
 
-        # Conversation analysis table for AI-flagged issues
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS conversation_analysis (
-                id SERIAL PRIMARY KEY,
-                log_id INTEGER REFERENCES logs(id),
-                phone_number TEXT NOT NULL,
-                issue_type TEXT NOT NULL,
-                severity TEXT DEFAULT 'low',
-                ai_explanation TEXT,
-                reviewed BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
 
-        # API usage tracking table for cost analytics
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS api_usage (
-                id SERIAL PRIMARY KEY,
-                phone_number TEXT NOT NULL,
-                request_type TEXT NOT NULL,
-                prompt_tokens INTEGER DEFAULT 0,
-                completion_tokens INTEGER DEFAULT 0,
-                total_tokens INTEGER DEFAULT 0,
-                model TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+def _write_api_usage_rows(cursor, values):
+    """Batch insert api_usage values from _open_api_usage_rows"""
+    execute_values(
+        cursor,
+        '''INSERT INTO api_usage (phone_number, request_type, prompt_tokens, completion_tokens,
+           total_tokens, model, cached, created_at) VALUES %s''',
+        values,
+        template=f"(%s, %s, %s, %s, %s, %s, %s, {_UTC_CREATED_AT})"
+    )
 
-        # Public changelog for updates, fixes, and features
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS changelog (
-                id SERIAL PRIMARY KEY,
-                title TEXT NOT NULL,
-                description TEXT,
-                entry_type TEXT NOT NULL DEFAULT 'improvement',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                published BOOLEAN DEFAULT TRUE
-            )
-        ''')
 
-        # Support tickets for premium users
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS support_tickets (
-                id SERIAL PRIMARY KEY,
-                phone_number TEXT NOT NULL,
-                status TEXT DEFAULT 'open',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+def _open_confidence_rows(rows):
+    """Turn buffered confidence_logs rows into insert values"""
+    return [
+        (_unseal(phone), action_type, confidence_score, threshold, confirmed, _unseal(user_message), created_at)
+        for phone, action_type, confidence_score, threshold, confirmed, user_message, created_at in rows
+    ]
 
-        # Support messages (thread of messages for each ticket)
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS support_messages (
-                id SERIAL PRIMARY KEY,
-                ticket_id INTEGER REFERENCES support_tickets(id) ON DELETE CASCADE,
-                phone_number TEXT NOT NULL,
-                message TEXT NOT NULL,
-                direction TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
 
-        # Lightweight contact messages (feedback, bug reports, questions) - not full tickets
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS contact_messages (
-                id SERIAL PRIMARY KEY,
-                phone_number TEXT NOT NULL,
-                message TEXT NOT NULL,
-                category TEXT NOT NULL,
-                source TEXT NOT NULL DEFAULT 'sms',
-                resolved BOOLEAN DEFAULT FALSE,
-                admin_reply TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+def _write_confidence_rows(cursor, values):
+    """Batch insert confidence_logs values from _open_confidence_rows"""
+    execute_values(
+        cursor,
+        '''INSERT INTO confidence_logs (phone_number, action_type, confidence_score, threshold,
+           confirmed, user_message, created_at) VALUES %s''',
+        values,
+        template=f"(%s, %s, %s, %s, %s, %s, {_UTC_CREATED_AT})"
+    )
 
-        # Customer service notes
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS customer_notes (
-                id SERIAL PRIMARY KEY,
-                phone_number TEXT NOT NULL,
-                note TEXT NOT NULL,
-                created_by TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
 
-        # Confidence score logging for AI calibration tracking
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS confidence_logs (
-                id SERIAL PRIMARY KEY,
-                phone_number TEXT,
-                action_type TEXT NOT NULL,
-                confidence_score INTEGER NOT NULL,
-                threshold INTEGER NOT NULL,
-                confirmed BOOLEAN,
-                user_message TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+# table -> (open buffered rows into insert values, batch insert the values)
+_BUFFERED_WRITERS = {
+    'logs': (_open_log_rows, _write_log_rows),
+    'api_usage': (_open_api_usage_rows, _write_api_usage_rows),
+    'confidence_logs': (_open_confidence_rows, _write_confidence_rows),
+}
+
+# Advisory lock class shared by record_account_deletion (exclusive) and the
+# buffered writers (shared), keyed by hashtext(phone_number)
+_ACCOUNT_LOCK_CLASS = 27
+
+
+def record_account_deletion(cursor, phone_number):
+    """Tombstone an account inside the caller's deletion transaction.
+
+    Call before deleting the user's rows. The exclusive lock waits for any
+    flush already writing rows for this phone number, so the DELETEs see
+    them; rows still queued in other processes or the Redis spill list are
+    dropped when they are flushed (see _drop_deleted_account_rows).
+    """
+    cursor.execute('SELECT pg_advisory_xact_lock(%s, hashtext(%s))', (_ACCOUNT_LOCK_CLASS, phone_number))
+    cursor.execute('''
+        INSERT INTO account_deletions (phone_number, deleted_at)
+        VALUES (%s, clock_timestamp() AT TIME ZONE 'UTC')
+        ON CONFLICT (phone_number) DO UPDATE SET deleted_at = EXCLUDED.deleted_at
+    ''', (phone_number,))
 
-        # Recurring reminders table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS recurring_reminders (
-                id SERIAL PRIMARY KEY,
-                phone_number TEXT NOT NULL,
-                reminder_text TEXT NOT NULL,
-                recurrence_type TEXT NOT NULL,
-                recurrence_day INTEGER,
-                reminder_time TIME NOT NULL,
-                timezone TEXT NOT NULL,
-                active BOOLEAN DEFAULT TRUE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_generated_date DATE,
-                next_occurrence TIMESTAMP
-            )
-        ''')
-
-        # Add new columns to existing tables (migrations)
-        # These will silently fail if columns already exist
-        migrations = [
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS referral_source TEXT",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS premium_status TEXT DEFAULT 'free'",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS premium_since TIMESTAMP",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS last_active_at TIMESTAMP",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS signup_source TEXT",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS total_messages INTEGER DEFAULT 0",
-            "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS delivery_status TEXT DEFAULT 'pending'",
-            "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS sent_at TIMESTAMP",
-            "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS error_message TEXT",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_list_item TEXT",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS last_active_list TEXT",
-            # Encryption: Add phone_hash columns for secure lookups
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS phone_hash TEXT",
-            "ALTER TABLE memories ADD COLUMN IF NOT EXISTS phone_hash TEXT",
-            "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS phone_hash TEXT",
-            "ALTER TABLE logs ADD COLUMN IF NOT EXISTS phone_hash TEXT",
-            "ALTER TABLE lists ADD COLUMN IF NOT EXISTS phone_hash TEXT",
-            "ALTER TABLE list_items ADD COLUMN IF NOT EXISTS phone_hash TEXT",
-            # Encryption: Add encrypted field columns
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS first_name_encrypted TEXT",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS last_name_encrypted TEXT",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS email_encrypted TEXT",
-            "ALTER TABLE memories ADD COLUMN IF NOT EXISTS memory_text_encrypted TEXT",
-            "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS reminder_text_encrypted TEXT",
-            "ALTER TABLE logs ADD COLUMN IF NOT EXISTS message_in_encrypted TEXT",
-            "ALTER TABLE logs ADD COLUMN IF NOT EXISTS message_out_encrypted TEXT",
-            "ALTER TABLE list_items ADD COLUMN IF NOT EXISTS item_text_encrypted TEXT",
-            # Delete reminder feature: stores search results when multiple matches found
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_reminder_delete TEXT",
-            # Delete memory feature: stores search results when multiple matches or confirmation needed
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_memory_delete TEXT",
-            # Free trial support
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS trial_end_date TIMESTAMP",
-            # Trial expiration warning tracking
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS trial_warning_7d_sent BOOLEAN DEFAULT FALSE",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS trial_warning_1d_sent BOOLEAN DEFAULT FALSE",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS trial_warning_0d_sent BOOLEAN DEFAULT FALSE",
-            # Mid-trial value reminder (Day 7 engagement message)
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS mid_trial_reminder_sent BOOLEAN DEFAULT FALSE",
-            # Feedback table (created via migration for existing deployments)
-            """CREATE TABLE IF NOT EXISTS feedback (
-                id SERIAL PRIMARY KEY,
-                user_phone TEXT NOT NULL,
-                message TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                resolved BOOLEAN DEFAULT FALSE
-            )""",
-            # API usage tracking table for cost analytics
-            """CREATE TABLE IF NOT EXISTS api_usage (
-                id SERIAL PRIMARY KEY,
-                phone_number TEXT NOT NULL,
-                request_type TEXT NOT NULL,
-                prompt_tokens INTEGER DEFAULT 0,
-                completion_tokens INTEGER DEFAULT 0,
-                total_tokens INTEGER DEFAULT 0,
-                model TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )""",
-            # Snooze feature: track last sent reminder for snooze detection
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS last_sent_reminder_id INTEGER",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS last_sent_reminder_at TIMESTAMP",
-            # Track if a reminder was snoozed (to avoid showing duplicates)
-            "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS snoozed BOOLEAN DEFAULT FALSE",
-            # Celery: Add claimed_at column for atomic reminder claiming
-            "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMP",
-            # Settings table for app configuration
-            """CREATE TABLE IF NOT EXISTS settings (
-                key TEXT PRIMARY KEY,
-                value TEXT,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )""",
-            # Conversation analysis table for AI-flagged issues
-            """CREATE TABLE IF NOT EXISTS conversation_analysis (
-                id SERIAL PRIMARY KEY,
-                log_id INTEGER REFERENCES logs(id),
-                phone_number TEXT NOT NULL,
-                issue_type TEXT NOT NULL,
-                severity TEXT DEFAULT 'low',
-                ai_explanation TEXT,
-                reviewed BOOLEAN DEFAULT FALSE,
-                source TEXT DEFAULT 'ai',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )""",
-            # Track which logs have been analyzed
-            "ALTER TABLE logs ADD COLUMN IF NOT EXISTS analyzed BOOLEAN DEFAULT FALSE",
-            # Add source column for flagging source (ai vs manual)
-            "ALTER TABLE conversation_analysis ADD COLUMN IF NOT EXISTS source TEXT DEFAULT 'ai'",
-            # Opt-out tracking for STOP command compliance
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS opted_out BOOLEAN DEFAULT FALSE",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS opted_out_at TIMESTAMP",
-            # Stripe subscription fields
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS stripe_customer_id TEXT",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS stripe_subscription_id TEXT",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS subscription_status TEXT",
-            # Recurring reminders: link individual reminders to their recurring pattern
-            "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS recurring_id INTEGER REFERENCES recurring_reminders(id)",
-            # Timezone management: store local time for recalculation on timezone change
-            "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS local_time TIME",
-            "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS original_timezone TEXT",
-            # Pending reminder date for clarify_date_time action (date without time)
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_reminder_date TEXT",
-            # Pending list create for duplicate list handling
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_list_create TEXT",
-            # Daily summary feature: opt-in morning summary of day's reminders
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS daily_summary_enabled BOOLEAN DEFAULT FALSE",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS daily_summary_time TIME DEFAULT '08:00'",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS daily_summary_last_sent DATE",
-            # Track if user has been prompted for daily summary after first action
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS daily_summary_prompted BOOLEAN DEFAULT FALSE",
-            # Store pending time when confirming evening daily summary preference
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_daily_summary_time TEXT",
-            # Store pending reminder for low-confidence confirmations (JSON with reminder details)
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_reminder_confirmation TEXT",
-            # 5-minute post-onboarding engagement nudge
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS five_minute_nudge_scheduled_at TIMESTAMP",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS five_minute_nudge_sent BOOLEAN DEFAULT FALSE",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS post_onboarding_interactions INTEGER DEFAULT 0",
-            # Trial info messaging (one-time after first real interaction)
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS trial_info_sent BOOLEAN DEFAULT FALSE",
-            # DELETE ACCOUNT: two-step confirmation flag
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_delete_account BOOLEAN DEFAULT FALSE",
-            # Support ticket enhancements: category, source, priority, assignment
-            "ALTER TABLE support_tickets ADD COLUMN IF NOT EXISTS category TEXT DEFAULT 'support'",
-            "ALTER TABLE support_tickets ADD COLUMN IF NOT EXISTS source TEXT DEFAULT 'sms'",
-            "ALTER TABLE support_tickets ADD COLUMN IF NOT EXISTS priority TEXT DEFAULT 'normal'",
-            "ALTER TABLE support_tickets ADD COLUMN IF NOT EXISTS assigned_to TEXT",
-            # Cancellation feedback collection
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_cancellation_feedback BOOLEAN DEFAULT FALSE",
-            # Canned responses for CS reps
-            """CREATE TABLE IF NOT EXISTS canned_responses (
-                id SERIAL PRIMARY KEY,
-                title TEXT NOT NULL,
-                message TEXT NOT NULL,
-                category TEXT DEFAULT 'general',
-                created_by TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )""",
-            # Broadcast system improvements
-            "ALTER TABLE scheduled_broadcasts ADD COLUMN IF NOT EXISTS target_phone TEXT",
-            "ALTER TABLE broadcast_logs ADD COLUMN IF NOT EXISTS source TEXT DEFAULT 'immediate'",
-            # Lifecycle nudges (roundtable Phase 4)
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS day_3_nudge_sent BOOLEAN DEFAULT FALSE",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS post_trial_reengagement_sent BOOLEAN DEFAULT FALSE",
-            # 30-day win-back (roundtable 2, Phase 3)
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS winback_30d_sent BOOLEAN DEFAULT FALSE",
-            # 14-day post-trial touchpoint (roundtable 3, Phase 3)
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS post_trial_14d_sent BOOLEAN DEFAULT FALSE",
-            # Backfill NULLs to FALSE — ALTER TABLE DEFAULT doesn't backfill existing rows
-            "UPDATE users SET trial_warning_7d_sent = FALSE WHERE trial_warning_7d_sent IS NULL",
-            "UPDATE users SET trial_warning_1d_sent = FALSE WHERE trial_warning_1d_sent IS NULL",
-            "UPDATE users SET trial_warning_0d_sent = FALSE WHERE trial_warning_0d_sent IS NULL",
-            "UPDATE users SET mid_trial_reminder_sent = FALSE WHERE mid_trial_reminder_sent IS NULL",
-            "UPDATE users SET day_3_nudge_sent = FALSE WHERE day_3_nudge_sent IS NULL",
-            "UPDATE users SET post_trial_reengagement_sent = FALSE WHERE post_trial_reengagement_sent IS NULL",
-            "UPDATE users SET post_trial_14d_sent = FALSE WHERE post_trial_14d_sent IS NULL",
-            "UPDATE users SET winback_30d_sent = FALSE WHERE winback_30d_sent IS NULL",
-            # Smart Nudges: proactive AI intelligence layer
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS smart_nudges_enabled BOOLEAN DEFAULT FALSE",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS smart_nudge_time TIME DEFAULT '09:00'",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS smart_nudge_last_sent DATE",
-            "ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_nudge_response TEXT",
-            # Smart nudges history table
-            """CREATE TABLE IF NOT EXISTS smart_nudges (
-                id SERIAL PRIMARY KEY,
-                phone_number TEXT NOT NULL,
-                nudge_type TEXT NOT NULL,
-                nudge_text TEXT NOT NULL,
-                ai_raw_response TEXT,
-                sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                user_response TEXT,
-                user_responded_at TIMESTAMP,
-                action_taken TEXT,
-                created_reminder_id INTEGER REFERENCES reminders(id),
-                metadata TEXT
-            )""",
-            # Twilio actual cost tracking (polled daily from Usage Records API)
-            """CREATE TABLE IF NOT EXISTS twilio_costs (
-                id SERIAL PRIMARY KEY,
-                cost_date DATE NOT NULL UNIQUE,
-                inbound_count INTEGER DEFAULT 0,
-                inbound_cost NUMERIC(10,4) DEFAULT 0,
-                outbound_count INTEGER DEFAULT 0,
-                outbound_cost NUMERIC(10,4) DEFAULT 0,
-                total_cost NUMERIC(10,4) DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )""",
-            # Admin reply to contact messages
-            "ALTER TABLE contact_messages ADD COLUMN IF NOT EXISTS admin_reply TEXT",
-        ]
 
-        # Create indexes on phone_hash columns for efficient lookups
-        index_migrations = [
-            "CREATE INDEX IF NOT EXISTS idx_users_phone_hash ON users(phone_hash)",
-            "CREATE INDEX IF NOT EXISTS idx_memories_phone_hash ON memories(phone_hash)",
-            "CREATE INDEX IF NOT EXISTS idx_reminders_phone_hash ON reminders(phone_hash)",
-            "CREATE INDEX IF NOT EXISTS idx_logs_phone_hash ON logs(phone_hash)",
-            "CREATE INDEX IF NOT EXISTS idx_lists_phone_hash ON lists(phone_hash)",
-            "CREATE INDEX IF NOT EXISTS idx_list_items_phone_hash ON list_items(phone_hash)",
-            # Celery: Index for efficient querying of due reminders
-            "CREATE INDEX IF NOT EXISTS idx_reminders_due ON reminders(reminder_date, sent, claimed_at) WHERE sent = FALSE",
-            # Index for conversation analysis lookups
-            "CREATE INDEX IF NOT EXISTS idx_logs_analyzed ON logs(analyzed) WHERE analyzed = FALSE",
-            "CREATE INDEX IF NOT EXISTS idx_conversation_analysis_reviewed ON conversation_analysis(reviewed) WHERE reviewed = FALSE",
-            # Recurring reminders indexes
-            "CREATE INDEX IF NOT EXISTS idx_recurring_reminders_phone ON recurring_reminders(phone_number)",
-            "CREATE INDEX IF NOT EXISTS idx_recurring_reminders_active ON recurring_reminders(active, next_occurrence) WHERE active = TRUE",
-            "CREATE INDEX IF NOT EXISTS idx_reminders_recurring_id ON reminders(recurring_id) WHERE recurring_id IS NOT NULL",
-            # Daily summary: index for efficient querying of users who need summary
-            "CREATE INDEX IF NOT EXISTS idx_users_daily_summary ON users(daily_summary_enabled) WHERE daily_summary_enabled = TRUE",
-            # Onboarding recovery: index for finding abandoned signups
-            "CREATE INDEX IF NOT EXISTS idx_onboarding_progress_abandoned ON onboarding_progress(followup_24h_sent, last_activity_at) WHERE cancelled = FALSE",
-            # Smart nudges: index for efficient querying of users who need nudge
-            "CREATE INDEX IF NOT EXISTS idx_users_smart_nudges ON users(smart_nudges_enabled) WHERE smart_nudges_enabled = TRUE",
-            "CREATE INDEX IF NOT EXISTS idx_smart_nudges_phone ON smart_nudges(phone_number, sent_at)",
-            # Twilio costs: index for date-range queries
-            "CREATE INDEX IF NOT EXISTS idx_twilio_costs_date ON twilio_costs(cost_date)",
+def _drop_deleted_account_rows(cursor, values_by_table):
+    """Filter out rows queued before their account was deleted.
+
+    Holds shared locks on the batch's phone numbers until commit, so a
+    concurrent record_account_deletion either sees these rows or is seen here.
+    """
+    phones = sorted({row[0] for values in values_by_table.values() for row in values if row[0]})
+    if not phones:
+        return values_by_table
+    cursor.execute(
+        'SELECT pg_advisory_xact_lock_shared(%s, hashtext(p)) FROM unnest(%s::text[]) AS p',
+        (_ACCOUNT_LOCK_CLASS, phones)
+    )
+    cursor.execute(
+        'SELECT phone_number, deleted_at FROM account_deletions WHERE phone_number = ANY(%s)',
+        (phones,)
+    )
+    deleted = dict(cursor.fetchall())
+    if not deleted:
+        return values_by_table
+    return {
+        table: [
+            row for row in values
+            if row[0] not in deleted or datetime.fromisoformat(row[-1]) > deleted[row[0]]
         ]
+        for table, values in values_by_table.items()
+    }
 
-        for migration in migrations:
-            try:
-                c.execute(migration)
-            except Exception as e:
-                err_msg = str(e).lower()
-                if 'already exists' in err_msg or 'duplicate' in err_msg:
-                    pass  # Expected — column/table already exists
-                else:
-                    logger.error(f"Unexpected migration error: {migration[:80]}... — {e}")
-
-        for index_migration in index_migrations:
-            try:
-                c.execute(index_migration)
-            except Exception as e:
-                err_msg = str(e).lower()
-                if 'already exists' in err_msg or 'duplicate' in err_msg:
-                    pass  # Expected — index already exists
-                else:
-                    logger.error(f"Unexpected index migration error: {index_migration[:80]}... — {e}")
 
+def _write_buffered_rows(rows_by_table):
+    """Write one batch from the buffer in a single transaction"""
+    values_by_table = {
+        table: _BUFFERED_WRITERS[table][0](rows) for table, rows in rows_by_table.items()
+    }
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        values_by_table = _drop_deleted_account_rows(c, values_by_table)
+        for table, values in values_by_table.items():
+            if values:
+                _BUFFERED_WRITERS[table][1](c, values)
         conn.commit()
+    finally:
         return_db_connection(conn)
-        logger.info("Database initialized successfully")
-    except Exception as e:
-        logger.error(f"Database initialization failed: {e}")
-        raise
+
+
+def _get_write_buffer():
+    """Get the process-wide write-behind buffer, creating it on first use"""
+    global _write_buffer
+    if _write_buffer is None:
+        from utils.write_buffer import create_write_buffer, RedisSpill
+        _write_buffer = create_write_buffer(
+            _write_buffered_rows,
+            max_rows=WRITE_BUFFER_MAX_ROWS,
+            batch_size=WRITE_BUFFER_BATCH_SIZE,
+            flush_interval_ms=WRITE_BUFFER_FLUSH_INTERVAL_MS,
+            spill=RedisSpill(UPSTASH_REDIS_URL, WRITE_BUFFER_SPILL_KEY),
+        )
+    return _write_buffer
+
+
+def _buffer_row(table, row):
+    """Queue an analytics row, stamped with the current UTC time"""
+    _get_write_buffer().add(table, row + (datetime.utcnow().isoformat(),))
+
+
+def flush_write_buffer():
+    """Synchronously write this process's queued analytics rows"""
+    if _write_buffer is not None:
+        _write_buffer.flush()
+
+
+def get_write_buffer_stats():
+    """Queue depth, throughput and backpressure counters for the write-behind buffer"""
+    if not WRITE_BUFFER_ENABLED:
+        return {'enabled': False}
+    return {'enabled': True, **_get_write_buffer().get_stats()}
+
 
 def log_interaction(phone_number, message_in, message_out, intent, success):
     """Log an interaction to the database with optional encryption"""
+    if WRITE_BUFFER_ENABLED:
+        try:
+            if ENCRYPTION_ENABLED:
+                from utils.encryption import hash_phone
+                # Only ciphertext and the phone hash are queued (and spilled to Redis)
+                row = (_seal(phone_number), hash_phone(phone_number), _seal(message_in), _seal(message_out),
+                       intent, success)
+            else:
+                row = (phone_number, message_in, message_out, intent, success)
+            _buffer_row('logs', row)
+        except Exception as e:
+            logger.error(f"Error logging interaction: {e}")
+        return
+
     conn = None
     try:
         conn = get_db_connection()
@@ -663,16 +651,14 @@ def log_interaction(phone_number, message_in, message_out, intent, success):
             phone_hash = hash_phone(phone_number)
             msg_in_encrypted = encrypt_field(message_in)
             msg_out_encrypted = encrypt_field(message_out)
-            c.execute(
-                '''INSERT INTO logs (phone_number, phone_hash, message_in, message_out,
-                   message_in_encrypted, message_out_encrypted, intent, success)
-                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s)''',
+            execute_prepared(
+                c, 'insert_log_encrypted',
                 (phone_number, phone_hash, message_in, message_out,
                  msg_in_encrypted, msg_out_encrypted, intent, success)
             )
         else:
-            c.execute(
-                'INSERT INTO logs (phone_number, message_in, message_out, intent, success) VALUES (%s, %s, %s, %s, %s)',
+            execute_prepared(
+                c, 'insert_log',
                 (phone_number, message_in, message_out, intent, success)
             )
         conn.commit()
@@ -683,16 +669,23 @@ def log_interaction(phone_number, message_in, message_out, intent, success):
             return_db_connection(conn)
 
 
-def log_api_usage(phone_number, request_type, prompt_tokens, completion_tokens, total_tokens, model):
-    """Log API token usage for cost tracking"""
+def log_api_usage(phone_number, request_type, prompt_tokens, completion_tokens, total_tokens, model, cached=False):
+    """Log API token usage for cost tracking (cached=True: served from the AI cache, tokens were saved)"""
+    if WRITE_BUFFER_ENABLED:
+        try:
+            _buffer_row('api_usage', (_seal(phone_number), request_type, prompt_tokens, completion_tokens, total_tokens, model, cached))
+        except Exception as e:
+            logger.error(f"Error logging API usage: {e}")
+        return
+
     conn = None
     try:
         conn = get_db_connection()
         c = conn.cursor()
         c.execute(
-            '''INSERT INTO api_usage (phone_number, request_type, prompt_tokens, completion_tokens, total_tokens, model)
-               VALUES (%s, %s, %s, %s, %s, %s)''',
-            (phone_number, request_type, prompt_tokens, completion_tokens, total_tokens, model)
+            '''INSERT INTO api_usage (phone_number, request_type, prompt_tokens, completion_tokens, total_tokens, model, cached)
+               VALUES (%s, %s, %s, %s, %s, %s, %s)''',
+            (phone_number, request_type, prompt_tokens, completion_tokens, total_tokens, model, cached)
         )
         conn.commit()
     except Exception as e:
@@ -751,6 +744,14 @@ def log_confidence(phone_number, action_type, confidence_score, threshold, confi
         confirmed: True if user confirmed, False if rejected, None if no confirmation needed
         user_message: The original user message (for debugging)
     """
+    if WRITE_BUFFER_ENABLED:
+        try:
+            _buffer_row('confidence_logs', (_seal(phone_number), action_type, confidence_score, threshold,
+                                            confirmed, _seal(user_message)))
+        except Exception as e:
+            logger.error(f"Error logging confidence: {e}")
+        return
+
     conn = None
     try:
         conn = get_db_connection()
@@ -769,63 +770,90 @@ def log_confidence(phone_number, action_type, confidence_score, threshold, confi
             return_db_connection(conn)
 
 
-def get_recent_logs(limit=100, offset=0, phone_filter=None, intent_filter=None, hide_reviewed=False, start_date=None, end_date=None):
-    """Get recent conversation logs for viewing"""
+# Review status shown per log: the latest conversation_analysis row's issue_type
+_LOG_REVIEWS_SQL = '''
+    SELECT DISTINCT ON (log_id) log_id, issue_type
+    FROM conversation_analysis
+    WHERE log_id IN (SELECT id FROM page)
+    ORDER BY log_id, id DESC
+'''
+
+
+def _fetch_recent_logs(c, limit, offset=0, phone_filter=None, intent_filter=None, hide_reviewed=False,
+                       start_date=None, end_date=None, before=None):
+    """
+    One page of logs, newest first. before=(created_at, id) continues after
+    that row (keyset pagination, flat cost at any depth); offset is only
+    applied without it. Review status and timezone are joined onto the page
+    rather than looked up per row.
+    """
+    where = []
+    params = []
+
+    if phone_filter:
+        where.append('l.phone_number LIKE %s')
+        params.append(f'%{phone_filter}%')
+
+    if intent_filter:
+        where.append('l.intent = %s')
+        params.append(intent_filter)
+
+    if hide_reviewed:
+        where.append('NOT EXISTS(SELECT 1 FROM conversation_analysis ca WHERE ca.log_id = l.id)')
+
+    if start_date:
+        where.append('l.created_at >= %s')
+        params.append(start_date)
+    if end_date:
+        where.append('l.created_at < %s')
+        params.append(end_date)
+
+    if before:
+        where.append('(l.created_at, l.id) < (%s, %s)')
+        params.extend(before)
+        offset = 0
+
+    c.execute(f'''
+        WITH page AS (
+            SELECT l.id, l.phone_number, l.message_in, l.message_out, l.intent, l.success, l.created_at, l.analyzed
+            FROM logs l
+            WHERE {' AND '.join(where) or 'TRUE'}
+            ORDER BY l.created_at DESC, l.id DESC
+            LIMIT %s OFFSET %s
+        ),
+        reviews AS ({_LOG_REVIEWS_SQL})
+        SELECT page.*, r.issue_type, COALESCE(u.timezone, 'America/New_York')
+        FROM page
+        LEFT JOIN reviews r ON r.log_id = page.id
+        LEFT JOIN users u ON u.phone_number = page.phone_number
+        ORDER BY page.created_at DESC, page.id DESC
+    ''', params + [limit, offset])
+    return [
+        {
+            'id': row[0],
+            'phone_number': row[1],
+            'message_in': row[2],
+            'message_out': row[3],
+            'intent': row[4],
+            'success': row[5],
+            'created_at': row[6].isoformat() if row[6] else None,
+            'analyzed': row[7] if row[7] is not None else False,
+            'review_status': row[8],
+            'timezone': row[9]
+        }
+        for row in c.fetchall()
+    ]
+
+
+def get_recent_logs(limit=100, offset=0, phone_filter=None, intent_filter=None, hide_reviewed=False, start_date=None, end_date=None, before=None):
+    """Get recent conversation logs for viewing (before=(created_at, id) of the last row seen for the next page)"""
     conn = None
     try:
         conn = get_db_connection()
-        c = conn.cursor()
-
-        # Build query dynamically based on filters
-        # Include subquery to check review status and join with users for timezone
-        query = '''
-            SELECT l.id, l.phone_number, l.message_in, l.message_out, l.intent, l.success, l.created_at, l.analyzed,
-                   (SELECT ca.issue_type FROM conversation_analysis ca WHERE ca.log_id = l.id LIMIT 1) as review_status,
-                   COALESCE(u.timezone, 'America/New_York') as user_timezone
-            FROM logs l
-            LEFT JOIN users u ON l.phone_number = u.phone_number
-            WHERE 1=1
-        '''
-        params = []
-
-        if phone_filter:
-            query += ' AND l.phone_number LIKE %s'
-            params.append(f'%{phone_filter}%')
-
-        if intent_filter:
-            query += ' AND l.intent = %s'
-            params.append(intent_filter)
-
-        if hide_reviewed:
-            query += ' AND NOT EXISTS(SELECT 1 FROM conversation_analysis ca WHERE ca.log_id = l.id)'
-
-        if start_date:
-            query += ' AND l.created_at >= %s'
-            params.append(start_date)
-        if end_date:
-            query += ' AND l.created_at < %s'
-            params.append(end_date)
-
-        query += ' ORDER BY l.created_at DESC LIMIT %s OFFSET %s'
-        params.extend([limit, offset])
-
-        c.execute(query, params)
-        rows = c.fetchall()
-        return [
-            {
-                'id': row[0],
-                'phone_number': row[1],
-                'message_in': row[2],
-                'message_out': row[3],
-                'intent': row[4],
-                'success': row[5],
-                'created_at': row[6].isoformat() if row[6] else None,
-                'analyzed': row[7] if len(row) > 7 else False,
-                'review_status': row[8] if len(row) > 8 else None,
-                'timezone': row[9] if len(row) > 9 else 'America/New_York'
-            }
-            for row in rows
-        ]
+        return _fetch_recent_logs(
+            conn.cursor(), limit, offset, phone_filter=phone_filter, intent_filter=intent_filter,
+            hide_reviewed=hide_reviewed, start_date=start_date, end_date=end_date, before=before
+        )
     except Exception as e:
         logger.error(f"Error getting recent logs: {e}")
         return []
@@ -834,6 +862,27 @@ def get_recent_logs(limit=100, offset=0, phone_filter=None, intent_filter=None,
             return_db_connection(conn)
 
 
+def iter_recent_logs(batch_size=1000, **filters):
+    """
+    Yield every log matching get_recent_logs' filters, newest first, in
+    keyset-paginated batches. Each batch borrows a pool connection only
+    while it is fetched, so a slow export consumer never holds one.
+    """
+    before = None
+    while True:
+        conn = None
+        try:
+            conn = get_db_connection()
+            rows = _fetch_recent_logs(conn.cursor(), batch_size, before=before, **filters)
+        finally:
+            if conn:
+                return_db_connection(conn)
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        before = (datetime.fromisoformat(rows[-1]['created_at']), rows[-1]['id'])
+
+
 def get_unanalyzed_logs(limit=50):
     """Get logs that haven't been analyzed yet"""
     conn = None
@@ -26,7 +26,7 @@ from database import init_db, log_interaction, get_setting, log_confidence
 from models.user import get_user, is_user_onboarded, create_or_update_user, get_user_timezone, get_last_active_list, get_pending_list_item, get_pending_reminder_delete, get_pending_memory_delete, get_pending_reminder_date, get_pending_list_create, mark_user_opted_out, get_user_first_name, get_pending_reminder_confirmation, is_user_opted_out, cancel_engagement_nudge, increment_post_onboarding_interactions, get_pending_nudge_response
 from models.memory import save_memory, get_memories, search_memories, delete_memory
 from models.reminder import (
-    save_reminder, get_user_reminders, search_pending_reminders, delete_reminder,
+    save_reminder, get_user_reminders, get_reminder_window, search_pending_reminders, delete_reminder,
     get_last_sent_reminder, mark_reminder_snoozed, save_recurring_reminder,
     get_recurring_reminders, delete_recurring_reminder, pause_recurring_reminder,
     resume_recurring_reminder, save_reminder_with_local_time, update_reminder_time,
@@ -34,10 +34,10 @@ from models.reminder import (
 )
 from models.list_model import (
     create_list, get_lists, get_list_by_name, get_list_items,
-    add_list_item, mark_item_complete, mark_item_incomplete,
+    add_list_items, mark_item_complete, mark_item_incomplete,
     delete_list_item, delete_list, rename_list, clear_list,
-    find_item_in_any_list, get_list_count, get_item_count,
-    get_next_available_list_name
+    find_item_in_any_list, get_list_count,
+    get_next_available_list_name, LIST_NAME_TAKEN
 )
 from services.sms_service import send_sms
 from services.ai_service import process_with_ai, parse_list_items
@@ -53,9 +53,9 @@ from services.trial_messaging_service import (
 # NOTE: Reminder checking is now handled by Celery Beat (see tasks/reminder_tasks.py)
 from services.metrics_service import track_user_activity, increment_message_count, set_referral_source
 from utils.timezone import get_user_current_time
-from utils.formatting import get_help_text, format_reminders_list, format_reminder_confirmation
+from utils.formatting import get_help_text, format_reminders_list, format_reminder_confirmation, format_list_items_added, format_list_add_failed
 from utils.validation import mask_phone_number, validate_list_name, validate_item_text, validate_message, log_security_event, detect_sensitive_data, get_sensitive_data_warning, sanitize_text
-from admin_dashboard import router as dashboard_router, start_broadcast_checker
+from admin_dashboard import router as dashboard_router
 from cs_portal import router as cs_router
 from monitoring_dashboard import router as monitoring_router
 
@@ -369,9 +369,7 @@ init_db()
 
 # NOTE: Background reminder checking is now handled by Celery Beat
 # See celery_config.py for the schedule and tasks/reminder_tasks.py for the task
-
-# Start scheduled broadcast checker
-start_broadcast_checker()
+# Scheduled broadcasts are started by Celery Beat too (tasks/broadcast_tasks.py)
 
 logger.info(f"✅ Application initialized in {ENVIRONMENT} mode")
 
@@ -519,9 +517,11 @@ async def sms_reply(request: Request, Body: str = Form(...), From: str = Form(..
                     logger.warning(f"Stripe cancellation issue for {mask_phone_number(phone_number)}: {cancel_result['error']}")
 
                 # Delete all user data (order matters for foreign key constraints)
-                from database import get_db_connection, return_db_connection
+                from database import get_db_connection, return_db_connection, record_account_deletion
                 conn = get_db_connection()
                 c = conn.cursor()
+                # Tombstone first so queued analytics rows (any process, Redis spill) never land after the delete
+                record_account_deletion(c, phone_number)
 
                 # Clean up monitoring agent FK chain (these tables reference logs via monitoring_issues)
                 # Use savepoints since monitoring tables may not exist in all environments
@@ -691,9 +691,10 @@ async def sms_reply(request: Request, Body: str = Form(...), From: str = Form(..
             if is_developer:
                 logger.info("Developer full reset - deleting all user data")
                 try:
-                    from database import get_db_connection, return_db_connection
+                    from database import get_db_connection, return_db_connection, record_account_deletion
                     conn = get_db_connection()
                     c = conn.cursor()
+                    record_account_deletion(c, phone_number)
 
                     # Delete all user data to simulate brand new user
                     c.execute("DELETE FROM reminders WHERE phone_number = %s", (phone_number,))
@@ -2047,45 +2048,40 @@ async def sms_reply(request: Request, Body: str = Form(...), From: str = Form(..
                     )
                     tier_limits = get_tier_limits(get_user_tier(phone_number))
                     max_items = tier_limits['max_items_per_list']
-                    item_count = get_item_count(list_id)
-                    available_slots = max_items - item_count
 
-                    if available_slots <= 0:
-                        resp = MessagingResponse()
-                        # Use Level 4 formatter for clear WHY-WHAT-HOW message
+                    # Add items up to the limit (capacity is checked in the same statement)
+                    result = add_list_items(list_id, phone_number, items_to_add, max_items)
+                    added_items = result['added']
+
+                    resp = MessagingResponse()
+                    if result['skipped'] and not added_items:
+                        # List is full - use Level 4 formatter for clear WHY-WHAT-HOW message
                         reply_msg = format_list_item_limit_message(
-                            phone_number, list_name, items_to_add, 0
+                            phone_number, list_name, result['skipped'], 0
                         )
                         resp.message(reply_msg)
                         create_or_update_user(phone_number, pending_list_item=None)
                         return Response(content=str(resp), media_type="application/xml")
 
-                    # Add items up to the limit
-                    added_items = []
-                    for item in items_to_add:
-                        if len(added_items) < available_slots:
-                            add_list_item(list_id, phone_number, item)
-                            added_items.append(item)
-
                     # Clear pending item and track last active list
                     create_or_update_user(phone_number, pending_list_item=None, last_active_list=list_name)
 
-                    resp = MessagingResponse()
                     # Handle partial or full adds with progressive education
-                    if len(added_items) < len(items_to_add):
+                    if result['error']:
+                        reply_msg = format_list_add_failed(list_name)
+                    elif result['skipped']:
                         # Some items skipped - use Level 4 formatter
                         reply_msg = format_list_item_limit_message(
-                            phone_number, list_name, items_to_add, len(added_items)
+                            phone_number, list_name, added_items + result['skipped'], len(added_items)
                         )
                     else:
                         # All items added successfully
-                        if len(added_items) == 1:
-                            base_reply = f"Added {added_items[0]} to your {list_name}"
-                        else:
-                            base_reply = f"Added {len(added_items)} items to your {list_name}: {', '.join(added_items)}"
+                        base_reply = format_list_items_added(list_name, added_items, result['duplicates'])
 
                         # Add progressive counter
-                        reply_msg = add_list_item_counter_to_message(phone_number, list_id, base_reply)
+                        reply_msg = add_list_item_counter_to_message(
+                            phone_number, list_id, base_reply, result['item_count']
+                        )
 
                     resp.message(reply_msg)
                     log_interaction(phone_number, incoming_msg, f"Added {len(added_items)} items to {list_name}", "add_to_list", True)
@@ -2161,8 +2157,7 @@ async def sms_reply(request: Request, Body: str = Form(...), From: str = Form(..
         # ==========================================
         # Handle "Delete reminders", "Cancel reminders", etc. - shows numbered list
         if msg_upper in ["DELETE REMINDERS", "DELETE MY REMINDERS", "CANCEL REMINDERS", "CANCEL MY REMINDERS", "REMOVE REMINDERS", "REMOVE MY REMINDERS"]:
-            reminders = get_user_reminders(phone_number)
-            pending = [r for r in reminders if not r[4]]  # r[4] is 'sent' flag
+            pending = get_reminder_window(phone_number)['pending']
 
             if not pending:
                 resp = MessagingResponse()
@@ -2293,8 +2288,7 @@ async def sms_reply(request: Request, Body: str = Form(...), From: str = Form(..
         if delete_reminder_match:
             reminder_num = int(delete_reminder_match.group(1))
             # Get user's reminders (pending only)
-            reminders = get_user_reminders(phone_number)
-            pending = [r for r in reminders if not r[4]]  # r[4] is 'sent' flag
+            pending = get_reminder_window(phone_number)['pending']
 
             if not pending:
                 resp = MessagingResponse()
@@ -2366,8 +2360,7 @@ async def sms_reply(request: Request, Body: str = Form(...), From: str = Form(..
             # Check if user was viewing reminders
             if last_active == "__REMINDERS__":
                 # Delete from reminders list - ask for confirmation first
-                reminders = get_user_reminders(phone_number)
-                pending_reminders = [r for r in reminders if not r[4]]  # unsent only
+                pending_reminders = get_reminder_window(phone_number)['pending']
                 if pending_reminders and 1 <= item_num <= len(pending_reminders):
                     r = pending_reminders[item_num - 1]
                     confirm_data = json.dumps({
@@ -2473,8 +2466,7 @@ async def sms_reply(request: Request, Body: str = Form(...), From: str = Form(..
             # No active list context - show options from all types
             # Check for reminder at this position
             # Tuple format: (id, reminder_date, reminder_text, recurring_id, sent)
-            reminders = get_user_reminders(phone_number)
-            pending_reminders = [r for r in reminders if not r[4]]  # unsent only
+            pending_reminders = get_reminder_window(phone_number)['pending']
             if pending_reminders and 1 <= item_num <= len(pending_reminders):
                 reminder = pending_reminders[item_num - 1]
                 recurring_id = reminder[3]
@@ -3339,9 +3331,8 @@ async def sms_reply(request: Request, Body: str = Form(...), From: str = Form(..
         # SHOW COMPLETED REMINDERS
         # ==========================================
         if msg_upper in ["SHOW COMPLETED REMINDERS", "SHOW COMPLETED", "COMPLETED REMINDERS", "PAST REMINDERS", "SHOW PAST REMINDERS"]:
-            reminders = get_user_reminders(phone_number)
-            # Filter to only sent/completed reminders
-            completed = [r for r in reminders if r[4]]  # r[4] is sent flag
+            # Only the last 10 completed reminders are shown
+            completed = get_reminder_window(phone_number, sent_limit=10)['sent']
 
             if not completed:
                 resp = MessagingResponse()
@@ -4186,7 +4177,9 @@ def process_single_action(ai_response, phone_number, incoming_msg):
             log_interaction(phone_number, incoming_msg, reply_text, "retrieve", True)
 
         elif ai_response["action"] == "list_reminders":
-            reminders = get_user_reminders(phone_number)
+            # All pending, plus one sent reminder so the list can hint at completed ones
+            reminder_window = get_reminder_window(phone_number, sent_limit=1)
+            reminders = reminder_window['pending'] + reminder_window['sent']
             user_tz = get_user_timezone(phone_number)
             reply_text = format_reminders_list(reminders, user_tz)
             # Set context so "Delete #" knows we're viewing reminders
@@ -4948,75 +4941,66 @@ def process_single_action(ai_response, phone_number, incoming_msg):
                         # Add all parsed items (check tier item limit)
                         tier_limits = get_tier_limits(get_user_tier(phone_number))
                         max_items = tier_limits['max_items_per_list']
-                        added_items = []
-                        for item in items_to_add:
-                            if len(added_items) < max_items:
-                                add_list_item(list_id, phone_number, item)
-                                added_items.append(item)
+                        result = add_list_items(list_id, phone_number, items_to_add, max_items)
+                        added_items = result['added']
                         # Track last active list
                         create_or_update_user(phone_number, last_active_list=list_name)
 
                         # Handle partial or full adds with progressive education
-                        if len(added_items) < len(items_to_add):
+                        if result['error']:
+                            reply_text = format_list_add_failed(list_name)
+                        elif result['skipped']:
                             # Some items skipped - use Level 4 formatter
                             reply_text = format_list_item_limit_message(
-                                phone_number, list_name, items_to_add, len(added_items)
+                                phone_number, list_name, added_items + result['skipped'], len(added_items)
                             )
                         else:
                             # All items added successfully
-                            if len(added_items) == 1:
-                                base_reply = f"Created your {list_name} and added {added_items[0]}!"
-                            else:
-                                base_reply = f"Created your {list_name} and added {len(added_items)} items: {', '.join(added_items)}"
+                            base_reply = format_list_items_added(
+                                list_name, added_items, result['duplicates'], created=True
+                            )
 
                             # Add list counter (for list creation) and item counter
                             reply_text = add_list_counter_to_message(phone_number, base_reply)
-                            reply_text = add_list_item_counter_to_message(phone_number, list_id, reply_text)
+                            reply_text = add_list_item_counter_to_message(
+                                phone_number, list_id, reply_text, result['item_count']
+                            )
                 else:
                     list_id = list_info[0]
                     list_name = list_info[1]  # Use actual list name from DB
                     # Check tier limit for items per list
                     from services.tier_service import (
-                        can_add_list_item, get_tier_limits, get_user_tier,
+                        get_tier_limits, get_user_tier,
                         format_list_item_limit_message, add_list_item_counter_to_message
                     )
-                    allowed, limit_msg = can_add_list_item(phone_number, list_id)
-                    if not allowed:
-                        # List is full - use Level 4 formatter
-                        reply_text = format_list_item_limit_message(
-                            phone_number, list_name, items_to_add, 0
-                        )
-                    else:
-                        tier_limits = get_tier_limits(get_user_tier(phone_number))
-                        max_items = tier_limits['max_items_per_list']
-                        item_count = get_item_count(list_id)
-                        available_slots = max_items - item_count
+                    tier_limits = get_tier_limits(get_user_tier(phone_number))
+                    max_items = tier_limits['max_items_per_list']
 
-                        # Add items up to the limit
-                        added_items = []
-                        for item in items_to_add:
-                            if len(added_items) < available_slots:
-                                add_list_item(list_id, phone_number, item)
-                                added_items.append(item)
+                    # Add items up to the limit; a full list comes back with every item skipped
+                    result = add_list_items(list_id, phone_number, items_to_add, max_items)
+                    added_items = result['added']
 
-                        # Track last active list
+                    # Track last active list
+                    if added_items or not result['skipped']:
                         create_or_update_user(phone_number, last_active_list=list_name)
 
-                        # Handle partial or full adds with progressive education
-                        if len(added_items) < len(items_to_add):
-                            # Some items skipped - use Level 4 formatter
-                            reply_text = format_list_item_limit_message(
-                                phone_number, list_name, items_to_add, len(added_items)
-                            )
-                        else:
-                            # All items added successfully
-                            if len(added_items) == 1:
-                                base_reply = ai_response.get("confirmation", f"Added {added_items[0]} to your {list_name}")
-                            else:
-                                base_reply = f"Added {len(added_items)} items to your {list_name}: {', '.join(added_items)}"
+                    # Handle partial or full adds with progressive education
+                    if result['error']:
+                        reply_text = format_list_add_failed(list_name)
+                    elif result['skipped']:
+                        # Some items skipped - use Level 4 formatter
+                        reply_text = format_list_item_limit_message(
+                            phone_number, list_name, added_items + result['skipped'], len(added_items)
+                        )
+                    else:
+                        base_reply = format_list_items_added(
+                            list_name, added_items, result['duplicates'], confirmation=ai_response.get("confirmation")
+                        )
 
-                            # Add progressive counter
-                            reply_text = add_list_item_counter_to_message(phone_number, list_id, base_reply)
+                        # Add progressive counter
+                        reply_text = add_list_item_counter_to_message(
+                            phone_number, list_id, base_reply, result['item_count']
+                        )
 
                 log_interaction(phone_number, incoming_msg, reply_text, "add_to_list", True)
 
@@ -5033,46 +5017,37 @@ def process_single_action(ai_response, phone_number, incoming_msg):
 
                 # Check tier limit for items per list
                 from services.tier_service import (
-                    can_add_list_item, get_tier_limits, get_user_tier,
+                    get_tier_limits, get_user_tier,
                     format_list_item_limit_message, add_list_item_counter_to_message
                 )
-                allowed, limit_msg = can_add_list_item(phone_number, list_id)
-                if not allowed:
-                    # List is full - use Level 4 formatter
-                    reply_text = format_list_item_limit_message(
-                        phone_number, list_name, items_to_add, 0
-                    )
-                else:
-                    tier_limits = get_tier_limits(get_user_tier(phone_number))
-                    max_items = tier_limits['max_items_per_list']
-                    item_count = get_item_count(list_id)
-                    available_slots = max_items - item_count
+                tier_limits = get_tier_limits(get_user_tier(phone_number))
+                max_items = tier_limits['max_items_per_list']
 
-                    # Add items up to the limit
-                    added_items = []
-                    for item in items_to_add:
-                        if len(added_items) < available_slots:
-                            add_list_item(list_id, phone_number, item)
-                            added_items.append(item)
+                # Add items up to the limit; a full list comes back with every item skipped
+                result = add_list_items(list_id, phone_number, items_to_add, max_items)
+                added_items = result['added']
 
-                    # Track last active list
+                # Track last active list
+                if added_items or not result['skipped']:
                     create_or_update_user(phone_number, last_active_list=list_name)
 
-                    # Handle partial or full adds with progressive education
-                    if len(added_items) < len(items_to_add):
-                        # Some items skipped - use Level 4 formatter
-                        reply_text = format_list_item_limit_message(
-                            phone_number, list_name, items_to_add, len(added_items)
-                        )
-                    else:
-                        # All items added successfully
-                        if len(added_items) == 1:
-                            base_reply = f"Added {added_items[0]} to your {list_name}"
-                        else:
-                            base_reply = f"Added {len(added_items)} items to your {list_name}: {', '.join(added_items)}"
+                # Handle partial or full adds with progressive education
+                if result['error']:
+                    reply_text = format_list_add_failed(list_name)
+                elif result['skipped']:
+                    # Some items skipped - use Level 4 formatter
+                    reply_text = format_list_item_limit_message(
+                        phone_number, list_name, added_items + result['skipped'], len(added_items)
+                    )
+                else:
+                    base_reply = format_list_items_added(
+                        list_name, added_items, result['duplicates']
+                    )
 
-                        # Add progressive counter
-                        reply_text = add_list_item_counter_to_message(phone_number, list_id, base_reply)
+                    # Add progressive counter
+                    reply_text = add_list_item_counter_to_message(
+                        phone_number, list_id, base_reply, result['item_count']
+                    )
 
             elif len(lists) > 1:
                 # Multiple lists, ask which one (store original text for parsing later)
@@ -5319,8 +5294,9 @@ def process_single_action(ai_response, phone_number, incoming_msg):
 
         elif ai_response["action"] == "clear_list":
             list_name = ai_response.get("list_name")
-            if clear_list(phone_number, list_name):
-                reply_text = ai_response.get("confirmation", f"Cleared all items from your {list_name}")
+            cleared = clear_list(phone_number, list_name)
+            if cleared:
+                reply_text = ai_response.get("confirmation", f"Cleared all items from your {cleared[0]}")
             else:
                 reply_text = f"I couldn't find a list called '{list_name}'."
             log_interaction(phone_number, incoming_msg, reply_text, "clear_list", True)
@@ -5329,8 +5305,12 @@ def process_single_action(ai_response, phone_number, incoming_msg):
             old_name = ai_response.get("old_name")
             new_name = ai_response.get("new_name")
             if get_list_by_name(phone_number, new_name):
+                renamed = LIST_NAME_TAKEN
+            else:
+                renamed = rename_list(phone_number, old_name, new_name)
+            if renamed is LIST_NAME_TAKEN:
                 reply_text = f"You already have a list called '{new_name}'."
-            elif rename_list(phone_number, old_name, new_name):
+            elif renamed:
                 reply_text = ai_response.get("confirmation", f"Renamed {old_name} to {new_name}")
             else:
                 reply_text = f"I couldn't find a list called '{old_name}'."
@@ -5341,8 +5321,8 @@ def process_single_action(ai_response, phone_number, incoming_msg):
             user_tz = get_user_timezone(phone_number)
             tz = pytz.timezone(user_tz)
 
-            # Search for matching pending reminders
-            matching_reminders = search_pending_reminders(phone_number, search_term)
+            # Search for matching pending reminders (every term must match)
+            matching_reminders = search_pending_reminders(phone_number, search_term, strict=True)
 
             if len(matching_reminders) == 0:
                 # Fallback: check if keyword matches a stored memory
@@ -5462,8 +5442,8 @@ def process_single_action(ai_response, phone_number, incoming_msg):
             user_tz_str = get_user_timezone(phone_number)
             tz = pytz.timezone(user_tz_str)
 
-            # Search for matching pending reminders
-            matching_reminders = search_pending_reminders(phone_number, search_term)
+            # Search for matching pending reminders (every term must match)
+            matching_reminders = search_pending_reminders(phone_number, search_term, strict=True)
 
             if len(matching_reminders) == 0:
                 reply_text = f"No pending reminders found matching '{search_term}'. Text MY REMINDERS to see your list."
@@ -6118,8 +6098,13 @@ async def view_reminders(phone_number: str, admin: str = Depends(verify_admin)):
 @app.get("/admin/stats")
 async def admin_stats(admin: str = Depends(verify_admin)):
     """Admin dashboard showing key metrics"""
-    from database import get_db_connection
-    conn = get_db_connection()
+    from database import get_db_connection, return_db_connection, get_write_buffer_stats, get_read_replica_stats
+    from services.openai_client import get_openai_call_stats
+    from utils.ai_cache import get_ai_cache_stats
+    from utils.response_cache import get_response_cache_stats
+    from services.customer_search_service import get_search_cache_stats
+    from services.customer_view_service import get_view_cache_stats
+    conn = get_db_connection(readonly=True)
     c = conn.cursor()
 
     # Total users
@@ -6160,7 +6145,7 @@ async def admin_stats(admin: str = Depends(verify_admin)):
     ''')
     activity_24h = c.fetchone()[0]
 
-    conn.close()
+    return_db_connection(conn)
 
     return {
         "overview": {
@@ -6181,6 +6166,13 @@ async def admin_stats(admin: str = Depends(verify_admin)):
         "activity": {
             "last_24_hours": activity_24h
         },
+        "write_buffer": get_write_buffer_stats(),
+        "read_replica": get_read_replica_stats(),
+        "openai": get_openai_call_stats(),
+        "ai_cache": get_ai_cache_stats(),
+        "admin_cache": get_response_cache_stats(),
+        "cs_search_cache": get_search_cache_stats(),
+        "cs_customer_view_cache": get_view_cache_stats(),
         "environment": ENVIRONMENT
     }
 
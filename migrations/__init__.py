@@ -0,0 +1,8 @@
+"""
+Schema Migrations
+Versioned, recorded schema changes for the main and monitoring databases.
+"""
+
+from migrations.runner import ConcurrentIndex, Migration, get_applied_versions, get_skipped_steps, run_migrations
+from migrations.app import APP_MIGRATIONS
+from migrations.monitoring import MONITORING_MIGRATIONS
@@ -0,0 +1,842 @@
+"""
+Application Schema Migrations
+Versioned schema for the main database (applied by database.init_db).
+
+Add new schema changes as a new Migration at the end of APP_MIGRATIONS with
+the next version number. Never edit a migration that has shipped.
+"""
+
+from migrations.runner import ConcurrentIndex, Migration
+
+# Everything init_db used to run on every start, as of the switch to versioned
+# migrations. All statements are idempotent, so existing databases just record it.
+_BASELINE_TABLES = (
+    # Memories table
+    '''
+    CREATE TABLE IF NOT EXISTS memories (
+        id SERIAL PRIMARY KEY,
+        phone_number TEXT NOT NULL,
+        memory_text TEXT NOT NULL,
+        parsed_data TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # Reminders table
+    '''
+    CREATE TABLE IF NOT EXISTS reminders (
+        id SERIAL PRIMARY KEY,
+        phone_number TEXT NOT NULL,
+        reminder_text TEXT NOT NULL,
+        reminder_date TIMESTAMP NOT NULL,
+        sent BOOLEAN DEFAULT FALSE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        delivery_status TEXT DEFAULT 'pending',
+        sent_at TIMESTAMP,
+        error_message TEXT
+    )
+    ''',
+    # Users table with onboarding info
+    '''
+    CREATE TABLE IF NOT EXISTS users (
+        phone_number TEXT PRIMARY KEY,
+        first_name TEXT,
+        last_name TEXT,
+        email TEXT,
+        zip_code TEXT,
+        timezone TEXT,
+        onboarding_complete BOOLEAN DEFAULT FALSE,
+        onboarding_step INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        pending_delete BOOLEAN DEFAULT FALSE,
+        pending_reminder_text TEXT,
+        pending_reminder_time TEXT,
+        referral_source TEXT,
+        premium_status TEXT DEFAULT 'free',
+        premium_since TIMESTAMP,
+        last_active_at TIMESTAMP,
+        signup_source TEXT,
+        total_messages INTEGER DEFAULT 0
+    )
+    ''',
+    # Onboarding progress tracking for abandoned signup recovery
+    '''
+    CREATE TABLE IF NOT EXISTS onboarding_progress (
+        id SERIAL PRIMARY KEY,
+        phone_number TEXT NOT NULL UNIQUE,
+        current_step INTEGER DEFAULT 1,
+        first_name TEXT,
+        last_name TEXT,
+        email TEXT,
+        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_activity_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        followup_24h_sent BOOLEAN DEFAULT FALSE,
+        followup_7d_sent BOOLEAN DEFAULT FALSE,
+        cancelled BOOLEAN DEFAULT FALSE
+    )
+    ''',
+    # Logs table for monitoring
+    '''
+    CREATE TABLE IF NOT EXISTS logs (
+        id SERIAL PRIMARY KEY,
+        phone_number TEXT NOT NULL,
+        message_in TEXT NOT NULL,
+        message_out TEXT NOT NULL,
+        intent TEXT,
+        success BOOLEAN,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # Lists table
+    '''
+    CREATE TABLE IF NOT EXISTS lists (
+        id SERIAL PRIMARY KEY,
+        phone_number TEXT NOT NULL,
+        list_name TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(phone_number, list_name)
+    )
+    ''',
+    # List items table
+    '''
+    CREATE TABLE IF NOT EXISTS list_items (
+        id SERIAL PRIMARY KEY,
+        list_id INTEGER NOT NULL REFERENCES lists(id) ON DELETE CASCADE,
+        phone_number TEXT NOT NULL,
+        item_text TEXT NOT NULL,
+        completed BOOLEAN DEFAULT FALSE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # Broadcast logs table
+    '''
+    CREATE TABLE IF NOT EXISTS broadcast_logs (
+        id SERIAL PRIMARY KEY,
+        sender TEXT NOT NULL,
+        message TEXT NOT NULL,
+        audience TEXT NOT NULL,
+        recipient_count INTEGER DEFAULT 0,
+        success_count INTEGER DEFAULT 0,
+        fail_count INTEGER DEFAULT 0,
+        status TEXT DEFAULT 'pending',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        completed_at TIMESTAMP,
+        source TEXT DEFAULT 'immediate'
+    )
+    ''',
+    # Scheduled broadcasts table
+    '''
+    CREATE TABLE IF NOT EXISTS scheduled_broadcasts (
+        id SERIAL PRIMARY KEY,
+        sender TEXT NOT NULL,
+        message TEXT NOT NULL,
+        audience TEXT NOT NULL,
+        scheduled_date TIMESTAMP NOT NULL,
+        status TEXT DEFAULT 'scheduled',
+        recipient_count INTEGER DEFAULT 0,
+        success_count INTEGER DEFAULT 0,
+        fail_count INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        sent_at TIMESTAMP,
+        target_phone TEXT
+    )
+    ''',
+    # User feedback table
+    '''
+    CREATE TABLE IF NOT EXISTS feedback (
+        id SERIAL PRIMARY KEY,
+        user_phone TEXT NOT NULL,
+        message TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        resolved BOOLEAN DEFAULT FALSE
+    )
+    ''',
+    # Conversation analysis table for AI-flagged issues
+    '''
+    CREATE TABLE IF NOT EXISTS conversation_analysis (
+        id SERIAL PRIMARY KEY,
+        log_id INTEGER REFERENCES logs(id),
+        phone_number TEXT NOT NULL,
+        issue_type TEXT NOT NULL,
+        severity TEXT DEFAULT 'low',
+        ai_explanation TEXT,
+        reviewed BOOLEAN DEFAULT FALSE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # API usage tracking table for cost analytics
+    '''
+    CREATE TABLE IF NOT EXISTS api_usage (
+        id SERIAL PRIMARY KEY,
+        phone_number TEXT NOT NULL,
+        request_type TEXT NOT NULL,
+        prompt_tokens INTEGER DEFAULT 0,
+        completion_tokens INTEGER DEFAULT 0,
+        total_tokens INTEGER DEFAULT 0,
+        model TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # Public changelog for updates, fixes, and features
+    '''
+    CREATE TABLE IF NOT EXISTS changelog (
+        id SERIAL PRIMARY KEY,
+        title TEXT NOT NULL,
+        description TEXT,
+        entry_type TEXT NOT NULL DEFAULT 'improvement',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        published BOOLEAN DEFAULT TRUE
+    )
+    ''',
+    # Support tickets for premium users
+    '''
+    CREATE TABLE IF NOT EXISTS support_tickets (
+        id SERIAL PRIMARY KEY,
+        phone_number TEXT NOT NULL,
+        status TEXT DEFAULT 'open',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # Support messages (thread of messages for each ticket)
+    '''
+    CREATE TABLE IF NOT EXISTS support_messages (
+        id SERIAL PRIMARY KEY,
+        ticket_id INTEGER REFERENCES support_tickets(id) ON DELETE CASCADE,
+        phone_number TEXT NOT NULL,
+        message TEXT NOT NULL,
+        direction TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # Lightweight contact messages (feedback, bug reports, questions) - not full tickets
+    '''
+    CREATE TABLE IF NOT EXISTS contact_messages (
+        id SERIAL PRIMARY KEY,
+        phone_number TEXT NOT NULL,
+        message TEXT NOT NULL,
+        category TEXT NOT NULL,
+        source TEXT NOT NULL DEFAULT 'sms',
+        resolved BOOLEAN DEFAULT FALSE,
+        admin_reply TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # Customer service notes
+    '''
+    CREATE TABLE IF NOT EXISTS customer_notes (
+        id SERIAL PRIMARY KEY,
+        phone_number TEXT NOT NULL,
+        note TEXT NOT NULL,
+        created_by TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # Confidence score logging for AI calibration tracking
+    '''
+    CREATE TABLE IF NOT EXISTS confidence_logs (
+        id SERIAL PRIMARY KEY,
+        phone_number TEXT,
+        action_type TEXT NOT NULL,
+        confidence_score INTEGER NOT NULL,
+        threshold INTEGER NOT NULL,
+        confirmed BOOLEAN,
+        user_message TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # Recurring reminders table
+    '''
+    CREATE TABLE IF NOT EXISTS recurring_reminders (
+        id SERIAL PRIMARY KEY,
+        phone_number TEXT NOT NULL,
+        reminder_text TEXT NOT NULL,
+        recurrence_type TEXT NOT NULL,
+        recurrence_day INTEGER,
+        reminder_time TIME NOT NULL,
+        timezone TEXT NOT NULL,
+        active BOOLEAN DEFAULT TRUE,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_generated_date DATE,
+        next_occurrence TIMESTAMP
+    )
+    ''',
+)
+
+_BASELINE_COLUMNS = (
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS referral_source TEXT",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS premium_status TEXT DEFAULT 'free'",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS premium_since TIMESTAMP",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS last_active_at TIMESTAMP",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS signup_source TEXT",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS total_messages INTEGER DEFAULT 0",
+    "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS delivery_status TEXT DEFAULT 'pending'",
+    "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS sent_at TIMESTAMP",
+    "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS error_message TEXT",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_list_item TEXT",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS last_active_list TEXT",
+    # Encryption: Add phone_hash columns for secure lookups
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS phone_hash TEXT",
+    "ALTER TABLE memories ADD COLUMN IF NOT EXISTS phone_hash TEXT",
+    "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS phone_hash TEXT",
+    "ALTER TABLE logs ADD COLUMN IF NOT EXISTS phone_hash TEXT",
+    "ALTER TABLE lists ADD COLUMN IF NOT EXISTS phone_hash TEXT",
+    "ALTER TABLE list_items ADD COLUMN IF NOT EXISTS phone_hash TEXT",
+    # Encryption: Add encrypted field columns
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS first_name_encrypted TEXT",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS last_name_encrypted TEXT",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS email_encrypted TEXT",
+    "ALTER TABLE memories ADD COLUMN IF NOT EXISTS memory_text_encrypted TEXT",
+    "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS reminder_text_encrypted TEXT",
+    "ALTER TABLE logs ADD COLUMN IF NOT EXISTS message_in_encrypted TEXT",
+    "ALTER TABLE logs ADD COLUMN IF NOT EXISTS message_out_encrypted TEXT",
+    "ALTER TABLE list_items ADD COLUMN IF NOT EXISTS item_text_encrypted TEXT",
+    # Delete reminder feature: stores search results when multiple matches found
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_reminder_delete TEXT",
+    # Delete memory feature: stores search results when multiple matches or confirmation needed
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_memory_delete TEXT",
+    # Free trial support
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS trial_end_date TIMESTAMP",
+    # Trial expiration warning tracking
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS trial_warning_7d_sent BOOLEAN DEFAULT FALSE",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS trial_warning_1d_sent BOOLEAN DEFAULT FALSE",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS trial_warning_0d_sent BOOLEAN DEFAULT FALSE",
+    # Mid-trial value reminder (Day 7 engagement message)
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS mid_trial_reminder_sent BOOLEAN DEFAULT FALSE",
+    # Feedback table (created via migration for existing deployments)
+    """CREATE TABLE IF NOT EXISTS feedback (
+        id SERIAL PRIMARY KEY,
+        user_phone TEXT NOT NULL,
+        message TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        resolved BOOLEAN DEFAULT FALSE
+    )""",
+    # API usage tracking table for cost analytics
+    """CREATE TABLE IF NOT EXISTS api_usage (
+        id SERIAL PRIMARY KEY,
+        phone_number TEXT NOT NULL,
+        request_type TEXT NOT NULL,
+        prompt_tokens INTEGER DEFAULT 0,
+        completion_tokens INTEGER DEFAULT 0,
+        total_tokens INTEGER DEFAULT 0,
+        model TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    # Snooze feature: track last sent reminder for snooze detection
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS last_sent_reminder_id INTEGER",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS last_sent_reminder_at TIMESTAMP",
+    # Track if a reminder was snoozed (to avoid showing duplicates)
+    "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS snoozed BOOLEAN DEFAULT FALSE",
+    # Celery: Add claimed_at column for atomic reminder claiming
+    "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS claimed_at TIMESTAMP",
+    # Settings table for app configuration
+    """CREATE TABLE IF NOT EXISTS settings (
+        key TEXT PRIMARY KEY,
+        value TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    # Conversation analysis table for AI-flagged issues
+    """CREATE TABLE IF NOT EXISTS conversation_analysis (
+        id SERIAL PRIMARY KEY,
+        log_id INTEGER REFERENCES logs(id),
+        phone_number TEXT NOT NULL,
+        issue_type TEXT NOT NULL,
+        severity TEXT DEFAULT 'low',
+        ai_explanation TEXT,
+        reviewed BOOLEAN DEFAULT FALSE,
+        source TEXT DEFAULT 'ai',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    # Track which logs have been analyzed
+    "ALTER TABLE logs ADD COLUMN IF NOT EXISTS analyzed BOOLEAN DEFAULT FALSE",
+    # Add source column for flagging source (ai vs manual)
+    "ALTER TABLE conversation_analysis ADD COLUMN IF NOT EXISTS source TEXT DEFAULT 'ai'",
+    # Opt-out tracking for STOP command compliance
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS opted_out BOOLEAN DEFAULT FALSE",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS opted_out_at TIMESTAMP",
+    # Stripe subscription fields
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS stripe_customer_id TEXT",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS stripe_subscription_id TEXT",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS subscription_status TEXT",
+    # Recurring reminders: link individual reminders to their recurring pattern
+    "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS recurring_id INTEGER REFERENCES recurring_reminders(id)",
+    # Timezone management: store local time for recalculation on timezone change
+    "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS local_time TIME",
+    "ALTER TABLE reminders ADD COLUMN IF NOT EXISTS original_timezone TEXT",
+    # Pending reminder date for clarify_date_time action (date without time)
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_reminder_date TEXT",
+    # Pending list create for duplicate list handling
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_list_create TEXT",
+    # Daily summary feature: opt-in morning summary of day's reminders
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS daily_summary_enabled BOOLEAN DEFAULT FALSE",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS daily_summary_time TIME DEFAULT '08:00'",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS daily_summary_last_sent DATE",
+    # Track if user has been prompted for daily summary after first action
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS daily_summary_prompted BOOLEAN DEFAULT FALSE",
+    # Store pending time when confirming evening daily summary preference
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_daily_summary_time TEXT",
+    # Store pending reminder for low-confidence confirmations (JSON with reminder details)
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_reminder_confirmation TEXT",
+    # 5-minute post-onboarding engagement nudge
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS five_minute_nudge_scheduled_at TIMESTAMP",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS five_minute_nudge_sent BOOLEAN DEFAULT FALSE",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS post_onboarding_interactions INTEGER DEFAULT 0",
+    # Trial info messaging (one-time after first real interaction)
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS trial_info_sent BOOLEAN DEFAULT FALSE",
+    # DELETE ACCOUNT: two-step confirmation flag
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_delete_account BOOLEAN DEFAULT FALSE",
+    # Support ticket enhancements: category, source, priority, assignment
+    "ALTER TABLE support_tickets ADD COLUMN IF NOT EXISTS category TEXT DEFAULT 'support'",
+    "ALTER TABLE support_tickets ADD COLUMN IF NOT EXISTS source TEXT DEFAULT 'sms'",
+    "ALTER TABLE support_tickets ADD COLUMN IF NOT EXISTS priority TEXT DEFAULT 'normal'",
+    "ALTER TABLE support_tickets ADD COLUMN IF NOT EXISTS assigned_to TEXT",
+    # Cancellation feedback collection
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_cancellation_feedback BOOLEAN DEFAULT FALSE",
+    # Canned responses for CS reps
+    """CREATE TABLE IF NOT EXISTS canned_responses (
+        id SERIAL PRIMARY KEY,
+        title TEXT NOT NULL,
+        message TEXT NOT NULL,
+        category TEXT DEFAULT 'general',
+        created_by TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    # Broadcast system improvements
+    "ALTER TABLE scheduled_broadcasts ADD COLUMN IF NOT EXISTS target_phone TEXT",
+    "ALTER TABLE broadcast_logs ADD COLUMN IF NOT EXISTS source TEXT DEFAULT 'immediate'",
+    # Lifecycle nudges (roundtable Phase 4)
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS day_3_nudge_sent BOOLEAN DEFAULT FALSE",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS post_trial_reengagement_sent BOOLEAN DEFAULT FALSE",
+    # 30-day win-back (roundtable 2, Phase 3)
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS winback_30d_sent BOOLEAN DEFAULT FALSE",
+    # 14-day post-trial touchpoint (roundtable 3, Phase 3)
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS post_trial_14d_sent BOOLEAN DEFAULT FALSE",
+    # Backfill NULLs to FALSE — ALTER TABLE DEFAULT doesn't backfill existing rows
+    "UPDATE users SET trial_warning_7d_sent = FALSE WHERE trial_warning_7d_sent IS NULL",
+    "UPDATE users SET trial_warning_1d_sent = FALSE WHERE trial_warning_1d_sent IS NULL",
+    "UPDATE users SET trial_warning_0d_sent = FALSE WHERE trial_warning_0d_sent IS NULL",
+    "UPDATE users SET mid_trial_reminder_sent = FALSE WHERE mid_trial_reminder_sent IS NULL",
+    "UPDATE users SET day_3_nudge_sent = FALSE WHERE day_3_nudge_sent IS NULL",
+    "UPDATE users SET post_trial_reengagement_sent = FALSE WHERE post_trial_reengagement_sent IS NULL",
+    "UPDATE users SET post_trial_14d_sent = FALSE WHERE post_trial_14d_sent IS NULL",
+    "UPDATE users SET winback_30d_sent = FALSE WHERE winback_30d_sent IS NULL",
+    # Smart Nudges: proactive AI intelligence layer
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS smart_nudges_enabled BOOLEAN DEFAULT FALSE",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS smart_nudge_time TIME DEFAULT '09:00'",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS smart_nudge_last_sent DATE",
+    "ALTER TABLE users ADD COLUMN IF NOT EXISTS pending_nudge_response TEXT",
+    # Smart nudges history table
+    """CREATE TABLE IF NOT EXISTS smart_nudges (
+        id SERIAL PRIMARY KEY,
+        phone_number TEXT NOT NULL,
+        nudge_type TEXT NOT NULL,
+        nudge_text TEXT NOT NULL,
+        ai_raw_response TEXT,
+        sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        user_response TEXT,
+        user_responded_at TIMESTAMP,
+        action_taken TEXT,
+        created_reminder_id INTEGER REFERENCES reminders(id),
+        metadata TEXT
+    )""",
+    # Twilio actual cost tracking (polled daily from Usage Records API)
+    """CREATE TABLE IF NOT EXISTS twilio_costs (
+        id SERIAL PRIMARY KEY,
+        cost_date DATE NOT NULL UNIQUE,
+        inbound_count INTEGER DEFAULT 0,
+        inbound_cost NUMERIC(10,4) DEFAULT 0,
+        outbound_count INTEGER DEFAULT 0,
+        outbound_cost NUMERIC(10,4) DEFAULT 0,
+        total_cost NUMERIC(10,4) DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    # Admin reply to contact messages
+    "ALTER TABLE contact_messages ADD COLUMN IF NOT EXISTS admin_reply TEXT",
+)
+
+_BASELINE_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_users_phone_hash ON users(phone_hash)",
+    "CREATE INDEX IF NOT EXISTS idx_memories_phone_hash ON memories(phone_hash)",
+    "CREATE INDEX IF NOT EXISTS idx_reminders_phone_hash ON reminders(phone_hash)",
+    "CREATE INDEX IF NOT EXISTS idx_logs_phone_hash ON logs(phone_hash)",
+    "CREATE INDEX IF NOT EXISTS idx_lists_phone_hash ON lists(phone_hash)",
+    "CREATE INDEX IF NOT EXISTS idx_list_items_phone_hash ON list_items(phone_hash)",
+    # Celery: Index for efficient querying of due reminders
+    "CREATE INDEX IF NOT EXISTS idx_reminders_due ON reminders(reminder_date, sent, claimed_at) WHERE sent = FALSE",
+    # Index for conversation analysis lookups
+    "CREATE INDEX IF NOT EXISTS idx_logs_analyzed ON logs(analyzed) WHERE analyzed = FALSE",
+    "CREATE INDEX IF NOT EXISTS idx_conversation_analysis_reviewed ON conversation_analysis(reviewed) WHERE reviewed = FALSE",
+    # Recurring reminders indexes
+    "CREATE INDEX IF NOT EXISTS idx_recurring_reminders_phone ON recurring_reminders(phone_number)",
+    "CREATE INDEX IF NOT EXISTS idx_recurring_reminders_active ON recurring_reminders(active, next_occurrence) WHERE active = TRUE",
+    "CREATE INDEX IF NOT EXISTS idx_reminders_recurring_id ON reminders(recurring_id) WHERE recurring_id IS NOT NULL",
+    # Daily summary: index for efficient querying of users who need summary
+    "CREATE INDEX IF NOT EXISTS idx_users_daily_summary ON users(daily_summary_enabled) WHERE daily_summary_enabled = TRUE",
+    # Onboarding recovery: index for finding abandoned signups
+    "CREATE INDEX IF NOT EXISTS idx_onboarding_progress_abandoned ON onboarding_progress(followup_24h_sent, last_activity_at) WHERE cancelled = FALSE",
+    # Smart nudges: index for efficient querying of users who need nudge
+    "CREATE INDEX IF NOT EXISTS idx_users_smart_nudges ON users(smart_nudges_enabled) WHERE smart_nudges_enabled = TRUE",
+    "CREATE INDEX IF NOT EXISTS idx_smart_nudges_phone ON smart_nudges(phone_number, sent_at)",
+    # Twilio costs: index for date-range queries
+    "CREATE INDEX IF NOT EXISTS idx_twilio_costs_date ON twilio_costs(cost_date)",
+)
+
+# Indexes matching the hot query workload (see benchmarks/index_advisor.py)
+_WORKLOAD_INDEXES = (
+    # get_reminders_for_date: pending reminders for one user in a date range
+    ConcurrentIndex('idx_reminders_phone_hash_pending', 'reminders (phone_hash, reminder_date) WHERE sent = FALSE'),
+    ConcurrentIndex('idx_reminders_phone_pending', 'reminders (phone_number, reminder_date) WHERE sent = FALSE'),
+    # get_memories: per-user, newest first (no sort step)
+    ConcurrentIndex('idx_memories_phone_hash_created', 'memories (phone_hash, created_at DESC)'),
+    ConcurrentIndex('idx_memories_phone_created', 'memories (phone_number, created_at DESC)'),
+    # Superseded by idx_memories_phone_hash_created (same leading column)
+    'DROP INDEX CONCURRENTLY IF EXISTS idx_memories_phone_hash',
+    # get_all_tickets: per-ticket message count (index-only) and latest message
+    ConcurrentIndex('idx_support_messages_ticket_created', 'support_messages (ticket_id, created_at DESC)'),
+    # analyze_interactions / check_delivery_failures: recent-window scans
+    ConcurrentIndex('idx_logs_created_at', 'logs (created_at)'),
+    ConcurrentIndex('idx_confidence_logs_created_at', 'confidence_logs (created_at)'),
+    ConcurrentIndex('idx_reminders_failed_delivery', "reminders (created_at) WHERE delivery_status = 'failed'"),
+    # CS customer search: LIKE '%term%' on phone and names
+    ConcurrentIndex('idx_users_phone_trgm', 'users USING gin (phone_number gin_trgm_ops)', extension='pg_trgm'),
+    ConcurrentIndex('idx_users_first_name_trgm', 'users USING gin (LOWER(first_name) gin_trgm_ops)', extension='pg_trgm'),
+    ConcurrentIndex('idx_users_last_name_trgm', 'users USING gin (LOWER(last_name) gin_trgm_ops)', extension='pg_trgm'),
+)
+
+# get_reminder_window: pending (ascending) and last sent (descending) per user.
+# Also serves get_reminders_for_date and plain phone_hash lookups, so the
+# narrower reminder indexes it replaces are dropped.
+_REMINDER_HISTORY_INDEXES = (
+    ConcurrentIndex('idx_reminders_phone_hash_sent_date', 'reminders (phone_hash, sent, reminder_date)'),
+    ConcurrentIndex('idx_reminders_phone_sent_date', 'reminders (phone_number, sent, reminder_date)'),
+    'DROP INDEX CONCURRENTLY IF EXISTS idx_reminders_phone_hash',
+    'DROP INDEX CONCURRENTLY IF EXISTS idx_reminders_phone_hash_pending',
+    'DROP INDEX CONCURRENTLY IF EXISTS idx_reminders_phone_pending',
+)
+
+
+def _backfill_memory_keywords(cursor):
+    """Store the dedup keyword set for memories saved before the column existed"""
+    from psycopg2.extras import execute_values
+    from models.memory import _extract_keywords
+
+    while True:
+        cursor.execute('SELECT id, memory_text FROM memories WHERE keywords IS NULL ORDER BY id LIMIT 1000')
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        execute_values(
+            cursor,
+            'UPDATE memories SET keywords = v.keywords FROM (VALUES %s) AS v (id, keywords) WHERE memories.id = v.id',
+            [(mem_id, sorted(_extract_keywords(text))) for mem_id, text in rows],
+            template='(%s, %s::text[])',
+        )
+
+
+# Candidate lookup for memory deduplication (models.memory._find_similar_memory)
+_MEMORY_KEYWORDS = (
+    "ALTER TABLE memories ADD COLUMN IF NOT EXISTS keywords TEXT[]",
+    _backfill_memory_keywords,
+    ConcurrentIndex('idx_memories_keywords', 'memories USING gin (keywords)'),
+)
+
+# Ranked search (utils.text_search) over GIN expression indexes. The search
+# queries repeat these exact to_tsvector expressions so the planner uses them;
+# indexing expressions avoids a stored column whose ADD would rewrite the table.
+_TEXT_SEARCH_INDEXES = (
+    ConcurrentIndex('idx_memories_text_search', "memories USING gin (to_tsvector('english', COALESCE(memory_text, '')))"),
+    ConcurrentIndex(
+        'idx_reminders_text_search',
+        "reminders USING gin (to_tsvector('english', COALESCE(reminder_text, ''))) WHERE sent = FALSE"
+    ),
+)
+_TEXT_SEARCH = _TEXT_SEARCH_INDEXES + (
+    ConcurrentIndex('idx_memories_text_trgm', 'memories USING gin (LOWER(memory_text) gin_trgm_ops)', extension='pg_trgm'),
+    ConcurrentIndex(
+        'idx_reminders_text_trgm', 'reminders USING gin (LOWER(reminder_text) gin_trgm_ops) WHERE sent = FALSE',
+        extension='pg_trgm'
+    ),
+)
+
+
+def _add_memory_embeddings(cursor):
+    """Add memories.embedding (pgvector) and backfill it; skipped without pgvector"""
+    from config import logger
+    from migrations.runner import _ensure_extension
+    from utils.embeddings import EMBEDDING_DIMENSIONS
+
+    if not _ensure_extension(cursor, 'vector'):
+        logger.warning("Skipping memory embeddings: extension vector is not available")
+        return
+    # Per-user retrieval only scans that user's rows (phone indexes), so there
+    # is no ANN index: exact distances over a few hundred vectors are cheap
+    cursor.execute(f'ALTER TABLE memories ADD COLUMN IF NOT EXISTS embedding vector({EMBEDDING_DIMENSIONS})')
+    _backfill_memory_embeddings(cursor)
+
+
+def _backfill_memory_embeddings(cursor, batch_size=1000):
+    """Embed memories by id range; in autocommit each batch commits on its own, so a re-run resumes"""
+    from psycopg2.extras import execute_values
+    from utils.embeddings import embed_keywords, to_vector_literal
+
+    last_id = 0
+    while True:
+        cursor.execute('''
+            SELECT id, keywords FROM memories
+            WHERE id > %s AND embedding IS NULL AND keywords IS NOT NULL
+            ORDER BY id LIMIT %s
+        ''', (last_id, batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        # Memories with empty keywords get no embedding; moving past the last
+        # id keeps them from being selected again
+        last_id = rows[-1][0]
+        embeddings = [(memory_id, embed_keywords(keywords)) for memory_id, keywords in rows]
+        values = [(memory_id, to_vector_literal(embedding)) for memory_id, embedding in embeddings if embedding]
+        if values:
+            execute_values(
+                cursor,
+                'UPDATE memories SET embedding = v.embedding FROM (VALUES %s) AS v (id, embedding) WHERE memories.id = v.id',
+                values,
+                template='(%s, %s::vector)',
+                page_size=batch_size,
+            )
+
+
+_MEMORY_EMBEDDINGS = (_add_memory_embeddings,)
+
+# Single-statement list commands resolve the list by (owner, LOWER(list_name))
+# and then touch its items by list_id
+_LIST_LOOKUP_INDEXES = (
+    ConcurrentIndex('idx_lists_phone_hash_name', 'lists (phone_hash, LOWER(list_name))'),
+    ConcurrentIndex('idx_lists_phone_name', 'lists (phone_number, LOWER(list_name))'),
+    ConcurrentIndex('idx_list_items_list_id', 'list_items (list_id)'),
+    'DROP INDEX CONCURRENTLY IF EXISTS idx_lists_phone_hash',
+)
+
+# AI responses served from utils.ai_cache are logged with the tokens they
+# saved; cost queries exclude them. A constant default is a metadata-only change.
+_API_USAGE_CACHED = (
+    'ALTER TABLE api_usage ADD COLUMN IF NOT EXISTS cached BOOLEAN NOT NULL DEFAULT FALSE',
+)
+
+# Daily rollups behind the admin overview (services.metrics_service). Buckets
+# are keyed by the UTC creation day of the rows they count; the created_at
+# indexes keep the live part (days the rollup task hasn't covered yet) cheap.
+_METRICS_DAILY = (
+    """CREATE TABLE IF NOT EXISTS metrics_daily (
+        day DATE PRIMARY KEY,
+        users_onboarded INTEGER NOT NULL DEFAULT 0,
+        users_pending_onboarding INTEGER NOT NULL DEFAULT 0,
+        users_free INTEGER NOT NULL DEFAULT 0,
+        users_premium INTEGER NOT NULL DEFAULT 0,
+        users_churned INTEGER NOT NULL DEFAULT 0,
+        user_messages BIGINT NOT NULL DEFAULT 0,
+        memories INTEGER NOT NULL DEFAULT 0,
+        reminders INTEGER NOT NULL DEFAULT 0,
+        reminders_pending INTEGER NOT NULL DEFAULT 0,
+        reminders_sent INTEGER NOT NULL DEFAULT 0,
+        reminders_failed INTEGER NOT NULL DEFAULT 0,
+        lists INTEGER NOT NULL DEFAULT 0,
+        list_items INTEGER NOT NULL DEFAULT 0,
+        referrals JSONB NOT NULL DEFAULT '{}',
+        refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    ConcurrentIndex('idx_users_created_at', 'users (created_at)'),
+    ConcurrentIndex('idx_memories_created_at', 'memories (created_at)'),
+    ConcurrentIndex('idx_reminders_created_at', 'reminders (created_at)'),
+    ConcurrentIndex('idx_lists_created_at', 'lists (created_at)'),
+    ConcurrentIndex('idx_list_items_created_at', 'list_items (created_at)'),
+    # Active user counts stay live: a range scan over recently active users
+    ConcurrentIndex('idx_users_last_active_onboarded', 'users (last_active_at) WHERE onboarding_complete = TRUE'),
+)
+
+# get_cost_analytics reads the last 30 days of api_usage in one pass (logs
+# already has idx_logs_created_at)
+_API_USAGE_CREATED_AT = (
+    ConcurrentIndex('idx_api_usage_created_at', 'api_usage (created_at)'),
+)
+
+# Per-recipient delivery state for broadcasts sent by tasks.broadcast_tasks
+# (pending -> sending -> sent | failed), so interrupted broadcasts resume
+# without re-sending. Scheduled broadcasts link their broadcast_logs row.
+_BROADCAST_RECIPIENTS = (
+    """CREATE TABLE IF NOT EXISTS broadcast_recipients (
+        broadcast_id INTEGER NOT NULL REFERENCES broadcast_logs(id) ON DELETE CASCADE,
+        phone_number TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        error TEXT,
+        attempted_at TIMESTAMP,
+        PRIMARY KEY (broadcast_id, phone_number)
+    )""",
+    'ALTER TABLE broadcast_logs ADD COLUMN IF NOT EXISTS scheduled_broadcast_id INTEGER',
+)
+
+# Conversation log viewer: keyset pages walk (created_at, id) backwards, and
+# review status is joined in by log_id
+_LOG_VIEWER_INDEXES = (
+    ConcurrentIndex('idx_logs_created_at_id', 'logs (created_at, id)'),
+    ConcurrentIndex('idx_conversation_analysis_log_id', 'conversation_analysis (log_id)'),
+)
+
+# CS customer view (services.customer_view_service): a per-customer version
+# bumped by statement-level triggers whenever a customer's reminders, lists,
+# memories, tickets or notes change, so the cached view is keyed by it. Each
+# statement upserts the distinct phone numbers it touched in sorted order.
+_CUSTOMER_VIEW_TABLES = (
+    'reminders', 'lists', 'list_items', 'memories', 'support_tickets', 'support_messages', 'customer_notes',
+)
+
+
+def _create_customer_version_triggers(cursor) -> None:
+    for table in _CUSTOMER_VIEW_TABLES:
+        for event, transitions in (
+            ('INSERT', 'NEW TABLE AS new_rows'),
+            ('UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+            ('DELETE', 'OLD TABLE AS old_rows'),
+        ):
+            trigger = f'{table}_customer_version_{event.lower()}'
+            cursor.execute(f'DROP TRIGGER IF EXISTS {trigger} ON {table}')
+            cursor.execute(f'''
+                CREATE TRIGGER {trigger} AFTER {event} ON {table}
+                REFERENCING {transitions}
+                FOR EACH STATEMENT EXECUTE FUNCTION bump_customer_data_version()
+            ''')
+
+
+_CUSTOMER_VIEW = (
+    """CREATE TABLE IF NOT EXISTS customer_data_versions (
+        phone_number TEXT PRIMARY KEY,
+        version BIGINT NOT NULL DEFAULT 0
+    )""",
+    """CREATE OR REPLACE FUNCTION bump_customer_data_version() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO customer_data_versions (phone_number, version)
+            SELECT DISTINCT phone_number, 1 FROM new_rows ORDER BY phone_number
+            ON CONFLICT (phone_number) DO UPDATE SET version = customer_data_versions.version + 1;
+        ELSIF TG_OP = 'UPDATE' THEN
+            INSERT INTO customer_data_versions (phone_number, version)
+            SELECT phone_number, 1 FROM (
+                SELECT phone_number FROM new_rows UNION SELECT phone_number FROM old_rows
+            ) touched ORDER BY phone_number
+            ON CONFLICT (phone_number) DO UPDATE SET version = customer_data_versions.version + 1;
+        ELSE
+            INSERT INTO customer_data_versions (phone_number, version)
+            SELECT DISTINCT phone_number, 1 FROM old_rows ORDER BY phone_number
+            ON CONFLICT (phone_number) DO UPDATE SET version = customer_data_versions.version + 1;
+        END IF;
+        RETURN NULL;
+    END
+    $$""",
+    _create_customer_version_triggers,
+    # The view reads each section newest first by phone number
+    ConcurrentIndex('idx_reminders_phone_date', 'reminders (phone_number, reminder_date DESC, id DESC)'),
+    ConcurrentIndex('idx_support_tickets_phone_updated', 'support_tickets (phone_number, updated_at DESC)'),
+    ConcurrentIndex('idx_customer_notes_phone_created', 'customer_notes (phone_number, created_at DESC)'),
+)
+
+# Ticket activity kept on support_tickets by services.support_service when a
+# message is recorded, so the CS queue and SLA summary read no messages.
+# Previews are truncated the way the queue displays them.
+_SUPPORT_TICKET_ACTIVITY = (
+    'ALTER TABLE support_tickets ADD COLUMN IF NOT EXISTS message_count INTEGER NOT NULL DEFAULT 0',
+    'ALTER TABLE support_tickets ADD COLUMN IF NOT EXISTS last_inbound_at TIMESTAMP',
+    'ALTER TABLE support_tickets ADD COLUMN IF NOT EXISTS last_outbound_at TIMESTAMP',
+    'ALTER TABLE support_tickets ADD COLUMN IF NOT EXISTS last_message_preview TEXT',
+    """UPDATE support_tickets t
+    SET message_count = m.message_count,
+        last_inbound_at = m.last_inbound_at,
+        last_outbound_at = m.last_outbound_at,
+        last_message_preview = m.last_message_preview
+    FROM (
+        SELECT ticket_id,
+               COUNT(*) AS message_count,
+               MAX(created_at) FILTER (WHERE direction = 'inbound') AS last_inbound_at,
+               MAX(created_at) FILTER (WHERE direction = 'outbound') AS last_outbound_at,
+               (ARRAY_AGG(CASE WHEN LENGTH(message) > 100 THEN LEFT(message, 100) || '...' ELSE message END
+                          ORDER BY created_at DESC, id DESC))[1] AS last_message_preview
+        FROM support_messages
+        GROUP BY ticket_id
+    ) m
+    WHERE m.ticket_id = t.id""",
+    # The queue lists open tickets newest first; the SLA summary scans open tickets
+    ConcurrentIndex('idx_support_tickets_open_updated', "support_tickets (updated_at DESC) WHERE status = 'open'"),
+)
+
+# Databases that applied migration 5 before it moved to expression indexes
+# have stored search_vector columns; build the expression indexes, then drop
+# the columns (a catalog-only change, unlike adding them)
+_TEXT_SEARCH_EXPRESSIONS = _TEXT_SEARCH_INDEXES + (
+    'DROP INDEX CONCURRENTLY IF EXISTS idx_memories_search_vector',
+    'DROP INDEX CONCURRENTLY IF EXISTS idx_reminders_search_vector',
+    'ALTER TABLE memories DROP COLUMN IF EXISTS search_vector',
+    'ALTER TABLE reminders DROP COLUMN IF EXISTS search_vector',
+)
+
+# Tombstones for deleted accounts: buffered analytics rows queued before the
+# deletion (in another process or the Redis spill list) are dropped at flush
+_ACCOUNT_DELETIONS = (
+    """CREATE TABLE IF NOT EXISTS account_deletions (
+        phone_number TEXT PRIMARY KEY,
+        deleted_at TIMESTAMP NOT NULL
+    )""",
+)
+
+# Reminder delivery (claim, mark sent, status callbacks) must not upsert
+# customer_data_versions on every statement; the customer view derives its
+# reminders version from the rows instead (services.customer_view_service)
+_CUSTOMER_VERSION_OFF_REMINDERS = tuple(
+    f'DROP TRIGGER IF EXISTS reminders_customer_version_{event} ON reminders'
+    for event in ('insert', 'update', 'delete')
+)
+
+# pg_trgm indexes that migrations 2 and 5 skipped on servers without the
+# extension, before the runner recorded skipped steps for retry
+_TRIGRAM_INDEXES = tuple(
+    step for step in _WORKLOAD_INDEXES + _TEXT_SEARCH
+    if isinstance(step, ConcurrentIndex) and step.extension == 'pg_trgm'
+)
+
+# The admin overview counts status snapshots and counters live instead of
+# from metrics_daily (changes to old rows would lag until the nightly run):
+# reminder delivery statuses by created_at, the failed index already exists
+_LIVE_STATUS_METRICS = (
+    ConcurrentIndex(
+        'idx_reminders_pending_delivery', "reminders (created_at) WHERE COALESCE(delivery_status, 'pending') = 'pending'"
+    ),
+    ConcurrentIndex('idx_reminders_sent_delivery', "reminders (created_at) WHERE delivery_status = 'sent'"),
+    'ALTER TABLE metrics_daily DROP COLUMN IF EXISTS users_onboarded',
+    'ALTER TABLE metrics_daily DROP COLUMN IF EXISTS users_pending_onboarding',
+    'ALTER TABLE metrics_daily DROP COLUMN IF EXISTS users_free',
+    'ALTER TABLE metrics_daily DROP COLUMN IF EXISTS users_premium',
+    'ALTER TABLE metrics_daily DROP COLUMN IF EXISTS users_churned',
+    'ALTER TABLE metrics_daily DROP COLUMN IF EXISTS user_messages',
+    'ALTER TABLE metrics_daily DROP COLUMN IF EXISTS reminders_pending',
+    'ALTER TABLE metrics_daily DROP COLUMN IF EXISTS reminders_sent',
+    'ALTER TABLE metrics_daily DROP COLUMN IF EXISTS reminders_failed',
+    'ALTER TABLE metrics_daily DROP COLUMN IF EXISTS referrals',
+)
+
+APP_MIGRATIONS = [
+    Migration(1, 'baseline_schema', _BASELINE_TABLES + _BASELINE_COLUMNS + _BASELINE_INDEXES),
+    Migration(2, 'workload_indexes', _WORKLOAD_INDEXES),
+    Migration(3, 'reminder_history_indexes', _REMINDER_HISTORY_INDEXES),
+    Migration(4, 'memory_keywords', _MEMORY_KEYWORDS),
+    Migration(5, 'text_search', _TEXT_SEARCH),
+    Migration(6, 'memory_embeddings', _MEMORY_EMBEDDINGS, autocommit=True),
+    Migration(7, 'list_lookup_indexes', _LIST_LOOKUP_INDEXES),
+    Migration(8, 'api_usage_cached', _API_USAGE_CACHED),
+    Migration(9, 'metrics_daily', _METRICS_DAILY),
+    Migration(10, 'api_usage_created_at', _API_USAGE_CREATED_AT),
+    Migration(11, 'broadcast_recipients', _BROADCAST_RECIPIENTS),
+    Migration(12, 'log_viewer_indexes', _LOG_VIEWER_INDEXES),
+    Migration(13, 'customer_view', _CUSTOMER_VIEW),
+    Migration(14, 'support_ticket_activity', _SUPPORT_TICKET_ACTIVITY),
+    Migration(15, 'text_search_expression_indexes', _TEXT_SEARCH_EXPRESSIONS),
+    Migration(16, 'account_deletions', _ACCOUNT_DELETIONS),
+    Migration(17, 'customer_version_off_reminders', _CUSTOMER_VERSION_OFF_REMINDERS),
+    Migration(18, 'trigram_indexes', _TRIGRAM_INDEXES),
+    Migration(19, 'live_status_metrics', _LIVE_STATUS_METRICS),
+]
@@ -0,0 +1,296 @@
+"""
+Monitoring Schema Migrations
+Tables for the agents pipeline (interaction monitor, validator, resolution
+tracker, code analyzer, fix planner). Applied to the monitoring database,
+which may be separate from the main one (see MONITORING_DATABASE_URL).
+"""
+
+from config import logger
+from migrations.runner import Migration
+
+
+def _dedupe_then_unique_issue_index(cursor):
+    """Remove duplicate (log_id, issue_type) issues, then add the unique index"""
+    cursor.execute('''
+        SELECT 1 FROM pg_indexes
+        WHERE indexname = 'idx_monitoring_issues_log_type'
+    ''')
+    if cursor.fetchone():
+        return
+
+    # Find duplicate issue IDs to delete (keep the one with highest id)
+    cursor.execute('''
+        SELECT a.id FROM monitoring_issues a
+        JOIN monitoring_issues b ON a.log_id = b.log_id
+          AND a.issue_type = b.issue_type
+          AND a.id < b.id
+        WHERE a.log_id IS NOT NULL
+    ''')
+    duplicate_ids = [row[0] for row in cursor.fetchall()]
+
+    if duplicate_ids:
+        # First delete references from issue_pattern_links
+        cursor.execute('''
+            DELETE FROM issue_pattern_links
+            WHERE issue_id = ANY(%s)
+        ''', (duplicate_ids,))
+        logger.info(f"Removed {cursor.rowcount} pattern links for duplicate issues")
+
+        # Now delete the duplicate monitoring issues
+        cursor.execute('''
+            DELETE FROM monitoring_issues
+            WHERE id = ANY(%s)
+        ''', (duplicate_ids,))
+        logger.info(f"Removed {cursor.rowcount} duplicate monitoring issues")
+
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_monitoring_issues_log_type
+        ON monitoring_issues(log_id, issue_type) WHERE log_id IS NOT NULL
+    ''')
+
+
+# Agent 1: Interaction Monitor
+_MONITOR_TABLES = (
+    '''
+    CREATE TABLE IF NOT EXISTS monitoring_issues (
+        id SERIAL PRIMARY KEY,
+        log_id INTEGER REFERENCES logs(id),
+        phone_number TEXT NOT NULL,
+        issue_type TEXT NOT NULL,
+        severity TEXT NOT NULL DEFAULT 'medium',
+        details JSONB,
+        detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        validated BOOLEAN DEFAULT FALSE,
+        validated_by TEXT,
+        validated_at TIMESTAMP,
+        resolution TEXT,
+        resolved_at TIMESTAMP,
+        false_positive BOOLEAN DEFAULT FALSE
+    )
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_monitoring_issues_type
+    ON monitoring_issues(issue_type, detected_at DESC)
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_monitoring_issues_validated
+    ON monitoring_issues(validated) WHERE validated = FALSE
+    ''',
+    # Monitoring runs table (audit trail)
+    '''
+    CREATE TABLE IF NOT EXISTS monitoring_runs (
+        id SERIAL PRIMARY KEY,
+        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        completed_at TIMESTAMP,
+        logs_analyzed INTEGER DEFAULT 0,
+        issues_found INTEGER DEFAULT 0,
+        time_range_start TIMESTAMP,
+        time_range_end TIMESTAMP,
+        status TEXT DEFAULT 'running'
+    )
+    ''',
+)
+
+# Agent 2: Issue Validator
+_VALIDATOR_TABLES = (
+    # Issue patterns table - groups related issues
+    '''
+    CREATE TABLE IF NOT EXISTS issue_patterns (
+        id SERIAL PRIMARY KEY,
+        pattern_name TEXT NOT NULL,
+        description TEXT,
+        issue_count INTEGER DEFAULT 0,
+        first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        status TEXT DEFAULT 'active',
+        root_cause TEXT,
+        suggested_fix TEXT,
+        priority TEXT DEFAULT 'medium'
+    )
+    ''',
+    # Link issues to patterns
+    '''
+    CREATE TABLE IF NOT EXISTS issue_pattern_links (
+        id SERIAL PRIMARY KEY,
+        issue_id INTEGER REFERENCES monitoring_issues(id),
+        pattern_id INTEGER REFERENCES issue_patterns(id),
+        confidence FLOAT DEFAULT 1.0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # Validation runs audit
+    '''
+    CREATE TABLE IF NOT EXISTS validation_runs (
+        id SERIAL PRIMARY KEY,
+        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        completed_at TIMESTAMP,
+        issues_processed INTEGER DEFAULT 0,
+        validated_count INTEGER DEFAULT 0,
+        false_positive_count INTEGER DEFAULT 0,
+        patterns_found INTEGER DEFAULT 0,
+        ai_used BOOLEAN DEFAULT FALSE,
+        status TEXT DEFAULT 'running'
+    )
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_issue_patterns_status
+    ON issue_patterns(status) WHERE status = 'active'
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_issue_pattern_links_issue
+    ON issue_pattern_links(issue_id)
+    ''',
+)
+
+# Agent 3: Resolution Tracker
+_TRACKER_TABLES = (
+    # Resolutions table - tracks how issues were resolved
+    '''
+    CREATE TABLE IF NOT EXISTS issue_resolutions (
+        id SERIAL PRIMARY KEY,
+        issue_id INTEGER REFERENCES monitoring_issues(id),
+        resolution_type TEXT NOT NULL,
+        description TEXT,
+        commit_ref TEXT,
+        resolved_by TEXT,
+        resolved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        verified BOOLEAN DEFAULT FALSE,
+        verified_at TIMESTAMP
+    )
+    ''',
+    # Health snapshots - periodic system health metrics
+    '''
+    CREATE TABLE IF NOT EXISTS health_snapshots (
+        id SERIAL PRIMARY KEY,
+        snapshot_date DATE NOT NULL UNIQUE,
+        total_interactions INTEGER DEFAULT 0,
+        total_issues INTEGER DEFAULT 0,
+        false_positives INTEGER DEFAULT 0,
+        resolved_issues INTEGER DEFAULT 0,
+        open_issues INTEGER DEFAULT 0,
+        health_score FLOAT,
+        issue_rate FLOAT,
+        resolution_rate FLOAT,
+        avg_resolution_hours FLOAT,
+        top_issue_types JSONB,
+        top_patterns JSONB,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # Pattern resolutions - tracks when patterns are addressed
+    '''
+    CREATE TABLE IF NOT EXISTS pattern_resolutions (
+        id SERIAL PRIMARY KEY,
+        pattern_id INTEGER REFERENCES issue_patterns(id),
+        resolution_type TEXT NOT NULL,
+        description TEXT,
+        resolved_by TEXT,
+        resolved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        recurrence_count INTEGER DEFAULT 0,
+        last_recurrence TIMESTAMP
+    )
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_resolutions_issue
+    ON issue_resolutions(issue_id)
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_health_snapshots_date
+    ON health_snapshots(snapshot_date DESC)
+    ''',
+)
+
+# Agent 4: Code Analyzer
+_ANALYZER_TABLES = (
+    # Code analysis results table
+    '''
+    CREATE TABLE IF NOT EXISTS code_analysis (
+        id SERIAL PRIMARY KEY,
+        issue_id INTEGER REFERENCES monitoring_issues(id),
+        pattern_id INTEGER,
+        root_cause_summary TEXT NOT NULL,
+        root_cause_details TEXT,
+        likely_files JSONB,
+        claude_prompt TEXT NOT NULL,
+        confidence_score INTEGER DEFAULT 50,
+        analysis_model TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        status TEXT DEFAULT 'pending',
+        applied_at TIMESTAMP,
+        applied_by TEXT
+    )
+    ''',
+    # Code analysis runs audit table
+    '''
+    CREATE TABLE IF NOT EXISTS code_analysis_runs (
+        id SERIAL PRIMARY KEY,
+        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        completed_at TIMESTAMP,
+        issues_analyzed INTEGER DEFAULT 0,
+        analyses_generated INTEGER DEFAULT 0,
+        use_ai BOOLEAN DEFAULT TRUE,
+        status TEXT DEFAULT 'running'
+    )
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_code_analysis_issue
+    ON code_analysis(issue_id)
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_code_analysis_pattern
+    ON code_analysis(pattern_id) WHERE pattern_id IS NOT NULL
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_code_analysis_status
+    ON code_analysis(status)
+    ''',
+    # Unique constraint to prevent duplicate analyses
+    '''
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_code_analysis_unique_issue
+    ON code_analysis(issue_id) WHERE issue_id IS NOT NULL
+    ''',
+)
+
+# Agent 5: Fix Planner
+_FIX_PLANNER_TABLES = (
+    # Fix proposals table - stores generated prompts
+    '''
+    CREATE TABLE IF NOT EXISTS fix_proposals (
+        id SERIAL PRIMARY KEY,
+        issue_id INTEGER REFERENCES monitoring_issues(id),
+        pattern_id INTEGER,
+        affected_files JSONB,
+        code_context TEXT,
+        claude_prompt TEXT NOT NULL,
+        status TEXT DEFAULT 'pending',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    # Fix proposal runs table - audit trail
+    '''
+    CREATE TABLE IF NOT EXISTS fix_proposal_runs (
+        id SERIAL PRIMARY KEY,
+        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        completed_at TIMESTAMP,
+        issues_analyzed INTEGER DEFAULT 0,
+        proposals_generated INTEGER DEFAULT 0,
+        status TEXT DEFAULT 'running'
+    )
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_fix_proposals_issue
+    ON fix_proposals(issue_id)
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_fix_proposals_status
+    ON fix_proposals(status)
+    ''',
+)
+
+MONITORING_MIGRATIONS = [
+    Migration(
+        1, 'agents_baseline_schema',
+        _MONITOR_TABLES + _VALIDATOR_TABLES + (_dedupe_then_unique_issue_index,)
+        + _TRACKER_TABLES + _ANALYZER_TABLES + _FIX_PLANNER_TABLES
+    ),
+]
@@ -0,0 +1,268 @@
+"""
+Migration Runner
+Applies versioned schema migrations and records them in schema_migrations.
+
+When the schema is current, checking costs two SELECTs. Pending
+migrations are applied under a Postgres advisory lock so concurrently
+starting processes don't race each other. Index steps skipped because an
+extension was unavailable are recorded in schema_migration_skips and
+retried on every run until they are built.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Union
+
+import psycopg2
+from psycopg2 import errors
+
+from config import logger
+
+# Give up quickly on locks held by live traffic, then retry, rather than
+# queueing behind a long transaction and blocking every query on the table
+LOCK_TIMEOUT = '5s'
+LOCK_RETRIES = 3
+LOCK_RETRY_DELAY = 2  # seconds
+
+
+@dataclass(frozen=True)
+class ConcurrentIndex:
+    """CREATE INDEX CONCURRENTLY step (builds without blocking writes).
+
+    `definition` is everything after ON, e.g. "reminders (phone_hash, sent)".
+    An INVALID index left behind by a failed build is dropped and rebuilt.
+    If `extension` is set (e.g. 'pg_trgm') it is created first; when the
+    server doesn't offer it, the index is skipped with a warning and
+    retried by later runs.
+    """
+    name: str
+    definition: str
+    unique: bool = False
+    extension: Optional[str] = None
+
+
+MigrationStep = Union[str, ConcurrentIndex, Callable[[Any], None]]
+
+
+@dataclass(frozen=True)
+class Migration:
+    """A numbered schema change.
+
+    Steps are SQL strings, ConcurrentIndex steps, or callables taking a cursor.
+    Migrations without ConcurrentIndex steps run in a single transaction.
+    Migrations with them, or with autocommit=True (e.g. a backfill that
+    commits batch by batch), run each statement in autocommit, so every step
+    must be idempotent (IF NOT EXISTS) to allow a safe re-run after a partial
+    failure.
+    """
+    version: int
+    name: str
+    steps: tuple = field(default_factory=tuple)
+    autocommit: bool = False
+
+    @property
+    def concurrent(self) -> bool:
+        return any(isinstance(step, ConcurrentIndex) for step in self.steps)
+
+
+def _ensure_migrations_table(cursor) -> None:
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            scope TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            duration_ms INTEGER,
+            PRIMARY KEY (scope, version)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migration_skips (
+            scope TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            step TEXT NOT NULL,
+            skipped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (scope, version, step)
+        )
+    ''')
+
+
+def get_applied_versions(conn, scope: str) -> set[int]:
+    """Versions already applied for a scope (empty if nothing was ever migrated)."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute('SELECT version FROM schema_migrations WHERE scope = %s', (scope,))
+        versions = {row[0] for row in cursor.fetchall()}
+        conn.commit()
+        return versions
+    except errors.UndefinedTable:
+        conn.rollback()
+        return set()
+
+
+def get_skipped_steps(conn, scope: str) -> set[tuple[int, str]]:
+    """(version, index name) of steps skipped by applied migrations and not yet built."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute('SELECT version, step FROM schema_migration_skips WHERE scope = %s', (scope,))
+        skipped = {(row[0], row[1]) for row in cursor.fetchall()}
+        conn.commit()
+        return skipped
+    except errors.UndefinedTable:
+        conn.rollback()
+        return set()
+
+
+def _ensure_extension(cursor, extension: str) -> bool:
+    cursor.execute('SELECT 1 FROM pg_available_extensions WHERE name = %s', (extension,))
+    if not cursor.fetchone():
+        return False
+    cursor.execute(f'CREATE EXTENSION IF NOT EXISTS {extension}')
+    return True
+
+
+def _run_step(cursor, step: MigrationStep) -> bool:
+    """Run one step; False if it was skipped (index whose extension is unavailable)."""
+    if isinstance(step, ConcurrentIndex):
+        if step.extension and not _ensure_extension(cursor, step.extension):
+            logger.warning(f"Skipping index {step.name}: extension {step.extension} is not available")
+            return False
+        cursor.execute('''
+            SELECT i.indisvalid FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = %s
+        ''', (step.name,))
+        existing = cursor.fetchone()
+        if existing and not existing[0]:
+            logger.warning(f"Dropping invalid index {step.name} left by a failed concurrent build")
+            cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {step.name}')
+        unique = 'UNIQUE ' if step.unique else ''
+        cursor.execute(f'CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {step.name} ON {step.definition}')
+    elif callable(step):
+        step(cursor)
+    else:
+        cursor.execute(step)
+    return True
+
+
+def _apply_migration(conn, migration: Migration, scope: str) -> None:
+    start = time.perf_counter()
+    cursor = conn.cursor()
+    skipped = []
+
+    if migration.concurrent or migration.autocommit:
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+        conn.autocommit = True
+        try:
+            cursor.execute(f"SET lock_timeout = '{LOCK_TIMEOUT}'")
+            for step in migration.steps:
+                if not _run_step(cursor, step):
+                    skipped.append(step.name)
+            cursor.execute('RESET lock_timeout')
+        finally:
+            conn.autocommit = False
+    else:
+        cursor.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'")
+        for step in migration.steps:
+            _run_step(cursor, step)
+
+    duration_ms = int((time.perf_counter() - start) * 1000)
+    cursor.execute(
+        'INSERT INTO schema_migrations (scope, version, name, duration_ms) VALUES (%s, %s, %s, %s)',
+        (scope, migration.version, migration.name, duration_ms)
+    )
+    for step in skipped:
+        cursor.execute(
+            'INSERT INTO schema_migration_skips (scope, version, step) VALUES (%s, %s, %s) ON CONFLICT DO NOTHING',
+            (scope, migration.version, step)
+        )
+    conn.commit()
+    logger.info(f"Applied {scope} migration {migration.version:04d}_{migration.name} in {duration_ms}ms")
+
+
+def _retry_skipped_steps(conn, migrations: list[Migration], scope: str, skipped: set[tuple[int, str]]) -> None:
+    """Build previously skipped index steps, forgetting each once it exists."""
+    steps = {
+        (m.version, step.name): step
+        for m in migrations for step in m.steps if isinstance(step, ConcurrentIndex)
+    }
+    cursor = conn.cursor()
+    for version, name in sorted(skipped):
+        step = steps.get((version, name))
+        if step is not None:
+            conn.autocommit = True
+            try:
+                cursor.execute(f"SET lock_timeout = '{LOCK_TIMEOUT}'")
+                built = _run_step(cursor, step)
+                cursor.execute('RESET lock_timeout')
+            except psycopg2.Error as e:
+                logger.warning(f"Retrying skipped index {name} of migration {version:04d} failed: {e}")
+                continue
+            finally:
+                conn.autocommit = False
+            if not built:
+                continue
+            logger.info(f"Built index {name} skipped by {scope} migration {version:04d}")
+        cursor.execute(
+            'DELETE FROM schema_migration_skips WHERE scope = %s AND version = %s AND step = %s',
+            (scope, version, name)
+        )
+        conn.commit()
+
+
+def _apply_with_retry(conn, migration: Migration, scope: str) -> None:
+    for attempt in range(1, LOCK_RETRIES + 1):
+        try:
+            _apply_migration(conn, migration, scope)
+            return
+        except errors.LockNotAvailable:
+            conn.rollback()
+            if attempt == LOCK_RETRIES:
+                raise
+            logger.warning(
+                f"Migration {migration.version:04d}_{migration.name} hit lock_timeout "
+                f"(attempt {attempt}/{LOCK_RETRIES}), retrying"
+            )
+            time.sleep(LOCK_RETRY_DELAY)
+
+
+def run_migrations(conn, migrations: list[Migration], scope: str) -> int:
+    """Apply pending migrations for a scope in version order.
+
+    Args:
+        conn: psycopg2 connection (left open; caller returns it to its pool)
+        migrations: All migrations for the scope
+        scope: Namespace in schema_migrations ('app', 'monitoring')
+
+    Returns:
+        Number of migrations applied (retried skipped steps are not counted)
+    """
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise ValueError(f"Duplicate migration versions in scope {scope}")
+
+    applied = get_applied_versions(conn, scope)
+    if all(m.version in applied for m in migrations) and not get_skipped_steps(conn, scope):
+        return 0
+
+    cursor = conn.cursor()
+    cursor.execute('SELECT pg_advisory_lock(hashtext(%s))', (f'schema_migrations:{scope}',))
+    try:
+        _ensure_migrations_table(cursor)
+        conn.commit()
+
+        # Another process may have applied them while we waited for the lock
+        applied = get_applied_versions(conn, scope)
+        _retry_skipped_steps(conn, migrations, scope, get_skipped_steps(conn, scope))
+        pending = sorted((m for m in migrations if m.version not in applied), key=lambda m: m.version)
+        for migration in pending:
+            try:
+                _apply_with_retry(conn, migration, scope)
+            except psycopg2.Error as e:
+                conn.rollback()
+                logger.error(f"Migration {migration.version:04d}_{migration.name} failed: {e}")
+                raise
+        return len(pending)
+    finally:
+        cursor.execute('SELECT pg_advisory_unlock(hashtext(%s))', (f'schema_migrations:{scope}',))
+        conn.commit()
@@ -6,8 +6,34 @@ Handles all list-related database operations
 from datetime import datetime
 from typing import Any, Optional
 
+import psycopg2.errors
+
 from database import get_db_connection, return_db_connection
-from config import logger, ENCRYPTION_ENABLED
+from config import logger, ENCRYPTION_ENABLED, MAX_ITEMS_PER_LIST
+
+
+def _list_owner(phone_number: str) -> tuple[str, tuple]:
+    """SQL condition and params matching a user's lists in one statement.
+
+    With encryption, matches phone_hash or (for lists created before
+    encryption) phone_number.
+    """
+    if ENCRYPTION_ENABLED:
+        from utils.encryption import hash_phone
+        return '(l.phone_hash = %s OR l.phone_number = %s)', (hash_phone(phone_number), phone_number)
+    return 'l.phone_number = %s', (phone_number,)
+
+
+def _target_list_cte(phone_number: str, list_name: str) -> tuple[str, tuple]:
+    """CTE selecting the user's list by case-insensitive name (phone_hash matches first, like get_list_by_name)"""
+    condition, params = _list_owner(phone_number)
+    return f'''
+        WITH target AS (
+            SELECT l.id, l.list_name FROM lists l
+            WHERE {condition} AND LOWER(l.list_name) = LOWER(%s)
+            ORDER BY l.phone_hash IS NULL, l.id
+            LIMIT 1
+        )''', params + (list_name,)
 
 
 def create_list(phone_number: str, list_name: str) -> Optional[int]:
@@ -275,85 +301,119 @@ def add_list_item(list_id: int, phone_number: str, item_text: str) -> Optional[i
             return_db_connection(conn)
 
 
-def mark_item_complete(phone_number: str, list_name: str, item_text: str) -> bool:
-    """Mark an item as complete (case-insensitive match)"""
+# Capacity, case-insensitive dedupe (against the list and within the message)
+# and the insert in one statement. Items keep the order they were sent in.
+_ADD_LIST_ITEMS_QUERY = '''
+    WITH existing AS (
+        SELECT LOWER(item_text) AS key FROM list_items WHERE list_id = %(list_id)s
+    ), incoming AS (
+        SELECT item, encrypted, ord
+        FROM unnest(%(items)s::text[], %(encrypted)s::text[]) WITH ORDINALITY AS u(item, encrypted, ord)
+    ), first_seen AS (
+        SELECT DISTINCT ON (LOWER(item)) item, encrypted, ord
+        FROM incoming
+        ORDER BY LOWER(item), ord
+    ), candidates AS (
+        SELECT item, encrypted, ord,
+               ROW_NUMBER() OVER (ORDER BY ord) <= GREATEST(%(max_items)s - (SELECT COUNT(*) FROM existing), 0) AS fits
+        FROM first_seen
+        WHERE LOWER(item) NOT IN (SELECT key FROM existing)
+    ), inserted AS (
+        INSERT INTO list_items (list_id, phone_number, phone_hash, item_text, item_text_encrypted)
+        SELECT %(list_id)s, %(phone_number)s, %(phone_hash)s, item, encrypted FROM candidates WHERE fits ORDER BY ord
+        RETURNING item_text
+    )
+    SELECT
+        ARRAY(SELECT item FROM candidates WHERE fits ORDER BY ord),
+        ARRAY(SELECT item FROM candidates WHERE NOT fits ORDER BY ord),
+        ARRAY(SELECT item FROM incoming WHERE ord NOT IN (SELECT ord FROM candidates) ORDER BY ord),
+        (SELECT COUNT(*) FROM existing) + (SELECT COUNT(*) FROM inserted)
+'''
+
+
+def add_list_items(list_id: int, phone_number: str, items: list[str], max_items: int = MAX_ITEMS_PER_LIST) -> dict[str, Any]:
+    """Add several items to a list in one round trip.
+
+    Items already on the list (case-insensitive) or repeated in `items` are
+    skipped, and only as many as fit under `max_items` are inserted.
+
+    Returns:
+        Dict with 'added', 'skipped' (left out because the list is full) and
+        'duplicates' item texts in the order sent, 'item_count' after adding,
+        and 'error' (True if nothing could be written; all lists are empty)
+    """
     conn = None
     try:
         conn = get_db_connection()
         c = conn.cursor()
 
-        # Find the list first
+        phone_hash = None
+        encrypted = [None] * len(items)
         if ENCRYPTION_ENABLED:
-            from utils.encryption import hash_phone
+            from utils.encryption import encrypt_field, hash_phone
             phone_hash = hash_phone(phone_number)
-            c.execute(
-                'SELECT id FROM lists WHERE phone_hash = %s AND LOWER(list_name) = LOWER(%s)',
-                (phone_hash, list_name)
-            )
-        else:
-            c.execute(
-                'SELECT id FROM lists WHERE phone_number = %s AND LOWER(list_name) = LOWER(%s)',
-                (phone_number, list_name)
-            )
-
-        list_result = c.fetchone()
-        if not list_result:
-            return False
-
-        list_id = list_result[0]
-        c.execute(
-            '''UPDATE list_items SET completed = TRUE
-               WHERE list_id = %s AND LOWER(item_text) = LOWER(%s) AND completed = FALSE''',
-            (list_id, item_text)
-        )
-        updated = c.rowcount > 0
+            encrypted = [encrypt_field(item) for item in items]
+
+        c.execute(_ADD_LIST_ITEMS_QUERY, {
+            'list_id': list_id,
+            'phone_number': phone_number,
+            'phone_hash': phone_hash,
+            'items': list(items),
+            'encrypted': encrypted,
+            'max_items': max_items,
+        })
+        added, skipped, duplicates, item_count = c.fetchone()
         conn.commit()
-        return updated
+        logger.info(f"Added {len(added)} items to list {list_id}")
+        return {'added': added, 'skipped': skipped, 'duplicates': duplicates, 'item_count': item_count,
+                'error': False}
     except Exception as e:
-        logger.error(f"Error marking item complete: {e}")
-        return False
+        logger.error(f"Error adding list items: {e}")
+        return {'added': [], 'skipped': [], 'duplicates': [], 'item_count': None, 'error': True}
     finally:
         if conn:
             return_db_connection(conn)
 
 
-def mark_item_incomplete(phone_number: str, list_name: str, item_text: str) -> bool:
-    """Mark an item as incomplete (case-insensitive match)"""
+def mark_item_complete(phone_number: str, list_name: str, item_text: str) -> Optional[tuple[str, str]]:
+    """Mark an item as complete (case-insensitive match).
+
+    Returns (list_name, item_text) as stored, or None if no open item matched.
+    """
+    return _set_item_completed(phone_number, list_name, item_text, True)
+
+
+def mark_item_incomplete(phone_number: str, list_name: str, item_text: str) -> Optional[tuple[str, str]]:
+    """Mark an item as incomplete (case-insensitive match).
+
+    Returns (list_name, item_text) as stored, or None if no completed item matched.
+    """
+    return _set_item_completed(phone_number, list_name, item_text, False)
+
+
+def _set_item_completed(phone_number: str, list_name: str, item_text: str, completed: bool) -> Optional[tuple[str, str]]:
+    """Resolve the list and flip matching items in a single statement"""
     conn = None
     try:
         conn = get_db_connection()
         c = conn.cursor()
 
-        # Find the list first
-        if ENCRYPTION_ENABLED:
-            from utils.encryption import hash_phone
-            phone_hash = hash_phone(phone_number)
-            c.execute(
-                'SELECT id FROM lists WHERE phone_hash = %s AND LOWER(list_name) = LOWER(%s)',
-                (phone_hash, list_name)
-            )
-        else:
-            c.execute(
-                'SELECT id FROM lists WHERE phone_number = %s AND LOWER(list_name) = LOWER(%s)',
-                (phone_number, list_name)
-            )
-
-        list_result = c.fetchone()
-        if not list_result:
-            return False
-
-        list_id = list_result[0]
+        target, params = _target_list_cte(phone_number, list_name)
         c.execute(
-            '''UPDATE list_items SET completed = FALSE
-               WHERE list_id = %s AND LOWER(item_text) = LOWER(%s) AND completed = TRUE''',
-            (list_id, item_text)
+            target + '''
+            UPDATE list_items li SET completed = %s
+            FROM target
+            WHERE li.list_id = target.id AND LOWER(li.item_text) = LOWER(%s) AND li.completed = %s
+            RETURNING target.list_name, li.item_text
+            ''',
+            params + (completed, item_text, not completed)
         )
-        updated = c.rowcount > 0
+        result = c.fetchone()
         conn.commit()
-        return updated
+        return result
     except Exception as e:
-        logger.error(f"Error marking item incomplete: {e}")
-        return False
+        logger.error(f"Error marking item {'complete' if completed else 'incomplete'}: {e}")
+        return None
     finally:
         if conn:
             return_db_connection(conn)
@@ -393,42 +453,32 @@ def find_item_in_any_list(phone_number: str, item_text: str) -> list[tuple[int,
             return_db_connection(conn)
 
 
-def delete_list_item(phone_number: str, list_name: str, item_text: str) -> bool:
-    """Delete an item from a list"""
+def delete_list_item(phone_number: str, list_name: str, item_text: str) -> Optional[tuple[str, str]]:
+    """Delete an item from a list.
+
+    Returns (list_name, item_text) as stored, or None if nothing matched.
+    """
     conn = None
     try:
         conn = get_db_connection()
         c = conn.cursor()
 
-        # Find the list first
-        if ENCRYPTION_ENABLED:
-            from utils.encryption import hash_phone
-            phone_hash = hash_phone(phone_number)
-            c.execute(
-                'SELECT id FROM lists WHERE phone_hash = %s AND LOWER(list_name) = LOWER(%s)',
-                (phone_hash, list_name)
-            )
-        else:
-            c.execute(
-                'SELECT id FROM lists WHERE phone_number = %s AND LOWER(list_name) = LOWER(%s)',
-                (phone_number, list_name)
-            )
-
-        list_result = c.fetchone()
-        if not list_result:
-            return False
-
-        list_id = list_result[0]
+        target, params = _target_list_cte(phone_number, list_name)
         c.execute(
-            'DELETE FROM list_items WHERE list_id = %s AND LOWER(item_text) = LOWER(%s)',
-            (list_id, item_text)
+            target + '''
+            DELETE FROM list_items li
+            USING target
+            WHERE li.list_id = target.id AND LOWER(li.item_text) = LOWER(%s)
+            RETURNING target.list_name, li.item_text
+            ''',
+            params + (item_text,)
         )
-        deleted = c.rowcount > 0
+        result = c.fetchone()
         conn.commit()
-        return deleted
+        return result
     except Exception as e:
         logger.error(f"Error deleting list item: {e}")
-        return False
+        return None
     finally:
         if conn:
             return_db_connection(conn)
@@ -478,72 +528,75 @@ def delete_list(phone_number: str, list_name: str) -> bool:
             return_db_connection(conn)
 
 
-def rename_list(phone_number: str, old_name: str, new_name: str) -> bool:
-    """Rename a list"""
+# rename_list result when the user already has a list with the new name
+LIST_NAME_TAKEN = object()
+
+
+def rename_list(phone_number: str, old_name: str, new_name: str) -> Any:
+    """Rename a list.
+
+    Returns the list's previous name as stored, LIST_NAME_TAKEN if another
+    of the user's lists already has the new name, or None if no list matched.
+    """
     conn = None
     try:
         conn = get_db_connection()
         c = conn.cursor()
 
-        if ENCRYPTION_ENABLED:
-            from utils.encryption import hash_phone
-            phone_hash = hash_phone(phone_number)
-            c.execute(
-                '''UPDATE lists SET list_name = %s
-                   WHERE phone_hash = %s AND LOWER(list_name) = LOWER(%s)''',
-                (new_name, phone_hash, old_name)
-            )
-        else:
-            c.execute(
-                '''UPDATE lists SET list_name = %s
-                   WHERE phone_number = %s AND LOWER(list_name) = LOWER(%s)''',
-                (new_name, phone_number, old_name)
-            )
-
-        updated = c.rowcount > 0
+        target, params = _target_list_cte(phone_number, old_name)
+        c.execute(
+            target + '''
+            UPDATE lists SET list_name = %s
+            FROM target
+            WHERE lists.id = target.id
+            RETURNING target.list_name
+            ''',
+            params + (new_name,)
+        )
+        result = c.fetchone()
         conn.commit()
-        return updated
+        return result[0] if result else None
+    except psycopg2.errors.UniqueViolation:
+        conn.rollback()
+        return LIST_NAME_TAKEN
     except Exception as e:
         logger.error(f"Error renaming list: {e}")
-        return False
+        return None
     finally:
         if conn:
             return_db_connection(conn)
 
 
-def clear_list(phone_number: str, list_name: str) -> bool:
-    """Remove all items from a list (but keep the list)"""
+def clear_list(phone_number: str, list_name: str) -> Optional[tuple[str, int]]:
+    """Remove all items from a list (but keep the list).
+
+    Returns (list_name, items_removed), or None if no list matched.
+    """
     conn = None
     try:
         conn = get_db_connection()
         c = conn.cursor()
 
-        # Find the list first
-        if ENCRYPTION_ENABLED:
-            from utils.encryption import hash_phone
-            phone_hash = hash_phone(phone_number)
-            c.execute(
-                'SELECT id FROM lists WHERE phone_hash = %s AND LOWER(list_name) = LOWER(%s)',
-                (phone_hash, list_name)
-            )
-        else:
-            c.execute(
-                'SELECT id FROM lists WHERE phone_number = %s AND LOWER(list_name) = LOWER(%s)',
-                (phone_number, list_name)
+        target, params = _target_list_cte(phone_number, list_name)
+        c.execute(
+            target + ''', removed AS (
+                DELETE FROM list_items li
+                USING target
+                WHERE li.list_id = target.id
+                RETURNING li.id
             )
-
-        list_result = c.fetchone()
-        if not list_result:
-            return False
-
-        list_id = list_result[0]
-        c.execute('DELETE FROM list_items WHERE list_id = %s', (list_id,))
+            SELECT target.list_name, (SELECT COUNT(*) FROM removed) FROM target
+            ''',
+            params
+        )
+        result = c.fetchone()
         conn.commit()
-        logger.info(f"Cleared all items from list '{list_name}'")
-        return True
+        if result:
+            logger.info(f"Cleared all items from list '{result[0]}'")
+        return result
     except Exception as e:
         logger.error(f"Error clearing list: {e}")
-        return False
+        return None
     finally:
         if conn:
             return_db_connection(conn)
@@ -9,7 +9,7 @@ from datetime import datetime
 from typing import Any, Optional
 
 from database import get_db_connection, return_db_connection
-from config import logger, ENCRYPTION_ENABLED
+from config import logger, ENCRYPTION_ENABLED, MEMORY_CONTEXT_RECENT
 
 # Common words to ignore when comparing memory similarity
 _STOP_WORDS = frozenset({
@@ -37,10 +37,8 @@ def _extract_keywords(text: str) -> set[str]:
     return {w for w in words if w not in _STOP_WORDS and len(w) > 1}
 
 
-def _memory_similarity(text_a: str, text_b: str) -> float:
-    """Calculate Jaccard similarity between two memory texts based on keywords."""
-    keywords_a = _extract_keywords(text_a)
-    keywords_b = _extract_keywords(text_b)
+def _keyword_similarity(keywords_a: set[str], keywords_b: set[str]) -> float:
+    """Calculate Jaccard similarity between two keyword sets."""
     if not keywords_a or not keywords_b:
         return 0.0
     intersection = keywords_a & keywords_b
@@ -48,34 +46,40 @@ def _memory_similarity(text_a: str, text_b: str) -> float:
     return len(intersection) / len(union)
 
 
+# Candidates share at least one stored keyword (GIN index on memories.keywords)
+_SIMILAR_CANDIDATES_QUERY = '''
+    SELECT id, keywords FROM memories
+    WHERE {column} = %s AND keywords && %s::text[]
+'''
+
+
 def _find_similar_memory(cursor, phone_number: str, memory_text: str) -> Optional[int]:
-    """Find an existing memory with high keyword overlap. Returns the memory ID or None."""
+    """Find an existing memory with high keyword overlap. Returns the memory ID or None.
+
+    Only memories sharing a keyword with the new text are fetched, so the cost
+    scales with overlap rather than with the user's total memory count.
+    """
+    new_keywords = _extract_keywords(memory_text)
+    if not new_keywords:
+        return None
+    keyword_list = sorted(new_keywords)
+
     if ENCRYPTION_ENABLED:
         from utils.encryption import hash_phone
         phone_hash = hash_phone(phone_number)
-        cursor.execute(
-            'SELECT id, memory_text FROM memories WHERE phone_hash = %s',
-            (phone_hash,)
-        )
+        cursor.execute(_SIMILAR_CANDIDATES_QUERY.format(column='phone_hash'), (phone_hash, keyword_list))
         results = cursor.fetchall()
         if not results:
-            cursor.execute(
-                'SELECT id, memory_text FROM memories WHERE phone_number = %s',
-                (phone_number,)
-            )
+            cursor.execute(_SIMILAR_CANDIDATES_QUERY.format(column='phone_number'), (phone_number, keyword_list))
             results = cursor.fetchall()
     else:
-        cursor.execute(
-            'SELECT id, memory_text FROM memories WHERE phone_number = %s',
-            (phone_number,)
-        )
+        cursor.execute(_SIMILAR_CANDIDATES_QUERY.format(column='phone_number'), (phone_number, keyword_list))
         results = cursor.fetchall()
 
     best_id = None
     best_score = 0.0
-    new_keywords = _extract_keywords(memory_text)
-    for mem_id, existing_text in results:
-        score = _memory_similarity(memory_text, existing_text)
+    for mem_id, existing_keywords in results:
+        score = _keyword_similarity(new_keywords, set(existing_keywords))
         if score > best_score:
             best_score = score
             best_id = mem_id
@@ -91,6 +95,18 @@ def _find_similar_memory(cursor, phone_number: str, memory_text: str) -> Optiona
     return None
 
 
+def _store_embedding(cursor, memory_id: int, keywords: list[str]) -> None:
+    """Store the retrieval embedding for a memory (no-op without pgvector)."""
+    from utils.embeddings import embed_keywords, embeddings_available, to_vector_literal
+    if not embeddings_available(cursor):
+        return
+    embedding = embed_keywords(keywords)
+    cursor.execute(
+        'UPDATE memories SET embedding = %s::vector WHERE id = %s',
+        (to_vector_literal(embedding) if embedding else None, memory_id)
+    )
+
+
 def save_memory(phone_number: str, memory_text: str, parsed_data: dict[str, Any]) -> bool:
     """Save a memory, updating an existing similar memory if found.
 
@@ -103,6 +119,7 @@ def save_memory(phone_number: str, memory_text: str, parsed_data: dict[str, Any]
 
         # Check for existing similar memory to update
         existing_id = _find_similar_memory(c, phone_number, memory_text)
+        keywords = sorted(_extract_keywords(memory_text))
 
         if existing_id:
             # Update existing memory
@@ -111,16 +128,17 @@ def save_memory(phone_number: str, memory_text: str, parsed_data: dict[str, Any]
                 memory_text_encrypted = encrypt_field(memory_text)
                 c.execute(
                     '''UPDATE memories SET memory_text = %s, memory_text_encrypted = %s,
-                       parsed_data = %s, created_at = NOW()
+                       parsed_data = %s, keywords = %s, created_at = NOW()
                        WHERE id = %s''',
-                    (memory_text, memory_text_encrypted, json.dumps(parsed_data), existing_id)
+                    (memory_text, memory_text_encrypted, json.dumps(parsed_data), keywords, existing_id)
                 )
             else:
                 c.execute(
-                    '''UPDATE memories SET memory_text = %s, parsed_data = %s, created_at = NOW()
+                    '''UPDATE memories SET memory_text = %s, parsed_data = %s, keywords = %s, created_at = NOW()
                        WHERE id = %s''',
-                    (memory_text, json.dumps(parsed_data), existing_id)
+                    (memory_text, json.dumps(parsed_data), keywords, existing_id)
                 )
+            _store_embedding(c, existing_id, keywords)
             conn.commit()
             logger.info(f"Updated existing memory {existing_id} for user")
             return True
@@ -131,15 +149,16 @@ def save_memory(phone_number: str, memory_text: str, parsed_data: dict[str, Any]
                 phone_hash = hash_phone(phone_number)
                 memory_text_encrypted = encrypt_field(memory_text)
                 c.execute(
-                    '''INSERT INTO memories (phone_number, phone_hash, memory_text, memory_text_encrypted, parsed_data)
-                       VALUES (%s, %s, %s, %s, %s)''',
-                    (phone_number, phone_hash, memory_text, memory_text_encrypted, json.dumps(parsed_data))
+                    '''INSERT INTO memories (phone_number, phone_hash, memory_text, memory_text_encrypted, parsed_data, keywords)
+                       VALUES (%s, %s, %s, %s, %s, %s) RETURNING id''',
+                    (phone_number, phone_hash, memory_text, memory_text_encrypted, json.dumps(parsed_data), keywords)
                 )
             else:
                 c.execute(
-                    'INSERT INTO memories (phone_number, memory_text, parsed_data) VALUES (%s, %s, %s)',
-                    (phone_number, memory_text, json.dumps(parsed_data))
+                    'INSERT INTO memories (phone_number, memory_text, parsed_data, keywords) VALUES (%s, %s, %s, %s) RETURNING id',
+                    (phone_number, memory_text, json.dumps(parsed_data), keywords)
                 )
+            _store_embedding(c, c.fetchone()[0], keywords)
             conn.commit()
             logger.info(f"Saved new memory for user")
             return False
@@ -187,6 +206,71 @@ def get_memories(phone_number: str) -> list[tuple[int, str, str, datetime]]:
         if conn:
             return_db_connection(conn)
 
+# Most recent memories plus the nearest others to the message (cosine distance),
+# returned newest first like get_memories
+_RELEVANT_MEMORIES_QUERY = '''
+    WITH recent AS (
+        SELECT id, memory_text, parsed_data, created_at FROM memories
+        WHERE {column} = %(value)s
+        ORDER BY created_at DESC
+        LIMIT %(recent)s
+    ), relevant AS (
+        SELECT id, memory_text, parsed_data, created_at FROM memories
+        WHERE {column} = %(value)s AND embedding IS NOT NULL
+          AND id NOT IN (SELECT id FROM recent)
+        ORDER BY embedding <=> %(embedding)s::vector
+        LIMIT %(relevant)s
+    )
+    SELECT * FROM (SELECT * FROM recent UNION ALL SELECT * FROM relevant) m
+    ORDER BY created_at DESC
+'''
+
+
+def get_relevant_memories(phone_number: str, message: str, limit: int) -> list[tuple[int, str, str, datetime]]:
+    """Get up to `limit` memories for the AI context: the most recent few plus
+    those closest to the message by local embedding.
+
+    Falls back to the `limit` most recent memories when pgvector isn't
+    installed or the message has no keywords.
+    Returns tuples like get_memories: (id, memory_text, parsed_data, created_at)
+    """
+    conn = None
+    try:
+        conn = get_db_connection()
+        c = conn.cursor()
+
+        from utils.embeddings import embed_keywords, embeddings_available, to_vector_literal
+        embedding = embed_keywords(_extract_keywords(message))
+        if not embedding or not embeddings_available(c):
+            return get_memories(phone_number)[:limit]
+
+        recent = min(MEMORY_CONTEXT_RECENT, limit)
+        params = {
+            'recent': recent,
+            'relevant': limit - recent,
+            'embedding': to_vector_literal(embedding),
+        }
+
+        if ENCRYPTION_ENABLED:
+            from utils.encryption import hash_phone
+            c.execute(_RELEVANT_MEMORIES_QUERY.format(column='phone_hash'), {**params, 'value': hash_phone(phone_number)})
+            results = c.fetchall()
+            if not results:
+                # Fallback for data created before encryption
+                c.execute(_RELEVANT_MEMORIES_QUERY.format(column='phone_number'), {**params, 'value': phone_number})
+                results = c.fetchall()
+        else:
+            c.execute(_RELEVANT_MEMORIES_QUERY.format(column='phone_number'), {**params, 'value': phone_number})
+            results = c.fetchall()
+
+        return results
+    except Exception as e:
+        logger.error(f"Error getting relevant memories: {e}")
+        return []
+    finally:
+        if conn:
+            return_db_connection(conn)
+
 def delete_all_memories(phone_number: str) -> None:
     """Delete all memories for a user"""
     conn = None
@@ -212,43 +296,17 @@ def delete_all_memories(phone_number: str) -> None:
 
 
 def search_memories(phone_number: str, search_term: str) -> list[tuple[int, str, datetime]]:
-    """Search memories by keyword (case-insensitive)"""
+    """Search memories by keyword, best matches first (see utils.text_search)"""
     conn = None
     try:
         conn = get_db_connection()
         c = conn.cursor()
 
-        search_pattern = f'%{search_term}%'
-
-        if ENCRYPTION_ENABLED:
-            from utils.encryption import hash_phone
-            phone_hash = hash_phone(phone_number)
-            c.execute(
-                '''SELECT id, memory_text, created_at FROM memories
-                   WHERE phone_hash = %s AND LOWER(memory_text) LIKE LOWER(%s)
-                   ORDER BY created_at DESC''',
-                (phone_hash, search_pattern)
-            )
-            results = c.fetchall()
-            if not results:
-                # Fallback for memories created before encryption
-                c.execute(
-                    '''SELECT id, memory_text, created_at FROM memories
-                       WHERE phone_number = %s AND LOWER(memory_text) LIKE LOWER(%s)
-                       ORDER BY created_at DESC''',
-                    (phone_number, search_pattern)
-                )
-                results = c.fetchall()
-        else:
-            c.execute(
-                '''SELECT id, memory_text, created_at FROM memories
-                   WHERE phone_number = %s AND LOWER(memory_text) LIKE LOWER(%s)
-                   ORDER BY created_at DESC''',
-                (phone_number, search_pattern)
-            )
-            results = c.fetchall()
-
-        return results
+        from utils.text_search import ranked_search
+        return ranked_search(
+            c, 'memories', 'id, memory_text, created_at', 'memory_text',
+            phone_number, search_term, order_by='created_at DESC'
+        )
     except Exception as e:
         logger.error(f"Error searching memories: {e}")
         return []
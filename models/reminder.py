@@ -6,7 +6,7 @@ Handles all reminder-related database operations
 from datetime import date, datetime, timedelta, time
 from typing import Any, Optional
 
-from database import get_db_connection, return_db_connection
+from database import get_db_connection, return_db_connection, register_prepared_statement, execute_prepared
 from config import logger, ENCRYPTION_ENABLED
 
 def save_reminder(phone_number: str, reminder_text: str, reminder_date: datetime) -> None:
@@ -116,6 +116,91 @@ def get_user_reminders(phone_number: str) -> list[tuple[int, datetime, str, Opti
             return_db_connection(conn)
 
 
+# Each branch picks its rows (the next pending page, the latest sent); the
+# outer ORDER BY returns pending then sent, each oldest first
+_REMINDER_WINDOW_QUERY = '''
+    (SELECT id, reminder_date, reminder_text, recurring_id, sent
+     FROM reminders
+     WHERE {column} = %s AND sent = FALSE
+     ORDER BY reminder_date, id
+     LIMIT %s OFFSET %s)
+    UNION ALL
+    (SELECT id, reminder_date, reminder_text, recurring_id, sent
+     FROM reminders
+     WHERE {column} = %s AND sent = TRUE AND reminder_date >= %s
+     ORDER BY reminder_date DESC, id DESC
+     LIMIT %s)
+    ORDER BY sent, reminder_date, id
+'''
+
+_REMINDER_COUNTS_QUERY = '''
+    SELECT COUNT(*) FILTER (WHERE sent = FALSE), COUNT(*) FILTER (WHERE sent = TRUE)
+    FROM reminders
+    WHERE {column} = %s
+'''
+
+
+def get_reminder_window(
+    phone_number: str,
+    pending_limit: Optional[int] = None,
+    pending_offset: int = 0,
+    sent_limit: Optional[int] = 0,
+    sent_since: Optional[datetime] = None,
+) -> dict[str, Any]:
+    """Get a bounded window of a user's reminders instead of their full history.
+
+    Args:
+        phone_number: User's phone number
+        pending_limit: Max pending reminders to return (None for all)
+        pending_offset: Pending reminders to skip, for paging
+        sent_limit: Max most recent sent reminders to return (None for all)
+        sent_since: Only include sent reminders dated at or after this (UTC)
+
+    Returns:
+        Dict with 'pending' (soonest first), 'sent' (oldest first, the last
+        sent_limit only), 'pending_total' and 'sent_total'. Reminder tuples
+        match get_user_reminders: (id, reminder_date, reminder_text, recurring_id, sent)
+    """
+    conn = None
+    try:
+        conn = get_db_connection()
+        c = conn.cursor()
+
+        def fetch(column, value):
+            c.execute(_REMINDER_COUNTS_QUERY.format(column=column), (value,))
+            pending_total, sent_total = c.fetchone()
+            rows = []
+            if pending_total or sent_total:
+                c.execute(
+                    _REMINDER_WINDOW_QUERY.format(column=column),
+                    (value, pending_limit, pending_offset, value, sent_since or datetime.min, sent_limit)
+                )
+                rows = c.fetchall()
+            return {
+                'pending': [r for r in rows if not r[4]],
+                'sent': [r for r in rows if r[4]],
+                'pending_total': pending_total,
+                'sent_total': sent_total,
+            }
+
+        if ENCRYPTION_ENABLED:
+            from utils.encryption import hash_phone
+            window = fetch('phone_hash', hash_phone(phone_number))
+            if not window['pending_total'] and not window['sent_total']:
+                # Fallback for reminders created before encryption
+                window = fetch('phone_number', phone_number)
+        else:
+            window = fetch('phone_number', phone_number)
+
+        return window
+    except Exception as e:
+        logger.error(f"Error getting reminder window: {e}")
+        return {'pending': [], 'sent': [], 'pending_total': 0, 'sent_total': 0}
+    finally:
+        if conn:
+            return_db_connection(conn)
+
+
 def get_pending_reminders(phone_number: str) -> list[tuple[int, str, datetime]]:
     """Get all pending (not yet sent) reminders for a user with IDs"""
     conn = None
@@ -229,44 +314,23 @@ def get_reminders_for_date(phone_number: str, target_date: date, timezone_str: s
             return_db_connection(conn)
 
 
-def search_pending_reminders(phone_number: str, search_term: str) -> list[tuple[int, str, datetime]]:
-    """Search pending reminders by keyword (case-insensitive)"""
+def search_pending_reminders(phone_number: str, search_term: str,
+                             strict: bool = False) -> list[tuple[int, str, datetime]]:
+    """Search pending reminders by keyword, best matches first (see utils.text_search)
+
+    With strict=True only reminders containing every search term match.
+    """
     conn = None
     try:
         conn = get_db_connection()
         c = conn.cursor()
 
-        search_pattern = f'%{search_term}%'
-
-        if ENCRYPTION_ENABLED:
-            from utils.encryption import hash_phone
-            phone_hash = hash_phone(phone_number)
-            c.execute(
-                '''SELECT id, reminder_text, reminder_date FROM reminders
-                   WHERE phone_hash = %s AND sent = FALSE AND LOWER(reminder_text) LIKE LOWER(%s)
-                   ORDER BY reminder_date''',
-                (phone_hash, search_pattern)
-            )
-            results = c.fetchall()
-            if not results:
-                # Fallback for reminders created before encryption
-                c.execute(
-                    '''SELECT id, reminder_text, reminder_date FROM reminders
-                       WHERE phone_number = %s AND sent = FALSE AND LOWER(reminder_text) LIKE LOWER(%s)
-                       ORDER BY reminder_date''',
-                    (phone_number, search_pattern)
-                )
-                results = c.fetchall()
-        else:
-            c.execute(
-                '''SELECT id, reminder_text, reminder_date FROM reminders
-                   WHERE phone_number = %s AND sent = FALSE AND LOWER(reminder_text) LIKE LOWER(%s)
-                   ORDER BY reminder_date''',
-                (phone_number, search_pattern)
-            )
-            results = c.fetchall()
-
-        return results
+        from utils.text_search import ranked_search
+        return ranked_search(
+            c, 'reminders', 'id, reminder_text, reminder_date', 'reminder_text',
+            phone_number, search_term, where='AND sent = FALSE', order_by='reminder_date',
+            strict=strict
+        )
     except Exception as e:
         logger.error(f"Error searching pending reminders: {e}")
         return []
@@ -459,6 +523,25 @@ def mark_reminder_snoozed(reminder_id: int) -> None:
             return_db_connection(conn)
 
 
+register_prepared_statement('claim_due_reminders', """
+    WITH claimed AS (
+        SELECT id, phone_number, reminder_text
+        FROM reminders
+        WHERE reminder_date <= %s
+          AND sent = FALSE
+          AND (claimed_at IS NULL OR claimed_at < NOW() - INTERVAL '5 minutes')
+        ORDER BY reminder_date ASC
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE reminders r
+    SET claimed_at = NOW()
+    FROM claimed c
+    WHERE r.id = c.id
+    RETURNING r.id, r.phone_number, r.reminder_text
+""")
+
+
 def claim_due_reminders(batch_size: int = 10) -> list[dict[str, Any]]:
     """
     Atomically claim due reminders using SELECT FOR UPDATE SKIP LOCKED.
@@ -485,23 +568,7 @@ def claim_due_reminders(batch_size: int = 10) -> list[dict[str, Any]]:
         # 2. Locks them (other workers will skip these rows)
         # 3. Updates claimed_at to mark them as in-progress
         # 4. Returns the claimed reminders
-        c.execute("""
-            WITH claimed AS (
-                SELECT id, phone_number, reminder_text
-                FROM reminders
-                WHERE reminder_date <= %s
-                  AND sent = FALSE
-                  AND (claimed_at IS NULL OR claimed_at < NOW() - INTERVAL '5 minutes')
-                ORDER BY reminder_date ASC
-                LIMIT %s
-                FOR UPDATE SKIP LOCKED
-            )
-            UPDATE reminders r
-            SET claimed_at = NOW()
-            FROM claimed c
-            WHERE r.id = c.id
-            RETURNING r.id, r.phone_number, r.reminder_text
-        """, (now, batch_size))
+        execute_prepared(c, 'claim_due_reminders', (now, batch_size))
 
         results = c.fetchall()
         conn.commit()
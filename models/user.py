@@ -8,7 +8,7 @@ from datetime import date
 from typing import Any, Optional, Tuple
 
 from psycopg2 import sql
-from database import get_db_connection, return_db_connection
+from database import get_db_connection, return_db_connection, register_prepared_statement, execute_prepared
 from config import logger, ENCRYPTION_ENABLED
 from utils.db_helpers import USER_COLUMNS
 
@@ -43,6 +43,35 @@ ALLOWED_USER_FIELDS = {
     'pending_nudge_response',
 }
 
+# Per-message user lookups, run as named prepared statements. Each lookup has a
+# phone_hash variant and a phone_number variant (pre-encryption fallback).
+_PREPARED_USER_LOOKUPS = {
+    'user': USER_COLUMNS,
+    'pending_list_item': 'pending_list_item',
+    'pending_reminder_delete': 'pending_reminder_delete',
+    'pending_memory_delete': 'pending_memory_delete',
+    'pending_reminder_date': 'pending_reminder_text, pending_reminder_date',
+    'pending_list_create': 'pending_list_create',
+    'pending_reminder_confirmation': 'pending_reminder_confirmation',
+    'pending_nudge_response': 'pending_nudge_response',
+}
+for _lookup, _columns in _PREPARED_USER_LOOKUPS.items():
+    register_prepared_statement(f'{_lookup}_by_hash', f'SELECT {_columns} FROM users WHERE phone_hash = %s')
+    register_prepared_statement(f'{_lookup}_by_phone', f'SELECT {_columns} FROM users WHERE phone_number = %s')
+
+
+def _fetch_user_lookup(cursor: Any, lookup: str, phone_number: str) -> Optional[Tuple[Any, ...]]:
+    """Run a prepared users lookup by phone_hash, falling back to phone_number."""
+    if ENCRYPTION_ENABLED:
+        from utils.encryption import hash_phone
+        execute_prepared(cursor, f'{lookup}_by_hash', (hash_phone(phone_number),))
+        result = cursor.fetchone()
+        if result:
+            return result
+        # Fallback for users created before encryption was enabled
+    execute_prepared(cursor, f'{lookup}_by_phone', (phone_number,))
+    return cursor.fetchone()
+
 
 def get_user(phone_number: str) -> Optional[Tuple[Any, ...]]:
     """Get user info from database"""
@@ -51,19 +80,7 @@ def get_user(phone_number: str) -> Optional[Tuple[Any, ...]]:
         conn = get_db_connection()
         c = conn.cursor()
 
-        if ENCRYPTION_ENABLED:
-            from utils.encryption import hash_phone
-            phone_hash = hash_phone(phone_number)
-            # Try phone_hash first, fallback to phone_number for existing users
-            c.execute(f'SELECT {USER_COLUMNS} FROM users WHERE phone_hash = %s', (phone_hash,))
-            result = c.fetchone()
-            if not result:
-                # Fallback for users created before encryption was enabled
-                c.execute(f'SELECT {USER_COLUMNS} FROM users WHERE phone_number = %s', (phone_number,))
-                result = c.fetchone()
-        else:
-            c.execute(f'SELECT {USER_COLUMNS} FROM users WHERE phone_number = %s', (phone_number,))
-            result = c.fetchone()
+        result = _fetch_user_lookup(c, 'user', phone_number)
 
         return result
     except Exception as e:
@@ -286,17 +303,7 @@ def get_pending_list_item(phone_number: str) -> Optional[str]:
         conn = get_db_connection()
         c = conn.cursor()
 
-        if ENCRYPTION_ENABLED:
-            from utils.encryption import hash_phone
-            phone_hash = hash_phone(phone_number)
-            c.execute('SELECT pending_list_item FROM users WHERE phone_hash = %s', (phone_hash,))
-            result = c.fetchone()
-            if not result:
-                c.execute('SELECT pending_list_item FROM users WHERE phone_number = %s', (phone_number,))
-                result = c.fetchone()
-        else:
-            c.execute('SELECT pending_list_item FROM users WHERE phone_number = %s', (phone_number,))
-            result = c.fetchone()
+        result = _fetch_user_lookup(c, 'pending_list_item', phone_number)
 
         if result and result[0]:
             return result[0]
@@ -316,17 +323,7 @@ def get_pending_reminder_delete(phone_number: str) -> Optional[str]:
         conn = get_db_connection()
         c = conn.cursor()
 
-        if ENCRYPTION_ENABLED:
-            from utils.encryption import hash_phone
-            phone_hash = hash_phone(phone_number)
-            c.execute('SELECT pending_reminder_delete FROM users WHERE phone_hash = %s', (phone_hash,))
-            result = c.fetchone()
-            if not result:
-                c.execute('SELECT pending_reminder_delete FROM users WHERE phone_number = %s', (phone_number,))
-                result = c.fetchone()
-        else:
-            c.execute('SELECT pending_reminder_delete FROM users WHERE phone_number = %s', (phone_number,))
-            result = c.fetchone()
+        result = _fetch_user_lookup(c, 'pending_reminder_delete', phone_number)
 
         if result and result[0]:
             return result[0]
@@ -346,17 +343,7 @@ def get_pending_memory_delete(phone_number: str) -> Optional[str]:
         conn = get_db_connection()
         c = conn.cursor()
 
-        if ENCRYPTION_ENABLED:
-            from utils.encryption import hash_phone
-            phone_hash = hash_phone(phone_number)
-            c.execute('SELECT pending_memory_delete FROM users WHERE phone_hash = %s', (phone_hash,))
-            result = c.fetchone()
-            if not result:
-                c.execute('SELECT pending_memory_delete FROM users WHERE phone_number = %s', (phone_number,))
-                result = c.fetchone()
-        else:
-            c.execute('SELECT pending_memory_delete FROM users WHERE phone_number = %s', (phone_number,))
-            result = c.fetchone()
+        result = _fetch_user_lookup(c, 'pending_memory_delete', phone_number)
 
         if result and result[0]:
             return result[0]
@@ -376,17 +363,7 @@ def get_pending_reminder_date(phone_number: str) -> Optional[dict[str, Any]]:
         conn = get_db_connection()
         c = conn.cursor()
 
-        if ENCRYPTION_ENABLED:
-            from utils.encryption import hash_phone
-            phone_hash = hash_phone(phone_number)
-            c.execute('SELECT pending_reminder_text, pending_reminder_date FROM users WHERE phone_hash = %s', (phone_hash,))
-            result = c.fetchone()
-            if not result:
-                c.execute('SELECT pending_reminder_text, pending_reminder_date FROM users WHERE phone_number = %s', (phone_number,))
-                result = c.fetchone()
-        else:
-            c.execute('SELECT pending_reminder_text, pending_reminder_date FROM users WHERE phone_number = %s', (phone_number,))
-            result = c.fetchone()
+        result = _fetch_user_lookup(c, 'pending_reminder_date', phone_number)
 
         if result and result[1]:
             pending_date = result[1]
@@ -416,17 +393,7 @@ def get_pending_list_create(phone_number: str) -> Optional[str]:
         conn = get_db_connection()
         c = conn.cursor()
 
-        if ENCRYPTION_ENABLED:
-            from utils.encryption import hash_phone
-            phone_hash = hash_phone(phone_number)
-            c.execute('SELECT pending_list_create FROM users WHERE phone_hash = %s', (phone_hash,))
-            result = c.fetchone()
-            if not result:
-                c.execute('SELECT pending_list_create FROM users WHERE phone_number = %s', (phone_number,))
-                result = c.fetchone()
-        else:
-            c.execute('SELECT pending_list_create FROM users WHERE phone_number = %s', (phone_number,))
-            result = c.fetchone()
+        result = _fetch_user_lookup(c, 'pending_list_create', phone_number)
 
         if result and result[0]:
             return result[0]
@@ -687,17 +654,7 @@ def get_pending_reminder_confirmation(phone_number: str) -> Optional[dict[str, A
         conn = get_db_connection()
         c = conn.cursor()
 
-        if ENCRYPTION_ENABLED:
-            from utils.encryption import hash_phone
-            phone_hash = hash_phone(phone_number)
-            c.execute('SELECT pending_reminder_confirmation FROM users WHERE phone_hash = %s', (phone_hash,))
-            result = c.fetchone()
-            if not result:
-                c.execute('SELECT pending_reminder_confirmation FROM users WHERE phone_number = %s', (phone_number,))
-                result = c.fetchone()
-        else:
-            c.execute('SELECT pending_reminder_confirmation FROM users WHERE phone_number = %s', (phone_number,))
-            result = c.fetchone()
+        result = _fetch_user_lookup(c, 'pending_reminder_confirmation', phone_number)
 
         if result and result[0]:
             return json.loads(result[0])
@@ -1042,17 +999,7 @@ def get_pending_nudge_response(phone_number: str) -> Optional[dict[str, Any]]:
         conn = get_db_connection()
         c = conn.cursor()
 
-        if ENCRYPTION_ENABLED:
-            from utils.encryption import hash_phone
-            phone_hash = hash_phone(phone_number)
-            c.execute('SELECT pending_nudge_response FROM users WHERE phone_hash = %s', (phone_hash,))
-            result = c.fetchone()
-            if not result:
-                c.execute('SELECT pending_nudge_response FROM users WHERE phone_number = %s', (phone_number,))
-                result = c.fetchone()
-        else:
-            c.execute('SELECT pending_nudge_response FROM users WHERE phone_number = %s', (phone_number,))
-            result = c.fetchone()
+        result = _fetch_user_lookup(c, 'pending_nudge_response', phone_number)
 
         if result and result[0]:
             return json.loads(result[0])
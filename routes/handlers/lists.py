@@ -10,11 +10,12 @@ from config import logger, ENVIRONMENT
 from models.user import create_or_update_user, get_last_active_list
 from models.list_model import (
     create_list, get_list_by_name, get_lists, get_list_items,
-    add_list_item, get_item_count, mark_item_complete, mark_item_incomplete,
+    add_list_items, mark_item_complete, mark_item_incomplete,
     delete_list_item, delete_list as db_delete_list, clear_list as db_clear_list,
-    rename_list as db_rename_list, find_item_in_any_list
+    rename_list as db_rename_list, find_item_in_any_list, LIST_NAME_TAKEN
 )
 from services.ai_service import parse_list_items
+from utils.formatting import format_list_items_added, format_list_add_failed
 from utils.validation import (
     validate_list_name, validate_item_text,
     detect_sensitive_data, get_sensitive_data_warning
@@ -76,7 +77,7 @@ def handle_add_to_list(
 ) -> str:
     """Handle add_to_list action."""
     from services.tier_service import (
-        can_create_list, can_add_list_item, get_tier_limits, get_user_tier,
+        can_create_list, get_tier_limits, get_user_tier,
         format_list_limit_message, format_list_item_limit_message,
         add_list_item_counter_to_message, add_list_counter_to_message
     )
@@ -124,69 +125,60 @@ def handle_add_to_list(
             tier_limits = get_tier_limits(get_user_tier(phone_number))
             max_items = tier_limits['max_items_per_list']
 
-            added_items = []
-            for item in items_to_add:
-                if len(added_items) < max_items:
-                    add_list_item(list_id, phone_number, item)
-                    added_items.append(item)
+            result = add_list_items(list_id, phone_number, items_to_add, max_items)
+            added_items = result['added']
 
             create_or_update_user(phone_number, last_active_list=list_name)
 
             # Handle partial or full adds with progressive education
-            if len(added_items) < len(items_to_add):
+            if result['error']:
+                reply_text = format_list_add_failed(list_name)
+            elif result['skipped']:
                 # Some items skipped - use Level 4 formatter
                 reply_text = format_list_item_limit_message(
-                    phone_number, list_name, items_to_add, len(added_items)
+                    phone_number, list_name, added_items + result['skipped'], len(added_items)
                 )
             else:
                 # All items added successfully
-                if len(added_items) == 1:
-                    base_reply = f"Created your {list_name} and added {added_items[0]}!"
-                else:
-                    base_reply = f"Created your {list_name} and added {len(added_items)} items: {', '.join(added_items)}"
+                base_reply = format_list_items_added(list_name, added_items, result['duplicates'], created=True)
 
                 # Add list counter (for list creation) and item counter
                 reply_text = add_list_counter_to_message(phone_number, base_reply)
-                reply_text = add_list_item_counter_to_message(phone_number, list_id, reply_text)
+                reply_text = add_list_item_counter_to_message(
+                    phone_number, list_id, reply_text, result['item_count']
+                )
     else:
         list_id = list_info[0]
         list_name = list_info[1]
 
-        allowed, limit_msg = can_add_list_item(phone_number, list_id)
-        if not allowed:
-            # List is already full - use Level 4 formatter
-            reply_text = format_list_item_limit_message(
-                phone_number, list_name, items_to_add, 0
-            )
-        else:
-            tier_limits = get_tier_limits(get_user_tier(phone_number))
-            max_items = tier_limits['max_items_per_list']
-            item_count = get_item_count(list_id)
-            available_slots = max_items - item_count
+        tier_limits = get_tier_limits(get_user_tier(phone_number))
+        max_items = tier_limits['max_items_per_list']
 
-            added_items = []
-            for item in items_to_add:
-                if len(added_items) < available_slots:
-                    add_list_item(list_id, phone_number, item)
-                    added_items.append(item)
+        # Capacity is checked in the same statement as the insert; a full
+        # list comes back with every item skipped
+        result = add_list_items(list_id, phone_number, items_to_add, max_items)
+        added_items = result['added']
 
+        if added_items or not result['skipped']:
             create_or_update_user(phone_number, last_active_list=list_name)
 
-            # Handle partial or full adds with progressive education
-            if len(added_items) < len(items_to_add):
-                # Some items skipped - use Level 4 formatter
-                reply_text = format_list_item_limit_message(
-                    phone_number, list_name, items_to_add, len(added_items)
-                )
-            else:
-                # All items added successfully
-                if len(added_items) == 1:
-                    base_reply = ai_response.get("confirmation", f"Added {added_items[0]} to your {list_name}")
-                else:
-                    base_reply = f"Added {len(added_items)} items to your {list_name}: {', '.join(added_items)}"
+        # Handle partial or full adds with progressive education
+        if result['error']:
+            reply_text = format_list_add_failed(list_name)
+        elif result['skipped']:
+            # Some items skipped - use Level 4 formatter
+            reply_text = format_list_item_limit_message(
+                phone_number, list_name, added_items + result['skipped'], len(added_items)
+            )
+        else:
+            base_reply = format_list_items_added(
+                list_name, added_items, result['duplicates'], confirmation=ai_response.get("confirmation")
+            )
 
-                # Add progressive counter
-                reply_text = add_list_item_counter_to_message(phone_number, list_id, base_reply)
+            # Add progressive counter
+            reply_text = add_list_item_counter_to_message(
+                phone_number, list_id, base_reply, result['item_count']
+            )
 
     log_interaction(phone_number, incoming_msg, reply_text, "add_to_list", True)
     return reply_text
@@ -199,7 +191,7 @@ def handle_add_item_ask_list(
 ) -> str:
     """Handle add_item_ask_list action - when list name is ambiguous."""
     from services.tier_service import (
-        can_add_list_item, get_tier_limits, get_user_tier,
+        get_tier_limits, get_user_tier,
         format_list_item_limit_message, add_list_item_counter_to_message
     )
 
@@ -213,41 +205,34 @@ def handle_add_item_ask_list(
 
         items_to_add = parse_list_items(item_text, phone_number)
 
-        allowed, limit_msg = can_add_list_item(phone_number, list_id)
-        if not allowed:
-            # List is full - use Level 4 formatter
-            reply_text = format_list_item_limit_message(
-                phone_number, list_name, items_to_add, 0
-            )
-        else:
-            tier_limits = get_tier_limits(get_user_tier(phone_number))
-            max_items = tier_limits['max_items_per_list']
-            item_count = get_item_count(list_id)
-            available_slots = max_items - item_count
+        tier_limits = get_tier_limits(get_user_tier(phone_number))
+        max_items = tier_limits['max_items_per_list']
 
-            added_items = []
-            for item in items_to_add:
-                if len(added_items) < available_slots:
-                    add_list_item(list_id, phone_number, item)
-                    added_items.append(item)
+        # Capacity is checked in the same statement as the insert; a full
+        # list comes back with every item skipped
+        result = add_list_items(list_id, phone_number, items_to_add, max_items)
+        added_items = result['added']
 
+        if added_items or not result['skipped']:
             create_or_update_user(phone_number, last_active_list=list_name)
 
-            # Handle partial or full adds with progressive education
-            if len(added_items) < len(items_to_add):
-                # Some items skipped - use Level 4 formatter
-                reply_text = format_list_item_limit_message(
-                    phone_number, list_name, items_to_add, len(added_items)
-                )
-            else:
-                # All items added successfully
-                if len(added_items) == 1:
-                    base_reply = f"Added {added_items[0]} to your {list_name}"
-                else:
-                    base_reply = f"Added {len(added_items)} items to your {list_name}: {', '.join(added_items)}"
+        # Handle partial or full adds with progressive education
+        if result['error']:
+            reply_text = format_list_add_failed(list_name)
+        elif result['skipped']:
+            # Some items skipped - use Level 4 formatter
+            reply_text = format_list_item_limit_message(
+                phone_number, list_name, added_items + result['skipped'], len(added_items)
+            )
+        else:
+            base_reply = format_list_items_added(
+                list_name, added_items, result['duplicates']
+            )
 
-                # Add progressive counter
-                reply_text = add_list_item_counter_to_message(phone_number, list_id, base_reply)
+            # Add progressive counter
+            reply_text = add_list_item_counter_to_message(
+                phone_number, list_id, base_reply, result['item_count']
+            )
 
     elif len(lists) > 1:
         # Multiple lists, ask which one
@@ -466,11 +451,10 @@ def handle_clear_list(
 ) -> str:
     """Handle clear_list action - remove all items from list."""
     list_name = ai_response.get("list_name")
-    list_info = get_list_by_name(phone_number, list_name)
+    cleared = db_clear_list(phone_number, list_name)
 
-    if list_info:
-        db_clear_list(phone_number, list_info[1])
-        reply_text = f"Cleared all items from your {list_info[1]}."
+    if cleared:
+        reply_text = f"Cleared all items from your {cleared[0]}."
     else:
         reply_text = f"I couldn't find a list called '{list_name}'."
 
@@ -487,17 +471,17 @@ def handle_rename_list(
     old_name = ai_response.get("old_name")
     new_name = ai_response.get("new_name")
 
-    list_info = get_list_by_name(phone_number, old_name)
-
-    if list_info:
-        is_valid, result = validate_list_name(new_name)
-        if is_valid:
-            db_rename_list(phone_number, list_info[1], result)
-            reply_text = f"Renamed '{list_info[1]}' to '{result}'."
-        else:
-            reply_text = result
+    is_valid, result = validate_list_name(new_name)
+    if not is_valid:
+        reply_text = result
     else:
-        reply_text = f"I couldn't find a list called '{old_name}'."
+        previous_name = db_rename_list(phone_number, old_name, result)
+        if previous_name is LIST_NAME_TAKEN:
+            reply_text = f"You already have a list called '{result}'."
+        elif previous_name:
+            reply_text = f"Renamed '{previous_name}' to '{result}'."
+        else:
+            reply_text = f"I couldn't find a list called '{old_name}'."
 
     log_interaction(phone_number, incoming_msg, reply_text, "rename_list", True)
     return reply_text
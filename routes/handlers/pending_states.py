@@ -26,12 +26,12 @@ from models.reminder import (
 )
 from models.list_model import (
     get_list_by_name, get_lists, get_list_items,
-    add_list_item, delete_list_item, get_item_count, rename_list,
+    add_list_items, delete_list_item, rename_list,
     get_next_available_list_name, create_list
 )
 from models.memory import delete_memory
 from utils.timezone import get_user_current_time
-from utils.formatting import format_reminder_confirmation
+from utils.formatting import format_reminder_confirmation, format_list_items_added, format_list_add_failed
 from services.ai_service import parse_list_items
 from services.first_action_service import (
     should_prompt_daily_summary, mark_daily_summary_prompted,
@@ -316,44 +316,38 @@ def handle_pending_list_item(
         # Parse multiple items
         items_to_add = parse_list_items(pending_item, phone_number)
 
-        # Check item limit using tier-aware limits
+        # Check item limit using tier-aware limits (in the same statement as the insert)
         tier_limits = get_tier_limits(get_user_tier(phone_number))
         max_items = tier_limits['max_items_per_list']
-        item_count = get_item_count(list_id)
-        available_slots = max_items - item_count
+        result = add_list_items(list_id, phone_number, items_to_add, max_items)
+        added_items = result['added']
 
-        if available_slots <= 0:
+        if result['skipped'] and not added_items:
             create_or_update_user(phone_number, pending_list_item=None)
             # Use Level 4 formatter for clear WHY-WHAT-HOW message
             reply_msg = format_list_item_limit_message(
-                phone_number, list_name, items_to_add, 0
+                phone_number, list_name, result['skipped'], 0
             )
             return (True, reply_msg)
 
-        # Add items
-        added_items = []
-        for item in items_to_add:
-            if len(added_items) < available_slots:
-                add_list_item(list_id, phone_number, item)
-                added_items.append(item)
-
         create_or_update_user(phone_number, pending_list_item=None, last_active_list=list_name)
 
         # Handle partial or full adds with progressive education
-        if len(added_items) < len(items_to_add):
+        if result['error']:
+            reply_msg = format_list_add_failed(list_name)
+        elif result['skipped']:
             # Some items skipped - use Level 4 formatter
             reply_msg = format_list_item_limit_message(
-                phone_number, list_name, items_to_add, len(added_items)
+                phone_number, list_name, added_items + result['skipped'], len(added_items)
             )
         else:
             # All items added successfully
-            if len(added_items) == 1:
-                base_reply = f"Added {added_items[0]} to your {list_name}"
-            else:
-                base_reply = f"Added {len(added_items)} items to your {list_name}: {', '.join(added_items)}"
+            base_reply = format_list_items_added(list_name, added_items, result['duplicates'])
 
             # Add progressive counter
-            reply_msg = add_list_item_counter_to_message(phone_number, list_id, base_reply)
+            reply_msg = add_list_item_counter_to_message(
+                phone_number, list_id, base_reply, result['item_count']
+            )
 
         log_interaction(phone_number, incoming_msg, f"Added {len(added_items)} items to {list_name}", "add_to_list", True)
         return (True, reply_msg)
@@ -12,7 +12,7 @@ from typing import Tuple, Optional, Any
 from config import logger, ENVIRONMENT
 from models.user import create_or_update_user, get_user_timezone
 from models.reminder import (
-    save_reminder, save_reminder_with_local_time, get_user_reminders,
+    save_reminder, save_reminder_with_local_time, get_reminder_window,
     save_recurring_reminder, delete_reminder as db_delete_reminder,
     search_pending_reminders, update_reminder_time
 )
@@ -56,7 +56,9 @@ def format_reminders_list(reminders: list, user_tz: str) -> str:
 
 def handle_list_reminders(phone_number: str, incoming_msg: str) -> str:
     """Handle list_reminders action."""
-    reminders = get_user_reminders(phone_number)
+    # All pending, plus one sent reminder so the list can hint at completed ones
+    reminder_window = get_reminder_window(phone_number, sent_limit=1)
+    reminders = reminder_window['pending'] + reminder_window['sent']
     user_tz = get_user_timezone(phone_number)
     reply_text = format_reminders_list(reminders, user_tz)
     log_interaction(phone_number, incoming_msg, reply_text, "list_reminders", True)
@@ -400,8 +402,8 @@ def handle_delete_reminder(
     search_term = ai_response.get("search_term")
 
     if reminder_id:
-        # Direct ID delete - verify ownership via get_user_reminders
-        reminders = get_user_reminders(phone_number)
+        # Direct ID delete - verify ownership against the user's pending reminders
+        reminders = get_reminder_window(phone_number)['pending']
         reminder_match = next((r for r in reminders if r[0] == reminder_id), None)
         if reminder_match:
             db_delete_reminder(phone_number, reminder_id)
@@ -409,8 +411,8 @@ def handle_delete_reminder(
         else:
             reply_text = "I couldn't find that reminder."
     elif reminder_number:
-        # Delete by list number
-        reminders = get_user_reminders(phone_number)
+        # Delete by list number (numbers match the pending list shown to the user)
+        reminders = get_reminder_window(phone_number)['pending']
         if 1 <= reminder_number <= len(reminders):
             reminder_id = reminders[reminder_number - 1][0]
             text = reminders[reminder_number - 1][1]
@@ -420,7 +422,7 @@ def handle_delete_reminder(
             reply_text = f"Invalid reminder number. You have {len(reminders)} reminders."
     elif search_term:
         # Search and delete
-        matches = search_pending_reminders(phone_number, search_term)
+        matches = search_pending_reminders(phone_number, search_term, strict=True)
         if len(matches) == 1:
             reminder_id, text, _ = matches[0]
             pending_data = json.dumps({'id': reminder_id, 'text': text})
@@ -6,181 +6,33 @@ Handles all OpenAI API interactions and natural language processing
 import json
 from typing import Any, Optional
 
-from openai import OpenAI
 from datetime import datetime, timedelta
 import pytz
 
-from config import OPENAI_API_KEY, OPENAI_MODEL, OPENAI_TEMPERATURE, OPENAI_MAX_TOKENS, OPENAI_TIMEOUT, logger, MAX_MEMORIES_IN_CONTEXT, MAX_COMPLETED_REMINDERS_DISPLAY
-from models.memory import get_memories
-from models.reminder import get_user_reminders
+from config import OPENAI_MODEL, OPENAI_TEMPERATURE, OPENAI_MAX_TOKENS, logger, MAX_MEMORIES_IN_CONTEXT, MAX_COMPLETED_REMINDERS_DISPLAY, MAX_PENDING_REMINDERS_IN_CONTEXT
+from config import PROMPT_MAX_INPUT_TOKENS, PROMPT_SECTION_BUDGETS
+from models.memory import get_relevant_memories
+from models.reminder import get_reminder_window
 from models.user import get_user_timezone, get_user_first_name
 from models.list_model import get_lists, get_list_items
 from utils.timezone import get_user_current_time
+from utils.item_splitter import split_list_text
+from utils import ai_cache
+from utils.prompt_budget import PromptSection, TOKENS_PER_MESSAGE, assemble_prompt, count_message_tokens
 from database import log_api_usage
+from services.openai_client import chat_completion
 
 
-def process_with_ai(message: str, phone_number: str, context: dict[str, Any]) -> dict[str, Any]:
-    """Process user message with OpenAI and determine action"""
-    try:
-        logger.info(f"Processing message with AI for {phone_number}")
-        
-        # Get and format memories
-        # Tuple format: (id, memory_text, parsed_data, created_at)
-        memories = get_memories(phone_number)
-        if memories:
-            # Get user's timezone for proper date display
-            user_tz_str = get_user_timezone(phone_number)
-            user_tz = pytz.timezone(user_tz_str)
-
-            formatted_memories = []
-            for m in memories[:MAX_MEMORIES_IN_CONTEXT]:
-                memory_text = m[1]
-                created_date = m[3]
-                try:
-                    # Handle both datetime objects and strings from PostgreSQL
-                    if isinstance(created_date, datetime):
-                        date_obj = created_date
-                    else:
-                        date_obj = datetime.strptime(str(created_date), '%Y-%m-%d %H:%M:%S')
-
-                    # Convert from UTC to user's timezone for proper date display
-                    if date_obj.tzinfo is None:
-                        date_obj = pytz.utc.localize(date_obj)
-                    date_obj_local = date_obj.astimezone(user_tz)
-                    readable_date = date_obj_local.strftime('%B %d, %Y')
-                    formatted_memories.append(f"- {memory_text} (recorded on {readable_date})")
-                except (ValueError, TypeError, AttributeError):
-                    formatted_memories.append(f"- {memory_text}")
-            memory_context = "\n".join(formatted_memories)
-        else:
-            memory_context = "No memories stored yet."
-
-        # Get and format reminders
-        reminders = get_user_reminders(phone_number)
-        if reminders:
-            user_tz = get_user_timezone(phone_number)
-            tz = pytz.timezone(user_tz)
-            user_now = get_user_current_time(phone_number)
-            
-            scheduled = []
-            completed = []
-            scheduled_num = 0
-            completed_num = 0
-
-            # Tuple format: (id, reminder_date, reminder_text, recurring_id, sent)
-            for reminder in reminders:
-                reminder_id, reminder_date_utc, reminder_text, recurring_id, sent = reminder
-                try:
-                    # Handle both datetime objects and strings from PostgreSQL
-                    if isinstance(reminder_date_utc, datetime):
-                        utc_dt = reminder_date_utc
-                        if utc_dt.tzinfo is None:
-                            utc_dt = pytz.UTC.localize(utc_dt)
-                    else:
-                        utc_dt = datetime.strptime(str(reminder_date_utc), '%Y-%m-%d %H:%M:%S')
-                        utc_dt = pytz.UTC.localize(utc_dt)
-                    user_dt = utc_dt.astimezone(tz)
-
-                    # Smart date formatting
-                    if user_dt.date() == user_now.date():
-                        date_str = f"Today at {user_dt.strftime('%I:%M %p')}"
-                    elif user_dt.date() == (user_now + timedelta(days=1)).date():
-                        date_str = f"Tomorrow at {user_dt.strftime('%I:%M %p')}"
-                    else:
-                        date_str = user_dt.strftime('%a, %b %d at %I:%M %p')
-
-                    # Add [R] prefix for recurring reminders
-                    display_text = f"[R] {reminder_text}" if recurring_id else reminder_text
-
-                    if sent:
-                        completed_num += 1
-                        completed.append(f"{completed_num}. {display_text}\n   {date_str}")
-                    else:
-                        scheduled_num += 1
-                        scheduled.append(f"{scheduled_num}. {display_text}\n   {date_str}")
-                except (ValueError, TypeError, AttributeError):
-                    display_text = f"[R] {reminder_text}" if recurring_id else reminder_text
-                    if sent:
-                        completed_num += 1
-                        completed.append(f"{completed_num}. {display_text}")
-                    else:
-                        scheduled_num += 1
-                        scheduled.append(f"{scheduled_num}. {display_text}")
-
-            # Build context - limit completed to last 5
-            parts = []
-            if scheduled:
-                parts.append("SCHEDULED:\n\n" + "\n\n".join(scheduled))
-            if completed:
-                # Show only last N completed reminders
-                completed_to_show = completed[-MAX_COMPLETED_REMINDERS_DISPLAY:]
-                completed_text = "\n\n".join(completed_to_show)
-                if len(completed) > MAX_COMPLETED_REMINDERS_DISPLAY:
-                    parts.append(f"COMPLETED (last {MAX_COMPLETED_REMINDERS_DISPLAY} of {len(completed)}):\n\n" + completed_text)
-                else:
-                    parts.append("COMPLETED:\n\n" + completed_text)
-            
-            reminders_context = "\n\n".join(parts) if parts else "No reminders set."
-        else:
-            reminders_context = "No reminders set."
-
-        # Get and format lists
-        lists = get_lists(phone_number)
-        if lists:
-            formatted_lists = []
-            for list_id, list_name, item_count, completed_count in lists:
-                items = get_list_items(list_id)
-                if items:
-                    item_texts = []
-                    for item_id, item_text, completed in items:
-                        if completed:
-                            item_texts.append(f"  [x] {item_text}")
-                        else:
-                            item_texts.append(f"  [ ] {item_text}")
-                    formatted_lists.append(f"- {list_name} ({item_count} items):\n" + "\n".join(item_texts))
-                else:
-                    formatted_lists.append(f"- {list_name} (empty)")
-            lists_context = "\n".join(formatted_lists)
-        else:
-            lists_context = "No lists created yet."
-
-        # Get current time in user's timezone
-        user_time = get_user_current_time(phone_number)
-        user_tz = get_user_timezone(phone_number)
-        user_first_name = get_user_first_name(phone_number)
-
-        current_datetime = user_time.strftime('%Y-%m-%d %H:%M:%S')
-        current_day_of_week = user_time.strftime('%A')
-        current_date_readable = user_time.strftime('%A, %B %d, %Y')
-        current_time_readable = user_time.strftime('%I:%M %p')
-
-        # Build system prompt
-        user_name_context = f"USER'S NAME: {user_first_name}" if user_first_name else "USER'S NAME: (not provided)"
-
-        system_prompt = f"""You are a helpful SMS memory assistant with reminder capabilities.
-
-{user_name_context}
-
-CURRENT DATE/TIME INFORMATION (in user's timezone: {user_tz}):
-- Full date: {current_date_readable}
-- Today is: {current_day_of_week}
-- Current time: {current_time_readable}
-- ISO format: {current_datetime}
-
-USER'S STORED MEMORIES:
-{memory_context}
-
-USER'S REMINDERS:
-{reminders_context}
-
-USER'S LISTS:
-{lists_context}
+# Fixed instructions for process_with_ai. They open the system prompt and are the
+# same for every user, so OpenAI prompt caching can reuse them; per-user context
+# (date, memories, reminders, lists) is appended after them.
+PROCESS_INSTRUCTIONS = """You are a helpful SMS memory assistant with reminder capabilities.
 
 IMPORTANT: Each memory shows when it was recorded. Use these dates when answering questions about "when did I..."
 
 CAPABILITIES:
 1. STORE new information from the user
-2. RETRIEVE information from the stored memories above
+2. RETRIEVE information from the stored memories below
 3. SET REMINDERS for future tasks
 4. LIST REMINDERS when asked
 5. PROVIDE HELP when asked
@@ -223,7 +75,7 @@ For SPECIFIC TIME reminders (use action "reminder"):
 - "Saturday at 8am" = next Saturday at 08:00:00
 
 For reminder requests with DAYS OF THE WEEK:
-- Use "Today is: {current_day_of_week}" to calculate
+- Use the "Today is" line of CURRENT DATE/TIME to calculate
 - "Saturday" = the next Saturday from today
 - "this Saturday" = this week's Saturday
 - "next Monday" = Monday of next week
@@ -249,14 +101,14 @@ Examples:
 RESPONSE FORMAT (must be valid JSON):
 
 For STORING new information:
-{{
+{
     "action": "store",
     "item": "the item/object being stored",
     "details": "key details",
     "memory_text": "The memory text with relative dates converted to actual dates",
     "confirmation": "Brief, friendly confirmation message"
-}}
-IMPORTANT for memory_text: Convert ALL relative time references to actual dates based on the current date ({current_date_readable}):
+}
+IMPORTANT for memory_text: Convert ALL relative time references to actual dates based on the current date (see CURRENT DATE/TIME):
 - "last night" → "on the night of [yesterday's date]" (e.g., "December 25, 2025")
 - "yesterday" → "[yesterday's date]"
 - "this morning" → "on the morning of [today's date]"
@@ -269,29 +121,29 @@ Examples:
 - User says "My car broke down this morning" on Dec 26 → memory_text: "My car broke down on the morning of December 26, 2025"
 
 For RETRIEVING information:
-{{
+{
     "action": "retrieve",
     "query": "what they're asking about",
-    "response": "Answer based ONLY on the stored memories and reminders listed above, including the dates shown. When answering 'when' questions, use the '(recorded on DATE)' information. When asked about reminders, list them from the USER'S REMINDERS section. If no relevant memory or reminder exists, say 'I don't have that information stored yet.'"
-}}
+    "response": "Answer based ONLY on the stored memories and reminders listed below, including the dates shown. When answering 'when' questions, use the '(recorded on DATE)' information. When asked about reminders, list them from the USER'S REMINDERS section. If no relevant memory or reminder exists, say 'I don't have that information stored yet.'"
+}
 
 For LISTING REMINDERS:
-{{
+{
     "action": "list_reminders",
-    "response": "List all reminders from the USER'S REMINDERS section above, showing scheduled and sent reminders with their times."
-}}
+    "response": "List all reminders from the USER'S REMINDERS section below, showing scheduled and sent reminders with their times."
+}
 
 For DELETING/CANCELING A REMINDER:
-{{
+{
     "action": "delete_reminder",
     "search_term": "keyword(s) to search for in reminder text OR the actual reminder text if user references by number",
     "confirmation": "Deleted your reminder about [topic]"
-}}
+}
 WHEN TO USE delete_reminder:
 - "delete reminder about coffee" → search_term: "coffee"
 - "cancel my dentist reminder" → search_term: "dentist"
 - "delete coffee" (when no list has coffee, but there's a reminder about coffee) → search_term: "coffee"
-- "delete 1" or "delete reminder 1" (when they want to delete the first SCHEDULED reminder) → search_term: the actual text of reminder #1 from SCHEDULED section above
+- "delete 1" or "delete reminder 1" (when they want to delete the first SCHEDULED reminder) → search_term: the actual text of reminder #1 from SCHEDULED section below
 - "remove the break reminder" → search_term: "break"
 IMPORTANT: When user says "delete [keyword]" (without specifying "reminder", "memory", or "forget"):
 - If the keyword matches something in SCHEDULED reminders → use delete_reminder
@@ -299,13 +151,13 @@ IMPORTANT: When user says "delete [keyword]" (without specifying "reminder", "me
 - If the keyword matches both → use delete_reminder (reminders are more time-sensitive)
 
 For UPDATING/CHANGING A REMINDER TIME:
-{{
+{
     "action": "update_reminder",
     "search_term": "keyword(s) to identify which reminder to update",
     "new_time": "HH:MM AM/PM format (e.g., '8:00 AM', '3:30 PM')",
     "new_date": "YYYY-MM-DD format (optional - only if date is also changing)",
     "confirmation": "Updated your [topic] reminder to [new time/date]"
-}}
+}
 WHEN TO USE update_reminder:
 - "change my mammogram reminder to 8am" → search_term: "mammogram", new_time: "8:00 AM"
 - "move my dentist reminder to 3pm" → search_term: "dentist", new_time: "3:00 PM"
@@ -316,12 +168,12 @@ IMPORTANT: Use update_reminder when user wants to CHANGE/MODIFY/RESCHEDULE/MOVE
 IMPORTANT: Do NOT use update_reminder for changing the daily summary time or other settings. Use update_settings instead.
 
 For UPDATING SETTINGS/PREFERENCES (daily summary time, enable/disable summary):
-{{
+{
     "action": "update_settings",
     "setting": "daily_summary_time" | "daily_summary_enabled",
     "value": "the new value (e.g., '8:00 AM' for time, 'true'/'false' for enabled)",
     "confirmation": "Updated your daily summary time to [time]"
-}}
+}
 WHEN TO USE update_settings:
 - "change my daily summary time to 8am" → setting: "daily_summary_time", value: "8:00 AM"
 - "move my summary to 7pm" → setting: "daily_summary_time", value: "7:00 PM"
@@ -332,33 +184,33 @@ WHEN TO USE update_settings:
 IMPORTANT: "daily summary" refers to the daily summary SETTING, NOT a reminder. Any request to change/update/modify the daily summary time or enable/disable it should use update_settings, NOT update_reminder or delete_reminder.
 
 For DELETING/FORGETTING A MEMORY:
-{{
+{
     "action": "delete_memory",
     "search_term": "keyword(s) to search for in memory text",
     "confirmation": "Looking for memories about [topic]..."
-}}
+}
 WHEN TO USE delete_memory:
 - "delete memory about my car" → search_term: "car"
 - "forget my wifi password" → search_term: "wifi password"
 - "remove the memory about my VIN" → search_term: "VIN"
 - "forget my doctor's number" → search_term: "doctor"
-- "delete 1" or "delete memory 1" (when they want to delete memory #1 from their list) → search_term: the actual text of memory #1 from USER'S STORED MEMORIES above
+- "delete 1" or "delete memory 1" (when they want to delete memory #1 from their list) → search_term: the actual text of memory #1 from USER'S STORED MEMORIES below
 IMPORTANT: Use delete_memory when:
 - User explicitly says "memory" or "forget" (e.g., "delete my surfing memory", "forget my wifi password")
 - User says "delete [keyword]" and the keyword appears in USER'S STORED MEMORIES but NOT in SCHEDULED reminders
 - User wants to remove stored information/facts, not reminders or list items
 
 For SETTING REMINDERS WITH CLEAR TIME (specific time given):
-{{
+{
     "action": "reminder",
     "reminder_text": "what to remind them about",
-    "reminder_date": "YYYY-MM-DD HH:MM:SS format (this will be in {user_tz} timezone)",
+    "reminder_date": "YYYY-MM-DD HH:MM:SS format (this will be in the user's timezone)",
     "confirmation": "I'll remind you on [readable date/time including day of week] to [action]",
     "confidence": number 0-100 (how confident you are about the date/time parsing)
-}}
+}
 
 For SETTING REMINDERS WITH RELATIVE TIME ("in X minutes/hours/days/weeks/months"):
-{{
+{
     "action": "reminder_relative",
     "reminder_text": "what to remind them about",
     "offset_minutes": number (optional - for minutes/hours, e.g., 30 for "30 minutes", 120 for "2 hours"),
@@ -366,18 +218,18 @@ For SETTING REMINDERS WITH RELATIVE TIME ("in X minutes/hours/days/weeks/months"
     "offset_weeks": number (optional - for weeks, e.g., 2 for "2 weeks"),
     "offset_months": number (optional - for months, e.g., 5 for "5 months"),
     "confidence": number 0-100 (how confident you are about the time parsing)
-}}
+}
 IMPORTANT: Use this action for ANY relative time request. Only include ONE offset type. The server will calculate the exact date/time.
 
 For RECURRING REMINDERS ("every day", "every Sunday", "weekdays", etc.):
-{{
+{
     "action": "reminder_recurring",
     "reminder_text": "what to remind them about",
     "recurrence_type": "daily" | "weekly" | "weekdays" | "weekends" | "monthly",
     "recurrence_day": number (for weekly: 0=Monday through 6=Sunday, for monthly: day of month 1-31, null for others),
     "time": "HH:MM" (24-hour format),
     "confidence": number 0-100 (how confident you are about the recurrence pattern and time)
-}}
+}
 
 CONFIDENCE SCORING GUIDELINES:
 - 90-100: Clear, unambiguous request (e.g., "remind me tomorrow at 3pm to call mom")
@@ -407,13 +259,13 @@ NOT SUPPORTED - If user asks for minute, hourly, or custom day/week/month interv
 - "every 5 minutes" or minute intervals → suggest daily
 - "every 3 months" or "quarterly" → suggest monthly
 Example:
-{{
+{
     "action": "help",
     "response": "I can't do every-2-week reminders, but I can do weekly! Try 'Remind me every Monday at 9am to [task]'."
-}}
+}
 
 For ASKING TIME CLARIFICATION (when time given but missing AM/PM):
-{{
+{
     "action": "clarify_time",
     "reminder_text": "what to remind them about",
     "time_mentioned": "the ambiguous time they said (e.g., '4:35')",
@@ -421,15 +273,15 @@ For ASKING TIME CLARIFICATION (when time given but missing AM/PM):
     "recurrence_type": "daily/weekly/weekdays/weekends/monthly if this is a recurring reminder, omit if one-time",
     "recurrence_day": "day number (0-6 for weekly, 1-31 for monthly) if weekly/monthly, omit otherwise",
     "response": "Got it! Do you mean [time] AM or PM?"
-}}
+}
 
 For ASKING WHAT TIME (when date given but NO time at all):
-{{
+{
     "action": "clarify_date_time",
     "reminder_text": "what to remind them about",
     "reminder_date": "YYYY-MM-DD (just the date, no time)",
     "response": "I'll remind you on [day, date] to [task]. What time would you like the reminder?"
-}}
+}
 WHEN TO USE clarify_date_time:
 - "Remind me tomorrow to check MyChart" → No time given, ask what time
 - "Remind me on Friday to call mom" → No time given, ask what time
@@ -444,11 +296,11 @@ DO NOT USE clarify_date_time when time IS specified:
 CRITICAL: If the message contains "at [time]am" or "at [time]pm" ANYWHERE, extract that time and use action "reminder" - do NOT ask for time again!
 
 For VAGUE TIME (when time expression is unclear like "in a bit", "later", "soon"):
-{{
+{
     "action": "clarify_specific_time",
     "reminder_text": "what to remind them about",
     "response": "I'd be happy to set that reminder! What time works? (e.g., 'in 30 minutes', 'at 3pm', 'tomorrow at 9am')"
-}}
+}
 WHEN TO USE clarify_specific_time:
 - "Remind me in a bit to check email" → vague time "in a bit"
 - "Remind me later to call mom" → vague time "later"
@@ -457,32 +309,32 @@ WHEN TO USE clarify_specific_time:
 DO NOT use this for relative times that ARE specific like "in 30 minutes" - those should use reminder_relative
 
 For UNCLEAR requests or GREETINGS:
-{{
+{
     "action": "help",
     "response": "Personalized greeting using user's name if available (e.g., 'Hi [Name]! How can I help you today?'), otherwise just 'Hi! How can I help you today?'"
-}}
+}
 
 For HELP REQUESTS:
-{{
+{
     "action": "show_help",
     "response": "User is asking how to use the service. Tell them to text INFO (or ? or GUIDE) for the full guide, or answer their specific question briefly."
-}}
+}
 
 For CREATING A LIST (ONLY when no items are provided):
-{{
+{
     "action": "create_list",
     "list_name": "the name of the list to create",
     "confirmation": "Created your [list name]!"
-}}
+}
 IMPORTANT: If the user says "create a list" AND includes items in the same message (e.g., "Create a grocery list\nMilk\nEggs\nBread"), do NOT use create_list. Use add_to_list instead — the system will auto-create the list AND add the items in one step.
 
 For ADDING TO A SPECIFIC LIST (also use this when creating a list WITH items):
-{{
+{
     "action": "add_to_list",
     "list_name": "the name of the list",
     "item_text": "VERBATIM copy of ALL items - do NOT parse or split, just copy exactly as user said",
     "confirmation": "Added [items] to your [list name]"
-}}
+}
 Note: ALWAYS use add_to_list when the user specifies a list name, even if that list doesn't exist yet. The system will auto-create it.
 
 CRITICAL MULTI-ITEM RULE - READ CAREFULLY:
@@ -502,31 +354,31 @@ WRONG - NEVER DO THIS:
 - User says "add apples and oranges" → item_text: "apples" (WRONG - missing oranges!)
 
 For ADDING ITEM BUT NO LIST SPECIFIED (user has lists but didn't say which):
-{{
+{
     "action": "add_item_ask_list",
     "item_text": "VERBATIM copy of ALL items - same rules as add_to_list above",
     "response": "Which list would you like to add these to?"
-}}
+}
 Note: Only use add_item_ask_list if user has multiple lists and didn't specify which one. If user specifies a list name like "grocery list", use add_to_list instead.
 
 For SHOWING A SPECIFIC NAMED LIST (user says a list name like "grocery list", "shopping list"):
-{{
+{
     "action": "show_list",
     "list_name": "the full list name (e.g., 'grocery list', 'shopping list')",
-    "response": "Format the list contents from USER'S LISTS above"
-}}
+    "response": "Format the list contents from USER'S LISTS below"
+}
 CRITICAL: Use show_list when user mentions a SPECIFIC list name (singular with a type), even if it contains keywords like "grocery", "shopping".
 Examples of show_list:
-- "show grocery list" → {{"action": "show_list", "list_name": "grocery list"}}
-- "show my shopping list" → {{"action": "show_list", "list_name": "shopping list"}}
-- "show the todo list" → {{"action": "show_list", "list_name": "todo list"}}
-- "what's on my grocery list" → {{"action": "show_list", "list_name": "grocery list"}}
+- "show grocery list" → {"action": "show_list", "list_name": "grocery list"}
+- "show my shopping list" → {"action": "show_list", "list_name": "shopping list"}
+- "show the todo list" → {"action": "show_list", "list_name": "todo list"}
+- "what's on my grocery list" → {"action": "show_list", "list_name": "grocery list"}
 
 For SHOWING THE CURRENT/LAST ACTIVE LIST (no specific list name given):
-{{
+{
     "action": "show_current_list",
     "response": "Showing your current list"
-}}
+}
 Use show_current_list ONLY for generic phrases without a list name:
 - "show list" → show_current_list
 - "show my list" → show_current_list
@@ -534,24 +386,24 @@ Use show_current_list ONLY for generic phrases without a list name:
 - "view list" → show_current_list
 
 For SHOWING ALL LISTS (plural "lists" without a type):
-{{
+{
     "action": "show_all_lists",
     "response": "Showing your lists"
-}}
+}
 Examples:
 - "show lists" → show_all_lists
 - "show my lists" → show_all_lists
 - "what lists do I have" → show_all_lists
 
 For SHOWING FILTERED LISTS (PLURAL "lists" with a type keyword):
-{{
+{
     "action": "show_all_lists",
     "list_filter": "the keyword to filter by",
     "response": "Showing your [type] lists"
-}}
+}
 CRITICAL: ONLY use list_filter when user says PLURAL "lists" with a filter:
-- "show grocery lists" (PLURAL) → {{"action": "show_all_lists", "list_filter": "grocery"}}
-- "show my shopping lists" (PLURAL) → {{"action": "show_all_lists", "list_filter": "shopping"}}
+- "show grocery lists" (PLURAL) → {"action": "show_all_lists", "list_filter": "grocery"}
+- "show my shopping lists" (PLURAL) → {"action": "show_all_lists", "list_filter": "shopping"}
 
 DISAMBIGUATION RULES - SINGULAR vs PLURAL:
 1. "[type] list" (SINGULAR) = show_list with list_name="[type] list"
@@ -560,29 +412,29 @@ DISAMBIGUATION RULES - SINGULAR vs PLURAL:
 4. "lists" (no type) = show_all_lists
 
 For CHECKING OFF AN ITEM:
-{{
+{
     "action": "complete_item",
     "list_name": "the list containing the item",
     "item_text": "the item to check off",
     "confirmation": "Checked off [item] from your [list name]"
-}}
+}
 Note: If item exists in only one list, use that list. If item exists in multiple lists, ask which one.
 
 For UNCHECKING AN ITEM:
-{{
+{
     "action": "uncomplete_item",
     "list_name": "the list containing the item",
     "item_text": "the item to uncheck",
     "confirmation": "Unmarked [item] in your [list name]"
-}}
+}
 
 For DELETING AN ITEM FROM A LIST (not a reminder!):
-{{
+{
     "action": "delete_item",
     "list_name": "the list name",
     "item_text": "the item to delete",
     "confirmation": "Removed [item] from your [list name]"
-}}
+}
 IMPORTANT: Only use delete_item when deleting from a SHOPPING/TODO LIST in USER'S LISTS section.
 - "remove milk from grocery list" → delete_item (it's a list item)
 - "delete coffee" when coffee is in a LIST → delete_item
@@ -590,34 +442,34 @@ IMPORTANT: Only use delete_item when deleting from a SHOPPING/TODO LIST in USER'
 If the item exists in a reminder but NOT in any list, use delete_reminder instead!
 
 For DELETING AN ENTIRE LIST:
-{{
+{
     "action": "delete_list",
     "list_name": "the exact list name to delete",
     "confirmation": "Are you sure you want to delete your [list name]? Reply YES to confirm."
-}}
+}
 
 For DELETING MULTIPLE LISTS BY TYPE (when user says "delete grocery lists" plural):
-{{
+{
     "action": "delete_list",
     "list_filter": "the keyword to filter lists (e.g., 'grocery' for all grocery lists)",
     "confirmation": "Finding your [type] lists..."
-}}
+}
 CRITICAL: When user says "delete grocery lists" or "delete my shopping lists" (PLURAL), use list_filter instead of list_name.
 
 For CLEARING ALL ITEMS FROM A LIST:
-{{
+{
     "action": "clear_list",
     "list_name": "the list to clear",
     "confirmation": "Cleared all items from your [list name]"
-}}
+}
 
 For RENAMING A LIST:
-{{
+{
     "action": "rename_list",
     "old_name": "current list name",
     "new_name": "new list name",
     "confirmation": "Renamed [old name] to [new name]"
-}}
+}
 
 MULTI-COMMAND SUPPORT:
 If the user's message contains MULTIPLE distinct commands, return an array of actions instead of a single action.
@@ -637,13 +489,13 @@ IMPORTANT: "for the next X days" means X separate reminders on consecutive days,
 IMPORTANT: If AM/PM is missing from recurring reminders (e.g., "for the next 3 days at 11 o'clock"), use "clarify_time" action to ask the user.
 
 For MULTIPLE COMMANDS or RECURRING REMINDERS, return:
-{{
+{
     "action": "multiple",
     "actions": [
-        {{ "action": "first_action", ... }},
-        {{ "action": "second_action", ... }}
+        { "action": "first_action", ... },
+        { "action": "second_action", ... }
     ]
-}}
+}
 
 CRITICAL MULTI-COMMAND RULES:
 - Look for command verbs: "remove", "delete", "add", "check off", "remind", etc.
@@ -655,24 +507,191 @@ CRITICAL MULTI-COMMAND RULES:
 - Do NOT split a single command into multiple actions (e.g., "add milk and eggs" is ONE add_to_list with item_text="milk and eggs")
 
 CRITICAL RULES:
-- All times are in user's timezone: {user_tz}
+- All times are in the user's timezone (shown in CURRENT DATE/TIME)
 - Check for AM/PM in a case-insensitive way: "pm", "PM", "p.m.", "P.M.", "am", "AM", "a.m.", "A.M." are ALL valid
 - If you see ANY variation of AM/PM in the user's message, use action "reminder" NOT "clarify_time"
 - If a time does NOT have ANY form of AM/PM specified, you MUST use action "clarify_time" instead of setting the reminder
-- When answering "when did I..." questions, use the "(recorded on DATE)" timestamp from the memories above
+- When answering "when did I..." questions, use the "(recorded on DATE)" timestamp from the memories below
 - Never say "today" when referring to a date that shows "(recorded on [past date])" - use the actual recorded date
-- When retrieving information, ONLY use the memories listed above
+- When retrieving information, ONLY use the memories listed below
 - Always include the day of the week in reminder confirmations (e.g., "Saturday, December 21st at 8:00 AM")"""
 
-        # Call OpenAI API with timeout and retry logic
-        client = OpenAI(api_key=OPENAI_API_KEY, timeout=OPENAI_TIMEOUT)
 
+def process_with_ai(message: str, phone_number: str, context: dict[str, Any]) -> dict[str, Any]:
+    """Process user message with OpenAI and determine action"""
+    try:
+        logger.info(f"Processing message with AI for {phone_number}")
+        
+        # Get and format memories (most recent plus those relevant to this message)
+        # Tuple format: (id, memory_text, parsed_data, created_at)
+        memories = get_relevant_memories(phone_number, message, MAX_MEMORIES_IN_CONTEXT)
+        formatted_memories = []
+        if memories:
+            # Get user's timezone for proper date display
+            user_tz_str = get_user_timezone(phone_number)
+            user_tz = pytz.timezone(user_tz_str)
+
+            for m in memories:
+                memory_text = m[1]
+                created_date = m[3]
+                try:
+                    # Handle both datetime objects and strings from PostgreSQL
+                    if isinstance(created_date, datetime):
+                        date_obj = created_date
+                    else:
+                        date_obj = datetime.strptime(str(created_date), '%Y-%m-%d %H:%M:%S')
+
+                    # Convert from UTC to user's timezone for proper date display
+                    if date_obj.tzinfo is None:
+                        date_obj = pytz.utc.localize(date_obj)
+                    date_obj_local = date_obj.astimezone(user_tz)
+                    readable_date = date_obj_local.strftime('%B %d, %Y')
+                    formatted_memories.append(f"- {memory_text} (recorded on {readable_date})")
+                except (ValueError, TypeError, AttributeError):
+                    formatted_memories.append(f"- {memory_text}")
+
+        # Get and format reminders (next pending + last completed, not the full history)
+        reminder_window = get_reminder_window(
+            phone_number,
+            pending_limit=MAX_PENDING_REMINDERS_IN_CONTEXT,
+            sent_limit=MAX_COMPLETED_REMINDERS_DISPLAY,
+        )
+        reminders = reminder_window['pending'] + reminder_window['sent']
+        # Headers and reminders as separate entries so the budget can drop reminders one at a time
+        reminder_entries = []
+        if reminders:
+            user_tz = get_user_timezone(phone_number)
+            tz = pytz.timezone(user_tz)
+            user_now = get_user_current_time(phone_number)
+            
+            scheduled = []
+            completed = []
+            scheduled_num = 0
+            # Number completed reminders by their position in the full history
+            completed_num = reminder_window['sent_total'] - len(reminder_window['sent'])
+
+            # Tuple format: (id, reminder_date, reminder_text, recurring_id, sent)
+            for reminder in reminders:
+                reminder_id, reminder_date_utc, reminder_text, recurring_id, sent = reminder
+                try:
+                    # Handle both datetime objects and strings from PostgreSQL
+                    if isinstance(reminder_date_utc, datetime):
+                        utc_dt = reminder_date_utc
+                        if utc_dt.tzinfo is None:
+                            utc_dt = pytz.UTC.localize(utc_dt)
+                    else:
+                        utc_dt = datetime.strptime(str(reminder_date_utc), '%Y-%m-%d %H:%M:%S')
+                        utc_dt = pytz.UTC.localize(utc_dt)
+                    user_dt = utc_dt.astimezone(tz)
+
+                    # Smart date formatting
+                    if user_dt.date() == user_now.date():
+                        date_str = f"Today at {user_dt.strftime('%I:%M %p')}"
+                    elif user_dt.date() == (user_now + timedelta(days=1)).date():
+                        date_str = f"Tomorrow at {user_dt.strftime('%I:%M %p')}"
+                    else:
+                        date_str = user_dt.strftime('%a, %b %d at %I:%M %p')
+
+                    # Add [R] prefix for recurring reminders
+                    display_text = f"[R] {reminder_text}" if recurring_id else reminder_text
+
+                    if sent:
+                        completed_num += 1
+                        completed.append(f"{completed_num}. {display_text}\n   {date_str}")
+                    else:
+                        scheduled_num += 1
+                        scheduled.append(f"{scheduled_num}. {display_text}\n   {date_str}")
+                except (ValueError, TypeError, AttributeError):
+                    display_text = f"[R] {reminder_text}" if recurring_id else reminder_text
+                    if sent:
+                        completed_num += 1
+                        completed.append(f"{completed_num}. {display_text}")
+                    else:
+                        scheduled_num += 1
+                        scheduled.append(f"{scheduled_num}. {display_text}")
+
+            # Build context - limit completed to last 5
+            if scheduled:
+                if reminder_window['pending_total'] > len(scheduled):
+                    reminder_entries.append(f"SCHEDULED (next {len(scheduled)} of {reminder_window['pending_total']}):")
+                else:
+                    reminder_entries.append("SCHEDULED:")
+                reminder_entries.extend(scheduled)
+            if completed:
+                # Only the last N completed reminders were fetched
+                if reminder_window['sent_total'] > MAX_COMPLETED_REMINDERS_DISPLAY:
+                    reminder_entries.append(f"COMPLETED (last {MAX_COMPLETED_REMINDERS_DISPLAY} of {reminder_window['sent_total']}):")
+                else:
+                    reminder_entries.append("COMPLETED:")
+                reminder_entries.extend(completed)
+
+        # Get and format lists
+        # One line per entry so the budget can cut a long list part way through.
+        # Lists named in the message go first so they are the last to be cut.
+        lists = get_lists(phone_number)
+        lists = sorted(lists, key=lambda l: l[1].lower() not in message.lower())
+        list_lines = []
+        if lists:
+            for list_id, list_name, item_count, completed_count in lists:
+                items = get_list_items(list_id)
+                if items:
+                    list_lines.append(f"- {list_name} ({item_count} items):")
+                    for item_id, item_text, completed in items:
+                        if completed:
+                            list_lines.append(f"  [x] {item_text}")
+                        else:
+                            list_lines.append(f"  [ ] {item_text}")
+                else:
+                    list_lines.append(f"- {list_name} (empty)")
+
+        # Get current time in user's timezone
+        user_time = get_user_current_time(phone_number)
+        user_tz = get_user_timezone(phone_number)
+        user_first_name = get_user_first_name(phone_number)
+
+        current_datetime = user_time.strftime('%Y-%m-%d %H:%M:%S')
+        current_day_of_week = user_time.strftime('%A')
+        current_date_readable = user_time.strftime('%A, %B %d, %Y')
+        current_time_readable = user_time.strftime('%I:%M %p')
+
+        # Build system prompt: the fixed instructions, then per-user sections cut to their budgets
+        user_message_tokens = count_message_tokens([{"role": "user", "content": message}], OPENAI_MODEL)
+        user_name_context = f"USER'S NAME: {user_first_name}" if user_first_name else "USER'S NAME: (not provided)"
+
+        system_prompt, budget_report = assemble_prompt(
+            PROCESS_INSTRUCTIONS,
+            [
+                PromptSection('user', user_name_context, [
+                    f"CURRENT DATE/TIME INFORMATION (in user's timezone: {user_tz}):",
+                    f"- Full date: {current_date_readable}",
+                    f"- Today is: {current_day_of_week}",
+                    f"- Current time: {current_time_readable}",
+                    f"- ISO format: {current_datetime}",
+                ]),
+                PromptSection('memories', "USER'S STORED MEMORIES:", formatted_memories,
+                              PROMPT_SECTION_BUDGETS['memories'], empty="No memories stored yet."),
+                PromptSection('reminders', "USER'S REMINDERS:", reminder_entries,
+                              PROMPT_SECTION_BUDGETS['reminders'], separator="\n\n", empty="No reminders set."),
+                PromptSection('lists', "USER'S LISTS:", list_lines,
+                              PROMPT_SECTION_BUDGETS['lists'], empty="No lists created yet."),
+            ],
+            PROMPT_MAX_INPUT_TOKENS,
+            reserved_tokens=user_message_tokens,
+            model=OPENAI_MODEL,
+        )
+        projected_tokens = budget_report['projected_tokens'] + TOKENS_PER_MESSAGE + user_message_tokens
+        section_tokens = ", ".join(f"{name}={section['tokens']}" for name, section in budget_report['sections'].items())
+        logger.info(f"process_with_ai prompt: {projected_tokens} tokens projected "
+                    f"(instructions={budget_report['prefix_tokens']}, {section_tokens})")
+
+        # Call OpenAI API (shared client with the webhook's timeout budget) with retry logic
         max_retries = 2
         last_error = None
 
         for attempt in range(max_retries + 1):
             try:
-                response = client.chat.completions.create(
+                response = chat_completion(
+                    'process_with_ai',
                     model=OPENAI_MODEL,
                     messages=[
                         {"role": "system", "content": system_prompt},
@@ -680,7 +699,8 @@ CRITICAL RULES:
                     ],
                     temperature=OPENAI_TEMPERATURE,
                     max_tokens=OPENAI_MAX_TOKENS,
-                    response_format={"type": "json_object"}  # Force JSON output
+                    response_format={"type": "json_object"},  # Force JSON output
+                    projected_prompt_tokens=projected_tokens,
                 )
 
                 # Log API usage for cost tracking
@@ -755,6 +775,26 @@ CRITICAL RULES:
         }
 
 
+# Bump when the parse_list_items prompt changes so cached parses are not reused
+LIST_PARSE_PROMPT_VERSION = 1
+
+
+def _restore_item_case(items, item_text):
+    """Re-case items from a cached parse (cache keys ignore case) to match this message."""
+    text = ' '.join(item_text.split())
+    lowered = text.lower()
+    restored = []
+    position = 0
+    for item in items:
+        start = lowered.find(item.lower(), position)
+        if start == -1:
+            restored.append(item)
+            continue
+        restored.append(text[start:start + len(item)])
+        position = start + len(item)
+    return restored
+
+
 def parse_list_items(item_text, phone_number='system'):
     """
     Parse a string of items into individual list items using AI.
@@ -781,6 +821,18 @@ def parse_list_items(item_text, phone_number='system'):
         if ',' in item_text and ' and ' not in item_text:
             return [item.strip() for item in item_text.split(',') if item.strip()]
 
+        # Split locally when the compound lexicon and rules are confident;
+        # only an ambiguous "and" needs the AI
+        local_items = split_list_text(item_text)
+        if local_items is not None:
+            logger.info(f"Split '{item_text}' locally into {len(local_items)} items: {local_items}")
+            return local_items
+
+        cached_items = ai_cache.lookup('parse_list_items', LIST_PARSE_PROMPT_VERSION, OPENAI_MODEL, item_text, phone_number)
+        if cached_items is not None:
+            logger.info(f"Parsed '{item_text}' from cache into {len(cached_items)} items")
+            return _restore_item_case(cached_items, item_text)
+
         system_prompt = """You are a list item parser. Your job is to separate a user's input into individual list items.
 
 RULES:
@@ -807,8 +859,8 @@ EXAMPLES:
 Return ONLY a JSON array of strings. No explanation, just the array.
 Example output: ["item1", "item2", "item3"]"""
 
-        client = OpenAI(api_key=OPENAI_API_KEY, timeout=OPENAI_TIMEOUT)
-        response = client.chat.completions.create(
+        response = chat_completion(
+            'parse_list_items',
             model=OPENAI_MODEL,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -834,7 +886,9 @@ Example output: ["item1", "item2", "item3"]"""
         # Validate result is a list of strings
         if isinstance(result, list) and all(isinstance(item, str) for item in result):
             logger.info(f"Parsed '{item_text}' into {len(result)} items: {result}")
-            return [item.strip() for item in result if item.strip()]
+            items = [item.strip() for item in result if item.strip()]
+            ai_cache.store('parse_list_items', LIST_PARSE_PROMPT_VERSION, OPENAI_MODEL, item_text, items, response.usage)
+            return items
         else:
             logger.warning(f"Unexpected parse result format: {result}")
             return [item_text.strip()]
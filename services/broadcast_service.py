@@ -0,0 +1,407 @@
+"""
+Broadcast Service
+Recipient selection and delivery bookkeeping for admin broadcasts
+
+A broadcast is a broadcast_logs row plus one broadcast_recipients row per
+recipient (pending -> sending -> sent | failed). Recipients are chosen in
+SQL when the broadcast is created: opted-out users are excluded and the
+8am-8pm window is evaluated once per distinct timezone. Delivery runs on
+Celery (tasks.broadcast_tasks): chunks of recipients are claimed atomically,
+sent under a rate limit shared by all workers, and counted with atomic
+increments, so a broadcast interrupted by a restart resumes where it
+stopped without re-sending.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+import pytz
+
+from database import get_db_connection, return_db_connection
+from config import logger, BROADCAST_SEND_RATE, BROADCAST_STALL_MINUTES, UPSTASH_REDIS_URL
+
+BROADCAST_PREFIX = "[Remyndrs System Message] "
+
+# Broadcast time window (8am - 8pm in user's local timezone)
+BROADCAST_START_HOUR = 8
+BROADCAST_END_HOUR = 20  # 8pm
+DEFAULT_TIMEZONE = 'America/New_York'
+
+# Audience filters for sends (opted-out users are always excluded)
+_AUDIENCE_SQL = {
+    "all": "",
+    "free": " AND (premium_status = 'free' OR premium_status IS NULL)",
+    "premium": " AND premium_status = 'premium'",
+}
+
+# Seconds a send task may hold claimed recipients (its hard time limit); older claims are dead
+CLAIM_TIMEOUT = 600
+
+RATE_KEY_PREFIX = 'remyndrs:broadcast_rate:'
+# How long to stop using Redis for the shared rate limit after an error
+REDIS_RETRY_INTERVAL = 60
+
+
+def is_within_broadcast_window(timezone_str: str) -> bool:
+    """Check if current time is within 8am-8pm for the given timezone"""
+    try:
+        tz = pytz.timezone(timezone_str or DEFAULT_TIMEZONE)
+    except pytz.UnknownTimezoneError:
+        tz = pytz.timezone(DEFAULT_TIMEZONE)
+
+    local_time = datetime.now(tz)
+    return BROADCAST_START_HOUR <= local_time.hour < BROADCAST_END_HOUR
+
+
+def timezone_windows(timezones) -> dict:
+    """Whether each distinct users.timezone value ('' when unset) is in the 8am-8pm window now"""
+    return {tz: is_within_broadcast_window(tz) for tz in timezones}
+
+
+# =============================================================================
+# CREATING BROADCASTS
+# =============================================================================
+
+def create_broadcast(c, sender, message, audience, source='immediate', target_phone=None,
+                     scheduled_broadcast_id=None):
+    """Insert a broadcast and its recipients on cursor c (the caller commits).
+
+    Returns (broadcast_id, recipient_count, total_audience). When nobody in
+    the audience is inside the window nothing is inserted and broadcast_id
+    is None.
+    """
+    if audience == "single":
+        recipients_sql, recipients_params, total_audience = "SELECT %s, %s", [target_phone], 1
+    elif audience in _AUDIENCE_SQL:
+        audience_filter = _AUDIENCE_SQL[audience] + " AND onboarding_complete = TRUE AND (opted_out = FALSE OR opted_out IS NULL)"
+        c.execute(f"SELECT COALESCE(timezone, ''), COUNT(*) FROM users WHERE TRUE{audience_filter} GROUP BY 1")
+        groups = c.fetchall()
+        windows = timezone_windows({timezone for timezone, _ in groups})
+        total_audience = sum(count for _, count in groups)
+        if not any(windows[timezone] for timezone, _ in groups):
+            return None, 0, total_audience
+        recipients_sql = f"SELECT %s, phone_number FROM users WHERE COALESCE(timezone, '') = ANY(%s){audience_filter}"
+        recipients_params = [[timezone for timezone, in_window in windows.items() if in_window]]
+    else:
+        raise ValueError(f"Invalid audience: {audience}")
+
+    c.execute('''
+        INSERT INTO broadcast_logs (sender, message, audience, recipient_count, status, source, scheduled_broadcast_id)
+        VALUES (%s, %s, %s, 0, 'pending', %s, %s)
+        RETURNING id
+    ''', (sender, message, audience, source, scheduled_broadcast_id))
+    broadcast_id = c.fetchone()[0]
+
+    c.execute(f'''
+        INSERT INTO broadcast_recipients (broadcast_id, phone_number)
+        {recipients_sql}
+        ON CONFLICT DO NOTHING
+    ''', [broadcast_id] + recipients_params)
+    recipient_count = c.rowcount
+    if recipient_count == 0:
+        # The audience changed between the count and the insert (opt-outs, plan changes)
+        c.execute('DELETE FROM broadcast_logs WHERE id = %s', (broadcast_id,))
+        return None, 0, total_audience
+
+    c.execute('UPDATE broadcast_logs SET recipient_count = %s WHERE id = %s', (recipient_count, broadcast_id))
+    return broadcast_id, recipient_count, total_audience
+
+
+def _start_scheduled(c, scheduled_id, message, audience, sender, target_phone):
+    """Create the broadcast for a claimed scheduled broadcast; returns its id, or None when nobody is in the window"""
+    if audience == "single" and not target_phone:
+        raise ValueError("Single-number broadcast has no target phone")
+    broadcast_id, recipient_count, _ = create_broadcast(
+        c, sender, message, audience, source='scheduled', target_phone=target_phone,
+        scheduled_broadcast_id=scheduled_id
+    )
+
+    if broadcast_id is None:
+        logger.info(f"Scheduled broadcast {scheduled_id}: No recipients in time window")
+        c.execute('''
+            UPDATE scheduled_broadcasts
+            SET status = 'completed', recipient_count = 0, sent_at = NOW()
+            WHERE id = %s
+        ''', (scheduled_id,))
+        # Still log to broadcast_logs so it appears in history
+        c.execute('''
+            INSERT INTO broadcast_logs (sender, message, audience, recipient_count, success_count, fail_count, status, completed_at, source, scheduled_broadcast_id)
+            VALUES (%s, %s, %s, 0, 0, 0, 'completed', NOW(), 'scheduled', %s)
+        ''', (sender, message, audience, scheduled_id))
+        return None
+
+    c.execute("UPDATE scheduled_broadcasts SET recipient_count = %s WHERE id = %s", (recipient_count, scheduled_id))
+    logger.info(f"Scheduled broadcast {scheduled_id} started as broadcast {broadcast_id}: {recipient_count} recipients")
+    return broadcast_id
+
+
+def start_due_scheduled_broadcasts():
+    """Claim each due scheduled broadcast and create its broadcast; returns the broadcast ids to send.
+
+    The claim (scheduled -> sending, skipping rows another checker holds)
+    commits together with the broadcast's recipients, so each scheduled
+    broadcast starts exactly once and a crash before the commit leaves it
+    scheduled for the next run. One that cannot start is marked failed.
+    """
+    conn = None
+    started = []
+    try:
+        conn = get_db_connection()
+        c = conn.cursor()
+        while True:
+            c.execute('''
+                UPDATE scheduled_broadcasts SET status = 'sending'
+                WHERE id = (
+                    SELECT id FROM scheduled_broadcasts
+                    WHERE status = 'scheduled' AND scheduled_date <= %s
+                    ORDER BY scheduled_date, id
+                    LIMIT 1
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, message, audience, sender, target_phone
+            ''', (datetime.utcnow(),))
+            row = c.fetchone()
+            if row is None:
+                conn.commit()
+                return started
+
+            scheduled_id, message, audience, sender, target_phone = row
+            try:
+                broadcast_id = _start_scheduled(c, scheduled_id, message, audience, sender or 'system', target_phone)
+                conn.commit()
+            except Exception as e:
+                logger.error(f"Scheduled broadcast {scheduled_id} error: {e}")
+                conn.rollback()
+                c.execute(
+                    "UPDATE scheduled_broadcasts SET status = 'failed', sent_at = NOW() WHERE id = %s AND status = 'scheduled'",
+                    (scheduled_id,)
+                )
+                conn.commit()
+                continue
+            if broadcast_id is not None:
+                started.append(broadcast_id)
+    finally:
+        if conn:
+            return_db_connection(conn)
+
+
+# =============================================================================
+# DELIVERY
+# =============================================================================
+
+def pending_recipients(broadcast_id):
+    """Phone numbers of a broadcast's recipients not yet attempted, marking the broadcast sending.
+
+    None when the broadcast is missing or no longer pending/sending.
+    """
+    conn = None
+    try:
+        conn = get_db_connection()
+        c = conn.cursor()
+        c.execute('''
+            UPDATE broadcast_logs SET status = 'sending'
+            WHERE id = %s AND status IN ('pending', 'sending')
+            RETURNING id
+        ''', (broadcast_id,))
+        if c.fetchone() is None:
+            conn.commit()
+            return None
+        c.execute('''
+            SELECT phone_number FROM broadcast_recipients
+            WHERE broadcast_id = %s AND status = 'pending'
+            ORDER BY phone_number
+        ''', (broadcast_id,))
+        phone_numbers = [row[0] for row in c.fetchall()]
+        c.execute('''
+            UPDATE scheduled_broadcasts s SET status = 'sending'
+            FROM broadcast_logs b
+            WHERE b.id = %s AND s.id = b.scheduled_broadcast_id AND s.status <> 'completed'
+        ''', (broadcast_id,))
+        conn.commit()
+        return phone_numbers
+    finally:
+        if conn:
+            return_db_connection(conn)
+
+
+def claim_recipients(c, broadcast_id, phone_numbers):
+    """Atomically move these recipients from pending to sending; returns (message, claimed phone numbers).
+
+    Recipients already claimed (a duplicate or redelivered task) are skipped.
+    """
+    c.execute('SELECT message FROM broadcast_logs WHERE id = %s', (broadcast_id,))
+    row = c.fetchone()
+    if row is None:
+        return None, []
+    c.execute('''
+        UPDATE broadcast_recipients SET status = 'sending', attempted_at = NOW()
+        WHERE broadcast_id = %s AND phone_number = ANY(%s) AND status = 'pending'
+        RETURNING phone_number
+    ''', (broadcast_id, list(phone_numbers)))
+    return row[0], sorted(r[0] for r in c.fetchall())
+
+
+def record_delivery(c, broadcast_id, phone_number, error=None):
+    """Mark one claimed recipient sent (error=None) or failed"""
+    c.execute('''
+        UPDATE broadcast_recipients SET status = %s, error = %s, attempted_at = NOW()
+        WHERE broadcast_id = %s AND phone_number = %s
+    ''', ('failed' if error else 'sent', error, broadcast_id, phone_number))
+
+
+def add_progress(c, broadcast_id, success_count, fail_count):
+    """Atomically add to a broadcast's counters (and its scheduled broadcast's)"""
+    if not (success_count or fail_count):
+        return
+    c.execute('''
+        UPDATE broadcast_logs
+        SET success_count = success_count + %s, fail_count = fail_count + %s
+        WHERE id = %s
+        RETURNING scheduled_broadcast_id
+    ''', (success_count, fail_count, broadcast_id))
+    row = c.fetchone()
+    if row and row[0]:
+        c.execute('''
+            UPDATE scheduled_broadcasts
+            SET success_count = success_count + %s, fail_count = fail_count + %s
+            WHERE id = %s
+        ''', (success_count, fail_count, row[0]))
+
+
+def release_recipients(c, broadcast_id, phone_numbers):
+    """Return claimed but unsent recipients to pending (a chunk ran out of time)"""
+    c.execute('''
+        UPDATE broadcast_recipients SET status = 'pending'
+        WHERE broadcast_id = %s AND phone_number = ANY(%s) AND status = 'sending'
+    ''', (broadcast_id, list(phone_numbers)))
+
+
+def complete_broadcast(broadcast_id):
+    """Record a broadcast's final counts once every recipient has been attempted.
+
+    Recipients claimed longer ago than CLAIM_TIMEOUT belong to chunks that
+    died mid-send; they are marked failed rather than retried, since the
+    message may have gone out. Returns {'status': 'completed', 'sent': n,
+    'failed': n}, or {'status': 'sending', 'pending': n, 'in_flight': n}
+    while recipients are still waiting or being sent.
+    """
+    conn = None
+    try:
+        conn = get_db_connection()
+        c = conn.cursor()
+        c.execute('''
+            UPDATE broadcast_recipients SET status = 'failed', error = 'interrupted'
+            WHERE broadcast_id = %s AND status = 'sending'
+            AND attempted_at < NOW() - %s * INTERVAL '1 second'
+        ''', (broadcast_id, CLAIM_TIMEOUT))
+        c.execute('''
+            SELECT
+                COUNT(*) FILTER (WHERE status = 'sent'),
+                COUNT(*) FILTER (WHERE status = 'failed'),
+                COUNT(*) FILTER (WHERE status = 'pending'),
+                COUNT(*) FILTER (WHERE status = 'sending')
+            FROM broadcast_recipients WHERE broadcast_id = %s
+        ''', (broadcast_id,))
+        sent, failed, pending, in_flight = c.fetchone()
+        if pending or in_flight:
+            conn.commit()
+            return {'status': 'sending', 'pending': pending, 'in_flight': in_flight}
+
+        c.execute('''
+            UPDATE broadcast_logs
+            SET success_count = %s, fail_count = %s, status = 'completed', completed_at = NOW()
+            WHERE id = %s AND status IN ('pending', 'sending')
+            RETURNING scheduled_broadcast_id
+        ''', (sent, failed, broadcast_id))
+        row = c.fetchone()
+        if row and row[0]:
+            c.execute('''
+                UPDATE scheduled_broadcasts
+                SET success_count = %s, fail_count = %s, status = 'completed', sent_at = NOW()
+                WHERE id = %s
+            ''', (sent, failed, row[0]))
+        conn.commit()
+        logger.info(f"Broadcast {broadcast_id} completed: {sent} success, {failed} failed")
+        return {'status': 'completed', 'sent': sent, 'failed': failed}
+    finally:
+        if conn:
+            return_db_connection(conn)
+
+
+def find_stalled_broadcasts(minutes=BROADCAST_STALL_MINUTES):
+    """Unfinished broadcasts with recipients and no send attempt in the last `minutes`"""
+    conn = None
+    try:
+        conn = get_db_connection()
+        c = conn.cursor()
+        c.execute('''
+            SELECT b.id FROM broadcast_logs b
+            WHERE b.status IN ('pending', 'sending')
+            AND b.created_at < NOW() - %s * INTERVAL '1 minute'
+            AND EXISTS (SELECT 1 FROM broadcast_recipients r WHERE r.broadcast_id = b.id)
+            AND NOT EXISTS (
+                SELECT 1 FROM broadcast_recipients r
+                WHERE r.broadcast_id = b.id AND r.attempted_at >= NOW() - %s * INTERVAL '1 minute'
+            )
+            ORDER BY b.id
+        ''', (minutes, minutes))
+        return [row[0] for row in c.fetchall()]
+    finally:
+        if conn:
+            return_db_connection(conn)
+
+
+# =============================================================================
+# SHARED SEND RATE LIMIT
+# =============================================================================
+
+_redis = None
+_redis_retry_at = 0.0
+_local_lock = threading.Lock()
+_local_next_slot = 0.0
+
+
+def _get_redis():
+    global _redis
+    if not UPSTASH_REDIS_URL or time.monotonic() < _redis_retry_at:
+        return None
+    if _redis is None:
+        import redis
+        _redis = redis.Redis.from_url(UPSTASH_REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+    return _redis
+
+
+def acquire_send_slot(rate=None):
+    """Block until one more message fits in the shared per-second send rate.
+
+    Workers count sends in a Redis key per second, so BROADCAST_SEND_RATE
+    holds across all of them. Without Redis each process paces itself at
+    the full rate.
+    """
+    global _redis_retry_at, _local_next_slot
+    rate = rate or BROADCAST_SEND_RATE
+    while True:
+        client = _get_redis()
+        if client is None:
+            break
+        now = time.time()
+        key = f'{RATE_KEY_PREFIX}{int(now)}'
+        try:
+            count = client.incr(key)
+            if count == 1:
+                client.expire(key, 5)
+        except Exception as e:
+            logger.warning(f"Broadcast rate limit Redis unavailable, pacing in-process: {e}")
+            _redis_retry_at = time.monotonic() + REDIS_RETRY_INTERVAL
+            break
+        if count <= rate:
+            return
+        time.sleep(int(now) + 1 - now)
+
+    with _local_lock:
+        now = time.monotonic()
+        slot = max(now, _local_next_slot)
+        _local_next_slot = slot + 1.0 / rate
+    if slot > now:
+        time.sleep(slot - now)
@@ -4,14 +4,14 @@ Analyzes user conversations using AI to identify potential issues.
 """
 
 import json
-from openai import OpenAI
-from config import OPENAI_API_KEY, OPENAI_MODEL, OPENAI_TIMEOUT, logger
+from config import OPENAI_MODEL, logger
 from database import (
     get_unanalyzed_logs,
     mark_logs_analyzed,
     save_conversation_analysis,
     log_api_usage
 )
+from services.openai_client import chat_completion
 
 
 def analyze_conversation_batch(conversations: list) -> list:
@@ -70,9 +70,8 @@ Be conservative - only flag genuine issues, not minor imperfections.
 Focus on cases where the user likely didn't get what they wanted."""
 
     try:
-        client = OpenAI(api_key=OPENAI_API_KEY, timeout=OPENAI_TIMEOUT)
-
-        response = client.chat.completions.create(
+        response = chat_completion(
+            'analyze_conversation_batch',
             model=OPENAI_MODEL,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -0,0 +1,101 @@
+"""
+Customer Search Service
+Phone and name lookup for the CS portal and the admin CS tab
+
+A complete phone number (E.164, or 10/11 US digits with any formatting) is
+an exact primary-key lookup. Other digit strings match phone_number as a
+substring, and text matches first/last names (substring, or prefix for
+two-character terms). Every pattern is served by the pg_trgm GIN indexes on
+users (idx_users_*_trgm); without pg_trgm the same LIKEs run as scans.
+
+Search responses are cached per query for a few seconds in their own LRU,
+so retyped or debounced keystrokes never reach the database and never evict
+the admin dashboard's cached aggregates.
+"""
+
+import re
+from typing import Any, Optional
+
+from config import CS_SEARCH_CACHE_MAX_ENTRIES
+from utils.response_cache import ResponseCache
+
+MIN_QUERY_LENGTH = 2
+# Shorter digit strings have no trigram and match most numbers
+MIN_PHONE_DIGITS = 3
+# Name terms shorter than this are prefix-matched
+MIN_SUBSTRING_LENGTH = 3
+SEARCH_LIMIT = 50
+
+_PHONE_FORMATTING = re.compile(r'[\s().-]')
+_PHONE_QUERY = re.compile(r'\+?\d+')
+
+
+def full_phone_number(query: str) -> Optional[str]:
+    """E.164 form of query when it is a complete US phone number, else None"""
+    phone_query = _PHONE_FORMATTING.sub('', query.strip())
+    if not _PHONE_QUERY.fullmatch(phone_query):
+        return None
+    digits = phone_query.lstrip('+')
+    if len(digits) == 10:
+        digits = '1' + digits
+    if len(digits) == 11 and digits.startswith('1'):
+        return '+' + digits
+    return None
+
+
+def _escape_like(term: str) -> str:
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def search_customers(cursor: Any, query: str, columns: str, order_by: str,
+                     name_columns=('first_name', 'last_name'), limit: int = SEARCH_LIMIT) -> list:
+    """Rows of `columns` for users matching query, best first by order_by"""
+    query = query.strip()
+    phone_query = _PHONE_FORMATTING.sub('', query)
+
+    if _PHONE_QUERY.fullmatch(phone_query):
+        exact = full_phone_number(phone_query)
+        if exact:
+            cursor.execute(f'SELECT {columns} FROM users WHERE phone_number = %s', (exact,))
+            rows = cursor.fetchall()
+            if rows:
+                return rows
+        digits = phone_query.lstrip('+')
+        if len(digits) < MIN_PHONE_DIGITS:
+            return []
+        where = 'phone_number LIKE %s'
+        params = [f'%{digits}%']
+    else:
+        term = _escape_like(query.lower())
+        pattern = f'%{term}%' if len(query) >= MIN_SUBSTRING_LENGTH else f'{term}%'
+        where = ' OR '.join(f'LOWER({column}) LIKE %s' for column in name_columns)
+        params = [pattern] * len(name_columns)
+
+    cursor.execute(f'''
+        SELECT {columns} FROM users
+        WHERE {where}
+        ORDER BY {order_by}
+        LIMIT %s
+    ''', params + [limit])
+    return cursor.fetchall()
+
+
+def cache_params(query: str) -> dict:
+    """Response cache key parameters: queries that search the same thing share an entry"""
+    return {'q': _PHONE_FORMATTING.sub('', query.strip()) if full_phone_number(query) else query.strip().lower()}
+
+
+_cache = None
+
+
+def get_search_cache() -> ResponseCache:
+    """Process-wide search response cache; stale entries are recomputed inline, never in the background"""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache(max_stale=0, max_entries=CS_SEARCH_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+def get_search_cache_stats() -> dict[str, Any]:
+    """Entry count and hit counters for the admin stats endpoint"""
+    return get_search_cache().get_stats()
@@ -0,0 +1,217 @@
+"""
+Customer View Service
+Everything the CS portal shows for one customer, in one query
+
+The profile, subscription, a page of reminders, lists with their items,
+recent memories, support tickets and CS notes are assembled by a single
+statement (json_agg per section) on one connection, and encrypted fields
+are decrypted together afterwards.
+
+Views are cached by the customer's data version: the users row's xmin
+(changes on any profile update), customer_data_versions.version (bumped by
+triggers whenever the customer's lists, memories, tickets or notes change),
+and the count and newest xmin of the customer's reminders. Reminders are
+derived rather than triggered so delivery, which updates reminders
+constantly, never writes customer_data_versions. A changed customer gets a
+new cache key, so a cached view is never stale; checking costs a
+primary-key lookup plus one scan of the customer's reminders.
+"""
+
+from typing import Any, Optional
+
+from config import ENCRYPTION_ENABLED, CS_CUSTOMER_VIEW_CACHE_MAX_ENTRIES
+from utils.response_cache import ResponseCache
+
+REMINDER_PAGE_SIZE = 50
+MAX_REMINDER_PAGE_SIZE = 200
+MEMORY_LIMIT = 50
+
+_VERSION_SQL = '''
+    SELECT u.xmin::text, COALESCE(v.version, 0), r.count, r.newest
+    FROM users u
+    LEFT JOIN customer_data_versions v ON v.phone_number = u.phone_number
+    CROSS JOIN LATERAL (
+        SELECT COUNT(*) AS count, COALESCE(MAX(xmin::text::bigint), 0) AS newest
+        FROM reminders WHERE phone_number = u.phone_number
+    ) r
+    WHERE u.phone_number = %s
+'''
+
+_VIEW_SQL = '''
+    SELECT
+        u.phone_number, u.first_name, u.first_name_encrypted, u.last_name, u.last_name_encrypted,
+        u.email, u.email_encrypted, u.zip_code, u.timezone, u.onboarding_complete, u.created_at,
+        u.last_active_at, COALESCE(u.total_messages, 0), COALESCE(u.opted_out, FALSE), u.opted_out_at,
+        COALESCE(u.premium_status, 'free'), u.premium_since, u.trial_end_date, u.subscription_status,
+        u.stripe_customer_id, u.stripe_subscription_id,
+        reminder_counts.total, reminder_counts.pending,
+        (SELECT COALESCE(json_agg(page ORDER BY page.reminder_date DESC, page.id DESC), '[]')
+         FROM (
+             SELECT id, reminder_text, reminder_text_encrypted, reminder_date, sent,
+                    delivery_status, recurring_id, created_at
+             FROM reminders WHERE phone_number = u.phone_number
+             ORDER BY reminder_date DESC, id DESC
+             LIMIT %s OFFSET %s
+         ) page),
+        (SELECT COALESCE(json_agg(json_build_object(
+                    'id', l.id, 'name', l.list_name, 'created_at', l.created_at, 'items', items.items
+                ) ORDER BY l.created_at DESC, l.id DESC), '[]')
+         FROM lists l
+         CROSS JOIN LATERAL (
+             SELECT COALESCE(json_agg(json_build_object(
+                        'id', i.id, 'text', i.item_text, 'text_encrypted', i.item_text_encrypted,
+                        'completed', i.completed
+                    ) ORDER BY i.created_at, i.id), '[]') AS items
+             FROM list_items i WHERE i.list_id = l.id
+         ) items
+         WHERE l.phone_number = u.phone_number),
+        (SELECT COUNT(*) FROM memories WHERE phone_number = u.phone_number),
+        (SELECT COALESCE(json_agg(recent ORDER BY recent.created_at DESC, recent.id DESC), '[]')
+         FROM (
+             SELECT id, memory_text, memory_text_encrypted, created_at
+             FROM memories WHERE phone_number = u.phone_number
+             ORDER BY created_at DESC, id DESC
+             LIMIT %s
+         ) recent),
+        (SELECT COALESCE(json_agg(json_build_object(
+                    'id', t.id, 'status', t.status, 'category', t.category, 'priority', t.priority,
+                    'assigned_to', t.assigned_to, 'created_at', t.created_at, 'updated_at', t.updated_at,
+                    'message_count', t.message_count
+                ) ORDER BY t.updated_at DESC, t.id DESC), '[]')
+         FROM support_tickets t WHERE t.phone_number = u.phone_number),
+        (SELECT COALESCE(json_agg(json_build_object(
+                    'note', n.note, 'created_by', n.created_by, 'created_at', n.created_at
+                ) ORDER BY n.created_at DESC, n.id DESC), '[]')
+         FROM customer_notes n WHERE n.phone_number = u.phone_number)
+    FROM users u
+    CROSS JOIN LATERAL (
+        SELECT COUNT(*) AS total, COUNT(*) FILTER (WHERE sent = FALSE) AS pending
+        FROM reminders WHERE phone_number = u.phone_number
+    ) reminder_counts
+    WHERE u.phone_number = %s
+'''
+
+
+def get_data_version(cursor: Any, phone_number: str) -> Optional[str]:
+    """Current data version of a customer, or None if there is no such customer"""
+    cursor.execute(_VERSION_SQL, (phone_number,))
+    row = cursor.fetchone()
+    return '.'.join(str(part) for part in row) if row else None
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _decrypt_into(fields: list) -> None:
+    """For each (obj, key, encrypted), replace obj[key] with the decrypted value, in one batch"""
+    pending = [(obj, key, encrypted) for obj, key, encrypted in fields if encrypted]
+    if not pending or not ENCRYPTION_ENABLED:
+        return
+    from utils.encryption import safe_decrypt_many
+    for (obj, key, _), plaintext in zip(pending, safe_decrypt_many([encrypted for _, _, encrypted in pending])):
+        obj[key] = plaintext
+
+
+def get_customer_view(cursor: Any, phone_number: str, reminder_limit: int = REMINDER_PAGE_SIZE,
+                      reminder_offset: int = 0) -> Optional[dict[str, Any]]:
+    """The CS view of a customer with one page of reminders (newest first), or None if not found"""
+    cursor.execute(_VIEW_SQL, (reminder_limit, reminder_offset, MEMORY_LIMIT, phone_number))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    (phone, first_name, first_name_encrypted, last_name, last_name_encrypted, email, email_encrypted,
+     zip_code, timezone, onboarding_complete, created_at, last_active_at, total_messages, opted_out,
+     opted_out_at, tier, premium_since, trial_end_date, subscription_status, stripe_customer_id,
+     stripe_subscription_id, reminder_total, reminders_pending, reminder_rows, lists, memory_count,
+     memory_rows, tickets, notes) = row
+
+    profile = {
+        'phone': phone,
+        'phone_masked': f"***{phone[-4:]}",
+        'name': first_name,
+        'last_name': last_name,
+        'email': email,
+        'zip_code': zip_code,
+        'timezone': timezone,
+        'onboarding_complete': onboarding_complete,
+        'created_at': _iso(created_at),
+        'last_active_at': _iso(last_active_at),
+        'total_messages': total_messages,
+        'active': not opted_out,
+        'opted_out_at': _iso(opted_out_at),
+    }
+    reminders = [
+        {
+            'id': r['id'],
+            'text': r['reminder_text'],
+            'reminder_time': r['reminder_date'],
+            'status': r['delivery_status'] or ('sent' if r['sent'] else 'pending'),
+            'sent': r['sent'],
+            'is_recurring': r['recurring_id'] is not None,
+            'created_at': r['created_at'],
+        }
+        for r in reminder_rows
+    ]
+    memories = [
+        {'id': m['id'], 'content': m['memory_text'], 'created_at': m['created_at']}
+        for m in memory_rows
+    ]
+
+    encrypted_fields = [
+        (profile, 'name', first_name_encrypted),
+        (profile, 'last_name', last_name_encrypted),
+        (profile, 'email', email_encrypted),
+    ]
+    encrypted_fields += [(view, 'text', r['reminder_text_encrypted']) for view, r in zip(reminders, reminder_rows)]
+    encrypted_fields += [(view, 'content', m['memory_text_encrypted']) for view, m in zip(memories, memory_rows)]
+    for lst in lists:
+        for item in lst['items']:
+            encrypted_fields.append((item, 'text', item.pop('text_encrypted')))
+    _decrypt_into(encrypted_fields)
+
+    return {
+        'profile': profile,
+        'subscription': {
+            'tier': tier,
+            'premium_since': _iso(premium_since),
+            'trial_end_date': _iso(trial_end_date),
+            'subscription_status': subscription_status,
+            'stripe_customer_id': stripe_customer_id,
+            'stripe_subscription_id': stripe_subscription_id,
+        },
+        'stats': {
+            'reminders': reminder_total,
+            'pending_reminders': reminders_pending,
+            'lists': len(lists),
+            'memories': memory_count,
+            'open_tickets': sum(1 for t in tickets if t['status'] != 'closed'),
+        },
+        'reminders': {
+            'items': reminders,
+            'total': reminder_total,
+            'limit': reminder_limit,
+            'offset': reminder_offset,
+            'has_more': reminder_offset + len(reminders) < reminder_total,
+        },
+        'lists': lists,
+        'memories': memories,
+        'tickets': tickets,
+        'notes': notes,
+    }
+
+
+_cache = None
+
+
+def get_view_cache() -> ResponseCache:
+    """Process-wide customer view cache; entries are keyed by data version, so never refreshed"""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache(max_stale=0, max_entries=CS_CUSTOMER_VIEW_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+def get_view_cache_stats() -> dict[str, Any]:
+    """Entry count and hit counters for the admin stats endpoint"""
+    return get_view_cache().get_stats()
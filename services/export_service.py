@@ -19,7 +19,7 @@ def get_user_export_data(phone_number: str) -> dict:
     """Collect all user data for export"""
     conn = None
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         c = conn.cursor()
 
         # User profile
@@ -3,9 +3,13 @@ Metrics Service
 Handles user activity tracking and metrics aggregation
 """
 
-from datetime import datetime
+import json
+from datetime import datetime, timedelta
+
+from psycopg2.extras import execute_values
+
 from database import get_db_connection, return_db_connection
-from config import logger
+from config import logger, METRICS_ROLLUP_REFRESH_DAYS
 
 
 def _date_filter(column, start_date=None, end_date=None):
@@ -121,398 +125,287 @@ def set_referral_source(phone_number, source):
 
 
 # =============================================================================
-# AGGREGATION QUERIES
+# DAILY ROLLUPS
 # =============================================================================
-
-def get_active_users(days=7, start_date=None, end_date=None):
-    """Get count of users active in last N days"""
+#
+# metrics_daily holds one row per UTC day with the creation counts the admin
+# overview needs (memories, reminders, lists, list_items created that day).
+# refresh_metrics_rollups (Celery, every 15 minutes) recomputes the last
+# METRICS_ROLLUP_REFRESH_DAYS complete days plus any days since the last
+# refresh; a nightly full run reconciles older days for deletions. Days after
+# the last rolled-up day, including today, are computed live from the
+# created_at indexes, so the overview costs the same however large the raw
+# tables get.
+#
+# Status snapshots and counters (onboarding and plan status, message totals,
+# referrals, reminder delivery status) change on old rows, so they are never
+# rolled up: they are counted live, from users and from partial indexes on
+# reminders.created_at per delivery status.
+
+ROLLUP_COUNTS = ('memories', 'reminders', 'lists', 'list_items')
+
+_ROLLUP_QUERIES = tuple(
+    (f'SELECT DATE(created_at), COUNT(*) FROM {table} WHERE 1=1{{filter}} GROUP BY 1', table)
+    for table in ROLLUP_COUNTS
+)
+
+USER_COUNTS = (
+    'users_onboarded', 'users_pending_onboarding', 'users_free', 'users_premium', 'users_churned',
+    'user_messages',
+)
+
+_USER_COUNTS_QUERY = '''
+    SELECT DATE(created_at),
+        COUNT(*) FILTER (WHERE onboarding_complete = TRUE),
+        COUNT(*) FILTER (WHERE onboarding_complete = FALSE AND onboarding_step > 0),
+        COUNT(*) FILTER (WHERE onboarding_complete = TRUE AND COALESCE(premium_status, 'free') = 'free'),
+        COUNT(*) FILTER (WHERE onboarding_complete = TRUE AND premium_status = 'premium'),
+        COUNT(*) FILTER (WHERE onboarding_complete = TRUE AND premium_status = 'churned'),
+        COALESCE(SUM(COALESCE(total_messages, 0)), 0)
+    FROM users WHERE 1=1{filter}
+    GROUP BY 1
+'''
+
+# Each predicate matches a partial index on reminders (created_at)
+_REMINDER_STATUSES = {
+    'pending': "COALESCE(delivery_status, 'pending') = 'pending'",
+    'sent': "delivery_status = 'sent'",
+    'failed': "delivery_status = 'failed'",
+}
+
+
+def _empty_bucket():
+    return dict.fromkeys(ROLLUP_COUNTS, 0)
+
+
+def _compute_buckets(c, start_date=None, end_date=None):
+    """Per-day creation counts computed from the raw tables for rows created in [start_date, end_date)"""
+    df, dp = _date_filter('created_at', start_date, end_date)
+    buckets = {}
+    for query, column in _ROLLUP_QUERIES:
+        c.execute(query.format(filter=df), dp)
+        for day, count in c.fetchall():
+            buckets.setdefault(day, _empty_bucket())[column] = int(count)
+    return buckets
+
+
+def refresh_metrics_rollups(days=METRICS_ROLLUP_REFRESH_DAYS):
+    """Recompute metrics_daily for the last `days` complete days (None = all history).
+
+    Days after the last rolled-up day are always included, so a refresh that
+    missed some runs catches up. Every day in the window gets a row (zeros
+    when nothing was created), so MAX(day) marks how far the rollups reach.
+
+    Returns the number of days written.
+    """
     conn = None
     try:
         conn = get_db_connection()
         c = conn.cursor()
-        query = '''
-            SELECT COUNT(*) FROM users
-            WHERE last_active_at >= NOW() - INTERVAL '%s days'
-            AND onboarding_complete = TRUE
-        '''
-        params = [days]
-        df, dp = _date_filter('created_at', start_date, end_date)
-        query += df
-        params.extend(dp)
-        c.execute(query, params)
-        result = c.fetchone()[0]
-        return result
-    except Exception as e:
-        logger.error(f"Error getting active users: {e}")
-        return 0
-    finally:
-        if conn:
-            return_db_connection(conn)
-
+        c.execute('SELECT CURRENT_DATE, (SELECT MAX(day) FROM metrics_daily)')
+        today, covered = c.fetchone()
 
-def get_daily_signups(days=30, start_date=None, end_date=None):
-    """Get daily signup counts for last N days"""
-    conn = None
-    try:
-        conn = get_db_connection()
-        c = conn.cursor()
-        if start_date or end_date:
-            query = '''
-                SELECT DATE(created_at) as signup_date, COUNT(*) as count
-                FROM users
-                WHERE onboarding_complete = TRUE
-            '''
-            params = []
-            df, dp = _date_filter('created_at', start_date, end_date)
-            query += df
-            params.extend(dp)
-            query += ' GROUP BY DATE(created_at) ORDER BY signup_date DESC'
-            c.execute(query, params)
+        if days is None or covered is None:
+            c.execute(f"SELECT LEAST({', '.join(f'(SELECT MIN(created_at) FROM {t})' for t in ROLLUP_COUNTS)})")
+            earliest = c.fetchone()[0]
+            start = earliest.date() if earliest else today
         else:
-            c.execute('''
-                SELECT DATE(created_at) as signup_date, COUNT(*) as count
-                FROM users
-                WHERE created_at >= NOW() - INTERVAL '%s days'
-                AND onboarding_complete = TRUE
-                GROUP BY DATE(created_at)
-                ORDER BY signup_date DESC
-            ''', (days,))
-        results = c.fetchall()
-        return results
-    except Exception as e:
-        logger.error(f"Error getting daily signups: {e}")
-        return []
-    finally:
-        if conn:
-            return_db_connection(conn)
-
-
-def get_new_user_counts(start_date=None, end_date=None):
-    """Get new user counts for today, this week, and this month"""
-    conn = None
-    try:
-        conn = get_db_connection()
-        c = conn.cursor()
-        df, dp = _date_filter('created_at', start_date, end_date)
-
-        # Today
-        query = '''
-            SELECT COUNT(*) FROM users
-            WHERE DATE(created_at) = CURRENT_DATE
-            AND onboarding_complete = TRUE
-        '''
-        query += df
-        c.execute(query, dp)
-        today = c.fetchone()[0]
-
-        # This week (last 7 days)
-        query = '''
-            SELECT COUNT(*) FROM users
-            WHERE created_at >= NOW() - INTERVAL '7 days'
-            AND onboarding_complete = TRUE
-        '''
-        query += df
-        c.execute(query, list(dp))
-        this_week = c.fetchone()[0]
-
-        # This month (last 30 days)
-        query = '''
-            SELECT COUNT(*) FROM users
-            WHERE created_at >= NOW() - INTERVAL '30 days'
-            AND onboarding_complete = TRUE
-        '''
-        query += df
-        c.execute(query, list(dp))
-        this_month = c.fetchone()[0]
-
-        return {
-            'today': today,
-            'this_week': this_week,
-            'this_month': this_month
-        }
-    except Exception as e:
-        logger.error(f"Error getting new user counts: {e}")
-        return {'today': 0, 'this_week': 0, 'this_month': 0}
-    finally:
-        if conn:
-            return_db_connection(conn)
-
-
-def get_premium_stats(start_date=None, end_date=None):
-    """Get premium vs free user counts"""
-    conn = None
-    try:
-        conn = get_db_connection()
-        c = conn.cursor()
-        query = '''
-            SELECT
-                COALESCE(premium_status, 'free') as status,
-                COUNT(*) as count
-            FROM users
-            WHERE onboarding_complete = TRUE
-        '''
-        params = []
-        df, dp = _date_filter('created_at', start_date, end_date)
-        query += df
-        params.extend(dp)
-        query += ' GROUP BY COALESCE(premium_status, \'free\')'
-        c.execute(query, params)
-        results = c.fetchall()
-
-        stats = {'free': 0, 'premium': 0, 'churned': 0}
-        for status, count in results:
-            if status in stats:
-                stats[status] = count
-        return stats
+            start = min(today - timedelta(days=days), covered + timedelta(days=1))
+        if start >= today:
+            conn.commit()
+            return 0
+
+        buckets = _compute_buckets(c, start, today)
+        rows = []
+        day = start
+        while day < today:
+            bucket = buckets.get(day) or _empty_bucket()
+            rows.append((day, *(bucket[column] for column in ROLLUP_COUNTS)))
+            day += timedelta(days=1)
+
+        execute_values(
+            c,
+            f"""
+                INSERT INTO metrics_daily (day, {', '.join(ROLLUP_COUNTS)}) VALUES %s
+                ON CONFLICT (day) DO UPDATE SET
+                    {', '.join(f'{column} = EXCLUDED.{column}' for column in ROLLUP_COUNTS)},
+                    refreshed_at = CURRENT_TIMESTAMP
+            """,
+            rows,
+            page_size=500,
+        )
+        conn.commit()
+        logger.info(f"Refreshed metrics rollups for {len(rows)} days from {start}")
+        return len(rows)
     except Exception as e:
-        logger.error(f"Error getting premium stats: {e}")
-        return {'free': 0, 'premium': 0, 'churned': 0}
-    finally:
+        logger.error(f"Error refreshing metrics rollups: {e}")
         if conn:
-            return_db_connection(conn)
-
-
-def get_reminder_completion_rate(start_date=None, end_date=None):
-    """Get reminder delivery statistics"""
-    conn = None
-    try:
-        conn = get_db_connection()
-        c = conn.cursor()
-        query = '''
-            SELECT
-                COALESCE(delivery_status, 'pending') as status,
-                COUNT(*) as count
-            FROM reminders
-            WHERE 1=1
-        '''
-        params = []
-        df, dp = _date_filter('created_at', start_date, end_date)
-        query += df
-        params.extend(dp)
-        query += " GROUP BY COALESCE(delivery_status, 'pending')"
-        c.execute(query, params)
-        results = c.fetchall()
-
-        stats = {'pending': 0, 'sent': 0, 'failed': 0}
-        for status, count in results:
-            if status in stats:
-                stats[status] = count
-
-        total = stats['sent'] + stats['failed']
-        if total > 0:
-            stats['completion_rate'] = round(stats['sent'] / total * 100, 1)
-        else:
-            stats['completion_rate'] = 100.0
-
-        return stats
-    except Exception as e:
-        logger.error(f"Error getting reminder completion rate: {e}")
-        return {'pending': 0, 'sent': 0, 'failed': 0, 'completion_rate': 0}
+            conn.rollback()
+        return 0
     finally:
         if conn:
             return_db_connection(conn)
 
 
-def get_engagement_stats(start_date=None, end_date=None):
-    """Get average engagement metrics per user"""
-    conn = None
-    try:
-        conn = get_db_connection()
-        c = conn.cursor()
-        df_user, dp_user = _date_filter('created_at', start_date, end_date)
-
-        # Get total users
-        query = 'SELECT COUNT(*) FROM users WHERE onboarding_complete = TRUE'
-        query += df_user
-        c.execute(query, dp_user)
-        total_users = c.fetchone()[0] or 1
-
-        # Get total memories
-        df_mem, dp_mem = _date_filter('created_at', start_date, end_date)
-        query = 'SELECT COUNT(*) FROM memories WHERE 1=1'
-        query += df_mem
-        c.execute(query, dp_mem)
-        total_memories = c.fetchone()[0]
-
-        # Get total reminders
-        df_rem, dp_rem = _date_filter('created_at', start_date, end_date)
-        query = 'SELECT COUNT(*) FROM reminders WHERE 1=1'
-        query += df_rem
-        c.execute(query, dp_rem)
-        total_reminders = c.fetchone()[0]
-
-        # Get total messages (from users created in range)
-        query = 'SELECT SUM(COALESCE(total_messages, 0)) FROM users WHERE 1=1'
-        query += df_user
-        c.execute(query, list(dp_user))
-        total_messages = c.fetchone()[0] or 0
-
-        # Get total lists
-        df_list, dp_list = _date_filter('created_at', start_date, end_date)
-        query = 'SELECT COUNT(*) FROM lists WHERE 1=1'
-        query += df_list
-        c.execute(query, dp_list)
-        total_lists = c.fetchone()[0]
-
-        # Get total list items
-        df_li, dp_li = _date_filter('created_at', start_date, end_date)
-        query = 'SELECT COUNT(*) FROM list_items WHERE 1=1'
-        query += df_li
-        c.execute(query, dp_li)
-        total_list_items = c.fetchone()[0]
-
-        # Calculate avg items per list
-        avg_items_per_list = round(total_list_items / total_lists, 2) if total_lists > 0 else 0
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _overview_buckets(c, start_date=None, end_date=None):
+    """(today, {day: bucket}) for [start_date, end_date): rolled-up days plus live days after them"""
+    c.execute('SELECT CURRENT_DATE, (SELECT MAX(day) FROM metrics_daily)')
+    today, covered = c.fetchone()
+    start, end = _as_date(start_date), _as_date(end_date)
+
+    buckets = {}
+    if covered is not None:
+        query = f"SELECT day, {', '.join(ROLLUP_COUNTS)} FROM metrics_daily WHERE 1=1"
+        df, dp = _date_filter('day', start, end)
+        c.execute(query + df, dp)
+        for row in c.fetchall():
+            buckets[row[0]] = dict(zip(ROLLUP_COUNTS, row[1:]))
+
+    live_start = covered + timedelta(days=1) if covered is not None else None
+    if start is not None and (live_start is None or start > live_start):
+        live_start = start
+    if live_start is None or end is None or live_start < end:
+        buckets.update(_compute_buckets(c, live_start, end))
+    return today, buckets
+
+
+def _user_counts(c, start_date=None, end_date=None):
+    """Live ({creation day: user status counts}, {referral source: onboarded users}) for users created in the range"""
+    df, dp = _date_filter('created_at', start_date, end_date)
+    c.execute(_USER_COUNTS_QUERY.format(filter=df), dp)
+    by_day = {row[0]: dict(zip(USER_COUNTS, (int(value) for value in row[1:]))) for row in c.fetchall()}
+    c.execute(f'''
+        SELECT COALESCE(referral_source, 'unknown'), COUNT(*)
+        FROM users WHERE onboarding_complete = TRUE{df}
+        GROUP BY 1
+    ''', dp)
+    return by_day, dict(c.fetchall())
+
+
+def _reminder_status_counts(c, start_date=None, end_date=None):
+    """Live {status: count} of reminders created in the range, by delivery status"""
+    df, dp = _date_filter('created_at', start_date, end_date)
+    c.execute(
+        'SELECT ' + ', '.join(
+            f'(SELECT COUNT(*) FROM reminders WHERE {predicate}{df})' for predicate in _REMINDER_STATUSES.values()
+        ),
+        dp * len(_REMINDER_STATUSES)
+    )
+    return dict(zip(_REMINDER_STATUSES, c.fetchone()))
+
+
+def _active_user_counts(c, start_date=None, end_date=None):
+    """(active in last 7 days, active in last 30 days) among onboarded users created in the range"""
+    df, dp = _date_filter('created_at', start_date, end_date)
+    c.execute(f'''
+        SELECT
+            COUNT(*) FILTER (WHERE last_active_at >= NOW() - INTERVAL '7 days'),
+            COUNT(*)
+        FROM users
+        WHERE last_active_at >= NOW() - INTERVAL '30 days'
+        AND onboarding_complete = TRUE{df}
+    ''', dp)
+    return c.fetchone()
 
-        return {
-            'avg_memories_per_user': round(total_memories / total_users, 2),
-            'avg_reminders_per_user': round(total_reminders / total_users, 2),
-            'avg_messages_per_user': round(total_messages / total_users, 2),
-            'avg_lists_per_user': round(total_lists / total_users, 2),
-            'avg_items_per_list': avg_items_per_list,
-            'total_memories': total_memories,
-            'total_reminders': total_reminders,
-            'total_messages': total_messages,
-            'total_lists': total_lists
-        }
-    except Exception as e:
-        logger.error(f"Error getting engagement stats: {e}")
-        return {
-            'avg_memories_per_user': 0,
-            'avg_reminders_per_user': 0,
-            'avg_messages_per_user': 0,
-            'avg_lists_per_user': 0,
-            'avg_items_per_list': 0,
-            'total_memories': 0,
-            'total_reminders': 0,
-            'total_messages': 0,
-            'total_lists': 0
-        }
-    finally:
-        if conn:
-            return_db_connection(conn)
 
+# =============================================================================
+# AGGREGATION QUERIES
+# =============================================================================
 
-def get_referral_breakdown(start_date=None, end_date=None):
-    """Get user counts by referral source"""
-    conn = None
-    try:
-        conn = get_db_connection()
-        c = conn.cursor()
-        query = '''
-            SELECT
-                COALESCE(referral_source, 'unknown') as source,
-                COUNT(*) as count
-            FROM users
-            WHERE onboarding_complete = TRUE
-        '''
-        params = []
-        df, dp = _date_filter('created_at', start_date, end_date)
-        query += df
-        params.extend(dp)
-        query += " GROUP BY COALESCE(referral_source, 'unknown') ORDER BY count DESC"
-        c.execute(query, params)
-        results = c.fetchall()
-        return results
-    except Exception as e:
-        logger.error(f"Error getting referral breakdown: {e}")
-        return []
-    finally:
-        if conn:
-            return_db_connection(conn)
+# Rolling windows reported by get_cost_analytics, all ending now (widest last)
+COST_PERIODS = {
+    'hour': '1 hour',
+    'day': '1 day',
+    'week': '7 days',
+    'month': '30 days'
+}
+COST_PLANS = ['free', 'trial', 'premium', 'family']
+
+# Plan tier for cost reporting (paid plans still inside their trial count as 'trial')
+_COST_PLAN_SQL = '''
+    CASE
+        WHEN u.trial_end_date > NOW() AND u.premium_status IN ('premium', 'family')
+            THEN 'trial'
+        ELSE COALESCE(u.premium_status, 'free')
+    END
+'''
+
+
+def _per_period(aggregate, column):
+    """`aggregate FILTER (WHERE column in period)` for each cost period, in order"""
+    return ', '.join(
+        f"{aggregate} FILTER (WHERE {column} >= NOW() - INTERVAL '{interval}')"
+        for interval in COST_PERIODS.values()
+    )
 
 
 def get_cost_analytics(start_date=None, end_date=None):
-    """Get cost analytics broken down by plan tier and time period"""
+    """Get cost analytics broken down by plan tier and time period
+
+    logs and api_usage are each read once, over the widest period (bounded
+    by their created_at indexes); FILTER aggregates split the rows into the
+    narrower periods.
+    """
     conn = None
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         c = conn.cursor()
-
-        # Time period intervals
-        periods = {
-            'hour': '1 hour',
-            'day': '1 day',
-            'week': '7 days',
-            'month': '30 days'
-        }
+        widest = list(COST_PERIODS.values())[-1]
 
         # Get user counts by plan (distinguishing trial users)
-        user_query = '''
-            SELECT
-                CASE
-                    WHEN trial_end_date > NOW() AND premium_status IN ('premium', 'family')
-                        THEN 'trial'
-                    ELSE COALESCE(premium_status, 'free')
-                END as plan,
-                COUNT(*) as count
-            FROM users
-            WHERE onboarding_complete = TRUE
-        '''
-        user_params = []
-        df_u, dp_u = _date_filter('created_at', start_date, end_date)
-        user_query += df_u + ' GROUP BY 1'
-        user_params.extend(dp_u)
-        c.execute(user_query, user_params)
+        df_u, dp_u = _date_filter('u.created_at', start_date, end_date)
+        c.execute(f'''
+            SELECT {_COST_PLAN_SQL} AS plan, COUNT(*) AS count
+            FROM users u
+            WHERE u.onboarding_complete = TRUE{df_u}
+            GROUP BY 1
+        ''', dp_u)
         user_counts = {row[0]: row[1] for row in c.fetchall()}
 
-        results = {}
+        # SMS message counts by plan, one column per period
+        df_l, dp_l = _date_filter('l.created_at', start_date, end_date)
+        c.execute(f'''
+            SELECT {_COST_PLAN_SQL} AS plan, {_per_period('COUNT(*)', 'l.created_at')}
+            FROM logs l
+            JOIN users u ON l.phone_number = u.phone_number
+            WHERE l.created_at >= NOW() - INTERVAL '{widest}'{df_l}
+            GROUP BY 1
+        ''', dp_l)
+        sms_by_plan = {row[0]: row[1:] for row in c.fetchall()}
+
+        # AI token usage by plan (cache hits cost nothing), prompt then completion per period
+        df_a, dp_a = _date_filter('a.created_at', start_date, end_date)
+        c.execute(f'''
+            SELECT {_COST_PLAN_SQL} AS plan,
+                {_per_period('SUM(a.prompt_tokens)', 'a.created_at')},
+                {_per_period('SUM(a.completion_tokens)', 'a.created_at')}
+            FROM api_usage a
+            JOIN users u ON a.phone_number = u.phone_number
+            WHERE a.created_at >= NOW() - INTERVAL '{widest}' AND NOT a.cached{df_a}
+            GROUP BY 1
+        ''', dp_a)
+        ai_by_plan = {row[0]: row[1:] for row in c.fetchall()}
 
-        for period_name, interval in periods.items():
+        results = {}
+        period_count = len(COST_PERIODS)
+        for index, period_name in enumerate(COST_PERIODS):
             period_data = {}
 
-            # Build additional date filter for logs/api_usage
-            df_l, dp_l = _date_filter('l.created_at', start_date, end_date)
-            df_a, dp_a = _date_filter('a.created_at', start_date, end_date)
-
-            # Get SMS costs by plan (count messages from logs table)
-            sms_query = '''
-                SELECT
-                    CASE
-                        WHEN u.trial_end_date > NOW() AND u.premium_status IN ('premium', 'family')
-                            THEN 'trial'
-                        ELSE COALESCE(u.premium_status, 'free')
-                    END as plan,
-                    COUNT(*) as message_count
-                FROM logs l
-                JOIN users u ON l.phone_number = u.phone_number
-                WHERE l.created_at >= NOW() - %s::interval
-            '''
-            sms_params = [interval]
-            sms_query += df_l
-            sms_params.extend(dp_l)
-            sms_query += ' GROUP BY 1'
-            c.execute(sms_query, sms_params)
-            sms_by_plan = {row[0]: row[1] for row in c.fetchall()}
-
-            # Get AI costs by plan (from api_usage table)
-            ai_query = '''
-                SELECT
-                    CASE
-                        WHEN u.trial_end_date > NOW() AND u.premium_status IN ('premium', 'family')
-                            THEN 'trial'
-                        ELSE COALESCE(u.premium_status, 'free')
-                    END as plan,
-                    SUM(a.prompt_tokens) as prompt_tokens,
-                    SUM(a.completion_tokens) as completion_tokens
-                FROM api_usage a
-                JOIN users u ON a.phone_number = u.phone_number
-                WHERE a.created_at >= NOW() - %s::interval
-            '''
-            ai_params = [interval]
-            ai_query += df_a
-            ai_params.extend(dp_a)
-            ai_query += ' GROUP BY 1'
-            c.execute(ai_query, ai_params)
-            ai_by_plan = {row[0]: {'prompt': row[1] or 0, 'completion': row[2] or 0} for row in c.fetchall()}
-
             # Calculate costs for each plan tier (including trial)
-            for plan in ['free', 'trial', 'premium', 'family']:
-                message_count = sms_by_plan.get(plan, 0)
+            for plan in COST_PLANS:
+                message_count = sms_by_plan[plan][index] if plan in sms_by_plan else 0
                 # Each interaction = 1 inbound + 1 outbound
                 sms_cost = message_count * 2 * SMS_COST_PER_MESSAGE
 
-                ai_tokens = ai_by_plan.get(plan, {'prompt': 0, 'completion': 0})
+                ai_row = ai_by_plan.get(plan)
+                ai_tokens = {
+                    'prompt': (ai_row[index] or 0) if ai_row else 0,
+                    'completion': (ai_row[period_count + index] or 0) if ai_row else 0,
+                }
                 ai_cost = (
                     (ai_tokens['prompt'] / 1000) * OPENAI_INPUT_COST_PER_1K +
                     (ai_tokens['completion'] / 1000) * OPENAI_OUTPUT_COST_PER_1K
@@ -567,7 +460,7 @@ def get_twilio_actual_costs(start_date=None, end_date=None):
     """
     conn = None
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         c = conn.cursor()
 
         periods = {
@@ -616,45 +509,74 @@ def get_twilio_actual_costs(start_date=None, end_date=None):
 
 
 def get_all_metrics(start_date=None, end_date=None):
-    """Get all metrics for dashboard"""
+    """Get all metrics for dashboard (from metrics_daily plus live days, on one connection)
+
+    Status and counter metrics (users, messages, referrals, reminder delivery)
+    are always counted live. Counts follow the creation day of the rows counted. new_users and the
+    default daily_signups window use calendar days (this week = the last 7
+    days including today).
+    """
     conn = None
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         c = conn.cursor()
 
-        # Total users (completed onboarding)
-        query = 'SELECT COUNT(*) FROM users WHERE onboarding_complete = TRUE'
-        params = []
-        df, dp = _date_filter('created_at', start_date, end_date)
-        query += df
-        params.extend(dp)
-        c.execute(query, params)
-        total_users = c.fetchone()[0]
-
-        # Pending onboarding (started but not completed)
-        query = 'SELECT COUNT(*) FROM users WHERE onboarding_complete = FALSE AND onboarding_step > 0'
-        query += df
-        c.execute(query, list(dp))
-        pending_onboarding = c.fetchone()[0]
-
-        # Convert referrals to serializable format
-        referrals_raw = get_referral_breakdown(start_date=start_date, end_date=end_date)
-        referrals = [[str(r[0]), r[1]] for r in referrals_raw]
-
-        # Convert daily_signups to serializable format
-        signups_raw = get_daily_signups(30, start_date=start_date, end_date=end_date)
-        daily_signups = [[str(s[0]), s[1]] for s in signups_raw]
+        today, buckets = _overview_buckets(c, start_date, end_date)
+        user_days, referrals = _user_counts(c, start_date, end_date)
+        reminder_statuses = _reminder_status_counts(c, start_date, end_date)
+        totals = dict.fromkeys(ROLLUP_COUNTS + USER_COUNTS, 0)
+        for bucket in list(buckets.values()) + list(user_days.values()):
+            for column, count in bucket.items():
+                totals[column] += count
+
+        def onboarded_since(days_back):
+            return sum(u['users_onboarded'] for day, u in user_days.items() if day > today - timedelta(days=days_back))
+
+        active_7d, active_30d = _active_user_counts(c, start_date, end_date)
+
+        delivered = reminder_statuses['sent'] + reminder_statuses['failed']
+        reminder_stats = {
+            **reminder_statuses,
+            'completion_rate': round(reminder_statuses['sent'] / delivered * 100, 1) if delivered > 0 else 100.0,
+        }
+
+        user_count = totals['users_onboarded'] or 1
+        engagement = {
+            'avg_memories_per_user': round(totals['memories'] / user_count, 2),
+            'avg_reminders_per_user': round(totals['reminders'] / user_count, 2),
+            'avg_messages_per_user': round(totals['user_messages'] / user_count, 2),
+            'avg_lists_per_user': round(totals['lists'] / user_count, 2),
+            'avg_items_per_list': round(totals['list_items'] / totals['lists'], 2) if totals['lists'] > 0 else 0,
+            'total_memories': totals['memories'],
+            'total_reminders': totals['reminders'],
+            'total_messages': totals['user_messages'],
+            'total_lists': totals['lists']
+        }
+
+        # Without a date filter the chart shows the last 30 days
+        signup_days = sorted(user_days.items(), reverse=True)
+        if not (start_date or end_date):
+            signup_days = [(day, u) for day, u in signup_days if day > today - timedelta(days=30)]
+        daily_signups = [[str(day), u['users_onboarded']] for day, u in signup_days if u['users_onboarded']]
 
         return {
-            'total_users': total_users,
-            'pending_onboarding': pending_onboarding,
-            'active_7d': get_active_users(7, start_date=start_date, end_date=end_date),
-            'active_30d': get_active_users(30, start_date=start_date, end_date=end_date),
-            'new_users': get_new_user_counts(start_date=start_date, end_date=end_date),
-            'premium_stats': get_premium_stats(start_date=start_date, end_date=end_date),
-            'reminder_stats': get_reminder_completion_rate(start_date=start_date, end_date=end_date),
-            'engagement': get_engagement_stats(start_date=start_date, end_date=end_date),
-            'referrals': referrals,
+            'total_users': totals['users_onboarded'],
+            'pending_onboarding': totals['users_pending_onboarding'],
+            'active_7d': active_7d,
+            'active_30d': active_30d,
+            'new_users': {
+                'today': user_days.get(today, {}).get('users_onboarded', 0),
+                'this_week': onboarded_since(7),
+                'this_month': onboarded_since(30),
+            },
+            'premium_stats': {
+                'free': totals['users_free'],
+                'premium': totals['users_premium'],
+                'churned': totals['users_churned'],
+            },
+            'reminder_stats': reminder_stats,
+            'engagement': engagement,
+            'referrals': [[source, count] for source, count in sorted(referrals.items(), key=lambda r: (-r[1], r[0]))],
             'daily_signups': daily_signups
         }
     except Exception as e:
@@ -9,14 +9,14 @@ from datetime import datetime, timedelta
 from typing import Any, Optional
 
 import pytz
-from openai import OpenAI
 
 from config import (
-    OPENAI_API_KEY, OPENAI_MODEL, logger,
+    OPENAI_MODEL, logger,
     NUDGE_MAX_TOKENS, NUDGE_TEMPERATURE, NUDGE_CONFIDENCE_THRESHOLD, NUDGE_MAX_CHARS,
-    TIER_FREE, TIER_PREMIUM,
+    TIER_FREE, TIER_PREMIUM, MAX_PENDING_REMINDERS_IN_CONTEXT,
 )
 from database import get_db_connection, return_db_connection, log_api_usage
+from services.openai_client import chat_completion
 from models.user import create_or_update_user, get_user_first_name
 
 
@@ -26,7 +26,7 @@ def gather_user_data(phone_number: str, timezone_str: str) -> dict[str, Any]:
     Returns dict with memories, reminders, lists, and interaction patterns.
     """
     from models.memory import get_memories
-    from models.reminder import get_pending_reminders, get_user_reminders
+    from models.reminder import get_pending_reminders, get_reminder_window
     from models.list_model import get_lists, get_list_items
 
     user_tz = pytz.timezone(timezone_str)
@@ -52,8 +52,13 @@ def gather_user_data(phone_number: str, timezone_str: str) -> dict[str, Any]:
         })
 
     # Gather reminders (upcoming and recently completed)
-    all_reminders = get_user_reminders(phone_number)
-    for rem_id, reminder_date, text, recurring_id, sent in all_reminders:
+    reminder_window = get_reminder_window(
+        phone_number,
+        pending_limit=MAX_PENDING_REMINDERS_IN_CONTEXT,
+        sent_limit=None,
+        sent_since=(utc_now - timedelta(days=3)).replace(tzinfo=None),
+    )
+    for rem_id, reminder_date, text, recurring_id, sent in reminder_window['pending'] + reminder_window['sent']:
         if reminder_date:
             if reminder_date.tzinfo is None:
                 reminder_date = pytz.UTC.localize(reminder_date)
@@ -241,8 +246,8 @@ def generate_nudge(phone_number: str, timezone_str: str, first_name: str, premiu
         prompt = build_nudge_prompt(user_data, first_name, premium_status)
 
         # Call OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        response = client.chat.completions.create(
+        response = chat_completion(
+            'generate_nudge',
             model=OPENAI_MODEL,
             messages=[
                 {"role": "system", "content": "You are a helpful SMS assistant that generates proactive nudges. Return only valid JSON."},
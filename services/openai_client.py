@@ -0,0 +1,197 @@
+"""
+OpenAI Client
+Shared, pooled OpenAI clients with per-call-site timeouts and retry budgets
+
+Every call site used to build its own OpenAI(...) client, throwing away the
+connection pool and TLS session after a single request. Clients here are
+created once per call site and share one keep-alive httpx pool. Each call
+site has its own timeout and SDK retry budget (CALL_BUDGETS), and every call
+feeds per-call-site latency and token histograms (get_openai_call_stats,
+shown in /admin/stats). Callers that count their prompt locally pass
+projected_prompt_tokens, and the stats compare it with the actual count
+and show how many prompt tokens OpenAI served from its prompt cache.
+
+Set OPENAI_BASE_URL to send every call to a local stub server instead of
+api.openai.com (see utils.openai_stub).
+"""
+
+import bisect
+import threading
+import time
+from typing import Any, Optional
+
+import httpx
+import openai
+
+from config import (
+    logger, OPENAI_API_KEY, OPENAI_TIMEOUT, OPENAI_BASE_URL,
+    OPENAI_POOL_MAX_CONNECTIONS, OPENAI_POOL_KEEPALIVE_CONNECTIONS, OPENAI_POOL_KEEPALIVE_EXPIRY
+)
+
+# call site: (timeout seconds, SDK retries on connection errors / 429 / 5xx)
+CALL_BUDGETS = {
+    # The SMS reply must go out before Twilio's 15s webhook timeout, so no SDK
+    # retries (process_with_ai retries bad JSON itself)
+    'process_with_ai': (OPENAI_TIMEOUT, 0),
+    'parse_list_items': (8, 1),
+    # Background jobs can wait longer and retry
+    'generate_nudge': (30, 2),
+    'analyze_conversation_batch': (60, 2),
+    'validate_with_ai': (60, 2),
+    'generate_ai_analysis': (60, 2),
+}
+DEFAULT_BUDGET = (OPENAI_TIMEOUT, 1)
+
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2000, 4000, 8000, 15000, 30000)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000)
+
+_lock = threading.Lock()
+_http_client = None
+_clients: dict[str, tuple[Any, Any]] = {}
+_call_stats: dict[str, dict[str, Any]] = {}
+
+
+def _get_http_client() -> httpx.Client:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=OPENAI_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENAI_POOL_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=OPENAI_POOL_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(OPENAI_TIMEOUT, connect=5.0),
+        )
+    return _http_client
+
+
+def get_openai_client(call_site: str):
+    """Get the shared OpenAI client for a call site (created on first use)."""
+    client_class = openai.OpenAI
+    with _lock:
+        cached = _clients.get(call_site)
+        # Rebuilt if openai.OpenAI was replaced (e.g. patched in tests)
+        if cached is None or cached[0] is not client_class:
+            timeout, max_retries = CALL_BUDGETS.get(call_site, DEFAULT_BUDGET)
+            client = client_class(
+                api_key=OPENAI_API_KEY,
+                base_url=OPENAI_BASE_URL,
+                timeout=timeout,
+                max_retries=max_retries,
+                http_client=_get_http_client(),
+            )
+            cached = (client_class, client)
+            _clients[call_site] = cached
+    return cached[1]
+
+
+def _new_histogram(bounds: tuple) -> dict[str, Any]:
+    return {'count': 0, 'sum': 0, 'bounds': list(bounds), 'buckets': [0] * (len(bounds) + 1)}
+
+
+def _observe(histogram: dict[str, Any], value: float) -> None:
+    histogram['count'] += 1
+    histogram['sum'] += value
+    histogram['buckets'][bisect.bisect_left(histogram['bounds'], value)] += 1
+
+
+def _record_call(call_site: str, latency_ms: float, response: Any, error: bool,
+                 projected_prompt_tokens: Optional[int] = None) -> None:
+    with _lock:
+        stats = _call_stats.get(call_site)
+        if stats is None:
+            stats = _call_stats[call_site] = {
+                'calls': 0,
+                'errors': 0,
+                'latency_ms': _new_histogram(LATENCY_BUCKETS_MS),
+                'prompt_tokens': _new_histogram(TOKEN_BUCKETS),
+                'completion_tokens': _new_histogram(TOKEN_BUCKETS),
+                'cached_prompt_tokens': 0,
+                'projected_calls': 0,
+                'projected_tokens': 0,
+                'projected_actual_tokens': 0,
+                'projection_abs_error': 0,
+            }
+        stats['calls'] += 1
+        if error:
+            stats['errors'] += 1
+        _observe(stats['latency_ms'], latency_ms)
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            try:
+                prompt_tokens = int(usage.prompt_tokens)
+                _observe(stats['prompt_tokens'], prompt_tokens)
+                _observe(stats['completion_tokens'], int(usage.completion_tokens))
+            except (TypeError, ValueError):
+                return
+            details = getattr(usage, 'prompt_tokens_details', None)
+            cached_tokens = getattr(details, 'cached_tokens', None)
+            if isinstance(cached_tokens, int):
+                stats['cached_prompt_tokens'] += cached_tokens
+            if projected_prompt_tokens is not None:
+                stats['projected_calls'] += 1
+                stats['projected_tokens'] += projected_prompt_tokens
+                stats['projected_actual_tokens'] += prompt_tokens
+                stats['projection_abs_error'] += abs(projected_prompt_tokens - prompt_tokens)
+
+
+def chat_completion(call_site: str, projected_prompt_tokens: Optional[int] = None, **kwargs):
+    """
+    Create a chat completion with the call site's shared client and budget.
+    Raises whatever the OpenAI client raises; latency and tokens are recorded either way.
+    projected_prompt_tokens (the caller's local count) is logged and tracked against
+    the prompt tokens OpenAI reports.
+    """
+    start = time.perf_counter()
+    response = None
+    try:
+        response = get_openai_client(call_site).chat.completions.create(**kwargs)
+        return response
+    finally:
+        latency_ms = (time.perf_counter() - start) * 1000
+        _record_call(call_site, latency_ms, response, response is None, projected_prompt_tokens)
+        logger.debug(f"OpenAI {call_site} took {latency_ms:.0f}ms")
+        usage = getattr(response, 'usage', None)
+        if projected_prompt_tokens is not None and usage is not None:
+            logger.info(f"OpenAI {call_site} prompt tokens: projected {projected_prompt_tokens}, "
+                        f"actual {usage.prompt_tokens}")
+
+
+def _summarize_histogram(histogram: dict[str, Any]) -> dict[str, Any]:
+    bounds = histogram['bounds']
+    labels = [f"<={bound}" for bound in bounds] + [f">{bounds[-1]}"]
+    return {
+        'count': histogram['count'],
+        'avg': round(histogram['sum'] / histogram['count'], 1) if histogram['count'] else 0,
+        'buckets': dict(zip(labels, histogram['buckets'])),
+    }
+
+
+def _summarize_projection(stats: dict[str, Any]) -> dict[str, Any]:
+    calls = stats['projected_calls']
+    if not calls:
+        return {'calls': 0}
+    return {
+        'calls': calls,
+        'avg_projected': round(stats['projected_tokens'] / calls, 1),
+        'avg_actual': round(stats['projected_actual_tokens'] / calls, 1),
+        # Mean absolute error as a share of the actual count
+        'error_pct': round(100 * stats['projection_abs_error'] / max(stats['projected_actual_tokens'], 1), 1),
+    }
+
+
+def get_openai_call_stats() -> dict[str, Any]:
+    """Per-call-site call counts and latency/token histograms for the admin stats endpoint"""
+    with _lock:
+        return {
+            call_site: {
+                'calls': stats['calls'],
+                'errors': stats['errors'],
+                'latency_ms': _summarize_histogram(stats['latency_ms']),
+                'prompt_tokens': _summarize_histogram(stats['prompt_tokens']),
+                'completion_tokens': _summarize_histogram(stats['completion_tokens']),
+                'cached_prompt_tokens': stats['cached_prompt_tokens'],
+                'projection': _summarize_projection(stats),
+            }
+            for call_site, stats in _call_stats.items()
+        }
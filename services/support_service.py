@@ -19,6 +19,43 @@ from services.sms_service import send_sms
 # How long after last activity to keep user in support mode (minutes)
 SUPPORT_MODE_TIMEOUT = 30
 
+# Ticket lists show the last message truncated to this many characters
+MESSAGE_PREVIEW_LENGTH = 100
+
+
+def _message_preview(message: str) -> str:
+    """Last-message preview as shown in ticket lists"""
+    if message and len(message) > MESSAGE_PREVIEW_LENGTH:
+        return message[:MESSAGE_PREVIEW_LENGTH] + '...'
+    return message
+
+
+def _record_ticket_message(cursor, ticket_id: int, phone_number: str, message: str, direction: str,
+                          touch: bool = True) -> None:
+    """
+    Insert a ticket message and update the ticket's activity columns
+    (message_count, last_inbound_at/last_outbound_at, last_message_preview)
+    in one statement, inside the caller's transaction.
+
+    touch=False leaves updated_at alone (tickets that must not enter support mode).
+    """
+    cursor.execute(
+        """WITH msg AS (
+               INSERT INTO support_messages (ticket_id, phone_number, message, direction)
+               VALUES (%s, %s, %s, %s)
+               RETURNING ticket_id, direction, created_at
+           )
+           UPDATE support_tickets t
+           SET message_count = t.message_count + 1,
+               last_inbound_at = CASE WHEN msg.direction = 'inbound' THEN msg.created_at ELSE t.last_inbound_at END,
+               last_outbound_at = CASE WHEN msg.direction = 'outbound' THEN msg.created_at ELSE t.last_outbound_at END,
+               last_message_preview = %s,
+               updated_at = CASE WHEN %s THEN CURRENT_TIMESTAMP ELSE t.updated_at END
+           FROM msg
+           WHERE t.id = msg.ticket_id""",
+        (ticket_id, phone_number, message, direction, _message_preview(message), touch)
+    )
+
 
 def is_premium_user(phone_number: str) -> bool:
     """Check if user has premium or family status (both can access support)"""
@@ -91,11 +128,7 @@ def create_categorized_ticket(phone_number: str, message: str, category: str, so
         ticket_id = c.fetchone()[0]
 
         # Add the message
-        c.execute(
-            """INSERT INTO support_messages (ticket_id, phone_number, message, direction)
-               VALUES (%s, %s, %s, 'inbound')""",
-            (ticket_id, phone_number, message)
-        )
+        _record_ticket_message(c, ticket_id, phone_number, message, 'inbound', touch=False)
 
         conn.commit()
 
@@ -339,11 +372,11 @@ def has_technician_replied(ticket_id: int) -> bool:
         conn = get_db_connection()
         c = conn.cursor()
         c.execute(
-            "SELECT COUNT(*) FROM support_messages WHERE ticket_id = %s AND direction = 'outbound'",
+            "SELECT last_outbound_at IS NOT NULL FROM support_tickets WHERE id = %s",
             (ticket_id,)
         )
         result = c.fetchone()
-        return result and result[0] > 0
+        return bool(result and result[0])
     except Exception as e:
         logger.error(f"Error checking technician replies: {e}")
         return False
@@ -366,14 +399,12 @@ def is_technician_actively_engaged(ticket_id: int) -> bool:
         conn = get_db_connection()
         c = conn.cursor()
         c.execute(
-            """SELECT created_at FROM support_messages
-               WHERE ticket_id = %s AND direction = 'outbound'
-               ORDER BY created_at DESC LIMIT 1""",
+            "SELECT last_outbound_at FROM support_tickets WHERE id = %s",
             (ticket_id,)
         )
         result = c.fetchone()
 
-        if not result:
+        if not result or not result[0]:
             return False
 
         last_reply_time = result[0]
@@ -402,7 +433,7 @@ def is_first_message_in_ticket(ticket_id: int) -> bool:
         conn = get_db_connection()
         c = conn.cursor()
         c.execute(
-            "SELECT COUNT(*) FROM support_messages WHERE ticket_id = %s",
+            "SELECT message_count FROM support_tickets WHERE id = %s",
             (ticket_id,)
         )
         result = c.fetchone()
@@ -446,18 +477,8 @@ def add_support_message(phone_number: str, message: str, direction: str = 'inbou
         conn = get_db_connection()
         c = conn.cursor()
 
-        # Add message to ticket
-        c.execute(
-            """INSERT INTO support_messages (ticket_id, phone_number, message, direction)
-               VALUES (%s, %s, %s, %s)""",
-            (ticket_id, phone_number, message, direction)
-        )
-
-        # Update ticket timestamp
-        c.execute(
-            "UPDATE support_tickets SET updated_at = CURRENT_TIMESTAMP WHERE id = %s",
-            (ticket_id,)
-        )
+        # Add message to ticket and update its activity and timestamp
+        _record_ticket_message(c, ticket_id, phone_number, message, direction)
 
         conn.commit()
 
@@ -512,18 +533,8 @@ def reply_to_ticket(ticket_id: int, message: str) -> dict:
         sms_message = f"[Support Ticket #{ticket_id}]\n\n{message}\n\n(Reply to continue, or text EXIT to return to normal use)"
         send_sms(phone_number, sms_message)
 
-        # Record outbound message
-        c.execute(
-            """INSERT INTO support_messages (ticket_id, phone_number, message, direction)
-               VALUES (%s, %s, %s, 'outbound')""",
-            (ticket_id, phone_number, message)
-        )
-
-        # Update ticket timestamp
-        c.execute(
-            "UPDATE support_tickets SET updated_at = CURRENT_TIMESTAMP WHERE id = %s",
-            (ticket_id,)
-        )
+        # Record outbound message and update the ticket's activity and timestamp
+        _record_ticket_message(c, ticket_id, phone_number, message, 'outbound')
 
         conn.commit()
         logger.info(f"Sent support reply to ticket #{ticket_id}")
@@ -622,9 +633,7 @@ def get_all_tickets(include_closed: bool = False, category_filter: str = None, s
 
         query = """
             SELECT t.id, t.phone_number, t.status, t.created_at, t.updated_at,
-                   u.first_name,
-                   (SELECT COUNT(*) FROM support_messages WHERE ticket_id = t.id) as message_count,
-                   (SELECT message FROM support_messages WHERE ticket_id = t.id ORDER BY created_at DESC LIMIT 1) as last_message,
+                   u.first_name, t.message_count, t.last_message_preview,
                    COALESCE(t.category, 'support') as category,
                    COALESCE(t.source, 'sms') as source,
                    COALESCE(t.priority, 'normal') as priority,
@@ -666,7 +675,7 @@ def get_all_tickets(include_closed: bool = False, category_filter: str = None, s
                 'updated_at': t[4].isoformat() if t[4] else None,
                 'user_name': t[5],
                 'message_count': t[6],
-                'last_message': t[7][:100] + '...' if t[7] and len(t[7]) > 100 else t[7],
+                'last_message': t[7],
                 'category': t[8],
                 'source': t[9],
                 'priority': t[10],
@@ -841,49 +850,28 @@ def get_ticket_sla_info() -> dict:
         conn = get_db_connection()
         c = conn.cursor()
 
-        # Get open ticket count
-        c.execute("SELECT COUNT(*) FROM support_tickets WHERE status = 'open'")
-        open_count = c.fetchone()[0]
-
-        # Get tickets waiting for response (no outbound message after last inbound)
+        # Open tickets, and those waiting for a response (no outbound message
+        # after the last inbound one) with how long they've waited
         c.execute("""
-            SELECT t.id, t.created_at,
-                   (SELECT MAX(sm.created_at) FROM support_messages sm
-                    WHERE sm.ticket_id = t.id AND sm.direction = 'inbound') as last_inbound,
-                   (SELECT MAX(sm.created_at) FROM support_messages sm
-                    WHERE sm.ticket_id = t.id AND sm.direction = 'outbound') as last_outbound
-            FROM support_tickets t
-            WHERE t.status = 'open'
-        """)
-        rows = c.fetchall()
-
-        now = datetime.utcnow()
-        waiting_times = []
-        oldest_unanswered_minutes = 0
-
-        for row in rows:
-            last_inbound = row[2]
-            last_outbound = row[3]
-
-            # Ticket is unanswered if no outbound, or last inbound is newer than last outbound
-            if last_inbound and (not last_outbound or last_inbound > last_outbound):
-                if last_inbound.tzinfo:
-                    from datetime import timezone
-                    now_tz = datetime.now(timezone.utc)
-                    wait_minutes = (now_tz - last_inbound).total_seconds() / 60
-                else:
-                    wait_minutes = (now - last_inbound).total_seconds() / 60
-                waiting_times.append(wait_minutes)
-                if wait_minutes > oldest_unanswered_minutes:
-                    oldest_unanswered_minutes = wait_minutes
-
-        avg_wait = sum(waiting_times) / len(waiting_times) if waiting_times else 0
+            SELECT COUNT(*),
+                   COUNT(*) FILTER (WHERE unanswered),
+                   AVG(wait_minutes) FILTER (WHERE unanswered),
+                   MAX(wait_minutes) FILTER (WHERE unanswered)
+            FROM (
+                SELECT last_inbound_at IS NOT NULL
+                           AND (last_outbound_at IS NULL OR last_inbound_at > last_outbound_at) AS unanswered,
+                       EXTRACT(EPOCH FROM (%s - last_inbound_at)) / 60 AS wait_minutes
+                FROM support_tickets
+                WHERE status = 'open'
+            ) open_tickets
+        """, (datetime.utcnow(),))
+        open_count, unanswered_count, avg_wait, oldest_unanswered_minutes = c.fetchone()
 
         return {
             'open_count': open_count,
-            'unanswered_count': len(waiting_times),
-            'avg_wait_minutes': round(avg_wait),
-            'oldest_unanswered_minutes': round(oldest_unanswered_minutes)
+            'unanswered_count': unanswered_count,
+            'avg_wait_minutes': round(avg_wait or 0),
+            'oldest_unanswered_minutes': round(max(oldest_unanswered_minutes or 0, 0))
         }
     except Exception as e:
         logger.error(f"Error getting SLA info: {e}")
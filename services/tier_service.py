@@ -4,6 +4,7 @@ Handles subscription tier checks and limit enforcement
 """
 
 from datetime import datetime, timedelta
+from typing import Optional
 from database import get_db_connection, return_db_connection
 from config import (
     logger, ENCRYPTION_ENABLED, BETA_MODE,
@@ -410,7 +411,8 @@ def add_usage_counter_to_message(phone_number: str, base_message: str) -> str:
 # PROGRESSIVE EDUCATION FUNCTIONS (Level 2 & 3)
 # =====================================================
 
-def add_list_item_counter_to_message(phone_number: str, list_id: int, base_message: str) -> str:
+def add_list_item_counter_to_message(phone_number: str, list_id: int, base_message: str,
+                                     current_count: Optional[int] = None) -> str:
     """Add item counter to list message for free tier users (Level 2/3 education).
 
     Level 2 (70-89%): Shows "(7 of 10 items)"
@@ -422,6 +424,7 @@ def add_list_item_counter_to_message(phone_number: str, list_id: int, base_messa
         phone_number: User's phone number
         list_id: ID of the list
         base_message: The message to append counter to
+        current_count: Item count if the caller already has it (skips the count query)
 
     Returns:
         Message with counter appended if user is on free tier and >= 70% full
@@ -435,8 +438,9 @@ def add_list_item_counter_to_message(phone_number: str, list_id: int, base_messa
     limits = get_tier_limits(tier)
     item_limit = limits['max_items_per_list']
 
-    from models.list_model import get_item_count
-    current_count = get_item_count(list_id)
+    if current_count is None:
+        from models.list_model import get_item_count
+        current_count = get_item_count(list_id)
 
     # Calculate percentage
     percentage = (current_count / item_limit) * 100
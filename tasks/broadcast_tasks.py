@@ -0,0 +1,163 @@
+"""
+Broadcast Tasks
+Sends admin broadcasts as chunked Celery jobs (see services.broadcast_service).
+
+send_broadcast fans a broadcast's pending recipients out to
+send_broadcast_chunk tasks on the 'broadcasts' queue; a chord runs
+finish_broadcast once every chunk is done. On Celery Beat,
+check_scheduled_broadcasts starts due scheduled broadcasts and
+resume_stalled_broadcasts re-dispatches broadcasts whose jobs were lost.
+"""
+
+from celery import chord
+from celery.exceptions import SoftTimeLimitExceeded
+
+from celery_app import celery_app
+from config import logger, BROADCAST_CHUNK_SIZE
+from services.broadcast_service import CLAIM_TIMEOUT
+from services.sms_service import send_sms
+
+# Flush progress counters every this many messages
+PROGRESS_EVERY = 10
+
+
+@celery_app.task(
+    name="tasks.broadcast_tasks.send_broadcast",
+    bind=True,
+    max_retries=3,
+    default_retry_delay=30,
+    acks_late=True,
+)
+def send_broadcast(self, broadcast_id: int):
+    """Split a broadcast's pending recipients into chunks and send them in parallel.
+
+    Only recipients still pending are dispatched, so re-running this for a
+    broadcast that was interrupted resumes it.
+    """
+    from services.broadcast_service import pending_recipients
+
+    try:
+        phone_numbers = pending_recipients(broadcast_id)
+    except Exception as exc:
+        logger.error(f"Error loading recipients for broadcast {broadcast_id}: {exc}")
+        raise self.retry(exc=exc)
+    if phone_numbers is None:
+        logger.info(f"Broadcast {broadcast_id} is not pending or sending, nothing to send")
+        return {"broadcast_id": broadcast_id, "recipients": 0, "chunks": 0}
+
+    chunks = [phone_numbers[i:i + BROADCAST_CHUNK_SIZE] for i in range(0, len(phone_numbers), BROADCAST_CHUNK_SIZE)]
+    if chunks:
+        chord(send_broadcast_chunk.s(broadcast_id, chunk) for chunk in chunks)(finish_broadcast.si(broadcast_id))
+    else:
+        finish_broadcast.delay(broadcast_id)
+    logger.info(f"Broadcast {broadcast_id}: dispatched {len(phone_numbers)} recipients in {len(chunks)} chunks")
+    return {"broadcast_id": broadcast_id, "recipients": len(phone_numbers), "chunks": len(chunks)}
+
+
+@celery_app.task(
+    name="tasks.broadcast_tasks.send_broadcast_chunk",
+    acks_late=True,
+    time_limit=CLAIM_TIMEOUT,
+    soft_time_limit=CLAIM_TIMEOUT - 60,
+)
+def send_broadcast_chunk(broadcast_id: int, phone_numbers: list):
+    """Claim and send one chunk of recipients under the shared send rate.
+
+    Each delivery is recorded as it happens. Recipients claimed by another
+    task are skipped; on the soft time limit the unsent rest go back to
+    pending for finish_broadcast to re-dispatch.
+    """
+    from database import get_db_connection, return_db_connection
+    from services.broadcast_service import (
+        BROADCAST_PREFIX, acquire_send_slot, add_progress, claim_recipients, record_delivery,
+        release_recipients,
+    )
+
+    conn = None
+    sent = failed = unflushed_sent = unflushed_failed = 0
+    try:
+        conn = get_db_connection()
+        c = conn.cursor()
+        message, claimed = claim_recipients(c, broadcast_id, phone_numbers)
+        conn.commit()
+        full_message = BROADCAST_PREFIX + (message or '')
+
+        def release(unsent):
+            release_recipients(c, broadcast_id, unsent)
+            conn.commit()
+            logger.warning(f"Broadcast {broadcast_id} chunk hit its time limit; {len(unsent)} recipients released")
+
+        for i, phone in enumerate(claimed):
+            try:
+                acquire_send_slot()
+            except SoftTimeLimitExceeded:
+                release(claimed[i:])
+                break
+            error = None
+            try:
+                send_sms(phone, full_message)
+            except SoftTimeLimitExceeded:
+                # This one may have gone out: leave it claimed (finish_broadcast marks it failed)
+                release(claimed[i + 1:])
+                break
+            except Exception as e:
+                logger.error(f"Failed to send broadcast {broadcast_id} to {phone[-4:]}: {e}")
+                error = str(e)[:500]
+
+            record_delivery(c, broadcast_id, phone, error)
+            if error:
+                failed += 1
+                unflushed_failed += 1
+            else:
+                sent += 1
+                unflushed_sent += 1
+            if unflushed_sent + unflushed_failed >= PROGRESS_EVERY:
+                add_progress(c, broadcast_id, unflushed_sent, unflushed_failed)
+                unflushed_sent = unflushed_failed = 0
+            conn.commit()
+
+        add_progress(c, broadcast_id, unflushed_sent, unflushed_failed)
+        conn.commit()
+        return {"broadcast_id": broadcast_id, "sent": sent, "failed": failed}
+    finally:
+        if conn:
+            return_db_connection(conn)
+
+
+@celery_app.task(name="tasks.broadcast_tasks.finish_broadcast")
+def finish_broadcast(broadcast_id: int):
+    """Chord callback: record final counts, or dispatch recipients a chunk left pending.
+
+    Recipients still being sent belong to another dispatch of the same
+    broadcast, whose own callback completes it.
+    """
+    from services.broadcast_service import complete_broadcast
+
+    result = complete_broadcast(broadcast_id)
+    if result['status'] != 'completed' and result['pending']:
+        logger.info(f"Broadcast {broadcast_id} has {result['pending']} pending recipients, re-dispatching")
+        send_broadcast.delay(broadcast_id)
+    return result
+
+
+@celery_app.task(name="tasks.broadcast_tasks.resume_stalled_broadcasts")
+def resume_stalled_broadcasts():
+    """Re-dispatch unfinished broadcasts with no recent sends (lost jobs, worker restarts)"""
+    from services.broadcast_service import find_stalled_broadcasts
+
+    broadcast_ids = find_stalled_broadcasts()
+    for broadcast_id in broadcast_ids:
+        logger.warning(f"Resuming stalled broadcast {broadcast_id}")
+        send_broadcast.delay(broadcast_id)
+    return {"resumed": broadcast_ids}
+
+
+@celery_app.task(name="tasks.broadcast_tasks.check_scheduled_broadcasts")
+def check_scheduled_broadcasts():
+    """Start scheduled broadcasts that are due (each is claimed atomically, so overlapping runs are safe)"""
+    from services.broadcast_service import start_due_scheduled_broadcasts
+
+    broadcast_ids = start_due_scheduled_broadcasts()
+    for broadcast_id in broadcast_ids:
+        send_broadcast.delay(broadcast_id)
+    return {"started": broadcast_ids}
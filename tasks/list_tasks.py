@@ -0,0 +1,21 @@
+"""
+List Tasks
+Mines the phrases the local list item splitter trusts (utils.item_splitter).
+"""
+
+from celery_app import celery_app
+from config import logger
+
+
+@celery_app.task(name="tasks.list_tasks.mine_list_phrases")
+def mine_list_phrases():
+    """Re-mine frequently stored list item texts and publish them to Redis.
+
+    The GROUP BY over list_items runs here, off the SMS webhook; requests
+    only read the published set. Safe to re-run: the set is replaced.
+    """
+    from utils.item_splitter import mine_phrases
+
+    phrase_count = mine_phrases()
+    logger.info(f"mine_list_phrases: {phrase_count} phrases")
+    return phrase_count
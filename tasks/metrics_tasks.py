@@ -0,0 +1,22 @@
+"""
+Metrics Rollup Tasks
+Keeps the metrics_daily rollups behind the admin overview up to date.
+"""
+
+from celery_app import celery_app
+from config import logger
+
+
+@celery_app.task(name="tasks.metrics_tasks.refresh_metrics_rollups")
+def refresh_metrics_rollups(full: bool = False):
+    """Recompute recent metrics_daily buckets (all of them when full=True).
+
+    The frequent run covers the last METRICS_ROLLUP_REFRESH_DAYS days, where
+    new rows land and statuses change. The nightly full run reconciles older
+    days. Safe to re-run: buckets are recomputed and upserted.
+    """
+    from services.metrics_service import refresh_metrics_rollups as refresh
+
+    days_written = refresh(None) if full else refresh()
+    logger.info(f"refresh_metrics_rollups: {days_written} days written (full={full})")
+    return days_written
@@ -30,6 +30,10 @@ os.environ.setdefault("OPENAI_API_KEY", "sk-test-key-not-real")
 os.environ.setdefault("DATABASE_URL", "postgresql://localhost/remyndrs_test")
 os.environ.setdefault("ADMIN_PASSWORD", "test_admin_password")
 os.environ.setdefault("PUBLIC_PHONE_NUMBER", "+15551234567")
+# Write analytics rows inline so tests can assert on them and clean them up
+os.environ.setdefault("WRITE_BUFFER_ENABLED", "false")
+# Tests that exercise the AI cache enable it explicitly (it would otherwise persist in Redis)
+os.environ.setdefault("AI_CACHE_ENABLED", "false")
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -52,6 +56,21 @@ celery_app.conf.update(
 )
 
 
+def execute_sql(sql, params=None):
+    """Run one statement on its own connection and commit; returns the rows, if any."""
+    from database import get_db_connection, return_db_connection
+
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        c.execute(sql, params)
+        rows = c.fetchall() if c.description else None
+        conn.commit()
+        return rows
+    finally:
+        return_db_connection(conn)
+
+
 class SMSCapture:
     """Captures outbound SMS messages instead of sending them."""
 
@@ -310,7 +329,7 @@ def sms_capture():
          patch('services.onboarding_service.send_delayed_sms.apply_async', side_effect=mock_delayed_sms_apply_async), \
          patch('services.onboarding_service.send_engagement_nudge.apply_async', side_effect=mock_engagement_nudge_apply_async), \
          patch('main.send_sms', side_effect=capture.send_sms), \
-         patch('admin_dashboard.send_sms', side_effect=capture.send_sms):
+         patch('tasks.broadcast_tasks.send_sms', side_effect=capture.send_sms):
         yield capture
 
 
@@ -614,7 +633,7 @@ def disable_twilio_globally():
         patch('services.stripe_service.send_sms', side_effect=mock_send_sms),
         patch('tasks.reminder_tasks.send_sms', side_effect=mock_send_sms),
         patch('main.send_sms', side_effect=mock_send_sms),
-        patch('admin_dashboard.send_sms', side_effect=mock_send_sms),
+        patch('tasks.broadcast_tasks.send_sms', side_effect=mock_send_sms),
     ]
 
     # Start all patches
@@ -0,0 +1,145 @@
+"""
+Tests for the AI response cache (utils.ai_cache) and its use in parse_list_items.
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+TEST_PHONE = '+15550390000'
+
+
+class FakeRedis:
+    def __init__(self, fail=False):
+        self.data = {}
+        self.fail = fail
+
+    def get(self, key):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.data[key] = value
+
+
+@pytest.fixture
+def ai_cache_on(monkeypatch):
+    """Enable the AI cache with a fresh in-process tier and no Redis."""
+    import utils.ai_cache as ai_cache
+    from database import get_db_connection, return_db_connection
+
+    def cleanup():
+        conn = get_db_connection()
+        try:
+            conn.cursor().execute("DELETE FROM api_usage WHERE phone_number = %s", (TEST_PHONE,))
+            conn.commit()
+        finally:
+            return_db_connection(conn)
+
+    monkeypatch.setattr(ai_cache, 'AI_CACHE_ENABLED', True)
+    monkeypatch.setattr(ai_cache, '_cache', ai_cache.AICache(None, ttl=60, max_entries=100))
+    cleanup()
+    yield ai_cache
+    cleanup()
+
+
+def _usage_rows():
+    from database import get_db_connection, return_db_connection
+
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        c.execute(
+            "SELECT request_type, total_tokens, cached FROM api_usage WHERE phone_number = %s ORDER BY id",
+            (TEST_PHONE,)
+        )
+        return c.fetchall()
+    finally:
+        return_db_connection(conn)
+
+
+class TestAICache:
+
+    def test_key_normalizes_input_only(self):
+        from utils.ai_cache import make_key
+
+        key = make_key('parse_list_items', 1, 'gpt-4o-mini', 'Milk  and Eggs ')
+        assert key == make_key('parse_list_items', 1, 'gpt-4o-mini', 'milk and eggs')
+        assert key != make_key('parse_list_items', 2, 'gpt-4o-mini', 'milk and eggs')
+        assert key != make_key('parse_list_items', 1, 'gpt-4o', 'milk and eggs')
+
+    def test_lru_eviction_and_ttl(self):
+        from utils.ai_cache import AICache
+
+        cache = AICache(None, ttl=60, max_entries=2)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, [key], (1, 1, 2))
+        assert cache.get('t', 'a') is None
+        assert cache.get('t', 'c')['result'] == ['c']
+
+        expired = AICache(None, ttl=0, max_entries=2)
+        expired.set('a', ['a'], (1, 1, 2))
+        assert expired.get('t', 'a') is None
+
+    def test_redis_tier_shared_between_processes(self):
+        from utils.ai_cache import AICache
+
+        redis = FakeRedis()
+        first, second = AICache('redis://fake', 60, 10), AICache('redis://fake', 60, 10)
+        first._redis = second._redis = redis
+
+        first.set('k', ['milk'], (100, 5, 105))
+        assert second.get('parse_list_items', 'k')['result'] == ['milk']
+        assert second.get('parse_list_items', 'k')['result'] == ['milk']
+
+        stats = second.get_stats()['tasks']['parse_list_items']
+        assert (stats['redis_hits'], stats['local_hits'], stats['tokens_saved']) == (1, 1, 210)
+
+    def test_redis_errors_fall_back_to_process_cache(self):
+        from utils.ai_cache import AICache
+
+        cache = AICache('redis://fake', 60, 10)
+        cache._redis = FakeRedis(fail=True)
+
+        cache.set('k', ['milk'], (1, 1, 2))
+        assert cache.get('t', 'k')['result'] == ['milk']
+        assert cache.get('t', 'missing') is None
+
+
+class TestParseListItemsCache:
+
+    def test_repeated_phrase_served_from_cache(self, ai_cache_on):
+        from services.ai_service import parse_list_items
+
+        response = MagicMock()
+        response.choices[0].message.content = json.dumps(["strawberries and cream"])
+        response.usage = MagicMock(prompt_tokens=120, completion_tokens=8, total_tokens=128)
+        with patch('openai.OpenAI') as mock_openai:
+            mock_openai.return_value.chat.completions.create.return_value = response
+
+            assert parse_list_items("strawberries and cream", TEST_PHONE) == ["strawberries and cream"]
+            assert parse_list_items("Strawberries  and Cream", TEST_PHONE) == ["Strawberries and Cream"]
+
+            assert mock_openai.return_value.chat.completions.create.call_count == 1
+
+        assert _usage_rows() == [('parse_list_items', 128, False), ('parse_list_items', 128, True)]
+        stats = ai_cache_on.get_ai_cache_stats()['tasks']['parse_list_items']
+        assert (stats['hits'], stats['misses'], stats['tokens_saved']) == (1, 1, 128)
+
+    def test_unusable_response_not_cached(self, ai_cache_on):
+        from services.ai_service import parse_list_items
+
+        response = MagicMock()
+        response.choices[0].message.content = json.dumps({"items": "strawberries and cream"})
+        response.usage = None
+        with patch('openai.OpenAI') as mock_openai:
+            mock_openai.return_value.chat.completions.create.return_value = response
+
+            parse_list_items("strawberries and cream", TEST_PHONE)
+            parse_list_items("strawberries and cream", TEST_PHONE)
+
+            assert mock_openai.return_value.chat.completions.create.call_count == 2
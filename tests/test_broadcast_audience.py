@@ -0,0 +1,112 @@
+"""
+Tests for the timezone-bucketed broadcast audience counts
+(get_broadcast_stats and get_recipients_preview in admin_dashboard).
+
+The 8am-8pm window check is replaced by a fixed set of "open" timezones,
+and each endpoint is compared with a per-user count over the same rows.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from tests.conftest import execute_sql
+
+OPEN_TIMEZONES = {'Asia/Tokyo', 'Europe/London'}
+USERS = [
+    # phone, timezone, plan, opted_out
+    ('+15550440001', 'Asia/Tokyo', 'free', False),
+    ('+15550440002', 'Asia/Tokyo', 'premium', False),
+    ('+15550440003', 'Europe/London', 'premium', True),
+    ('+15550440004', 'America/Denver', 'free', False),
+    ('+15550440005', None, None, False),
+    ('+15550440006', 'America/Denver', 'churned', None),
+]
+
+
+@pytest.fixture
+def audience(monkeypatch):
+    """Seeded onboarded users and a window check that counts its calls."""
+    import services.broadcast_service as broadcast_service
+
+    phones = [u[0] for u in USERS]
+    execute_sql('DELETE FROM users WHERE phone_number = ANY(%s)', (phones,))
+    for phone, timezone, plan, opted_out in USERS:
+        execute_sql('''
+            INSERT INTO users (phone_number, onboarding_complete, timezone, premium_status, opted_out)
+            VALUES (%s, TRUE, %s, %s, %s)
+        ''', (phone, timezone, plan, opted_out))
+
+    checked = []
+
+    def in_window(timezone_str):
+        checked.append(timezone_str)
+        return timezone_str in OPEN_TIMEZONES
+
+    monkeypatch.setattr(broadcast_service, 'is_within_broadcast_window', in_window)
+    yield checked
+    execute_sql('DELETE FROM users WHERE phone_number = ANY(%s)', (phones,))
+
+
+def _users():
+    return execute_sql('''
+        SELECT phone_number, timezone, COALESCE(premium_status, 'free'), COALESCE(opted_out, FALSE)
+        FROM users WHERE onboarding_complete = TRUE
+    ''')
+
+
+class TestBroadcastAudience:
+
+    def test_stats_match_per_user_counts(self, audience):
+        from admin_dashboard import get_broadcast_stats
+
+        expected = dict.fromkeys(['all', 'free', 'premium', 'all_in_window', 'free_in_window', 'premium_in_window'], 0)
+        timezones = set()
+        for _, timezone, plan, opted_out in _users():
+            if opted_out:
+                continue
+            timezones.add(timezone or '')
+            in_window = timezone in OPEN_TIMEZONES
+            for key in ['all'] + ([plan] if plan in ('free', 'premium') else []):
+                expected[key] += 1
+                expected[f'{key}_in_window'] += in_window
+
+        stats = json.loads(asyncio.run(get_broadcast_stats(admin='admin')).body)
+        assert stats == expected
+        assert stats['free_in_window'] >= 1 and stats['premium_in_window'] >= 1
+        # One window check per distinct timezone, not per user
+        assert sorted(audience) == sorted(timezones)
+
+    @pytest.mark.parametrize('audience_name', ['all', 'free', 'premium'])
+    def test_preview_summary_matches_per_user_counts(self, audience, audience_name):
+        from admin_dashboard import get_recipients_preview
+
+        summary = {'total_onboarded': 0, 'included': 0, 'excluded_opted_out': 0, 'excluded_outside_window': 0}
+        for _, timezone, plan, opted_out in _users():
+            if (audience_name == 'free' and plan == 'premium') or (audience_name == 'premium' and plan != 'premium'):
+                continue
+            summary['total_onboarded'] += 1
+            if opted_out:
+                summary['excluded_opted_out'] += 1
+            elif timezone not in OPEN_TIMEZONES:
+                summary['excluded_outside_window'] += 1
+            else:
+                summary['included'] += 1
+
+        preview = json.loads(asyncio.run(get_recipients_preview(audience=audience_name, admin='admin')).body)
+        assert {k: preview['summary'][k] for k in summary} == summary
+        assert len(audience) == len(set(audience))
+
+    def test_preview_lists_reasons_and_local_times(self, audience):
+        from admin_dashboard import get_recipients_preview
+
+        preview = json.loads(asyncio.run(get_recipients_preview(audience='premium', admin='admin')).body)
+        included = {u['phone'][-4:]: u for u in preview['included']}
+        excluded = {u['phone'][-4:]: u for u in preview['excluded']}
+
+        assert included['0002']['timezone'] == 'Asia/Tokyo'
+        assert included['0002']['local_time']
+        assert excluded['0003']['reason'] == 'opted_out'
+        assert excluded['0003']['phone_full'] == '+15550440003'
+        assert '0004' not in included and '0004' not in excluded
@@ -0,0 +1,247 @@
+"""
+Tests for chunked broadcast delivery (services.broadcast_service and
+tasks.broadcast_tasks), run through Celery in eager mode.
+
+Seeded users sit in a fixed "open" timezone; the 8am-8pm window check is
+replaced so only that timezone is in the window.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from tests.conftest import execute_sql
+
+OPEN_TIMEZONE = 'Pacific/Chatham'
+PHONES = ['+15550450001', '+15550450002', '+15550450003']
+OPTED_OUT = '+15550450004'
+
+
+@pytest.fixture
+def broadcast_env(monkeypatch, sms_capture):
+    """Seeded recipients, an open window for OPEN_TIMEZONE only and no send pacing."""
+    import services.broadcast_service as broadcast_service
+
+    all_phones = PHONES + [OPTED_OUT]
+    execute_sql('DELETE FROM users WHERE phone_number = ANY(%s)', (all_phones,))
+    for phone in all_phones:
+        execute_sql('''
+            INSERT INTO users (phone_number, onboarding_complete, timezone, premium_status, opted_out)
+            VALUES (%s, TRUE, %s, 'premium', %s)
+        ''', (phone, OPEN_TIMEZONE, phone == OPTED_OUT))
+
+    monkeypatch.setattr(broadcast_service, 'is_within_broadcast_window', lambda tz: tz == OPEN_TIMEZONE)
+    monkeypatch.setattr(broadcast_service, 'acquire_send_slot', lambda rate=None: None)
+    yield sms_capture
+
+    execute_sql("DELETE FROM broadcast_logs WHERE message LIKE 'engine test%'")
+    execute_sql("DELETE FROM scheduled_broadcasts WHERE message LIKE 'engine test%'")
+    execute_sql('DELETE FROM users WHERE phone_number = ANY(%s)', (all_phones,))
+
+
+def _create(message, audience='premium', **kwargs):
+    from database import get_db_connection, return_db_connection
+    from services.broadcast_service import create_broadcast
+
+    conn = get_db_connection()
+    try:
+        result = create_broadcast(conn.cursor(), 'admin', message, audience, **kwargs)
+        conn.commit()
+        return result
+    finally:
+        return_db_connection(conn)
+
+
+def _log(broadcast_id):
+    return execute_sql('''
+        SELECT recipient_count, success_count, fail_count, status, completed_at
+        FROM broadcast_logs WHERE id = %s
+    ''', (broadcast_id,))[0]
+
+
+def _recipients(broadcast_id):
+    return dict(execute_sql('''
+        SELECT phone_number, status FROM broadcast_recipients
+        WHERE broadcast_id = %s AND phone_number = ANY(%s)
+    ''', (broadcast_id, PHONES + [OPTED_OUT])))
+
+
+class TestBroadcastDelivery:
+
+    def test_endpoint_sends_in_chunks_and_completes(self, broadcast_env, monkeypatch):
+        import tasks.broadcast_tasks as broadcast_tasks
+        from admin_dashboard import BroadcastRequest, send_broadcast
+
+        monkeypatch.setattr(broadcast_tasks, 'BROADCAST_CHUNK_SIZE', 2)
+        response = asyncio.run(send_broadcast(BroadcastRequest(message='engine test send', audience='premium'), admin='admin'))
+        body = json.loads(response.body)
+
+        recipient_count, success_count, fail_count, status, completed_at = _log(body['broadcast_id'])
+        assert (status, fail_count) == ('completed', 0)
+        assert success_count == recipient_count == body['recipient_count']
+        assert completed_at is not None
+        assert _recipients(body['broadcast_id']) == dict.fromkeys(PHONES, 'sent')
+        for phone in PHONES:
+            assert [m['message'] for m in broadcast_env.get_messages_to(phone)] == ['[Remyndrs System Message] engine test send']
+        assert broadcast_env.get_messages_to(OPTED_OUT) == []
+
+    def test_resume_skips_recipients_already_sent(self, broadcast_env):
+        from tasks.broadcast_tasks import send_broadcast
+
+        broadcast_id, _, _ = _create('engine test resume')
+        execute_sql('''
+            UPDATE broadcast_recipients SET status = 'sent', attempted_at = NOW()
+            WHERE broadcast_id = %s AND phone_number = %s
+        ''', (broadcast_id, PHONES[0]))
+
+        send_broadcast.delay(broadcast_id)
+
+        assert broadcast_env.get_messages_to(PHONES[0]) == []
+        assert all(broadcast_env.get_messages_to(phone) for phone in PHONES[1:])
+        assert _recipients(broadcast_id) == dict.fromkeys(PHONES, 'sent')
+        assert _log(broadcast_id)[3] == 'completed'
+
+        # A finished broadcast is never re-sent
+        broadcast_env.clear()
+        send_broadcast.delay(broadcast_id)
+        assert len(broadcast_env) == 0
+
+    def test_failed_sends_are_counted(self, broadcast_env, monkeypatch):
+        import tasks.broadcast_tasks as broadcast_tasks
+
+        def flaky_send(to_number, message, media_url=None):
+            if to_number == PHONES[1]:
+                raise RuntimeError("carrier rejected")
+
+        monkeypatch.setattr(broadcast_tasks, 'send_sms', flaky_send)
+        broadcast_id, recipient_count, _ = _create('engine test failure')
+        broadcast_tasks.send_broadcast.delay(broadcast_id)
+
+        _, success_count, fail_count, status, _ = _log(broadcast_id)
+        assert (status, fail_count, success_count) == ('completed', 1, recipient_count - 1)
+        assert _recipients(broadcast_id)[PHONES[1]] == 'failed'
+
+    def test_nobody_in_window_is_rejected(self, broadcast_env, monkeypatch):
+        import services.broadcast_service as broadcast_service
+        from fastapi import HTTPException
+        from admin_dashboard import BroadcastRequest, send_broadcast
+
+        monkeypatch.setattr(broadcast_service, 'is_within_broadcast_window', lambda tz: False)
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(send_broadcast(BroadcastRequest(message='engine test closed', audience='premium'), admin='admin'))
+        assert exc.value.status_code == 400
+        assert execute_sql("SELECT COUNT(*) FROM broadcast_logs WHERE message = 'engine test closed'")[0][0] == 0
+
+
+def _schedule(message, audience='premium', minutes_from_now=-1):
+    return execute_sql('''
+        INSERT INTO scheduled_broadcasts (sender, message, audience, scheduled_date)
+        VALUES ('admin', %s, %s, (NOW() AT TIME ZONE 'UTC') + %s * INTERVAL '1 minute') RETURNING id
+    ''', (message, audience, minutes_from_now))[0][0]
+
+
+def _scheduled(scheduled_id):
+    return execute_sql('''
+        SELECT status, recipient_count, success_count, fail_count, sent_at
+        FROM scheduled_broadcasts WHERE id = %s
+    ''', (scheduled_id,))[0]
+
+
+class TestScheduledBroadcasts:
+
+    def test_due_broadcast_is_sent_and_updates_its_row(self, broadcast_env):
+        from tasks.broadcast_tasks import check_scheduled_broadcasts
+
+        scheduled_id = _schedule('engine test scheduled')
+        later_id = _schedule('engine test later', minutes_from_now=60)
+        check_scheduled_broadcasts.delay()
+
+        status, recipient_count, success_count, fail_count, sent_at = _scheduled(scheduled_id)
+        log = execute_sql('''
+            SELECT recipient_count, success_count, status, source
+            FROM broadcast_logs WHERE scheduled_broadcast_id = %s
+        ''', (scheduled_id,))
+        assert status == 'completed' and sent_at is not None
+        assert recipient_count == success_count == log[0][0] == log[0][1]
+        assert fail_count == 0
+        assert log[0][2:] == ('completed', 'scheduled')
+        assert all(broadcast_env.get_messages_to(phone) for phone in PHONES)
+        assert _scheduled(later_id)[0] == 'scheduled'
+
+    def test_overlapping_checks_send_once(self, broadcast_env):
+        from services.broadcast_service import start_due_scheduled_broadcasts
+        from tasks.broadcast_tasks import check_scheduled_broadcasts
+
+        scheduled_id = _schedule('engine test once')
+        first = start_due_scheduled_broadcasts()
+        assert start_due_scheduled_broadcasts() == []
+        assert _scheduled(scheduled_id)[0] == 'sending'
+        assert execute_sql('''
+            SELECT COUNT(*) FROM broadcast_logs WHERE scheduled_broadcast_id = %s
+        ''', (scheduled_id,))[0][0] == len(first) == 1
+
+        check_scheduled_broadcasts.delay()
+        assert len(broadcast_env) == 0
+
+    def test_unstartable_broadcast_is_marked_failed(self, broadcast_env):
+        from tasks.broadcast_tasks import check_scheduled_broadcasts
+
+        bad_id = _schedule('engine test bad audience', audience='everyone')
+        good_id = _schedule('engine test good audience')
+        check_scheduled_broadcasts.delay()
+
+        assert _scheduled(bad_id)[0] == 'failed'
+        assert _scheduled(good_id)[0] == 'completed'
+
+    def test_claimed_broadcast_cannot_be_cancelled(self, broadcast_env):
+        from fastapi import HTTPException
+        from admin_dashboard import cancel_scheduled_broadcast
+        from services.broadcast_service import start_due_scheduled_broadcasts
+
+        scheduled_id = _schedule('engine test cancel')
+        start_due_scheduled_broadcasts()
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(cancel_scheduled_broadcast(scheduled_id, admin='admin'))
+        assert exc.value.status_code == 400
+        assert _scheduled(scheduled_id)[0] == 'sending'
+
+
+class TestCompleteBroadcast:
+
+    def test_abandoned_claims_fail_and_recent_claims_wait(self, broadcast_env):
+        from services.broadcast_service import CLAIM_TIMEOUT, complete_broadcast
+
+        broadcast_id, _, _ = _create('engine test interrupted')
+        execute_sql('''
+            UPDATE broadcast_recipients SET status = 'sending', attempted_at = NOW()
+            WHERE broadcast_id = %s
+        ''', (broadcast_id,))
+
+        # Claims of a chunk that may still be running hold the broadcast open
+        result = complete_broadcast(broadcast_id)
+        assert result['status'] == 'sending' and result['pending'] == 0 and result['in_flight'] >= len(PHONES)
+
+        execute_sql('''
+            UPDATE broadcast_recipients SET attempted_at = NOW() - %s * INTERVAL '1 second'
+            WHERE broadcast_id = %s
+        ''', (CLAIM_TIMEOUT + 60, broadcast_id))
+        result = complete_broadcast(broadcast_id)
+        assert result['status'] == 'completed' and result['sent'] == 0
+        assert _recipients(broadcast_id) == dict.fromkeys(PHONES, 'failed')
+        assert _log(broadcast_id)[2:4] == (result['failed'], 'completed')
+
+
+class TestSendRate:
+
+    def test_in_process_pacing_without_redis(self, monkeypatch):
+        import services.broadcast_service as broadcast_service
+
+        monkeypatch.setattr(broadcast_service, '_get_redis', lambda: None)
+        monkeypatch.setattr(broadcast_service, '_local_next_slot', 0.0)
+        start = time.monotonic()
+        for _ in range(6):
+            broadcast_service.acquire_send_slot(rate=50)
+        # The first slot is immediate, the next five 20ms apart
+        assert time.monotonic() - start >= 0.09
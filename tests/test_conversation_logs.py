@@ -0,0 +1,119 @@
+"""
+Tests for the admin conversation log viewer: keyset pagination in
+database.get_recent_logs and the NDJSON export endpoint.
+"""
+
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+
+from tests.conftest import execute_sql
+
+PHONE = '+15550470001'
+LOG_COUNT = 12
+
+
+def _cleanup():
+    execute_sql('DELETE FROM conversation_analysis WHERE phone_number = %s', (PHONE,))
+    execute_sql('DELETE FROM logs WHERE phone_number = %s', (PHONE,))
+
+
+@pytest.fixture
+def seeded_logs():
+    """LOG_COUNT logs in the future (so they come first), pairs sharing a created_at; ids newest first."""
+    _cleanup()
+    ids = [row[0] for row in execute_sql('''
+        INSERT INTO logs (phone_number, message_in, message_out, intent, success, created_at)
+        SELECT %s, 'log viewer test ' || n, 'reply ' || n, 'help', TRUE,
+               TIMESTAMP '2099-01-01' - (n / 2) * INTERVAL '1 minute'
+        FROM generate_series(0, %s - 1) n
+        RETURNING id
+    ''', (PHONE, LOG_COUNT))]
+    # Two reviews on one log: the latest wins
+    execute_sql('''
+        INSERT INTO conversation_analysis (log_id, phone_number, issue_type, source)
+        VALUES (%s, %s, 'wrong_intent', 'manual'), (%s, %s, 'good', 'manual'), (%s, %s, 'dismissed', 'manual')
+    ''', (ids[1], PHONE, ids[1], PHONE, ids[4], PHONE))
+    yield execute_sql('''
+        SELECT id FROM logs WHERE phone_number = %s ORDER BY created_at DESC, id DESC
+    ''', (PHONE,))
+    _cleanup()
+
+
+def _cursor(row):
+    return datetime.fromisoformat(row['created_at']), row['id']
+
+
+class TestKeysetPagination:
+
+    def test_keyset_pages_match_offset_pages(self, seeded_logs):
+        from database import get_recent_logs
+
+        expected = [row[0] for row in seeded_logs]
+        pages, before = [], None
+        while len(pages) < LOG_COUNT:
+            page = get_recent_logs(limit=5, phone_filter=PHONE, before=before)
+            assert page == get_recent_logs(limit=5, offset=len(pages), phone_filter=PHONE)
+            pages.extend(page)
+            if len(page) < 5:
+                break
+            before = _cursor(page[-1])
+
+        # Rows sharing a created_at are split across pages without gaps or repeats
+        assert [row['id'] for row in pages] == expected
+
+    def test_review_status_and_timezone_are_joined(self, seeded_logs):
+        from database import get_recent_logs
+
+        logs = {row['id']: row for row in get_recent_logs(limit=LOG_COUNT, phone_filter=PHONE)}
+        statuses = {row['review_status'] for row in logs.values()}
+        assert statuses == {None, 'good', 'dismissed'}
+        assert all(row['timezone'] == 'America/New_York' for row in logs.values())
+
+        unreviewed = get_recent_logs(limit=LOG_COUNT, phone_filter=PHONE, hide_reviewed=True)
+        assert len(unreviewed) == LOG_COUNT - 2
+        assert all(row['review_status'] is None for row in unreviewed)
+
+    def test_endpoint_accepts_cursor_and_rejects_half_cursor(self, seeded_logs):
+        from fastapi import HTTPException
+        from admin_dashboard import get_conversations
+
+        def call(**kwargs):
+            params = dict(limit=4, offset=0, phone=PHONE, intent=None, hide_reviewed=False,
+                          start_date=None, end_date=None, before_created_at=None, before_id=None)
+            params.update(kwargs)
+            return json.loads(asyncio.run(get_conversations(**params, admin='admin')).body)
+
+        first = call()
+        second = call(before_created_at=first[-1]['created_at'], before_id=first[-1]['id'])
+        assert [row['id'] for row in first + second] == [row[0] for row in seeded_logs[:8]]
+
+        with pytest.raises(HTTPException) as exc:
+            call(before_id=first[-1]['id'])
+        assert exc.value.status_code == 400
+
+
+class TestExport:
+
+    def test_iter_recent_logs_walks_every_batch(self, seeded_logs):
+        from database import iter_recent_logs
+
+        ids = [row['id'] for row in iter_recent_logs(batch_size=5, phone_filter=PHONE)]
+        assert ids == [row[0] for row in seeded_logs]
+
+    def test_export_streams_ndjson(self, seeded_logs):
+        from admin_dashboard import export_conversations
+
+        response = asyncio.run(export_conversations(phone=PHONE, intent=None, hide_reviewed=True,
+                                                    start_date=None, end_date=None, admin='admin'))
+        assert response.media_type == 'application/x-ndjson'
+
+        async def body():
+            return ''.join([chunk async for chunk in response.body_iterator])
+
+        lines = asyncio.run(body()).splitlines()
+        rows = [json.loads(line) for line in lines]
+        assert len(rows) == LOG_COUNT - 2
+        assert all(row['phone_number'] == PHONE and row['review_status'] is None for row in rows)
@@ -0,0 +1,152 @@
+"""
+Regression tests for the single-pass get_cost_analytics.
+
+_legacy_cost_analytics is the per-period implementation it replaced (two
+queries per period); both run against the same seeded logs and api_usage
+rows and must return identical numbers.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from tests.conftest import execute_sql
+
+PHONES = {
+    '+15550420001': ('free', None),
+    '+15550420002': ('premium', None),
+    '+15550420003': ('premium', '+3 days'),     # paid plan, still in trial
+    '+15550420004': ('family', '-3 days'),      # trial over
+}
+# (hours ago, prompt tokens, completion tokens, cached) per user
+USAGE = [(0.2, 120, 30, False), (5, 300, 80, False), (5, 500, 90, True), (72, 800, 200, False),
+         (24 * 20, 1000, 400, False), (24 * 45, 5000, 900, False)]
+
+
+def _legacy_cost_analytics(start_date=None, end_date=None):
+    from database import get_db_connection, return_db_connection
+    from services.metrics_service import (
+        OPENAI_INPUT_COST_PER_1K, OPENAI_OUTPUT_COST_PER_1K, SMS_COST_PER_MESSAGE,
+        _date_filter, get_twilio_actual_costs,
+    )
+
+    plan_sql = '''
+        CASE
+            WHEN u.trial_end_date > NOW() AND u.premium_status IN ('premium', 'family')
+                THEN 'trial'
+            ELSE COALESCE(u.premium_status, 'free')
+        END
+    '''
+    conn = get_db_connection(readonly=True)
+    try:
+        c = conn.cursor()
+        df_u, dp_u = _date_filter('u.created_at', start_date, end_date)
+        c.execute(f'SELECT {plan_sql}, COUNT(*) FROM users u WHERE u.onboarding_complete = TRUE{df_u} GROUP BY 1',
+                  dp_u)
+        user_counts = {row[0]: row[1] for row in c.fetchall()}
+
+        df_l, dp_l = _date_filter('l.created_at', start_date, end_date)
+        df_a, dp_a = _date_filter('a.created_at', start_date, end_date)
+        results = {}
+        for period_name, interval in {'hour': '1 hour', 'day': '1 day', 'week': '7 days',
+                                      'month': '30 days'}.items():
+            c.execute(f'''
+                SELECT {plan_sql}, COUNT(*) FROM logs l JOIN users u ON l.phone_number = u.phone_number
+                WHERE l.created_at >= NOW() - %s::interval{df_l} GROUP BY 1
+            ''', [interval] + dp_l)
+            sms_by_plan = {row[0]: row[1] for row in c.fetchall()}
+            c.execute(f'''
+                SELECT {plan_sql}, SUM(a.prompt_tokens), SUM(a.completion_tokens)
+                FROM api_usage a JOIN users u ON a.phone_number = u.phone_number
+                WHERE a.created_at >= NOW() - %s::interval AND NOT a.cached{df_a} GROUP BY 1
+            ''', [interval] + dp_a)
+            ai_by_plan = {row[0]: {'prompt': row[1] or 0, 'completion': row[2] or 0} for row in c.fetchall()}
+
+            period_data = {}
+            for plan in ['free', 'trial', 'premium', 'family']:
+                message_count = sms_by_plan.get(plan, 0)
+                sms_cost = message_count * 2 * SMS_COST_PER_MESSAGE
+                ai_tokens = ai_by_plan.get(plan, {'prompt': 0, 'completion': 0})
+                ai_cost = (
+                    (ai_tokens['prompt'] / 1000) * OPENAI_INPUT_COST_PER_1K +
+                    (ai_tokens['completion'] / 1000) * OPENAI_OUTPUT_COST_PER_1K
+                )
+                total_cost = sms_cost + ai_cost
+                user_count = user_counts.get(plan, 0)
+                period_data[plan] = {
+                    'sms_cost': round(sms_cost, 4),
+                    'ai_cost': round(ai_cost, 4),
+                    'total_cost': round(total_cost, 4),
+                    'user_count': user_count,
+                    'cost_per_user': round(total_cost / user_count if user_count > 0 else 0, 4),
+                    'message_count': message_count,
+                    'prompt_tokens': ai_tokens['prompt'],
+                    'completion_tokens': ai_tokens['completion']
+                }
+            total_sms = sum(p['sms_cost'] for p in period_data.values())
+            total_ai = sum(p['ai_cost'] for p in period_data.values())
+            total_users_count = sum(user_counts.values())
+            period_data['total'] = {
+                'sms_cost': round(total_sms, 4),
+                'ai_cost': round(total_ai, 4),
+                'total_cost': round(total_sms + total_ai, 4),
+                'user_count': total_users_count,
+                'cost_per_user': round((total_sms + total_ai) / total_users_count, 4) if total_users_count > 0 else 0
+            }
+            results[period_name] = period_data
+    finally:
+        return_db_connection(conn)
+
+    results['twilio_actual'] = get_twilio_actual_costs(start_date=start_date, end_date=end_date)
+    return results
+
+
+@pytest.fixture
+def seeded_usage():
+    """Four users on different plans with logs and api_usage spread over 45 days."""
+    phones = list(PHONES)
+
+    def cleanup():
+        for table in ('api_usage', 'logs', 'users'):
+            execute_sql(f'DELETE FROM {table} WHERE phone_number = ANY(%s)', (phones,))
+
+    cleanup()
+    for phone, (plan, trial_offset) in PHONES.items():
+        execute_sql('''
+            INSERT INTO users (phone_number, onboarding_complete, premium_status, trial_end_date, created_at)
+            VALUES (%s, TRUE, %s, NOW() + %s::interval, NOW() - INTERVAL '60 days')
+        ''', (phone, plan, trial_offset))
+        for hours_ago, prompt, completion, cached in USAGE:
+            execute_sql('''
+                INSERT INTO logs (phone_number, message_in, message_out, created_at)
+                VALUES (%s, 'in', 'out', NOW() - %s * INTERVAL '1 hour')
+            ''', (phone, hours_ago))
+            execute_sql('''
+                INSERT INTO api_usage (phone_number, request_type, prompt_tokens, completion_tokens,
+                                         total_tokens, model, cached, created_at)
+                VALUES (%s, 'process', %s, %s, %s, 'gpt-4o-mini', %s, NOW() - %s * INTERVAL '1 hour')
+            ''', (phone, prompt, completion, prompt + completion, cached, hours_ago))
+    yield
+    cleanup()
+
+
+class TestCostAnalytics:
+
+    def test_matches_per_period_queries(self, seeded_usage):
+        from services.metrics_service import get_cost_analytics
+
+        results = get_cost_analytics()
+        assert results == _legacy_cost_analytics()
+        assert results['hour']['family']['message_count'] >= 1
+        assert results['month']['trial']['prompt_tokens'] >= 2220
+
+    def test_matches_per_period_queries_with_date_filter(self, seeded_usage):
+        from services.metrics_service import get_cost_analytics
+
+        kwargs = {'start_date': datetime.now() - timedelta(days=2), 'end_date': datetime.now() + timedelta(days=1)}
+        assert get_cost_analytics(**kwargs) == _legacy_cost_analytics(**kwargs)
+
+        kwargs = {'start_date': datetime(2001, 1, 1), 'end_date': datetime(2001, 2, 1)}
+        results = get_cost_analytics(**kwargs)
+        assert results == _legacy_cost_analytics(**kwargs)
+        assert results['month']['total']['total_cost'] == 0
@@ -0,0 +1,112 @@
+"""
+Tests for customer search (services.customer_search_service) and the two
+search endpoints that use it (/admin/cs/search and /cs/search).
+"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import Request
+
+from tests.conftest import execute_sql
+
+USERS = [
+    # phone, first_name, last_name
+    ('+19995550101', 'Abigail', 'Zephyrine'),
+    ('+19995550102', 'Zara', 'Abernathy'),
+    ('+19995550103', 'Marcabel', 'Quixote'),
+    ('+19995551010', 'Percent%Name', 'Under_Score'),
+]
+COLUMNS = 'phone_number'
+ORDER_BY = 'phone_number'
+
+
+@pytest.fixture
+def customers(monkeypatch):
+    """Seeded users and a fresh search cache."""
+    import services.customer_search_service as customer_search_service
+
+    monkeypatch.setattr(customer_search_service, '_cache', None)
+    phones = [u[0] for u in USERS]
+    execute_sql('DELETE FROM users WHERE phone_number = ANY(%s)', (phones,))
+    for phone, first_name, last_name in USERS:
+        execute_sql('INSERT INTO users (phone_number, first_name, last_name) VALUES (%s, %s, %s)',
+                   (phone, first_name, last_name))
+    yield customer_search_service
+    execute_sql('DELETE FROM users WHERE phone_number = ANY(%s)', (phones,))
+
+
+def _search(query, **kwargs):
+    from database import get_db_connection, return_db_connection
+    from services.customer_search_service import search_customers
+
+    conn = get_db_connection()
+    try:
+        rows = search_customers(conn.cursor(), query, COLUMNS, ORDER_BY, **kwargs)
+        return [row[0] for row in rows if row[0].startswith('+1999555')]
+    finally:
+        return_db_connection(conn)
+
+
+class TestSearchCustomers:
+
+    @pytest.mark.parametrize('query', ['+19995550101', '(999) 555-0101', '999-555-0101', '19995550101'])
+    def test_full_phone_number_is_an_exact_match(self, customers, query):
+        assert customers.full_phone_number(query) == '+19995550101'
+        # '999555010' is also a substring of the other numbers; the exact match wins
+        assert _search(query) == ['+19995550101']
+
+    def test_partial_digits_match_phone_substrings(self, customers):
+        assert _search('555010') == ['+19995550101', '+19995550102', '+19995550103']
+        assert _search('+1999555101') == ['+19995551010']
+        # Too short to narrow anything down
+        assert _search('01') == []
+
+    def test_names_match_substrings_case_insensitively(self, customers):
+        assert _search('ABEL') == ['+19995550103']
+        assert _search('aber') == ['+19995550102']
+        # Two-letter terms match the start of a name only
+        assert _search('ab') == ['+19995550101', '+19995550102']
+        assert _search('ab', name_columns=('first_name',)) == ['+19995550101']
+
+    def test_like_wildcards_are_literal(self, customers):
+        # As wildcards these would match Marcabel and Zara
+        assert _search('m%l') == []
+        assert _search('z_r') == []
+        assert _search('nt%na') == ['+19995551010']
+        assert _search('r_s') == ['+19995551010']
+
+
+def _request(path):
+    return Request({'type': 'http', 'method': 'GET', 'path': path, 'headers': []})
+
+
+class TestSearchEndpoints:
+
+    def test_admin_search_is_cached_per_query(self, customers, monkeypatch):
+        import utils.response_cache as response_cache
+        from admin_dashboard import cs_search_customers
+
+        monkeypatch.setattr(response_cache, 'ADMIN_CACHE_ENABLED', True)
+        first = asyncio.run(cs_search_customers(_request('/admin/cs/search'), q='Quixote', admin='admin'))
+        again = asyncio.run(cs_search_customers(_request('/admin/cs/search'), q=' quixote ', admin='admin'))
+
+        body = json.loads(first.body)
+        assert [c['phone'] for c in body['customers']] == ['+19995550103']
+        assert body['customers'][0]['phone_masked'] == '***0103'
+        assert (first.headers['x-cache'], again.headers['x-cache']) == ('MISS', 'HIT')
+        assert again.body == first.body
+        assert customers.get_search_cache_stats()['endpoints']['admin_cs_search']['hits'] == 1
+
+    def test_cs_portal_search_and_short_queries(self, customers, monkeypatch):
+        import utils.response_cache as response_cache
+        from cs_portal import cs_search_customers
+
+        monkeypatch.setattr(response_cache, 'ADMIN_CACHE_ENABLED', True)
+        response = asyncio.run(cs_search_customers(_request('/cs/search'), q='(999) 555-0102', user='cs'))
+        results = json.loads(response.body)['results']
+        assert [(r['phone'], r['name'], r['tier'], r['active']) for r in results] == [('+19995550102', 'Zara', 'free', True)]
+
+        short = asyncio.run(cs_search_customers(_request('/cs/search'), q='a', user='cs'))
+        assert short['results'] == [] and 'message' in short
@@ -0,0 +1,212 @@
+"""
+Tests for the CS customer view (services.customer_view_service), its data
+version triggers, and the /cs/customer/{phone}/full endpoint.
+"""
+
+import asyncio
+import base64
+import json
+import os
+
+import pytest
+from fastapi import Request
+
+from tests.conftest import execute_sql
+
+PHONE = '+15550490001'
+OTHER_PHONE = '+15550490002'
+REMINDER_COUNT = 7
+
+
+def _cleanup():
+    for phone in (PHONE, OTHER_PHONE):
+        execute_sql('DELETE FROM support_messages WHERE phone_number = %s', (phone,))
+        execute_sql('DELETE FROM support_tickets WHERE phone_number = %s', (phone,))
+        execute_sql('DELETE FROM customer_notes WHERE phone_number = %s', (phone,))
+        execute_sql('DELETE FROM list_items WHERE phone_number = %s', (phone,))
+        execute_sql('DELETE FROM lists WHERE phone_number = %s', (phone,))
+        execute_sql('DELETE FROM memories WHERE phone_number = %s', (phone,))
+        execute_sql('DELETE FROM reminders WHERE phone_number = %s', (phone,))
+        execute_sql('DELETE FROM users WHERE phone_number = %s', (phone,))
+
+
+@pytest.fixture
+def customer(monkeypatch):
+    """A customer with something in every section, and a fresh view cache."""
+    import services.customer_view_service as customer_view_service
+
+    monkeypatch.setattr(customer_view_service, '_cache', None)
+    _cleanup()
+    execute_sql('''INSERT INTO users (phone_number, first_name, premium_status, subscription_status)
+                  VALUES (%s, 'Vera', 'premium', 'active'), (%s, 'Other', 'free', NULL)''', (PHONE, OTHER_PHONE))
+    execute_sql('''
+        INSERT INTO reminders (phone_number, reminder_text, reminder_date, sent)
+        SELECT %s, 'reminder ' || n, TIMESTAMP '2030-01-01' + n * INTERVAL '1 day', n < 3
+        FROM generate_series(1, %s) n
+    ''', (PHONE, REMINDER_COUNT))
+    list_id = execute_sql("INSERT INTO lists (phone_number, list_name) VALUES (%s, 'Groceries') RETURNING id",
+                         (PHONE,))[0][0]
+    execute_sql('''INSERT INTO list_items (list_id, phone_number, item_text, completed)
+                  VALUES (%s, %s, 'milk', TRUE), (%s, %s, 'eggs', FALSE)''', (list_id, PHONE, list_id, PHONE))
+    execute_sql("INSERT INTO lists (phone_number, list_name) VALUES (%s, 'Empty')", (PHONE,))
+    execute_sql("INSERT INTO memories (phone_number, memory_text) VALUES (%s, 'parked on level 3')", (PHONE,))
+    ticket_id = execute_sql("INSERT INTO support_tickets (phone_number, message_count) VALUES (%s, 2) RETURNING id",
+                           (PHONE,))[0][0]
+    execute_sql('''INSERT INTO support_messages (ticket_id, phone_number, message, direction)
+                  VALUES (%s, %s, 'help', 'inbound'), (%s, %s, 'on it', 'outbound')''',
+               (ticket_id, PHONE, ticket_id, PHONE))
+    execute_sql("INSERT INTO customer_notes (phone_number, note, created_by) VALUES (%s, 'VIP', 'cs')", (PHONE,))
+    yield customer_view_service
+    _cleanup()
+
+
+def _with_cursor(fn, *args, **kwargs):
+    from database import get_db_connection, return_db_connection
+
+    conn = get_db_connection()
+    try:
+        return fn(conn.cursor(), *args, **kwargs)
+    finally:
+        return_db_connection(conn)
+
+
+class TestCustomerView:
+
+    def test_every_section_in_one_view(self, customer):
+        view = _with_cursor(customer.get_customer_view, PHONE)
+
+        assert view['profile']['name'] == 'Vera' and view['profile']['active'] is True
+        assert view['subscription']['tier'] == 'premium'
+        assert view['stats'] == {'reminders': REMINDER_COUNT, 'pending_reminders': REMINDER_COUNT - 2,
+                                 'lists': 2, 'memories': 1, 'open_tickets': 1}
+        assert [r['text'] for r in view['reminders']['items']][:2] == ['reminder 7', 'reminder 6']
+        assert view['reminders']['items'][-1]['status'] == 'pending'
+        empty, groceries = sorted(view['lists'], key=lambda lst: lst['name'])
+        assert [(i['text'], i['completed']) for i in groceries['items']] == [('milk', True), ('eggs', False)]
+        assert empty['items'] == []
+        assert [m['content'] for m in view['memories']] == ['parked on level 3']
+        assert [(t['status'], t['message_count']) for t in view['tickets']] == [('open', 2)]
+        assert [n['note'] for n in view['notes']] == ['VIP']
+        assert _with_cursor(customer.get_customer_view, '+15550499999') is None
+
+    def test_reminders_are_paginated(self, customer):
+        first = _with_cursor(customer.get_customer_view, PHONE, reminder_limit=4)['reminders']
+        rest = _with_cursor(customer.get_customer_view, PHONE, reminder_limit=4, reminder_offset=4)['reminders']
+
+        assert (first['has_more'], rest['has_more']) == (True, False)
+        texts = [r['text'] for r in first['items'] + rest['items']]
+        assert texts == [f'reminder {n}' for n in range(REMINDER_COUNT, 0, -1)]
+
+    def test_encrypted_fields_are_decrypted_in_one_batch(self, customer, monkeypatch):
+        import utils.encryption as encryption
+
+        monkeypatch.setattr(encryption, '_encryption_key', os.urandom(32))
+        monkeypatch.setattr(customer, 'ENCRYPTION_ENABLED', True)
+        execute_sql('UPDATE users SET first_name_encrypted = %s WHERE phone_number = %s',
+                   (encryption.encrypt_field('Veronica'), PHONE))
+        execute_sql('UPDATE list_items SET item_text_encrypted = %s WHERE phone_number = %s AND item_text = %s',
+                   (encryption.encrypt_field('oat milk'), PHONE, 'milk'))
+        # Legacy rows hold plaintext in the encrypted column; it comes back as is
+        execute_sql('UPDATE memories SET memory_text_encrypted = %s WHERE phone_number = %s', ('not-encrypted', PHONE))
+
+        real_decrypt, calls = encryption.safe_decrypt_many, []
+
+        def counting_decrypt(values, *args):
+            calls.append(len(values))
+            return real_decrypt(values, *args)
+
+        monkeypatch.setattr(encryption, 'safe_decrypt_many', counting_decrypt)
+        view = _with_cursor(customer.get_customer_view, PHONE)
+
+        assert calls == [3]
+        assert view['profile']['name'] == 'Veronica'
+        items = {i['text'] for lst in view['lists'] for i in lst['items']}
+        assert items == {'oat milk', 'eggs'}
+        assert view['memories'][0]['content'] == 'not-encrypted'
+
+
+class TestDataVersion:
+
+    def test_version_changes_only_for_the_customer_that_changed(self, customer):
+        before = _with_cursor(customer.get_data_version, PHONE)
+        other_before = _with_cursor(customer.get_data_version, OTHER_PHONE)
+
+        execute_sql('UPDATE list_items SET completed = TRUE WHERE phone_number = %s', (PHONE,))
+        after_item = _with_cursor(customer.get_data_version, PHONE)
+        execute_sql("UPDATE users SET last_active_at = NOW() WHERE phone_number = %s", (PHONE,))
+        after_profile = _with_cursor(customer.get_data_version, PHONE)
+        execute_sql('DELETE FROM customer_notes WHERE phone_number = %s', (PHONE,))
+        after_delete = _with_cursor(customer.get_data_version, PHONE)
+
+        assert len({before, after_item, after_profile, after_delete}) == 4
+        assert _with_cursor(customer.get_data_version, OTHER_PHONE) == other_before
+        assert _with_cursor(customer.get_data_version, '+15550499999') is None
+
+    def test_reminder_delivery_changes_version_without_version_writes(self, customer):
+        before = _with_cursor(customer.get_data_version, PHONE)
+        bumps = execute_sql('SELECT version FROM customer_data_versions WHERE phone_number = %s', (PHONE,))
+
+        execute_sql('UPDATE reminders SET claimed_at = NOW() WHERE phone_number = %s AND sent = FALSE', (PHONE,))
+        claimed = _with_cursor(customer.get_data_version, PHONE)
+        execute_sql('UPDATE reminders SET sent = TRUE, claimed_at = NULL WHERE phone_number = %s', (PHONE,))
+        sent = _with_cursor(customer.get_data_version, PHONE)
+        execute_sql('DELETE FROM reminders WHERE id = (SELECT MIN(id) FROM reminders WHERE phone_number = %s)',
+                   (PHONE,))
+        deleted = _with_cursor(customer.get_data_version, PHONE)
+
+        assert len({before, claimed, sent, deleted}) == 4
+        assert execute_sql('SELECT version FROM customer_data_versions WHERE phone_number = %s', (PHONE,)) == bumps
+
+
+def _request(path, headers=()):
+    return Request({'type': 'http', 'method': 'GET', 'path': path, 'headers': list(headers)})
+
+
+class TestFullEndpoint:
+
+    def _get(self, headers=(), **params):
+        from cs_portal import cs_get_customer_full
+
+        params = {'reminder_limit': 50, 'reminder_offset': 0, **params}
+        return asyncio.run(cs_get_customer_full(PHONE, _request(f'/cs/customer/{PHONE}/full', headers),
+                                                **params, user='cs'))
+
+    def test_cached_until_the_customer_changes(self, customer, monkeypatch):
+        import utils.response_cache as response_cache
+
+        monkeypatch.setattr(response_cache, 'ADMIN_CACHE_ENABLED', True)
+        first, again = self._get(), self._get()
+        assert (first.headers['x-cache'], again.headers['x-cache']) == ('MISS', 'HIT')
+        assert again.body == first.body
+
+        not_modified = self._get(headers=[(b'if-none-match', first.headers['etag'].encode())])
+        assert not_modified.status_code == 304
+
+        execute_sql("INSERT INTO customer_notes (phone_number, note, created_by) VALUES (%s, 'called back', 'cs')",
+                   (PHONE,))
+        changed = self._get()
+        assert changed.headers['x-cache'] == 'MISS'
+        assert [n['note'] for n in json.loads(changed.body)['notes']] == ['called back', 'VIP']
+
+        page = json.loads(self._get(reminder_limit=5, reminder_offset=5).body)['reminders']
+        assert len(page['items']) == REMINDER_COUNT - 5 and not page['has_more']
+        stats = customer.get_view_cache_stats()['endpoints']['cs_customer_view']
+        assert (stats['hits'], stats['not_modified']) == (2, 1)
+
+    def test_unknown_customer_is_404(self, customer):
+        from fastapi import HTTPException
+        from cs_portal import cs_get_customer_full
+
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(cs_get_customer_full('+15550499999', _request('/cs/customer/x/full'),
+                                             reminder_limit=50, reminder_offset=0, user='cs'))
+        assert exc.value.status_code == 404
+
+
+def test_safe_decrypt_many_matches_safe_decrypt(monkeypatch):
+    import utils.encryption as encryption
+
+    monkeypatch.setattr(encryption, '_encryption_key', os.urandom(32))
+    values = [encryption.encrypt_field('one'), None, '', 'plain', base64.b64encode(b'x' * 40).decode()]
+    assert encryption.safe_decrypt_many(values, fallback='-') == \
+        [encryption.safe_decrypt(v, fallback='-') for v in values]
@@ -0,0 +1,154 @@
+"""
+Tests for the local list item splitter used by parse_list_items.
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# The examples from the parse_list_items prompt
+PROMPT_EXAMPLES = [
+    ("milk, eggs, bread", ["milk", "eggs", "bread"]),
+    ("ham and cheese sandwich", ["ham and cheese sandwich"]),
+    ("peanut butter and jelly, milk, ham and cheese sandwich", ["peanut butter and jelly", "milk", "ham and cheese sandwich"]),
+    ("mac and cheese, bread and butter, eggs", ["mac and cheese", "bread and butter", "eggs"]),
+    ("apples, oranges and bananas", ["apples", "oranges", "bananas"]),
+    ("chips and salsa", ["chips and salsa"]),
+    ("milk and eggs", ["milk", "eggs"]),
+    ("soap, shampoo and conditioner", ["soap", "shampoo", "conditioner"]),
+    ("tape and stick", ["tape", "stick"]),
+    ("gloves and helmet", ["gloves", "helmet"]),
+    ("pants and jersey", ["pants", "jersey"]),
+]
+
+MINED_PHONES = ['+15550370001', '+15550370002', '+15550370003']
+
+
+class FakeRedis:
+    """In-memory stand-in for the splitter's Redis client."""
+
+    def __init__(self, fail=False):
+        self.values = {}
+        self.fail = fail
+        self.gets = 0
+
+    def get(self, key):
+        self.gets += 1
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.values.get(key)
+
+    def set(self, key, value):
+        self.values[key] = value
+
+
+@pytest.fixture
+def fresh_mining(monkeypatch):
+    """No mined phrases yet, and a fake Redis the splitter reads them from."""
+    import utils.item_splitter as splitter
+
+    redis = FakeRedis()
+    monkeypatch.setattr(splitter, '_redis', redis)
+    monkeypatch.setattr(splitter, '_next_load', 0.0)
+    monkeypatch.setattr(splitter, '_mined_compounds', {})
+    monkeypatch.setattr(splitter, '_mined_items', frozenset())
+    return redis
+
+
+@pytest.fixture
+def mined_compound(fresh_mining):
+    """Three users who each stored 'Strawberries and cream' as one item."""
+    from database import get_db_connection, return_db_connection
+    from models.list_model import create_list, add_list_item
+
+    def cleanup():
+        conn = get_db_connection()
+        try:
+            c = conn.cursor()
+            c.execute("DELETE FROM list_items WHERE phone_number = ANY(%s)", (MINED_PHONES,))
+            c.execute("DELETE FROM lists WHERE phone_number = ANY(%s)", (MINED_PHONES,))
+            conn.commit()
+        finally:
+            return_db_connection(conn)
+
+    cleanup()
+    for phone in MINED_PHONES:
+        add_list_item(create_list(phone, "Dessert List"), phone, "Strawberries and cream")
+    yield fresh_mining
+    cleanup()
+
+
+class TestSplitListText:
+
+    @pytest.mark.parametrize("text,expected", PROMPT_EXAMPLES)
+    def test_prompt_examples(self, text, expected, fresh_mining):
+        from utils.item_splitter import split_list_text
+
+        assert split_list_text(text) == expected
+
+    def test_keeps_case_and_compounds_inside_series(self, fresh_mining):
+        from utils.item_splitter import split_list_text
+
+        assert split_list_text("Milk and Mac and Cheese") == ["Milk", "Mac and Cheese"]
+
+    @pytest.mark.parametrize("text", ["strawberries and cream", "chicken and rice soup", "milk, chocolate and vanilla ice cream"])
+    def test_ambiguous_returns_none(self, text, fresh_mining):
+        from utils.item_splitter import split_list_text
+
+        assert split_list_text(text) is None
+
+    def test_mined_compound_kept_together(self, mined_compound):
+        from tasks.list_tasks import mine_list_phrases
+        import utils.item_splitter as splitter
+
+        assert mine_list_phrases() >= 1
+        # A fresh process picks the phrases up from Redis
+        splitter._mined_compounds, splitter._mined_items = {}, frozenset()
+        splitter._next_load = 0.0
+
+        assert splitter.split_list_text("strawberries and cream, milk") == ["strawberries and cream", "milk"]
+
+    def test_request_path_only_reads_the_cached_set(self, mined_compound, monkeypatch):
+        import database
+        import utils.item_splitter as splitter
+
+        splitter.mine_phrases()
+        splitter._next_load = 0.0
+
+        def no_database():
+            raise AssertionError("split_list_text queried the database")
+
+        monkeypatch.setattr(database, 'get_db_connection', no_database)
+        for _ in range(3):
+            assert splitter.split_list_text("strawberries and cream") == ["strawberries and cream"]
+        assert mined_compound.gets == 1
+
+    def test_redis_unavailable_uses_lexicon(self, fresh_mining):
+        from utils.item_splitter import split_list_text
+
+        fresh_mining.fail = True
+
+        assert split_list_text("mac and cheese, milk and eggs") == ["mac and cheese", "milk", "eggs"]
+        assert split_list_text("strawberries and cream") is None
+
+
+class TestParseListItemsEscalation:
+
+    def test_confident_split_skips_ai(self, fresh_mining):
+        from services.ai_service import parse_list_items
+
+        with patch('openai.OpenAI') as mock_openai:
+            assert parse_list_items("apples, oranges and bananas") == ["apples", "oranges", "bananas"]
+            mock_openai.assert_not_called()
+
+    def test_ambiguous_asks_ai(self, fresh_mining):
+        from services.ai_service import parse_list_items
+
+        response = MagicMock()
+        response.choices[0].message.content = json.dumps(["strawberries and cream"])
+        response.usage = None
+        with patch('openai.OpenAI') as mock_openai:
+            mock_openai.return_value.chat.completions.create.return_value = response
+            assert parse_list_items("strawberries and cream") == ["strawberries and cream"]
+            mock_openai.assert_called_once()
@@ -0,0 +1,163 @@
+"""
+Tests for the single-statement list item operations in models.list_model.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def grocery_list(onboarded_user):
+    from models.list_model import create_list, add_list_item
+
+    phone = onboarded_user['phone']
+    list_id = create_list(phone, "Grocery List")
+    for item in ("Milk", "Eggs", "Bread"):
+        add_list_item(list_id, phone, item)
+    return phone, list_id
+
+
+class TestListOperations:
+
+    def test_complete_and_uncomplete_return_stored_names(self, grocery_list):
+        from models.list_model import mark_item_complete, mark_item_incomplete, get_list_items
+
+        phone, list_id = grocery_list
+
+        assert mark_item_complete(phone, "grocery list", "milk") == ("Grocery List", "Milk")
+        # Already complete
+        assert mark_item_complete(phone, "grocery list", "milk") is None
+        assert [i[1] for i in get_list_items(list_id) if i[2]] == ["Milk"]
+
+        assert mark_item_incomplete(phone, "GROCERY LIST", "MILK") == ("Grocery List", "Milk")
+        assert mark_item_incomplete(phone, "grocery list", "milk") is None
+
+    def test_unknown_list_or_item(self, grocery_list):
+        from models.list_model import mark_item_complete, delete_list_item, clear_list, rename_list
+
+        phone, _ = grocery_list
+
+        assert mark_item_complete(phone, "hardware list", "milk") is None
+        assert mark_item_complete(phone, "grocery list", "butter") is None
+        assert delete_list_item(phone, "grocery list", "butter") is None
+        assert clear_list(phone, "hardware list") is None
+        assert rename_list(phone, "hardware list", "Tools") is None
+
+    def test_delete_item(self, grocery_list):
+        from models.list_model import delete_list_item, get_list_items
+
+        phone, list_id = grocery_list
+
+        assert delete_list_item(phone, "grocery list", "eggs") == ("Grocery List", "Eggs")
+        assert [i[1] for i in get_list_items(list_id)] == ["Milk", "Bread"]
+
+    def test_clear_list_reports_removed_count(self, grocery_list):
+        from models.list_model import clear_list, get_list_items
+
+        phone, list_id = grocery_list
+
+        assert clear_list(phone, "grocery list") == ("Grocery List", 3)
+        assert get_list_items(list_id) == []
+        # Clearing an empty list still finds it
+        assert clear_list(phone, "grocery list") == ("Grocery List", 0)
+
+    def test_rename_returns_previous_name(self, grocery_list):
+        from models.list_model import rename_list, get_list_by_name
+
+        phone, list_id = grocery_list
+
+        assert rename_list(phone, "grocery list", "Shopping List") == "Grocery List"
+        assert get_list_by_name(phone, "shopping list") == (list_id, "Shopping List")
+
+    def test_rename_to_taken_name(self, grocery_list):
+        from models.list_model import LIST_NAME_TAKEN, create_list, rename_list, get_list_by_name
+        from routes.handlers.lists import handle_rename_list
+
+        phone, list_id = grocery_list
+        create_list(phone, "Shopping List")
+
+        assert rename_list(phone, "grocery list", "Shopping List") is LIST_NAME_TAKEN
+        assert get_list_by_name(phone, "grocery list") == (list_id, "Grocery List")
+        reply = handle_rename_list(phone, "rename grocery list to shopping list",
+                                   {"old_name": "grocery list", "new_name": "Shopping List"})
+        assert reply == "You already have a list called 'Shopping List'."
+
+    def test_other_users_lists_untouched(self, grocery_list):
+        from models.list_model import mark_item_complete
+
+        assert mark_item_complete("+15550000001", "grocery list", "milk") is None
+
+    def test_add_items_in_order(self, grocery_list):
+        from models.list_model import add_list_items, get_list_items
+
+        phone, list_id = grocery_list
+
+        result = add_list_items(list_id, phone, ["Apples", "Butter", "Cheese"])
+
+        assert result == {'added': ["Apples", "Butter", "Cheese"], 'skipped': [], 'duplicates': [], 'item_count': 6,
+                          'error': False}
+        assert [i[1] for i in get_list_items(list_id)] == ["Milk", "Eggs", "Bread", "Apples", "Butter", "Cheese"]
+
+    def test_add_items_skips_duplicates(self, grocery_list):
+        from models.list_model import add_list_items, get_list_items
+
+        phone, list_id = grocery_list
+
+        result = add_list_items(list_id, phone, ["milk", "Jam", "jam", "EGGS"])
+
+        assert result['added'] == ["Jam"]
+        assert result['duplicates'] == ["milk", "jam", "EGGS"]
+        assert result['item_count'] == 4
+        assert [i[1] for i in get_list_items(list_id)] == ["Milk", "Eggs", "Bread", "Jam"]
+
+    def test_add_items_respects_capacity(self, grocery_list):
+        from models.list_model import add_list_items, get_list_items
+
+        phone, list_id = grocery_list
+
+        result = add_list_items(list_id, phone, ["Eggs", "Apples", "Butter", "Cheese"], max_items=5)
+
+        assert result == {'added': ["Apples", "Butter"], 'skipped': ["Cheese"], 'duplicates': ["Eggs"], 'item_count': 5,
+                          'error': False}
+        # Already full
+        result = add_list_items(list_id, phone, ["Jam"], max_items=5)
+        assert result == {'added': [], 'skipped': ["Jam"], 'duplicates': [], 'item_count': 5, 'error': False}
+        assert len(get_list_items(list_id)) == 5
+
+    def test_add_items_reports_database_errors(self, grocery_list):
+        from models.list_model import add_list_items
+
+        phone, _ = grocery_list
+
+        # No such list: the insert fails, which must not look like a full list
+        result = add_list_items(-1, phone, ["Jam"])
+
+        assert result == {'added': [], 'skipped': [], 'duplicates': [], 'item_count': None, 'error': True}
+
+    def test_failed_add_is_not_reported_as_full_list(self, grocery_list, monkeypatch):
+        import routes.handlers.lists as list_handlers
+
+        phone, _ = grocery_list
+        monkeypatch.setattr(list_handlers, 'add_list_items', lambda *args, **kwargs: {
+            'added': [], 'skipped': [], 'duplicates': [], 'item_count': None, 'error': True
+        })
+
+        reply = list_handlers.handle_add_to_list(
+            phone, "add jam to my grocery list",
+            {'action': 'add_to_list', 'list_name': 'Grocery List', 'item_text': 'jam'}
+        )
+
+        assert reply == "Sorry, I couldn't add those items to your Grocery List. Please try again."
+
+
+class TestListItemsAddedReply:
+
+    def test_replies(self):
+        from utils.formatting import format_list_items_added
+
+        assert format_list_items_added("Grocery List", ["Milk"], created=True) == "Created your Grocery List and added Milk!"
+        assert format_list_items_added("Grocery List", ["Milk"], confirmation="Got it!") == "Got it!"
+        assert format_list_items_added("Grocery List", ["Milk", "Jam"], ["eggs"]) == (
+            "Added 2 items to your Grocery List: Milk, Jam (eggs already on the list)"
+        )
+        assert format_list_items_added("Grocery List", [], ["eggs"]) == "eggs is already on your Grocery List."
+        assert format_list_items_added("Grocery List", [], ["eggs", "milk"]) == "eggs, milk are already on your Grocery List."
@@ -0,0 +1,65 @@
+"""
+Tests for memory deduplication via the stored keyword index.
+"""
+
+
+def _stored_memories(phone):
+    from database import get_db_connection, return_db_connection
+
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        c.execute('SELECT id, memory_text, keywords FROM memories WHERE phone_number = %s ORDER BY id', (phone,))
+        return c.fetchall()
+    finally:
+        return_db_connection(conn)
+
+
+class TestMemoryDedup:
+
+    def test_keywords_stored_on_insert_and_update(self, onboarded_user):
+        from models.memory import save_memory
+
+        phone = onboarded_user['phone']
+        assert save_memory(phone, "WiFi password is ABC123", {}) is False
+        assert _stored_memories(phone)[0][2] == ['abc123', 'password', 'wifi']
+
+        # Short key-value update replaces the existing memory
+        assert save_memory(phone, "WiFi password is XYZ789", {}) is True
+        rows = _stored_memories(phone)
+        assert len(rows) == 1
+        assert rows[0][1] == "WiFi password is XYZ789"
+        assert rows[0][2] == ['password', 'wifi', 'xyz789']
+
+    def test_unrelated_memory_inserted(self, onboarded_user):
+        from models.memory import save_memory
+
+        phone = onboarded_user['phone']
+        save_memory(phone, "Garage door code is 4512", {})
+        assert save_memory(phone, "Dentist is Dr. Patel on Main Street", {}) is False
+        assert len(_stored_memories(phone)) == 2
+
+    def test_backfill_then_match_legacy_rows(self, onboarded_user):
+        from database import get_db_connection, return_db_connection
+        from migrations.app import _backfill_memory_keywords
+        from models.memory import save_memory
+
+        phone = onboarded_user['phone']
+        conn = get_db_connection()
+        try:
+            c = conn.cursor()
+            # Saved before the keywords column existed
+            c.execute(
+                'INSERT INTO memories (phone_number, memory_text) VALUES (%s, %s)',
+                (phone, "Locker code is 1234")
+            )
+            _backfill_memory_keywords(c)
+            conn.commit()
+        finally:
+            return_db_connection(conn)
+        assert _stored_memories(phone)[0][2] == ['1234', 'code', 'locker']
+
+        assert save_memory(phone, "Locker code is 5678", {}) is True
+        rows = _stored_memories(phone)
+        assert len(rows) == 1
+        assert rows[0][2] == ['5678', 'code', 'locker']
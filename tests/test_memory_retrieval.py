@@ -0,0 +1,118 @@
+"""
+Tests for embedding-based memory retrieval for the AI context.
+"""
+
+import math
+
+import pytest
+
+
+def _embeddings_installed():
+    from database import get_db_connection, return_db_connection
+    from utils.embeddings import embeddings_available
+
+    conn = get_db_connection()
+    try:
+        return embeddings_available(conn.cursor())
+    finally:
+        return_db_connection(conn)
+
+
+class TestEmbedKeywords:
+
+    def test_normalized_and_deterministic(self):
+        from utils.embeddings import EMBEDDING_DIMENSIONS, embed_keywords
+
+        vector = embed_keywords({'wifi', 'password'})
+        assert len(vector) == EMBEDDING_DIMENSIONS
+        assert math.isclose(sum(v * v for v in vector), 1.0, rel_tol=1e-3)
+        assert embed_keywords({'password', 'wifi'}) == vector
+
+    def test_no_keywords(self):
+        from utils.embeddings import embed_keywords
+
+        assert embed_keywords(set()) is None
+
+    def test_shared_words_are_closer(self):
+        from utils.embeddings import embed_keywords
+
+        def cosine(a, b):
+            return sum(x * y for x, y in zip(a, b))
+
+        wifi = embed_keywords({'wifi', 'password', 'hunter2'})
+        assert cosine(wifi, embed_keywords({'wifi', 'password'})) > cosine(wifi, embed_keywords({'dentist', 'patel'}))
+
+
+class TestRelevantMemories:
+
+    def test_old_relevant_memory_included(self, onboarded_user):
+        if not _embeddings_installed():
+            pytest.skip("pgvector not installed")
+        from database import get_db_connection, return_db_connection
+        from models.memory import save_memory, get_relevant_memories
+
+        phone = onboarded_user['phone']
+        save_memory(phone, "Garage door code is 4512", {})
+        for text in (
+            "Mom's birthday is March 3", "Dentist is Dr. Patel", "Passport expires in 2031",
+            "Favorite pizza is margherita", "Car insurance renews in June", "Bike lock combo is 918",
+            "Neighbor Sam waters the plants", "Gym membership number is 55120",
+        ):
+            save_memory(phone, text, {})
+        conn = get_db_connection()
+        try:
+            # Make the garage memory the oldest
+            conn.cursor().execute(
+                "UPDATE memories SET created_at = NOW() - INTERVAL '1 year' WHERE phone_number = %s AND memory_text LIKE 'Garage%%'",
+                (phone,)
+            )
+            conn.commit()
+        finally:
+            return_db_connection(conn)
+
+        results = get_relevant_memories(phone, "what's my garage code?", 5)
+
+        texts = [r[1] for r in results]
+        assert len(texts) == 5
+        assert "Garage door code is 4512" in texts
+        # Newest first, like get_memories
+        assert [r[3] for r in results] == sorted((r[3] for r in results), reverse=True)
+
+    def test_message_without_keywords_uses_most_recent(self, onboarded_user):
+        from models.memory import save_memory, get_memories, get_relevant_memories
+
+        phone = onboarded_user['phone']
+        for i in range(4):
+            save_memory(phone, f"Note about topic{i}", {})
+
+        assert get_relevant_memories(phone, "?", 2) == get_memories(phone)[:2]
+
+
+class TestEmbeddingBackfill:
+
+    def test_backfill_in_batches(self, onboarded_user):
+        if not _embeddings_installed():
+            pytest.skip("pgvector not installed")
+        from database import get_db_connection, return_db_connection
+        from migrations.app import _backfill_memory_embeddings
+        from models.memory import save_memory
+
+        phone = onboarded_user['phone']
+        for text in ("Garage door code is 4512", "Dentist is Dr. Patel", "Passport expires in 2031", "?"):
+            save_memory(phone, text, {})
+        conn = get_db_connection()
+        try:
+            c = conn.cursor()
+            c.execute('UPDATE memories SET embedding = NULL WHERE phone_number = %s', (phone,))
+            conn.commit()
+            conn.autocommit = True
+            _backfill_memory_embeddings(c, batch_size=2)
+            conn.autocommit = False
+            c.execute('SELECT memory_text, embedding IS NOT NULL FROM memories WHERE phone_number = %s ORDER BY id',
+                      (phone,))
+            rows = c.fetchall()
+            conn.commit()
+        finally:
+            return_db_connection(conn)
+
+        assert [embedded for text, embedded in rows if text != "?"] == [True, True, True]
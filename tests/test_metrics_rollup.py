@@ -0,0 +1,131 @@
+"""
+Tests for the metrics_daily rollups behind the admin overview (get_all_metrics).
+
+Seeded rows are dated in January 2001 so date-filtered totals are exact
+whatever else the test database holds.
+"""
+
+from datetime import date, datetime
+
+import pytest
+
+from tests.conftest import execute_sql
+
+PHONES = ['+15550410001', '+15550410002', '+15550410003']
+TODAY_PHONE = '+15550410004'
+RANGE = {'start_date': datetime(2001, 1, 1), 'end_date': datetime(2001, 1, 6)}
+
+
+@pytest.fixture
+def seeded_history():
+    """Three 2001 signups with memories, reminders and a list; no rollups yet."""
+    def cleanup():
+        for table in ('list_items', 'lists', 'reminders', 'memories', 'users'):
+            execute_sql(f'DELETE FROM {table} WHERE phone_number = ANY(%s)', (PHONES + [TODAY_PHONE],))
+        execute_sql('DELETE FROM metrics_daily')
+
+    cleanup()
+    execute_sql('''
+        INSERT INTO users (phone_number, onboarding_complete, onboarding_step, premium_status,
+                             referral_source, total_messages, created_at)
+        VALUES (%s, TRUE, 5, 'premium', 'friend', 10, '2001-01-02 09:00'),
+                 (%s, TRUE, 5, 'free', NULL, 4, '2001-01-02 18:00'),
+                 (%s, FALSE, 2, 'free', NULL, 1, '2001-01-03 12:00')
+    ''', PHONES)
+    execute_sql('''
+        INSERT INTO memories (phone_number, memory_text, created_at)
+        VALUES (%s, 'gate code 1234', '2001-01-02 10:00'), (%s, 'wifi password', '2001-01-04 10:00')
+    ''', (PHONES[0], PHONES[1]))
+    execute_sql('''
+        INSERT INTO reminders (phone_number, reminder_text, reminder_date, delivery_status, created_at)
+        VALUES (%s, 'call mom', '2001-01-05 10:00', 'sent', '2001-01-03 10:00'),
+                 (%s, 'pay rent', '2001-01-05 10:00', 'failed', '2001-01-03 11:00'),
+                 (%s, 'dentist', '2001-02-01 10:00', 'pending', '2001-01-03 12:00')
+    ''', (PHONES[0], PHONES[0], PHONES[1]))
+    list_id = execute_sql(
+        "INSERT INTO lists (phone_number, list_name, created_at) VALUES (%s, 'Grocery', '2001-01-03') RETURNING id",
+        (PHONES[0],)
+    )[0][0]
+    execute_sql('''
+        INSERT INTO list_items (list_id, phone_number, item_text, created_at)
+        VALUES (%s, %s, 'milk', '2001-01-03'), (%s, %s, 'eggs', '2001-01-03')
+    ''', (list_id, PHONES[0], list_id, PHONES[0]))
+    yield
+    cleanup()
+
+
+def _check_seeded_totals(metrics):
+    assert metrics['total_users'] == 2
+    assert metrics['pending_onboarding'] == 1
+    assert metrics['premium_stats'] == {'free': 1, 'premium': 1, 'churned': 0}
+    assert metrics['reminder_stats'] == {'pending': 1, 'sent': 1, 'failed': 1, 'completion_rate': 50.0}
+    assert metrics['engagement']['total_memories'] == 2
+    assert metrics['engagement']['total_messages'] == 15
+    assert metrics['engagement']['avg_items_per_list'] == 2.0
+    assert metrics['referrals'] == [['friend', 1], ['unknown', 1]]
+    assert metrics['daily_signups'] == [['2001-01-02', 2]]
+
+
+class TestMetricsRollups:
+
+    def test_live_and_rolled_up_totals_match(self, seeded_history):
+        from services.metrics_service import get_all_metrics, refresh_metrics_rollups
+
+        _check_seeded_totals(get_all_metrics(**RANGE))
+
+        assert refresh_metrics_rollups(None) > 0
+        rows = execute_sql(
+            "SELECT day, memories, reminders, list_items FROM metrics_daily "
+            "WHERE day BETWEEN '2001-01-02' AND '2001-01-03' ORDER BY day"
+        )
+        assert rows == [(date(2001, 1, 2), 1, 0, 0), (date(2001, 1, 3), 0, 3, 2)]
+        _check_seeded_totals(get_all_metrics(**RANGE))
+
+    def test_rolled_up_days_not_rescanned_until_reconciled(self, seeded_history):
+        from services.metrics_service import get_all_metrics, refresh_metrics_rollups
+
+        refresh_metrics_rollups(None)
+        execute_sql("DELETE FROM memories WHERE phone_number = %s", (PHONES[1],))
+
+        # Old days come from metrics_daily; the recent-window refresh leaves them alone
+        refresh_metrics_rollups()
+        assert get_all_metrics(**RANGE)['engagement']['total_memories'] == 2
+
+        refresh_metrics_rollups(None)
+        assert get_all_metrics(**RANGE)['engagement']['total_memories'] == 1
+
+    def test_status_changes_on_old_rows_show_immediately(self, seeded_history):
+        from services.metrics_service import get_all_metrics, refresh_metrics_rollups
+
+        refresh_metrics_rollups(None)
+        execute_sql("UPDATE users SET premium_status = 'churned', total_messages = 20 WHERE phone_number = %s",
+                   (PHONES[0],))
+        execute_sql("UPDATE reminders SET delivery_status = 'sent' WHERE phone_number = %s", (PHONES[1],))
+
+        # No refresh in between: these are never read from metrics_daily
+        metrics = get_all_metrics(**RANGE)
+        assert metrics['premium_stats'] == {'free': 1, 'premium': 0, 'churned': 1}
+        assert metrics['engagement']['total_messages'] == 25
+        assert metrics['reminder_stats'] == {'pending': 0, 'sent': 2, 'failed': 1, 'completion_rate': 66.7}
+
+    def test_today_is_computed_live(self, seeded_history):
+        from services.metrics_service import get_all_metrics, refresh_metrics_rollups
+
+        refresh_metrics_rollups(None)
+        before = get_all_metrics()
+        execute_sql("INSERT INTO users (phone_number, onboarding_complete, referral_source) VALUES (%s, TRUE, 'ad')",
+                   (TODAY_PHONE,))
+        after = get_all_metrics()
+
+        assert after['new_users']['today'] == before['new_users']['today'] + 1
+        assert after['total_users'] == before['total_users'] + 1
+        assert dict(after['referrals'])['ad'] == dict(before['referrals']).get('ad', 0) + 1
+
+    def test_refresh_catches_up_missed_days(self, seeded_history):
+        from services.metrics_service import refresh_metrics_rollups
+
+        refresh_metrics_rollups(None)
+        execute_sql("DELETE FROM metrics_daily WHERE day >= CURRENT_DATE - 10")
+
+        assert refresh_metrics_rollups(days=1) == 10
+        assert execute_sql("SELECT MAX(day) = CURRENT_DATE - 1 FROM metrics_daily")[0][0]
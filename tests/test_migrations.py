@@ -0,0 +1,155 @@
+"""
+Tests for the versioned schema migration runner.
+"""
+
+import pytest
+
+SCOPE = 'test_runner'
+
+
+@pytest.fixture
+def migration_conn():
+    """Connection with the test scope's migrations and scratch table cleaned up."""
+    from database import get_db_connection, return_db_connection
+    from migrations.runner import _ensure_migrations_table
+
+    conn = get_db_connection()
+
+    def cleanup():
+        conn.rollback()
+        c = conn.cursor()
+        _ensure_migrations_table(c)
+        c.execute('DROP TABLE IF EXISTS migration_runner_test')
+        c.execute('DELETE FROM schema_migrations WHERE scope = %s', (SCOPE,))
+        c.execute('DELETE FROM schema_migration_skips WHERE scope = %s', (SCOPE,))
+        conn.commit()
+
+    cleanup()
+    yield conn
+    cleanup()
+    return_db_connection(conn)
+
+
+def _migrations():
+    from migrations import ConcurrentIndex, Migration
+
+    return [
+        Migration(1, 'create_table', (
+            'CREATE TABLE IF NOT EXISTS migration_runner_test (id SERIAL PRIMARY KEY, name TEXT)',
+        )),
+        Migration(2, 'add_index', (
+            ConcurrentIndex('idx_migration_runner_test_name', 'migration_runner_test (name)'),
+        )),
+    ]
+
+
+class TestRunMigrations:
+    """Pending migrations apply once, in order, and are recorded."""
+
+    def test_applies_pending_then_noop(self, migration_conn):
+        from migrations import get_applied_versions, run_migrations
+
+        assert run_migrations(migration_conn, _migrations(), SCOPE) == 2
+        assert get_applied_versions(migration_conn, SCOPE) == {1, 2}
+
+        c = migration_conn.cursor()
+        c.execute("SELECT indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                  "WHERE c.relname = 'idx_migration_runner_test_name'")
+        assert c.fetchone() == (True,)
+
+        assert run_migrations(migration_conn, _migrations(), SCOPE) == 0
+
+    def test_only_new_versions_applied(self, migration_conn):
+        from migrations import Migration, run_migrations
+
+        run_migrations(migration_conn, _migrations()[:1], SCOPE)
+        steps = []
+        later = _migrations() + [Migration(3, 'callable_step', (lambda cursor: steps.append(cursor),))]
+
+        assert run_migrations(migration_conn, later, SCOPE) == 2
+        assert len(steps) == 1
+
+    def test_failed_migration_not_recorded(self, migration_conn):
+        import psycopg2
+        from migrations import Migration, get_applied_versions, run_migrations
+
+        broken = _migrations()[:1] + [Migration(2, 'broken', (
+            'ALTER TABLE migration_runner_test ADD COLUMN extra TEXT',
+            'ALTER TABLE migration_runner_test ADD COLUMN extra TEXT',
+        ))]
+
+        with pytest.raises(psycopg2.Error):
+            run_migrations(migration_conn, broken, SCOPE)
+        assert get_applied_versions(migration_conn, SCOPE) == {1}
+
+        # The failed migration's first step was rolled back with it
+        c = migration_conn.cursor()
+        c.execute("SELECT COUNT(*) FROM information_schema.columns "
+                  "WHERE table_name = 'migration_runner_test' AND column_name = 'extra'")
+        assert c.fetchone()[0] == 0
+
+    def test_autocommit_migration_keeps_completed_steps(self, migration_conn):
+        import psycopg2
+        from migrations import Migration, get_applied_versions, run_migrations
+
+        def backfill(cursor):
+            for name in ('first', 'second'):
+                cursor.execute('INSERT INTO migration_runner_test (name) VALUES (%s)', (name,))
+            cursor.execute('INSERT INTO missing_table VALUES (1)')
+
+        with pytest.raises(psycopg2.Error):
+            run_migrations(migration_conn, _migrations()[:1] + [Migration(2, 'backfill', (backfill,), autocommit=True)],
+                           SCOPE)
+        assert get_applied_versions(migration_conn, SCOPE) == {1}
+
+        # Each statement committed on its own, so a re-run resumes instead of starting over
+        c = migration_conn.cursor()
+        c.execute('SELECT name FROM migration_runner_test ORDER BY id')
+        assert c.fetchall() == [('first',), ('second',)]
+
+    def test_skipped_index_retried_until_built(self, migration_conn, monkeypatch):
+        import migrations.runner as runner
+        from migrations import ConcurrentIndex, Migration, get_applied_versions, get_skipped_steps, run_migrations
+
+        needs_extension = _migrations()[:1] + [Migration(2, 'extension_index', (
+            ConcurrentIndex('idx_migration_runner_test_name', 'migration_runner_test (name)',
+                            extension='no_such_extension'),
+        ))]
+
+        assert run_migrations(migration_conn, needs_extension, SCOPE) == 2
+        assert get_applied_versions(migration_conn, SCOPE) == {1, 2}
+        assert get_skipped_steps(migration_conn, SCOPE) == {(2, 'idx_migration_runner_test_name')}
+
+        # Still unavailable: the skip stays recorded
+        run_migrations(migration_conn, needs_extension, SCOPE)
+        assert get_skipped_steps(migration_conn, SCOPE) == {(2, 'idx_migration_runner_test_name')}
+
+        # Extension installed later: the next run builds the index
+        monkeypatch.setattr(runner, '_ensure_extension', lambda cursor, extension: True)
+        assert run_migrations(migration_conn, needs_extension, SCOPE) == 0
+        assert get_skipped_steps(migration_conn, SCOPE) == set()
+        c = migration_conn.cursor()
+        c.execute("SELECT indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                  "WHERE c.relname = 'idx_migration_runner_test_name'")
+        assert c.fetchone() == (True,)
+
+    def test_duplicate_versions_rejected(self, migration_conn):
+        from migrations import Migration, run_migrations
+
+        with pytest.raises(ValueError):
+            run_migrations(migration_conn, [Migration(1, 'a', ()), Migration(1, 'b', ())], SCOPE)
+
+
+class TestAppSchema:
+    """init_db records the baseline so later starts skip the DDL."""
+
+    def test_app_migrations_recorded(self):
+        from database import get_db_connection, return_db_connection, init_db
+        from migrations import APP_MIGRATIONS, get_applied_versions
+
+        init_db()
+        conn = get_db_connection()
+        try:
+            assert get_applied_versions(conn, 'app') == {m.version for m in APP_MIGRATIONS}
+        finally:
+            return_db_connection(conn)
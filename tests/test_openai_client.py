@@ -0,0 +1,86 @@
+"""
+Tests for the shared OpenAI client, run against the local stub server.
+"""
+
+from unittest.mock import patch
+
+import openai
+import pytest
+
+# Captured before the autouse ai_mock fixture patches openai.OpenAI
+REAL_OPENAI = openai.OpenAI
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """Fresh client state pointed at a running OpenAI stub server."""
+    import services.openai_client as openai_client
+    from utils.openai_stub import OpenAIStubServer
+
+    with OpenAIStubServer() as server:
+        monkeypatch.setattr(openai_client, 'OPENAI_BASE_URL', server.base_url)
+        monkeypatch.setattr(openai_client, '_clients', {})
+        monkeypatch.setattr(openai_client, '_call_stats', {})
+        monkeypatch.setattr(openai_client, '_http_client', None)
+        with patch('openai.OpenAI', REAL_OPENAI):
+            yield server
+        if openai_client._http_client is not None:
+            openai_client._http_client.close()
+
+
+def _ask(call_site='parse_list_items'):
+    from services.openai_client import chat_completion
+
+    return chat_completion(call_site, model='gpt-4o-mini', messages=[{"role": "user", "content": "hi"}])
+
+
+class TestOpenAIClient:
+
+    def test_calls_reuse_one_connection(self, stub):
+        for _ in range(3):
+            response = _ask()
+            assert response.choices[0].message.content == stub.content
+
+        assert len(stub.requests) == 3
+        assert stub.connections == 1
+
+    def test_call_sites_share_the_pool_with_their_own_budgets(self, stub):
+        from config import OPENAI_TIMEOUT
+        from services.openai_client import get_openai_client
+
+        webhook = get_openai_client('process_with_ai')
+        nudge = get_openai_client('generate_nudge')
+
+        assert get_openai_client('process_with_ai') is webhook
+        assert (webhook.timeout, webhook.max_retries) == (OPENAI_TIMEOUT, 0)
+        assert (nudge.timeout, nudge.max_retries) == (30, 2)
+
+        _ask('process_with_ai')
+        _ask('generate_nudge')
+        assert stub.connections == 1
+
+    def test_records_latency_and_token_histograms(self, stub):
+        from services.openai_client import get_openai_call_stats
+
+        _ask()
+        _ask()
+
+        stats = get_openai_call_stats()['parse_list_items']
+        assert (stats['calls'], stats['errors']) == (2, 0)
+        assert stats['latency_ms']['count'] == 2
+        assert stats['prompt_tokens']['avg'] == 50
+        assert stats['completion_tokens']['buckets']['<=100'] == 2
+
+    def test_failed_call_counted_as_error(self, stub, monkeypatch):
+        import services.openai_client as openai_client
+        from services.openai_client import get_openai_call_stats
+
+        stub.stop()
+        monkeypatch.setattr(openai_client, '_clients', {})
+
+        with pytest.raises(openai.APIConnectionError):
+            _ask('process_with_ai')
+
+        stats = get_openai_call_stats()['process_with_ai']
+        assert (stats['calls'], stats['errors']) == (1, 1)
+        assert stats['prompt_tokens']['count'] == 0
@@ -0,0 +1,68 @@
+"""
+Tests for the named prepared statement registry in database.py.
+"""
+
+import pytest
+
+
+class TestPlaceholderConversion:
+    """%s placeholders become $n positional params for PREPARE."""
+
+    def test_placeholders_numbered_in_order(self):
+        from database import _to_positional_params
+
+        query, count = _to_positional_params('SELECT 1 FROM t WHERE a = %s AND b < %s LIMIT %s')
+        assert query == 'SELECT 1 FROM t WHERE a = $1 AND b < $2 LIMIT $3'
+        assert count == 3
+
+    def test_escaped_percent_preserved(self):
+        from database import _to_positional_params
+
+        query, count = _to_positional_params("SELECT 1 FROM t WHERE a LIKE 'x%%' AND b = %s")
+        assert query == "SELECT 1 FROM t WHERE a LIKE 'x%' AND b = $1"
+        assert count == 1
+
+
+class TestExecutePrepared:
+    """Statements are prepared once per connection and return the same rows."""
+
+    def test_registration_rejects_conflicting_query(self):
+        from database import register_prepared_statement
+
+        register_prepared_statement('test_conflict_check', 'SELECT %s::int')
+        with pytest.raises(ValueError):
+            register_prepared_statement('test_conflict_check', 'SELECT %s::text')
+
+    def test_prepared_matches_plain_execute(self, onboarded_user):
+        from database import get_db_connection, return_db_connection, execute_prepared, _prepared_statements
+
+        phone = onboarded_user["phone"]
+        conn = get_db_connection()
+        try:
+            c = conn.cursor()
+            c.execute(_prepared_statements['user_by_phone'][0], (phone,))
+            expected = c.fetchone()
+
+            # Run twice: first call PREPAREs, second reuses the statement
+            execute_prepared(c, 'user_by_phone', (phone,))
+            first = c.fetchone()
+            execute_prepared(c, 'user_by_phone', (phone,))
+            second = c.fetchone()
+
+            assert first == expected
+            assert second == expected
+            c.execute("SELECT COUNT(*) FROM pg_prepared_statements WHERE name = 'user_by_phone'")
+            assert c.fetchone()[0] == 1
+        finally:
+            return_db_connection(conn)
+
+    def test_wrong_param_count_raises(self):
+        import models.user  # noqa: F401 - registers user_by_phone
+        from database import get_db_connection, return_db_connection, execute_prepared
+
+        conn = get_db_connection()
+        try:
+            with pytest.raises(ValueError):
+                execute_prepared(conn.cursor(), 'user_by_phone', ())
+        finally:
+            return_db_connection(conn)
@@ -0,0 +1,112 @@
+"""
+Tests for prompt token budgeting (utils.prompt_budget) and its use in process_with_ai.
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+def _section(name, count, budget=None):
+    from utils.prompt_budget import PromptSection
+
+    return PromptSection(name, f"{name.upper()}:", [f"- {name} entry number {i}" for i in range(count)], budget)
+
+
+class TestCountTokens:
+
+    def test_counts_are_stable_and_grow_with_text(self):
+        from utils.prompt_budget import count_tokens
+
+        assert count_tokens("") == 0
+        assert count_tokens("hello world") == count_tokens("hello world") > 0
+        assert count_tokens("milk, eggs and bread " * 10) > count_tokens("milk, eggs and bread")
+
+    def test_message_overhead(self):
+        from utils.prompt_budget import count_message_tokens, count_tokens
+
+        messages = [{"role": "system", "content": "rules"}, {"role": "user", "content": "hi there"}]
+        assert count_message_tokens(messages) == 3 + (3 + count_tokens("rules")) + (3 + count_tokens("hi there"))
+
+
+class TestAssemblePrompt:
+
+    def test_prefix_first_and_sections_within_budget_untouched(self):
+        from utils.prompt_budget import assemble_prompt
+
+        prompt, report = assemble_prompt("RULES", [_section('memories', 3, budget=500)], max_tokens=10000)
+
+        assert prompt.startswith("RULES\n\nMEMORIES:\n- memories entry number 0")
+        assert (report['sections']['memories']['kept'], report['sections']['memories']['total']) == (3, 3)
+        assert "not shown" not in prompt
+
+    def test_section_cut_to_its_budget_from_the_end(self):
+        from utils.prompt_budget import assemble_prompt
+
+        prompt, report = assemble_prompt("RULES", [_section('lists', 100, budget=60)], max_tokens=10000)
+
+        lists = report['sections']['lists']
+        assert 0 < lists['kept'] < 100
+        assert lists['tokens'] <= 60
+        assert "- lists entry number 0\n" in prompt
+        assert prompt.endswith(f"[{100 - lists['kept']} more not shown]")
+
+    def test_overflow_cuts_lowest_priority_first(self):
+        from utils.prompt_budget import assemble_prompt
+
+        sections = [_section('memories', 20), _section('lists', 20)]
+        _, full = assemble_prompt("RULES", sections, max_tokens=10000)
+        _, report = assemble_prompt("RULES", sections, max_tokens=full['projected_tokens'] - 30)
+
+        assert report['sections']['memories']['kept'] == 20
+        assert report['sections']['lists']['kept'] < 20
+        assert report['projected_tokens'] <= full['projected_tokens'] - 30
+
+    def test_empty_section_uses_placeholder(self):
+        from utils.prompt_budget import PromptSection, assemble_prompt
+
+        prompt, _ = assemble_prompt("RULES", [PromptSection('lists', "USER'S LISTS:", [], 100, empty="No lists created yet.")], 1000)
+        assert prompt == "RULES\n\nUSER'S LISTS:\nNo lists created yet."
+
+
+@pytest.fixture
+def openai_response():
+    """openai.OpenAI patched to return one fixed process_with_ai reply."""
+    import services.openai_client as openai_client
+
+    response = MagicMock()
+    response.choices[0].message.content = json.dumps({"action": "show_all_lists", "response": "Here are your lists"})
+    response.choices[0].finish_reason = "stop"
+    response.usage = MagicMock(prompt_tokens=4000, completion_tokens=20, total_tokens=4020)
+    response.usage.prompt_tokens_details.cached_tokens = 3584
+    with patch.object(openai_client, '_call_stats', {}), patch('openai.OpenAI') as mock_openai:
+        mock_openai.return_value.chat.completions.create.return_value = response
+        yield mock_openai.return_value.chat.completions.create
+
+
+class TestProcessWithAIBudget:
+
+    def test_big_lists_are_cut_and_instructions_lead(self, onboarded_user, openai_response, monkeypatch):
+        import services.ai_service as ai_service
+        from models.list_model import add_list_items, create_list
+        from services.openai_client import get_openai_call_stats
+
+        phone = onboarded_user['phone']
+        for name in ("Grocery List", "Hardware List"):
+            add_list_items(create_list(phone, name), phone, [f"{name} item {i}" for i in range(40)])
+        monkeypatch.setitem(ai_service.PROMPT_SECTION_BUDGETS, 'lists', 300)
+
+        result = ai_service.process_with_ai("show my lists", phone, {})
+
+        assert result['action'] == 'show_all_lists'
+        system_prompt = openai_response.call_args.kwargs['messages'][0]['content']
+        assert system_prompt.startswith(ai_service.PROCESS_INSTRUCTIONS + "\n\nUSER'S NAME: Test")
+        assert "List (40 items):\n  [ ] " in system_prompt
+        assert system_prompt.endswith("more not shown]")
+        assert system_prompt.count("List item") < 80
+
+        stats = get_openai_call_stats()['process_with_ai']
+        assert stats['cached_prompt_tokens'] == 3584
+        assert stats['projection']['calls'] == 1
+        assert stats['projection']['avg_actual'] == 4000
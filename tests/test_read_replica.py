@@ -0,0 +1,119 @@
+"""
+Tests for read replica routing in database.py.
+
+The local test database stands in for the replica; routing, read-only
+sessions and the lag/availability fallbacks don't depend on real replication.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """Point READ_REPLICA_URL at the test database with fresh routing state."""
+    import database
+
+    monkeypatch.setattr(database, 'READ_REPLICA_URL', database.DATABASE_URL)
+    monkeypatch.setattr(database, '_replica_pool', None)
+    monkeypatch.setattr(database, '_replica_state', {
+        'healthy': False,
+        'lag_seconds': None,
+        'checked_at': float('-inf'),
+        'replica_reads': 0,
+        'primary_fallbacks': 0,
+        'last_error': None,
+    })
+    yield database
+    if database._replica_pool is not None:
+        database._replica_pool.closeall()
+
+
+class TestReplicaRouting:
+    """readonly=True uses the replica pool when it is healthy."""
+
+    def test_without_replica_reads_use_primary(self):
+        import database
+
+        conn = database.get_db_connection(readonly=True)
+        try:
+            assert conn not in database._replica_connections
+            assert not conn.readonly
+        finally:
+            database.return_db_connection(conn)
+
+    def test_readonly_routes_to_replica(self, replica):
+        import psycopg2
+
+        conn = replica.get_db_connection(readonly=True)
+        try:
+            assert conn in replica._replica_connections
+            assert conn.readonly
+            with pytest.raises(psycopg2.errors.ReadOnlySqlTransaction):
+                conn.cursor().execute("UPDATE users SET first_name = first_name WHERE FALSE")
+        finally:
+            replica.return_db_connection(conn)
+
+        assert conn not in replica._replica_connections
+        stats = replica.get_read_replica_stats()
+        assert stats['healthy'] is True
+        assert stats['lag_seconds'] == 0
+        assert stats['replica_reads'] == 1
+
+    def test_writes_stay_on_primary(self, replica):
+        conn = replica.get_db_connection()
+        try:
+            assert conn not in replica._replica_connections
+        finally:
+            replica.return_db_connection(conn)
+
+    def test_lagging_replica_falls_back_to_primary(self, replica, monkeypatch):
+        monkeypatch.setattr(replica, '_replica_lag_seconds', lambda conn: replica.REPLICA_MAX_LAG_SECONDS + 5)
+
+        with replica.get_db_cursor(readonly=True) as cursor:
+            cursor.execute('SELECT 1')
+            assert cursor.connection not in replica._replica_connections
+
+        # Stays on the primary until the next lag check is due
+        with replica.get_db_cursor(readonly=True) as cursor:
+            assert cursor.connection not in replica._replica_connections
+        assert replica.get_read_replica_stats()['primary_fallbacks'] == 2
+
+    def test_unreachable_replica_falls_back_to_primary(self, replica, monkeypatch):
+        monkeypatch.setattr(replica, 'READ_REPLICA_URL', 'postgresql://localhost:1/unreachable')
+
+        with replica.get_db_cursor(readonly=True) as cursor:
+            cursor.execute('SELECT 1')
+            assert cursor.fetchone() == (1,)
+
+        stats = replica.get_read_replica_stats()
+        assert stats['healthy'] is False
+        assert stats['last_error']
+
+
+class TestRouteDefault:
+    """prefer_read_replica makes readonly the default for one request."""
+
+    async def test_dependency_sets_default_for_request_only(self):
+        import httpx
+        from fastapi import Depends, FastAPI
+        import database
+
+        app = FastAPI()
+
+        @app.get("/async-read", dependencies=[Depends(database.prefer_read_replica)])
+        async def async_read():
+            return {"preferred": database._read_replica_preferred.get()}
+
+        @app.get("/sync-read", dependencies=[Depends(database.prefer_read_replica)])
+        def sync_read():
+            return {"preferred": database._read_replica_preferred.get()}
+
+        @app.get("/write")
+        async def write():
+            return {"preferred": database._read_replica_preferred.get()}
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            assert (await client.get("/async-read")).json() == {"preferred": True}
+            assert (await client.get("/sync-read")).json() == {"preferred": True}
+            assert (await client.get("/write")).json() == {"preferred": False}
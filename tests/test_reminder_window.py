@@ -0,0 +1,85 @@
+"""
+Tests for get_reminder_window, the bounded reminder history used for AI context.
+"""
+
+from datetime import datetime, timedelta
+
+
+def _seed(phone, pending=0, sent=0):
+    """Insert pending reminders over the coming days and sent ones over the past days"""
+    from database import get_db_connection, return_db_connection
+
+    now = datetime.utcnow().replace(microsecond=0)
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        for i in range(pending):
+            c.execute(
+                'INSERT INTO reminders (phone_number, reminder_text, reminder_date, sent) VALUES (%s, %s, %s, FALSE)',
+                (phone, f'pending {i}', now + timedelta(days=i + 1))
+            )
+        for i in range(sent):
+            c.execute(
+                'INSERT INTO reminders (phone_number, reminder_text, reminder_date, sent) VALUES (%s, %s, %s, TRUE)',
+                (phone, f'sent {i}', now - timedelta(days=i + 1))
+            )
+        conn.commit()
+    finally:
+        return_db_connection(conn)
+    return now
+
+
+class TestReminderWindow:
+
+    def test_limits_and_totals(self, onboarded_user):
+        from models.reminder import get_reminder_window
+
+        phone = onboarded_user['phone']
+        _seed(phone, pending=8, sent=12)
+
+        window = get_reminder_window(phone, pending_limit=3, sent_limit=4)
+
+        assert [r[2] for r in window['pending']] == ['pending 0', 'pending 1', 'pending 2']
+        # Most recent sent reminders, returned oldest first
+        assert [r[2] for r in window['sent']] == ['sent 3', 'sent 2', 'sent 1', 'sent 0']
+        assert window['pending_total'] == 8
+        assert window['sent_total'] == 12
+
+    def test_default_is_all_pending_no_sent(self, onboarded_user):
+        from models.reminder import get_reminder_window, get_user_reminders
+
+        phone = onboarded_user['phone']
+        _seed(phone, pending=5, sent=5)
+
+        window = get_reminder_window(phone)
+
+        assert window['sent'] == []
+        assert window['pending'] == [r for r in get_user_reminders(phone) if not r[4]]
+
+    def test_pending_offset_pages(self, onboarded_user):
+        from models.reminder import get_reminder_window
+
+        phone = onboarded_user['phone']
+        _seed(phone, pending=5)
+
+        window = get_reminder_window(phone, pending_limit=2, pending_offset=2)
+
+        assert [r[2] for r in window['pending']] == ['pending 2', 'pending 3']
+
+    def test_sent_since_filters_old_history(self, onboarded_user):
+        from models.reminder import get_reminder_window
+
+        phone = onboarded_user['phone']
+        now = _seed(phone, sent=10)
+
+        window = get_reminder_window(phone, sent_limit=None, sent_since=now - timedelta(days=3, hours=1))
+
+        assert [r[2] for r in window['sent']] == ['sent 2', 'sent 1', 'sent 0']
+        assert window['sent_total'] == 10
+
+    def test_unknown_user_is_empty(self, clean_test_user):
+        from models.reminder import get_reminder_window
+
+        window = get_reminder_window(clean_test_user, pending_limit=5, sent_limit=5)
+
+        assert window == {'pending': [], 'sent': [], 'pending_total': 0, 'sent_total': 0}
@@ -0,0 +1,160 @@
+"""
+Tests for the stale-while-revalidate admin response cache (utils.response_cache).
+"""
+
+import json
+import time
+
+import pytest
+from fastapi import Request
+
+
+@pytest.fixture
+def response_cache(monkeypatch):
+    """Enable the admin response cache with a fresh instance (60s max stale)."""
+    import utils.response_cache as response_cache
+
+    monkeypatch.setattr(response_cache, 'ADMIN_CACHE_ENABLED', True)
+    monkeypatch.setattr(response_cache, '_cache', response_cache.ResponseCache(max_stale=60, max_entries=3))
+    return response_cache
+
+
+class Counter:
+    """compute() stand-in returning a new payload on every call"""
+
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    def __call__(self):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        return {'calls': self.calls}
+
+
+def _age(cache, key, seconds):
+    cache._entries[key].created_at -= seconds
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+class TestResponseCache:
+
+    def test_fresh_entries_are_served_without_recomputing(self, response_cache):
+        cache, compute = response_cache.get_response_cache(), Counter()
+        key = response_cache.make_key('overview')
+
+        first, state = cache.get('overview', key, 30, compute)
+        assert state == 'miss'
+        second, state = cache.get('overview', key, 30, compute)
+        assert state == 'hit'
+        assert second.body == first.body == b'{"calls":1}'
+        assert compute.calls == 1
+
+    def test_stale_entry_served_while_refreshing_in_background(self, response_cache):
+        cache, compute = response_cache.get_response_cache(), Counter()
+        key = response_cache.make_key('costs')
+        cache.get('costs', key, 30, compute)
+        _age(cache, key, 31)
+
+        entry, state = cache.get('costs', key, 30, compute)
+        assert (state, entry.body) == ('stale', b'{"calls":1}')
+        assert _wait_for(lambda: cache.stats['costs']['refreshes'] == 1)
+        assert compute.calls == 2
+
+        entry, state = cache.get('costs', key, 30, compute)
+        assert (state, entry.body) == ('hit', b'{"calls":2}')
+
+    def test_entries_past_max_stale_are_recomputed_inline(self, response_cache):
+        cache, compute = response_cache.get_response_cache(), Counter()
+        key = response_cache.make_key('costs')
+        cache.get('costs', key, 30, compute)
+        _age(cache, key, 30 + 61)
+
+        entry, state = cache.get('costs', key, 30, compute)
+        assert (state, entry.body) == ('miss', b'{"calls":2}')
+
+    def test_failed_refresh_keeps_serving_stale(self, response_cache):
+        cache = response_cache.get_response_cache()
+        key = response_cache.make_key('monitoring_stats')
+        cache.get('monitoring_stats', key, 30, Counter())
+        _age(cache, key, 31)
+
+        failing = Counter(fail=True)
+        entry, state = cache.get('monitoring_stats', key, 30, failing)
+        assert state == 'stale'
+        assert _wait_for(lambda: cache.stats['monitoring_stats']['refresh_errors'] == 1)
+
+        # The next request retries the refresh and still gets the old body
+        entry, state = cache.get('monitoring_stats', key, 30, failing)
+        assert (state, entry.body) == ('stale', b'{"calls":1}')
+        assert _wait_for(lambda: failing.calls == 2)
+
+    def test_empty_results_are_not_cached(self, response_cache):
+        cache = response_cache.get_response_cache()
+        key = response_cache.make_key('overview')
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {}
+
+        cache.get('overview', key, 30, compute)
+        _, state = cache.get('overview', key, 30, compute)
+        assert state == 'miss'
+        assert len(calls) == 2
+
+    def test_keys_normalize_params_and_lru_is_bounded(self, response_cache):
+        from datetime import datetime
+
+        make_key = response_cache.make_key
+        assert make_key('costs', {'start_date': None, 'end_date': datetime(2026, 1, 2)}) == \
+            make_key('costs', {'end_date': datetime(2026, 1, 2)})
+        assert make_key('costs', {'days': 7}) != make_key('costs', {'days': 30})
+
+        cache = response_cache.get_response_cache()
+        for days in range(5):
+            cache.get('tracker_health', make_key('tracker_health', {'days': days}), 30, Counter())
+        assert cache.get_stats()['entries'] == 3
+
+
+def _request(if_none_match=None):
+    headers = [(b'if-none-match', if_none_match.encode())] if if_none_match else []
+    return Request({'type': 'http', 'method': 'GET', 'path': '/admin/tracker/health', 'headers': headers})
+
+
+class TestCachedJsonResponse:
+
+    def test_etag_revalidation_returns_304(self, response_cache):
+        compute = Counter()
+
+        first = response_cache.cached_json_response(_request(), 'tracker_health', compute, params={'days': 7})
+        assert first.status_code == 200
+        assert json.loads(first.body) == {'calls': 1}
+        assert first.headers['x-cache'] == 'MISS'
+        etag = first.headers['etag']
+
+        second = response_cache.cached_json_response(_request(etag), 'tracker_health', compute, params={'days': 7})
+        assert second.status_code == 304
+        assert second.headers['etag'] == etag
+        assert second.body == b''
+
+        other = response_cache.cached_json_response(_request(etag), 'tracker_health', compute, params={'days': 30})
+        assert other.status_code == 200
+        assert compute.calls == 2
+        assert response_cache.get_response_cache_stats()['endpoints']['tracker_health']['not_modified'] == 1
+
+    def test_disabled_cache_computes_every_request(self, response_cache, monkeypatch):
+        compute = Counter()
+        monkeypatch.setattr(response_cache, 'ADMIN_CACHE_ENABLED', False)
+
+        for expected in (1, 2):
+            response = response_cache.cached_json_response(_request(), 'tracker_health', compute)
+            assert json.loads(response.body) == {'calls': expected}
+        assert response_cache.get_response_cache_stats() == {'enabled': False}
@@ -85,7 +85,7 @@ class TestGenerateNudge:
     """Test nudge generation with mocked OpenAI."""
 
     @patch('services.nudge_service.log_api_usage')
-    @patch('services.nudge_service.OpenAI')
+    @patch('openai.OpenAI')
     @patch('services.nudge_service.gather_user_data')
     def test_generates_nudge_successfully(self, mock_gather, mock_openai_cls, mock_log):
         from services.nudge_service import generate_nudge
@@ -116,7 +116,7 @@ class TestGenerateNudge:
         assert result['confidence'] == 85
 
     @patch('services.nudge_service.log_api_usage')
-    @patch('services.nudge_service.OpenAI')
+    @patch('openai.OpenAI')
     @patch('services.nudge_service.gather_user_data')
     def test_skips_low_confidence_nudge(self, mock_gather, mock_openai_cls, mock_log):
         from services.nudge_service import generate_nudge
@@ -142,7 +142,7 @@ class TestGenerateNudge:
         assert result is None
 
     @patch('services.nudge_service.log_api_usage')
-    @patch('services.nudge_service.OpenAI')
+    @patch('openai.OpenAI')
     @patch('services.nudge_service.gather_user_data')
     def test_skips_none_nudge_type(self, mock_gather, mock_openai_cls, mock_log):
         from services.nudge_service import generate_nudge
@@ -182,7 +182,7 @@ class TestGenerateNudge:
         assert result is None
 
     @patch('services.nudge_service.log_api_usage')
-    @patch('services.nudge_service.OpenAI')
+    @patch('openai.OpenAI')
     @patch('services.nudge_service.gather_user_data')
     def test_truncates_long_nudge_text(self, mock_gather, mock_openai_cls, mock_log):
         from services.nudge_service import generate_nudge
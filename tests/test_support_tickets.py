@@ -0,0 +1,120 @@
+"""
+Tests for the ticket activity columns on support_tickets (message_count,
+last_inbound_at, last_outbound_at, last_message_preview): kept by
+services.support_service as messages are recorded, and read by the ticket
+queue and the SLA summary.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from tests.conftest import execute_sql
+
+PHONE = '+15550500001'
+SLA_PHONE = '+15550500002'
+
+
+def _cleanup():
+    for phone in (PHONE, SLA_PHONE):
+        execute_sql('DELETE FROM support_messages WHERE phone_number = %s', (phone,))
+        execute_sql('DELETE FROM support_tickets WHERE phone_number = %s', (phone,))
+
+
+@pytest.fixture
+def clean_tickets():
+    _cleanup()
+    yield
+    _cleanup()
+
+
+def _activity(ticket_id):
+    return execute_sql('''
+        SELECT message_count, last_inbound_at, last_outbound_at, last_message_preview, updated_at
+        FROM support_tickets WHERE id = %s
+    ''', (ticket_id,))[0]
+
+
+def _queue_entry(ticket_id):
+    from services.support_service import get_all_tickets
+
+    return next(t for t in get_all_tickets(include_closed=True) if t['id'] == ticket_id)
+
+
+class TestTicketActivity:
+
+    def test_messages_and_replies_update_the_ticket(self, clean_tickets, sms_capture):
+        from services.support_service import add_support_message, reply_to_ticket, has_technician_replied
+
+        ticket_id = add_support_message(PHONE, 'my reminders stopped')['ticket_id']
+        count, last_inbound, last_outbound, preview, _ = _activity(ticket_id)
+        assert (count, preview, last_outbound) == (1, 'my reminders stopped', None)
+        assert last_inbound is not None and not has_technician_replied(ticket_id)
+
+        assert reply_to_ticket(ticket_id, 'Looking into it')['success']
+        count, _, last_outbound, preview, _ = _activity(ticket_id)
+        assert (count, preview) == (2, 'Looking into it')
+        assert last_outbound is not None and has_technician_replied(ticket_id)
+
+        long_message = 'x' * 150
+        assert add_support_message(PHONE, long_message)['ticket_id'] == ticket_id
+        count, last_inbound, last_outbound, preview, _ = _activity(ticket_id)
+        assert count == 3 and preview == 'x' * 100 + '...'
+        assert last_inbound > last_outbound
+
+        entry = _queue_entry(ticket_id)
+        assert (entry['message_count'], entry['last_message']) == (3, 'x' * 100 + '...')
+
+    def test_categorized_ticket_counts_its_message_without_entering_support_mode(self, clean_tickets):
+        from services.support_service import create_categorized_ticket, is_first_message_in_ticket
+
+        ticket_id = create_categorized_ticket(PHONE, 'love the app', 'feedback', 'web')['ticket_id']
+        count, last_inbound, _, preview, updated_at = _activity(ticket_id)
+        assert (count, preview) == (1, 'love the app')
+        assert updated_at < last_inbound
+        assert not is_first_message_in_ticket(ticket_id)
+
+    def test_backfill_matches_the_messages(self, clean_tickets, sms_capture):
+        from migrations.app import _SUPPORT_TICKET_ACTIVITY
+        from services.support_service import add_support_message, reply_to_ticket
+
+        ticket_id = add_support_message(PHONE, 'first')['ticket_id']
+        reply_to_ticket(ticket_id, 'second')
+        expected = _activity(ticket_id)
+
+        execute_sql('''UPDATE support_tickets SET message_count = 0, last_inbound_at = NULL,
+                      last_outbound_at = NULL, last_message_preview = NULL WHERE id = %s''', (ticket_id,))
+        backfill = next(step for step in _SUPPORT_TICKET_ACTIVITY
+                        if isinstance(step, str) and step.startswith('UPDATE'))
+        execute_sql(backfill)
+        assert _activity(ticket_id) == expected
+
+
+class TestSlaInfo:
+
+    def _ticket(self, status, inbound_minutes_ago=None, outbound_minutes_ago=None):
+        now = datetime.utcnow()
+        ago = lambda minutes: now - timedelta(minutes=minutes) if minutes is not None else None
+        execute_sql('''
+            INSERT INTO support_tickets (phone_number, status, last_inbound_at, last_outbound_at)
+            VALUES (%s, %s, %s, %s)
+        ''', (SLA_PHONE, status, ago(inbound_minutes_ago), ago(outbound_minutes_ago)))
+
+    def test_sla_counts_only_open_unanswered_tickets(self, clean_tickets):
+        from services.support_service import get_ticket_sla_info
+
+        before = get_ticket_sla_info()
+        self._ticket('open', inbound_minutes_ago=30)
+        self._ticket('open', inbound_minutes_ago=90, outbound_minutes_ago=100)
+        self._ticket('open', inbound_minutes_ago=50, outbound_minutes_ago=10)  # answered
+        self._ticket('open')  # no messages yet
+        self._ticket('closed', inbound_minutes_ago=500)
+
+        sla = get_ticket_sla_info()
+        assert sla['open_count'] == before['open_count'] + 4
+        assert sla['unanswered_count'] == before['unanswered_count'] + 2
+        if before['unanswered_count'] == 0:
+            assert sla['avg_wait_minutes'] == 60
+            assert sla['oldest_unanswered_minutes'] == 90
+        else:
+            assert sla['oldest_unanswered_minutes'] >= 90
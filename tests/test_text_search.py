@@ -0,0 +1,183 @@
+"""
+Tests for ranked memory and reminder search (utils.text_search).
+"""
+
+from datetime import datetime, timedelta
+
+
+def _add_memories(phone, *texts):
+    from database import get_db_connection, return_db_connection
+
+    conn = get_db_connection()
+    try:
+        c = conn.cursor()
+        for text in texts:
+            c.execute('INSERT INTO memories (phone_number, memory_text) VALUES (%s, %s)', (phone, text))
+        conn.commit()
+    finally:
+        return_db_connection(conn)
+
+
+class TestBuildTsquery:
+
+    def test_terms_are_prefix_matched_and_deduplicated(self):
+        from utils.text_search import build_tsquery
+
+        assert build_tsquery("WiFi password, wifi!") == "wifi:* & password:*"
+        assert build_tsquery("wifi password", match_any=True) == "wifi:* | password:*"
+
+    def test_short_tokens_match_exactly(self):
+        from utils.text_search import build_tsquery
+
+        assert build_tsquery("mom's dr") == "mom:* & s & dr"
+
+    def test_untokenizable_input_is_empty(self):
+        from utils.text_search import build_tsquery
+
+        assert build_tsquery("?!") == ""
+
+
+class TestMemorySearch:
+
+    def test_stemmed_multi_word_match(self, onboarded_user):
+        from models.memory import search_memories
+
+        phone = onboarded_user['phone']
+        _add_memories(phone, "Team meetings are on Tuesdays", "Gym locker is 42")
+
+        results = search_memories(phone, "meeting tuesday")
+
+        assert [r[1] for r in results] == ["Team meetings are on Tuesdays"]
+
+    def test_partial_terms_fall_back_to_any_term_ranked(self, onboarded_user):
+        from models.memory import search_memories
+
+        phone = onboarded_user['phone']
+        _add_memories(phone, "The WiFi pw is hunter2", "Netflix password is on the fridge", "Dog's name is Rex")
+
+        results = search_memories(phone, "wifi password")
+
+        assert {r[1] for r in results} == {"The WiFi pw is hunter2", "Netflix password is on the fridge"}
+
+    def test_prefix_match(self, onboarded_user):
+        from models.memory import search_memories
+
+        phone = onboarded_user['phone']
+        _add_memories(phone, "Dentist is Dr. Patel")
+
+        assert [r[1] for r in search_memories(phone, "dent")] == ["Dentist is Dr. Patel"]
+
+    def test_no_match(self, onboarded_user):
+        from models.memory import search_memories
+
+        phone = onboarded_user['phone']
+        _add_memories(phone, "Dentist is Dr. Patel")
+
+        assert search_memories(phone, "plumber") == []
+
+
+class TestReminderSearch:
+
+    def test_only_pending_reminders_match(self, onboarded_user):
+        from database import get_db_connection, return_db_connection
+        from models.reminder import search_pending_reminders
+
+        phone = onboarded_user['phone']
+        now = datetime.utcnow()
+        conn = get_db_connection()
+        try:
+            c = conn.cursor()
+            c.execute(
+                'INSERT INTO reminders (phone_number, reminder_text, reminder_date, sent) VALUES (%s, %s, %s, TRUE)',
+                (phone, "Call the dentist", now - timedelta(days=1))
+            )
+            c.execute(
+                'INSERT INTO reminders (phone_number, reminder_text, reminder_date, sent) VALUES (%s, %s, %s, FALSE)',
+                (phone, "Dentist appointment", now + timedelta(days=1))
+            )
+            conn.commit()
+        finally:
+            return_db_connection(conn)
+
+        results = search_pending_reminders(phone, "dentist")
+
+        assert [r[1] for r in results] == ["Dentist appointment"]
+
+    def test_strict_search_needs_every_term(self, onboarded_user):
+        from database import get_db_connection, return_db_connection
+        from models.reminder import search_pending_reminders
+
+        phone = onboarded_user['phone']
+        conn = get_db_connection()
+        try:
+            c = conn.cursor()
+            c.execute(
+                'INSERT INTO reminders (phone_number, reminder_text, reminder_date, sent) VALUES (%s, %s, %s, FALSE)',
+                (phone, "Appointment with lawyer", datetime.utcnow() + timedelta(days=1))
+            )
+            conn.commit()
+        finally:
+            return_db_connection(conn)
+
+        assert [r[1] for r in search_pending_reminders(phone, "dentist appointment")] == ["Appointment with lawyer"]
+        assert search_pending_reminders(phone, "dentist appointment", strict=True) == []
+        assert len(search_pending_reminders(phone, "lawyer appointment", strict=True)) == 1
+
+    def test_partial_match_does_not_reschedule(self, onboarded_user):
+        from database import get_db_connection, return_db_connection
+        from main import process_single_action
+
+        phone = onboarded_user['phone']
+        reminder_date = (datetime.utcnow() + timedelta(days=1)).replace(microsecond=0)
+        conn = get_db_connection()
+        try:
+            c = conn.cursor()
+            c.execute(
+                'INSERT INTO reminders (phone_number, reminder_text, reminder_date, sent) '
+                'VALUES (%s, %s, %s, FALSE) RETURNING id',
+                (phone, "Appointment with lawyer", reminder_date)
+            )
+            reminder_id = c.fetchone()[0]
+            conn.commit()
+        finally:
+            return_db_connection(conn)
+
+        reply = process_single_action(
+            {'action': 'update_reminder', 'search_term': 'dentist appointment', 'new_time': '3pm'},
+            phone, "move my dentist appointment to 3pm"
+        )
+
+        assert reply.startswith("No pending reminders found matching")
+        conn = get_db_connection()
+        try:
+            c = conn.cursor()
+            c.execute('SELECT reminder_date FROM reminders WHERE id = %s', (reminder_id,))
+            assert c.fetchone()[0] == reminder_date
+        finally:
+            return_db_connection(conn)
+
+
+class TestSearchIndexes:
+
+    def test_search_uses_expression_index(self):
+        from database import get_db_connection, return_db_connection, init_db
+        from utils.text_search import _TSQUERY_MATCH
+
+        init_db()
+        conn = get_db_connection()
+        try:
+            c = conn.cursor()
+            c.execute("SELECT COUNT(*) FROM information_schema.columns WHERE column_name = 'search_vector'")
+            assert c.fetchone()[0] == 0
+            c.execute("SELECT indexname FROM pg_indexes WHERE indexname IN ('idx_memories_text_search', 'idx_reminders_text_search')")
+            assert len(c.fetchall()) == 2
+            c.execute('SET LOCAL enable_seqscan = off')
+            c.execute('EXPLAIN SELECT id FROM memories WHERE ' + _TSQUERY_MATCH.format(text_column='memory_text'),
+                      {'query': 'dentist:*'})
+            plan = '\n'.join(row[0] for row in c.fetchall())
+            conn.rollback()
+        finally:
+            return_db_connection(conn)
+
+        # The search predicate matches the indexed expression
+        assert 'idx_memories_text_search' in plan
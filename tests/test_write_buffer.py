@@ -0,0 +1,234 @@
+"""
+Tests for the write-behind buffer used by log_interaction, log_api_usage and log_confidence.
+"""
+
+import os
+import pytest
+from datetime import datetime, timedelta
+
+from tests.conftest import execute_sql
+
+
+class FakeSpill:
+    """In-memory stand-in for RedisSpill."""
+
+    def __init__(self, fail=False):
+        self.items = []
+        self.fail = fail
+
+    def push(self, items):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.items.extend(items)
+
+    def pop(self, count):
+        popped, self.items = self.items[:count], self.items[count:]
+        return popped
+
+    def size(self):
+        return len(self.items)
+
+
+class TestWriteBehindBuffer:
+    """Batching, backpressure and spill behaviour with a fake writer."""
+
+    def _make_buffer(self, writer, spill=None, max_rows=10, batch_size=3):
+        from utils.write_buffer import WriteBehindBuffer
+        # Long interval: tests drive flushes explicitly
+        return WriteBehindBuffer(writer, max_rows=max_rows, batch_size=batch_size,
+                                 flush_interval_ms=60000, spill=spill)
+
+    def test_flush_writes_batches_grouped_by_table(self):
+        batches = []
+        buffer = self._make_buffer(batches.append)
+
+        buffer.add('logs', ('a',))
+        buffer.add('api_usage', ('b',))
+        buffer.add('logs', ('c',))
+        buffer.add('logs', ('d',))
+
+        assert buffer.flush() == 4
+        assert batches[0] == {'logs': [('a',), ('c',)], 'api_usage': [('b',)]}
+        assert batches[1] == {'logs': [('d',)]}
+        assert buffer.get_stats()['written'] == 4
+        assert buffer.get_stats()['depth'] == 0
+
+    def test_failed_flush_spills_rows(self):
+        def failing_writer(rows):
+            raise RuntimeError("db down")
+
+        spill = FakeSpill()
+        buffer = self._make_buffer(failing_writer, spill=spill)
+        buffer.add('logs', ('a',))
+        buffer.add('logs', ('b',))
+
+        assert buffer.flush() == 0
+        # Each row was retried on its own, which counts as one failed attempt
+        assert spill.items == [('logs', ('a',), 1), ('logs', ('b',), 1)]
+        stats = buffer.get_stats()
+        assert stats['flush_errors'] == 1
+        assert stats['spilled'] == 2
+        assert stats['spill_depth'] == 2
+
+    def test_overflow_spills_instead_of_growing(self):
+        spill = FakeSpill()
+        buffer = self._make_buffer(lambda rows: None, spill=spill, max_rows=2)
+
+        for i in range(4):
+            buffer.add('logs', (i,))
+
+        stats = buffer.get_stats()
+        assert stats['depth'] == 2
+        assert stats['overflows'] == 2
+        assert [row for _, row, _ in spill.items] == [(2,), (3,)]
+
+    def test_spilled_rows_are_restored(self):
+        batches = []
+        spill = FakeSpill()
+        spill.items = [('logs', ('old',), 2)]
+        buffer = self._make_buffer(batches.append, spill=spill)
+
+        buffer._restore_spilled()
+        buffer.flush()
+
+        assert batches == [{'logs': [('old',)]}]
+        assert buffer.get_stats()['restored'] == 1
+
+    def test_rows_dropped_when_spill_unavailable(self):
+        def failing_writer(rows):
+            raise RuntimeError("db down")
+
+        buffer = self._make_buffer(failing_writer, spill=FakeSpill(fail=True))
+        buffer.add('logs', ('a',))
+        buffer.flush()
+
+        assert buffer.get_stats()['dropped'] == 1
+
+    def test_bad_row_does_not_fail_its_batch(self):
+        batches = []
+
+        def writer(rows):
+            if ('bad',) in rows.get('logs', []):
+                raise ValueError("invalid input syntax")
+            batches.append(rows)
+
+        spill = FakeSpill()
+        buffer = self._make_buffer(writer, spill=spill)
+        buffer.add('logs', ('a',))
+        buffer.add('logs', ('bad',))
+        buffer.add('api_usage', ('b',))
+
+        assert buffer.flush() == 2
+        assert batches == [{'logs': [('a',)]}, {'api_usage': [('b',)]}]
+        assert spill.items == [('logs', ('bad',), 1)]
+        assert buffer.get_stats()['written'] == 2
+
+    def test_row_discarded_after_max_attempts(self):
+        from utils.write_buffer import MAX_ROW_ATTEMPTS
+
+        def failing_writer(rows):
+            raise ValueError("invalid input syntax")
+
+        spill = FakeSpill()
+        buffer = self._make_buffer(failing_writer, spill=spill)
+        buffer.add('logs', ('bad',))
+
+        for _ in range(MAX_ROW_ATTEMPTS - 1):
+            buffer.flush()
+            buffer._restore_spilled()
+        assert buffer.get_stats()['depth'] == 1
+        buffer.flush()
+
+        stats = buffer.get_stats()
+        assert (stats['depth'], stats['spill_depth'], stats['discarded']) == (0, 0, 1)
+
+
+class TestBufferedWriters:
+    """The database writers batch insert rows with their enqueue timestamps."""
+
+    def test_buffered_rows_inserted_with_event_time(self, onboarded_user):
+        from database import _write_buffered_rows, get_db_connection, return_db_connection
+
+        phone = onboarded_user["phone"]
+        event_time = datetime.utcnow() - timedelta(minutes=3)
+        _write_buffered_rows({
+            'logs': [(phone, 'buffered in', 'buffered out', 'test', True, event_time.isoformat())],
+            'confidence_logs': [(phone, 'reminder', 80, 70, None, 'buffered', event_time.isoformat())],
+        })
+
+        conn = get_db_connection()
+        try:
+            c = conn.cursor()
+            c.execute(
+                "SELECT message_in, created_at FROM logs WHERE phone_number = %s AND intent = 'test'",
+                (phone,)
+            )
+            rows = c.fetchall()
+            c.execute("SELECT CURRENT_TIMESTAMP::timestamp - (NOW() AT TIME ZONE 'UTC')")
+            utc_offset = c.fetchone()[0]
+            c.execute("DELETE FROM confidence_logs WHERE phone_number = %s", (phone,))
+            conn.commit()
+        finally:
+            return_db_connection(conn)
+
+        assert len(rows) == 1
+        assert rows[0][0] == 'buffered in'
+        assert abs((rows[0][1] - utc_offset) - event_time) < timedelta(seconds=1)
+
+    def test_rows_queued_before_account_deletion_are_dropped(self, onboarded_user):
+        from database import _write_buffered_rows, get_db_connection, record_account_deletion, return_db_connection
+
+        phone = onboarded_user["phone"]
+        queued_at = datetime.utcnow().isoformat()
+        conn = get_db_connection()
+        try:
+            record_account_deletion(conn.cursor(), phone)
+            conn.commit()
+        finally:
+            return_db_connection(conn)
+        logged_at = datetime.utcnow().isoformat()
+
+        try:
+            # e.g. rows flushed late by another process or restored from the Redis spill
+            _write_buffered_rows({
+                'logs': [(phone, 'before delete', 'out', 'test', True, queued_at),
+                         (phone, 'after delete', 'out', 'test', True, logged_at)],
+                'api_usage': [(phone, 'buffer_test', 1, 1, 2, 'model', False, queued_at)],
+            })
+            logs = execute_sql("SELECT message_in FROM logs WHERE phone_number = %s AND intent = 'test'", (phone,))
+            usage = execute_sql(
+                "SELECT COUNT(*) FROM api_usage WHERE phone_number = %s AND request_type = 'buffer_test'", (phone,)
+            )
+        finally:
+            execute_sql("DELETE FROM account_deletions WHERE phone_number = %s", (phone,))
+
+        assert logs == [('after delete',)]
+        assert usage == [(0,)]
+
+    def test_queued_log_rows_hold_no_plaintext(self, onboarded_user, monkeypatch):
+        import database
+        import utils.encryption as encryption
+
+        monkeypatch.setattr(encryption, '_encryption_key', os.urandom(32))
+        monkeypatch.setattr(encryption, '_hash_key', os.urandom(32))
+        monkeypatch.setattr(database, 'ENCRYPTION_ENABLED', True)
+        monkeypatch.setattr(database, 'WRITE_BUFFER_ENABLED', True)
+        queued = []
+        monkeypatch.setattr(database, '_buffer_row', lambda table, row: queued.append((table, row)))
+
+        phone = onboarded_user["phone"]
+        database.log_interaction(phone, 'secret in', 'secret out', 'test', True)
+
+        # This is what the buffer (and its Redis spill list) holds
+        [(table, row)] = queued
+        assert not {phone, 'secret in', 'secret out'} & set(row)
+
+        database._write_buffered_rows({table: [row + (datetime.utcnow().isoformat(),)]})
+        rows = execute_sql(
+            "SELECT phone_hash, message_in, message_out_encrypted FROM logs WHERE phone_number = %s AND intent = 'test'",
+            (phone,)
+        )
+        assert len(rows) == 1
+        assert rows[0][0] == encryption.hash_phone(phone)
+        assert rows[0][1] == 'secret in'
+        assert encryption.decrypt_field(rows[0][2]) == 'secret out'
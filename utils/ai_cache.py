@@ -0,0 +1,179 @@
+"""
+AI Response Cache
+Content-addressed cache for AI sub-tasks that are pure functions of their input
+
+Keys hash the task name, its prompt version, the model and the normalized
+input (whitespace collapsed, lowercased), so changing a prompt (bump its
+version) or the model never serves an old answer. Lookups try an in-process
+LRU first, then Redis (shared by web workers and Celery); entries expire
+after AI_CACHE_TTL. When Redis errors, the tier is skipped for a minute and
+the cache keeps working in-process.
+
+Every hit is logged to api_usage with cached=TRUE and the tokens the
+original call used, i.e. the tokens it saved.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from config import logger, AI_CACHE_ENABLED, AI_CACHE_TTL, AI_CACHE_MAX_ENTRIES, UPSTASH_REDIS_URL
+
+REDIS_KEY_PREFIX = 'remyndrs:ai_cache:'
+# How long to stop using Redis after an error
+REDIS_RETRY_INTERVAL = 60
+
+
+def normalize_text(text: str) -> str:
+    return ' '.join(text.split()).lower()
+
+
+def make_key(task: str, prompt_version: int, model: str, text: str) -> str:
+    payload = json.dumps([task, prompt_version, model, normalize_text(text)])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class AICache:
+    """Two-tier (in-process LRU, then Redis) cache of AI results with a TTL."""
+
+    def __init__(self, redis_url: Optional[str], ttl: int, max_entries: int):
+        self._redis_url = redis_url
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._local: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        self._redis_retry_at = 0.0
+        self.stats: dict[str, dict[str, int]] = {}
+
+    def _get_redis(self):
+        if not self._redis_url or time.monotonic() < self._redis_retry_at:
+            return None
+        if self._redis is None:
+            import redis
+            self._redis = redis.Redis.from_url(self._redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        return self._redis
+
+    def _redis_failed(self, e: Exception) -> None:
+        logger.warning(f"AI cache Redis unavailable, using in-process cache only: {e}")
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_INTERVAL
+
+    def _task_stats(self, task: str) -> dict[str, int]:
+        stats = self.stats.get(task)
+        if stats is None:
+            stats = self.stats[task] = {'hits': 0, 'local_hits': 0, 'redis_hits': 0, 'misses': 0, 'tokens_saved': 0}
+        return stats
+
+    def _remember(self, key: str, entry: dict) -> None:
+        with self._lock:
+            self._local[key] = (time.monotonic() + self._ttl, entry)
+            self._local.move_to_end(key)
+            while len(self._local) > self._max_entries:
+                self._local.popitem(last=False)
+
+    def get(self, task: str, key: str) -> Optional[dict]:
+        """Cached entry ({'result': ..., 'usage': [prompt, completion, total]}) or None."""
+        entry = None
+        tier = 'local_hits'
+        with self._lock:
+            cached = self._local.get(key)
+            if cached is not None:
+                if cached[0] > time.monotonic():
+                    self._local.move_to_end(key)
+                    entry = cached[1]
+                else:
+                    del self._local[key]
+
+        if entry is None:
+            tier = 'redis_hits'
+            client = self._get_redis()
+            if client is not None:
+                try:
+                    raw = client.get(REDIS_KEY_PREFIX + key)
+                    if raw is not None:
+                        entry = json.loads(raw)
+                        self._remember(key, entry)
+                except Exception as e:
+                    self._redis_failed(e)
+
+        with self._lock:
+            stats = self._task_stats(task)
+            if entry is None:
+                stats['misses'] += 1
+            else:
+                stats['hits'] += 1
+                stats[tier] += 1
+                stats['tokens_saved'] += entry['usage'][2]
+        return entry
+
+    def set(self, key: str, result: Any, usage: tuple[int, int, int]) -> None:
+        entry = {'result': result, 'usage': list(usage)}
+        self._remember(key, entry)
+        client = self._get_redis()
+        if client is not None:
+            try:
+                client.setex(REDIS_KEY_PREFIX + key, self._ttl, json.dumps(entry))
+            except Exception as e:
+                self._redis_failed(e)
+
+    def clear(self) -> None:
+        """Drop the in-process tier and counters (Redis entries expire on their own)."""
+        with self._lock:
+            self._local.clear()
+            self.stats.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._local),
+                'tasks': {
+                    task: {**stats, 'hit_rate': round(stats['hits'] / (stats['hits'] + stats['misses']), 3)}
+                    for task, stats in self.stats.items() if stats['hits'] + stats['misses']
+                },
+            }
+
+
+_cache = None
+
+
+def get_ai_cache() -> AICache:
+    """Get the process-wide AI cache, creating it on first use"""
+    global _cache
+    if _cache is None:
+        _cache = AICache(UPSTASH_REDIS_URL, AI_CACHE_TTL, AI_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+def lookup(task: str, prompt_version: int, model: str, text: str, phone_number: str) -> Optional[Any]:
+    """
+    Cached result for this input, or None. A hit is logged to api_usage as
+    cached, with the tokens the original call used.
+    """
+    if not AI_CACHE_ENABLED:
+        return None
+    entry = get_ai_cache().get(task, make_key(task, prompt_version, model, text))
+    if entry is None:
+        return None
+
+    from database import log_api_usage
+    prompt_tokens, completion_tokens, total_tokens = entry['usage']
+    log_api_usage(phone_number, task, prompt_tokens, completion_tokens, total_tokens, model, cached=True)
+    return entry['result']
+
+
+def store(task: str, prompt_version: int, model: str, text: str, result: Any, usage: Any) -> None:
+    """Cache a result with the token usage of the call that produced it."""
+    if not AI_CACHE_ENABLED:
+        return
+    tokens = (usage.prompt_tokens, usage.completion_tokens, usage.total_tokens) if usage else (0, 0, 0)
+    get_ai_cache().set(make_key(task, prompt_version, model, text), result, tokens)
+
+
+def get_ai_cache_stats() -> dict[str, Any]:
+    """Hit rates and tokens saved per task for the admin stats endpoint"""
+    if not AI_CACHE_ENABLED:
+        return {'enabled': False}
+    return {'enabled': True, **get_ai_cache().get_stats()}
@@ -0,0 +1,65 @@
+"""
+Embedding Utilities
+Local hashed bag-of-words embeddings for memory retrieval (no network calls)
+
+Keywords and their character trigrams are hashed into a fixed number of
+signed buckets and L2-normalized, so cosine distance rewards shared words
+and, more weakly, near-miss spellings ("wi-fi" vs "wifi", "dentist" vs
+"dentists"). Stored in memories.embedding when pgvector is installed.
+"""
+
+import hashlib
+import math
+from typing import Any, Iterable, Optional
+
+from config import logger
+
+EMBEDDING_DIMENSIONS = 256
+_TRIGRAM_WEIGHT = 0.35
+
+_embeddings_available: Optional[bool] = None
+
+
+def _bucket(feature: str) -> tuple[int, float]:
+    digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+    value = int.from_bytes(digest, 'little')
+    return value % EMBEDDING_DIMENSIONS, 1.0 if value >> 63 else -1.0
+
+
+def embed_keywords(keywords: Iterable[str]) -> Optional[list[float]]:
+    """Embed a keyword set (see models.memory._extract_keywords). None if there are no keywords."""
+    vector = [0.0] * EMBEDDING_DIMENSIONS
+    empty = True
+    for keyword in keywords:
+        empty = False
+        index, sign = _bucket(keyword)
+        vector[index] += sign
+        padded = f"#{keyword}#"
+        for i in range(len(padded) - 2):
+            index, sign = _bucket(padded[i:i + 3])
+            vector[index] += sign * _TRIGRAM_WEIGHT
+    if empty:
+        return None
+    norm = math.sqrt(sum(v * v for v in vector))
+    if not norm:
+        return None
+    return [round(v / norm, 5) for v in vector]
+
+
+def to_vector_literal(vector: list[float]) -> str:
+    """Format an embedding for a ::vector cast."""
+    return '[' + ','.join(repr(v) for v in vector) + ']'
+
+
+def embeddings_available(cursor: Any) -> bool:
+    """Whether memories.embedding exists, i.e. pgvector was installed (checked once per process)."""
+    global _embeddings_available
+    if _embeddings_available is None:
+        cursor.execute('''
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'memories' AND column_name = 'embedding'
+        ''')
+        _embeddings_available = cursor.fetchone() is not None
+        if not _embeddings_available:
+            logger.info("pgvector not installed - memory context falls back to most recent memories")
+    return _embeddings_available
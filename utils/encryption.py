@@ -7,7 +7,7 @@ import os
 import base64
 import hashlib
 import hmac
-from typing import Tuple
+from typing import List, Optional, Tuple
 
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from config import logger
@@ -144,6 +144,32 @@ def safe_decrypt(encrypted: str, fallback: str = "") -> str:
         return encrypted if encrypted else fallback
 
 
+def safe_decrypt_many(values: List[Optional[str]], fallback: str = "") -> List[str]:
+    """
+    safe_decrypt for a batch of fields, sharing one key lookup and cipher.
+    Values that fail to decrypt come back as they are (see safe_decrypt).
+    """
+    if not any(values):
+        return [fallback for _ in values]
+
+    aesgcm = AESGCM(_get_encryption_key())
+    decrypted = []
+    failures = 0
+    for encrypted in values:
+        if not encrypted:
+            decrypted.append(fallback)
+            continue
+        try:
+            data = base64.b64decode(encrypted)
+            decrypted.append(aesgcm.decrypt(data[:12], data[12:], None).decode('utf-8'))
+        except Exception:
+            failures += 1
+            decrypted.append(encrypted)
+    if failures:
+        logger.warning(f"Decryption failed for {failures} of {len(values)} fields (possibly unencrypted migration data)")
+    return decrypted
+
+
 def is_encrypted(value: str) -> bool:
     """
     Check if a value appears to be encrypted (base64 with correct length)
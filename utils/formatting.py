@@ -175,3 +175,32 @@ def format_reminders_list(reminders, user_tz):
         return "You don't have any reminders set."
 
     return "\n".join(lines).strip()
+
+
+def format_list_items_added(list_name, added_items, duplicates=(), created=False, confirmation=None):
+    """
+    Format the reply after adding items to a list.
+    confirmation overrides the single-item wording (e.g. the AI's confirmation);
+    duplicates are items that were already on the list and were skipped.
+    """
+    if created:
+        if len(added_items) == 1:
+            reply = f"Created your {list_name} and added {added_items[0]}!"
+        else:
+            reply = f"Created your {list_name} and added {len(added_items)} items: {', '.join(added_items)}"
+    elif not added_items:
+        verb = "is" if len(duplicates) == 1 else "are"
+        return f"{', '.join(duplicates)} {verb} already on your {list_name}."
+    elif len(added_items) == 1:
+        reply = confirmation or f"Added {added_items[0]} to your {list_name}"
+    else:
+        reply = f"Added {len(added_items)} items to your {list_name}: {', '.join(added_items)}"
+
+    if duplicates:
+        reply += f" ({', '.join(duplicates)} already on the list)"
+    return reply
+
+
+def format_list_add_failed(list_name):
+    """Format the reply when items could not be saved to a list."""
+    return f"Sorry, I couldn't add those items to your {list_name}. Please try again."
@@ -0,0 +1,193 @@
+"""
+Item Splitter
+Splits "milk, eggs and bread" into list items locally, without an AI call
+
+Commas always separate items. Each " and " is decided by a small rule
+engine:
+
+1. It joins a known compound ("mac and cheese", "ham and cheese sandwich")
+   from the curated lexicon below or from phrases many users have stored
+   as a single item -> keep together
+2. Both sides are items users commonly store on their own -> split
+3. It joins single words at the end of a comma series ("apples, oranges
+   and bananas") -> split
+
+Anything else ("strawberries and cream", "chicken and rice soup") is
+ambiguous; split_list_text returns None and the caller asks the AI.
+
+Phrase frequencies are mined from list_items (distinct users per stored
+item text) by a Celery Beat task (tasks.list_tasks.mine_list_phrases) and
+stored in Redis. The request path only reads that set, at most every
+ITEM_SPLITTER_REFRESH seconds; without it the curated lexicon still applies.
+"""
+
+import json
+import time
+from typing import Optional
+
+from config import logger, ITEM_SPLITTER_MIN_USERS, ITEM_SPLITTER_REFRESH, UPSTASH_REDIS_URL
+
+# Compound items that keep their "and" (seeded from the parse_list_items prompt)
+COMPOUND_PHRASES = frozenset({
+    'mac and cheese', 'macaroni and cheese', 'ham and cheese', 'peanut butter and jelly',
+    'pb and j', 'fish and chips', 'bread and butter', 'salt and pepper', 'chips and salsa',
+    'chips and dip', 'rice and beans', 'pork and beans', 'franks and beans', 'biscuits and gravy',
+    'spaghetti and meatballs', 'cookies and cream', 'half and half', 'sweet and sour',
+    'salt and vinegar', 'oil and vinegar', 'washer and dryer', 'table and chairs',
+    'pen and paper', 'nuts and bolts', 'cup and saucer', 'lock and key', 'bow and arrow',
+})
+
+# Items commonly stored on their own (seeded from the prompt's examples)
+COMMON_ITEMS = frozenset({
+    'milk', 'eggs', 'bread', 'butter', 'cheese', 'apples', 'oranges', 'bananas', 'soap',
+    'shampoo', 'conditioner', 'toothpaste', 'tape', 'stick', 'gloves', 'helmet', 'pants',
+    'jersey', 'socks', 'coffee', 'tea', 'sugar', 'flour', 'rice', 'pasta', 'chicken',
+    'beef', 'yogurt', 'cereal', 'juice', 'water', 'lettuce', 'tomatoes', 'onions',
+    'potatoes', 'carrots', 'paper towels', 'toilet paper', 'batteries', 'diapers',
+})
+
+MINED_PHRASES_KEY = 'remyndrs:item_splitter:phrases'
+# Seconds before re-reading the mined phrases after Redis was unavailable
+REDIS_RETRY_INTERVAL = 60
+
+_mined_compounds: dict = {}
+_mined_items: frozenset = frozenset()
+_next_load: float = 0.0
+_redis = None
+
+_MINE_QUERY = '''
+    SELECT LOWER(item_text)
+    FROM list_items
+    WHERE LENGTH(item_text) <= 60
+    GROUP BY LOWER(item_text)
+    HAVING COUNT(DISTINCT COALESCE(phone_hash, phone_number)) >= %s
+'''
+
+
+def _index_compounds(phrases) -> dict[tuple[str, str], list[tuple[int, list[str]]]]:
+    """Index compound phrases by the words either side of their "and"."""
+    index = {}
+    for phrase in phrases:
+        words = phrase.split()
+        for i, word in enumerate(words):
+            if word == 'and' and 0 < i < len(words) - 1:
+                index.setdefault((words[i - 1], words[i + 1]), []).append((i, words))
+    return index
+
+
+_CURATED_COMPOUNDS = _index_compounds(COMPOUND_PHRASES)
+
+
+def _get_redis():
+    global _redis
+    if _redis is None:
+        import redis
+        _redis = redis.Redis.from_url(UPSTASH_REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5)
+    return _redis
+
+
+def _use_phrases(phrases: list[str]) -> None:
+    """Replace this process's mined compounds and items."""
+    global _mined_compounds, _mined_items
+    _mined_compounds = _index_compounds(p for p in phrases if ' and ' in f' {p} ')
+    _mined_items = frozenset(p for p in phrases if ' and ' not in f' {p} ')
+
+
+def mine_phrases() -> Optional[int]:
+    """Mine frequently stored item texts from list_items and publish them to Redis.
+
+    Runs in Celery Beat, never on the request path. Returns the number of
+    phrases stored, or None on failure.
+    """
+    from database import get_db_connection, return_db_connection
+    conn = None
+    try:
+        conn = get_db_connection()
+        c = conn.cursor()
+        c.execute(_MINE_QUERY, (ITEM_SPLITTER_MIN_USERS,))
+        phrases = sorted({' '.join(row[0].split()) for row in c.fetchall()})
+    except Exception as e:
+        logger.error(f"Error mining list items for splitter: {e}")
+        return None
+    finally:
+        if conn:
+            return_db_connection(conn)
+
+    try:
+        _get_redis().set(MINED_PHRASES_KEY, json.dumps(phrases))
+    except Exception as e:
+        logger.error(f"Error storing mined splitter phrases: {e}")
+        return None
+    _use_phrases(phrases)
+    logger.info(f"Item splitter mined {len(phrases)} phrases")
+    return len(phrases)
+
+
+def _load_mined_phrases() -> None:
+    """Re-read the mined phrase set from Redis when the local copy is stale."""
+    global _next_load
+    if time.monotonic() < _next_load:
+        return
+    try:
+        raw = _get_redis().get(MINED_PHRASES_KEY)
+    except Exception as e:
+        logger.warning(f"Could not read mined splitter phrases: {e}")
+        _next_load = time.monotonic() + REDIS_RETRY_INTERVAL
+        return
+    # Not mined yet: keep whatever this process has
+    if raw is not None:
+        _use_phrases(json.loads(raw))
+    _next_load = time.monotonic() + ITEM_SPLITTER_REFRESH
+
+
+def _joins_compound(words: list[str], index: int) -> bool:
+    """Whether the "and" at words[index] is inside a curated or mined compound phrase."""
+    key = (words[index - 1], words[index + 1])
+    for compounds in (_CURATED_COMPOUNDS, _mined_compounds):
+        for offset, parts in compounds.get(key, ()):
+            start = index - offset
+            if start >= 0 and words[start:start + len(parts)] == parts:
+                return True
+    return False
+
+
+def _is_item(phrase: str) -> bool:
+    return phrase in COMMON_ITEMS or phrase in _mined_items or phrase in COMPOUND_PHRASES
+
+
+def _split_segment(segment: str, ends_series: bool) -> Optional[list[str]]:
+    words = segment.split()
+    lower = [w.lower() for w in words]
+    separators = [
+        i for i, w in enumerate(lower)
+        if w == 'and' and 0 < i < len(lower) - 1 and not _joins_compound(lower, i)
+    ]
+    bounds = [-1] + separators + [len(words)]
+    pieces = [(bounds[k] + 1, bounds[k + 1]) for k in range(len(bounds) - 1)]
+
+    for (l_start, l_end), (r_start, r_end) in zip(pieces, pieces[1:]):
+        left = ' '.join(lower[l_start:l_end])
+        right = ' '.join(lower[r_start:r_end])
+        if _is_item(left) and _is_item(right):
+            continue
+        if ends_series and l_end - l_start == 1 and r_end - r_start == 1:
+            continue
+        return None
+    return [' '.join(words[start:end]) for start, end in pieces]
+
+
+def split_list_text(item_text: str) -> Optional[list[str]]:
+    """
+    Split item text into list items using the lexicon, mined phrases and rules.
+    Returns None when an "and" is ambiguous and the AI should decide.
+    """
+    _load_mined_phrases()
+
+    segments = [s.strip() for s in item_text.split(',') if s.strip()]
+    result = []
+    for i, segment in enumerate(segments):
+        parts = _split_segment(segment, len(segments) > 1 and i == len(segments) - 1)
+        if parts is None:
+            return None
+        result.extend(parts)
+    return result
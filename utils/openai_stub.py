@@ -0,0 +1,101 @@
+"""
+OpenAI Stub Server
+A local stand-in for the chat completions endpoint (no network, no API key)
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1. Every
+completion returns the same content (a JSON "unknown" action by default) and
+fixed token usage. Counts requests and TCP connections so tests and
+benchmarks can check that connections are kept alive.
+
+Usage:
+    python -m utils.openai_stub              # serves on 127.0.0.1:8765
+    python -m utils.openai_stub 9000         # custom port
+"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_CONTENT = json.dumps({"action": "unknown", "response": "Stub AI response"})
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.stub.connections += 1
+
+    def do_POST(self):
+        stub = self.server.stub
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        stub.requests.append(json.loads(body or b'{}'))
+        if not self.path.endswith('/chat/completions'):
+            self._reply(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        self._reply(200, {
+            "id": f"chatcmpl-stub-{len(stub.requests)}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": stub.requests[-1].get('model', 'stub'),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": stub.content},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 50, "completion_tokens": 10, "total_tokens": 60},
+        })
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class OpenAIStubServer:
+    """Chat completions stub running in a background thread (use as a context manager)."""
+
+    def __init__(self, port: int = 0, content: str = DEFAULT_CONTENT):
+        self.content = content
+        self.requests = []
+        self.connections = 0
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def start(self) -> 'OpenAIStubServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    server = OpenAIStubServer(int(sys.argv[1]) if len(sys.argv) > 1 else 8765)
+    print(f"OpenAI stub listening at {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
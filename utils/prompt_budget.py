@@ -0,0 +1,179 @@
+"""
+Prompt Budget
+Local token counting and per-section budgets for prompts sent to OpenAI
+
+count_tokens uses tiktoken's encoding for the model when tiktoken (and its
+encoding file) is available. Otherwise it falls back to an offline
+approximation. The approximation splits text roughly the way the GPT-4o
+pre-tokenizer does and charges long words and punctuation runs by length.
+That is close enough for budgeting. The real count comes back in
+response.usage, and chat_completion compares it with the projection.
+
+assemble_prompt puts a fixed prefix first, then the dynamic sections. Keeping
+the prefix first lets OpenAI's prompt caching reuse it across users. Each
+section is cut to its own budget. If the whole prompt is still over
+max_tokens, the lowest-priority sections are cut further. Sections are cut
+whole entries at a time from the end, so callers list the most important
+entries first.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional
+
+from config import logger
+
+# Chat format overhead per message (role and separators) and per request
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REQUEST = 3
+
+# Rough GPT-4o pre-tokenizer: words (with their leading space), 1-3 digit
+# groups, punctuation runs, newline runs and other whitespace
+_PIECE_RE = re.compile(r" ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|_+|\s*\n+|\s+")
+# Longer words and punctuation runs are usually split into several tokens
+_WORD_CHARS_PER_TOKEN = 7
+_PUNCT_CHARS_PER_TOKEN = 3
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    """tiktoken encoding for the model, or None to use the approximation."""
+    try:
+        import tiktoken
+    except ImportError:
+        logger.info("tiktoken not installed, approximating prompt token counts")
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding('o200k_base')
+    except Exception as e:
+        # The encoding file is downloaded on first use; offline hosts can't fetch it
+        logger.warning(f"tiktoken encoding unavailable, approximating prompt token counts: {e}")
+        return None
+
+
+def _approximate_tokens(text: str) -> int:
+    tokens = 0
+    for piece in _PIECE_RE.findall(text):
+        core = piece.strip()
+        if not core:
+            tokens += 1
+        elif core[0].isalpha():
+            tokens += -(-len(core) // _WORD_CHARS_PER_TOKEN)
+        elif core[0].isdigit():
+            tokens += 1
+        else:
+            tokens += -(-len(core) // _PUNCT_CHARS_PER_TOKEN)
+    return tokens
+
+
+def count_tokens(text: str, model: str = 'gpt-4o-mini') -> int:
+    """Number of tokens in text for the model."""
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return _approximate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=32)
+def _count_prefix_tokens(prefix: str, model: str) -> int:
+    # Prefixes are fixed instruction blocks, so each is counted once per process
+    return count_tokens(prefix, model)
+
+
+def count_message_tokens(messages: list[dict[str, Any]], model: str = 'gpt-4o-mini') -> int:
+    """Projected prompt tokens for a chat completion request."""
+    return TOKENS_PER_REQUEST + sum(
+        TOKENS_PER_MESSAGE + count_tokens(str(message.get('content') or ''), model)
+        for message in messages
+    )
+
+
+@dataclass
+class PromptSection:
+    """A dynamic block of the prompt: a header line followed by entries.
+
+    Entries are kept or dropped whole, from the end. `budget` caps the
+    section's tokens (None = no cap). `empty` is shown when there are no
+    entries at all.
+    """
+    name: str
+    header: str
+    entries: list[str]
+    budget: Optional[int] = None
+    separator: str = "\n"
+    empty: str = ""
+
+
+def _omitted_note(count: int) -> str:
+    return f"[{count} more not shown]"
+
+
+def _fit(section: PromptSection, costs: list[int], budget: Optional[int], model: str) -> tuple[str, int, int]:
+    """(text, tokens, entries kept) for the section cut to the budget."""
+    if not section.entries:
+        text = f"{section.header}\n{section.empty}"
+        return text, count_tokens(text, model), 0
+
+    header_cost = count_tokens(section.header, model) + 1
+    kept = len(section.entries)
+    entry_tokens = sum(costs)
+    tokens = header_cost + entry_tokens
+    if budget is not None:
+        while kept and tokens > budget:
+            kept -= 1
+            entry_tokens -= costs[kept]
+            tokens = header_cost + entry_tokens + count_tokens(_omitted_note(len(section.entries) - kept), model) + 1
+
+    body = section.separator.join(section.entries[:kept])
+    if kept < len(section.entries):
+        note = _omitted_note(len(section.entries) - kept)
+        body = f"{body}{section.separator}{note}" if body else note
+    return f"{section.header}\n{body}", tokens, kept
+
+
+def assemble_prompt(prefix: str, sections: list[PromptSection], max_tokens: int,
+                    reserved_tokens: int = 0, model: str = 'gpt-4o-mini') -> tuple[str, dict[str, Any]]:
+    """
+    Build prefix + sections (given in priority order, most important first)
+    within max_tokens, leaving reserved_tokens for the rest of the request
+    (e.g. the user's message).
+
+    Returns (prompt, report). The report has the projected token count and
+    each section's tokens and kept/total entries, for logging.
+    """
+    prefix_tokens = _count_prefix_tokens(prefix, model)
+    # Each entry plus the separator after it
+    costs = {section.name: [count_tokens(entry, model) + 1 for entry in section.entries] for section in sections}
+    fitted = {section.name: _fit(section, costs[section.name], section.budget, model) for section in sections}
+
+    # Still too long: cut the lowest-priority sections further
+    overflow = prefix_tokens + reserved_tokens + sum(f[1] + 1 for f in fitted.values()) - max_tokens
+    for section in reversed(sections):
+        if overflow <= 0:
+            break
+        before = fitted[section.name][1]
+        fitted[section.name] = _fit(section, costs[section.name], max(0, before - overflow), model)
+        overflow -= before - fitted[section.name][1]
+
+    prompt = "\n\n".join([prefix] + [fitted[section.name][0] for section in sections])
+    report = {
+        'projected_tokens': prefix_tokens + sum(f[1] + 1 for f in fitted.values()),
+        'prefix_tokens': prefix_tokens,
+        'sections': {
+            section.name: {
+                'tokens': fitted[section.name][1],
+                'kept': fitted[section.name][2],
+                'total': len(section.entries),
+            }
+            for section in sections
+        },
+    }
+    truncated = [name for name, s in report['sections'].items() if s['kept'] < s['total']]
+    if truncated:
+        logger.info(f"Prompt sections truncated to fit budget: {', '.join(truncated)}")
+    return prompt, report
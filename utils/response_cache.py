@@ -0,0 +1,178 @@
+"""
+Admin Response Cache
+Stale-while-revalidate cache for the admin dashboard's aggregate endpoints
+
+Responses are keyed by endpoint plus the normalized (parsed, None-dropped,
+sorted) query parameters and kept as rendered JSON with an ETag. For the
+endpoint's TTL (ADMIN_CACHE_TTLS) the cached body is served as is; for
+ADMIN_CACHE_MAX_STALE seconds after that it is still served while one
+background thread recomputes it. Older entries are recomputed inline.
+Requests whose If-None-Match matches get a 304, so polling dashboards
+transfer nothing until the numbers change.
+
+The cache is per process. Empty results (the metrics services return {}
+on error) and exceptions are never cached.
+"""
+
+import contextvars
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+from config import logger, ADMIN_CACHE_ENABLED, ADMIN_CACHE_TTLS, ADMIN_CACHE_MAX_STALE, ADMIN_CACHE_MAX_ENTRIES
+
+DEFAULT_TTL = 60
+# Stats counter for each lookup outcome
+_STATE_COUNTERS = {'hit': 'hits', 'stale': 'stale_hits', 'miss': 'misses'}
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+    created_at: float
+    refreshing: bool = False
+
+
+def make_key(endpoint: str, params: Optional[dict] = None) -> str:
+    normalized = sorted((k, str(v)) for k, v in (params or {}).items() if v is not None)
+    return json.dumps([endpoint, normalized])
+
+
+def render(content: Any) -> CachedResponse:
+    body = JSONResponse(content=content).body
+    etag = 'W/"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return CachedResponse(body, etag, time.monotonic())
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    return etag.removeprefix('W/') in tags
+
+
+class ResponseCache:
+    """In-process LRU of rendered JSON responses with stale-while-revalidate."""
+
+    def __init__(self, max_stale: int, max_entries: int):
+        self._max_stale = max_stale
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: dict[str, dict[str, int]] = {}
+
+    def _endpoint_stats(self, endpoint: str) -> dict[str, int]:
+        stats = self.stats.get(endpoint)
+        if stats is None:
+            stats = self.stats[endpoint] = {
+                'hits': 0, 'stale_hits': 0, 'misses': 0, 'not_modified': 0, 'refreshes': 0, 'refresh_errors': 0
+            }
+        return stats
+
+    def count(self, endpoint: str, counter: str) -> None:
+        with self._lock:
+            self._endpoint_stats(endpoint)[counter] += 1
+
+    def _store(self, key: str, content: Any) -> CachedResponse:
+        entry = render(content)
+        if content:
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def _refresh(self, endpoint: str, key: str, compute: Callable[[], Any]) -> None:
+        try:
+            self._store(key, compute())
+            self.count(endpoint, 'refreshes')
+        except Exception as e:
+            logger.error(f"Error refreshing cached {endpoint} response: {e}")
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refreshing = False
+            self.count(endpoint, 'refresh_errors')
+
+    def get(self, endpoint: str, key: str, ttl: int, compute: Callable[[], Any]) -> tuple[CachedResponse, str]:
+        """(response, 'hit' | 'stale' | 'miss'), computing or scheduling a refresh as needed"""
+        now = time.monotonic()
+        refresh = False
+        with self._lock:
+            entry = self._entries.get(key)
+            age = now - entry.created_at if entry is not None else None
+            if entry is not None and age <= ttl + self._max_stale:
+                self._entries.move_to_end(key)
+                state = 'hit' if age <= ttl else 'stale'
+                if state == 'stale' and not entry.refreshing:
+                    entry.refreshing = refresh = True
+            else:
+                entry, state = None, 'miss'
+            self._endpoint_stats(endpoint)[_STATE_COUNTERS[state]] += 1
+
+        if refresh:
+            # Copy the request context so route dependencies (prefer_read_replica) still apply
+            context = contextvars.copy_context()
+            threading.Thread(target=context.run, args=(self._refresh, endpoint, key, compute), daemon=True).start()
+        if entry is None:
+            entry = self._store(key, compute())
+        return entry, state
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.stats.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {'entries': len(self._entries), 'endpoints': {e: dict(s) for e, s in self.stats.items()}}
+
+
+_cache = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide admin response cache, creating it on first use"""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache(ADMIN_CACHE_MAX_STALE, ADMIN_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+def cached_json_response(request: Request, endpoint: str, compute: Callable[[], Any],
+                         params: Optional[dict] = None, cache: Optional[ResponseCache] = None) -> Response:
+    """
+    JSON response for compute(), served from the cache (default: the admin
+    response cache) under endpoint + params.
+    Returns 304 when the request's If-None-Match matches the current ETag.
+    """
+    if not ADMIN_CACHE_ENABLED:
+        return JSONResponse(content=compute())
+
+    cache = cache or get_response_cache()
+    ttl = ADMIN_CACHE_TTLS.get(endpoint, DEFAULT_TTL)
+    entry, state = cache.get(endpoint, make_key(endpoint, params), ttl, compute)
+    headers = {'ETag': entry.etag, 'Cache-Control': 'private, no-cache', 'X-Cache': state.upper()}
+    if etag_matches(request.headers.get('if-none-match'), entry.etag):
+        cache.count(endpoint, 'not_modified')
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type='application/json', headers=headers)
+
+
+def get_response_cache_stats() -> dict[str, Any]:
+    """Entry count and hit/refresh counters per endpoint for the admin stats endpoint"""
+    if not ADMIN_CACHE_ENABLED:
+        return {'enabled': False}
+    return {'enabled': True, **get_response_cache().get_stats()}
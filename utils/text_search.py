@@ -0,0 +1,118 @@
+"""
+Text Search Utilities
+Ranked search over memories and reminders using full-text search (GIN
+expression indexes on the text columns), with a pg_trgm fuzzy fallback when
+the extension exists
+"""
+
+import re
+from typing import Any, Optional
+
+from config import ENCRYPTION_ENABLED, logger
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+# Shorter tokens match exactly; prefix-matching them would match almost anything
+_MIN_PREFIX_LENGTH = 3
+
+_trigram_available: Optional[bool] = None
+
+# Tried in order until one returns rows: every term (stemmed, prefix-matched),
+# then any term (e.g. "wifi password" still finds "the WiFi pw is..."),
+# then trigram word similarity for typos
+# Must match the indexed expressions (migrations.app._TEXT_SEARCH_INDEXES)
+_TSVECTOR = "to_tsvector('english', COALESCE({text_column}, ''))"
+_TSQUERY_MATCH = _TSVECTOR + " @@ to_tsquery('english', %(query)s)"
+_TSQUERY_RANK = "ts_rank_cd(" + _TSVECTOR + ", to_tsquery('english', %(query)s))"
+_FUZZY_MATCH = "%(query)s <%% LOWER({text_column})"
+_FUZZY_RANK = "word_similarity(%(query)s, LOWER({text_column}))"
+
+_SEARCH_QUERY = '''
+    SELECT {columns} FROM {table}
+    WHERE {phone_column} = %(phone)s {where} AND {match}
+    ORDER BY {rank} DESC, {order_by}
+'''
+
+
+def build_tsquery(search_term: str, match_any: bool = False) -> str:
+    """Turn free text into a to_tsquery expression (AND of terms, or OR if match_any)."""
+    tokens = []
+    for token in _TOKEN.findall(search_term.lower()):
+        term = f"{token}:*" if len(token) >= _MIN_PREFIX_LENGTH else token
+        if term not in tokens:
+            tokens.append(term)
+    return (' | ' if match_any else ' & ').join(tokens)
+
+
+def trigram_available(cursor: Any) -> bool:
+    """Whether pg_trgm is installed (checked once per process)."""
+    global _trigram_available
+    if _trigram_available is None:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        _trigram_available = cursor.fetchone() is not None
+        if not _trigram_available:
+            logger.info("pg_trgm not installed - fuzzy search fallback disabled")
+    return _trigram_available
+
+
+def ranked_search(
+    cursor: Any,
+    table: str,
+    columns: str,
+    text_column: str,
+    phone_number: str,
+    search_term: str,
+    where: str = '',
+    order_by: str = 'id',
+    strict: bool = False
+) -> list[tuple]:
+    """
+    Search a user's rows in `table`, best matches first.
+
+    Args:
+        cursor: Database cursor
+        table: Table with a text search index on text_column (memories, reminders)
+        columns: Columns to select
+        text_column: Plaintext column to search
+        phone_number: User's phone number (phone_hash is tried first when encryption is on)
+        search_term: Free text from the user
+        where: Extra filter, starting with AND
+        order_by: Tie-breaker after rank
+        strict: Only match rows containing every term (no any-term or fuzzy
+            fallback); use when the match is acted on without asking the user
+
+    Returns:
+        Rows from the first search tier that matches anything
+    """
+    tiers = []
+    all_terms = build_tsquery(search_term)
+    if all_terms:
+        tiers.append((_TSQUERY_MATCH, _TSQUERY_RANK, all_terms))
+        any_term = build_tsquery(search_term, match_any=True)
+        if any_term != all_terms and not strict:
+            tiers.append((_TSQUERY_MATCH, _TSQUERY_RANK, any_term))
+        if trigram_available(cursor) and not strict:
+            tiers.append((_FUZZY_MATCH, _FUZZY_RANK, search_term.lower().strip()))
+    else:
+        # Nothing to tokenize (e.g. punctuation only): plain substring match
+        tiers.append((f"LOWER({text_column}) LIKE %(query)s", '1', f"%{search_term.lower()}%"))
+
+    lookups = [('phone_number', phone_number)]
+    if ENCRYPTION_ENABLED:
+        from utils.encryption import hash_phone
+        # Fallback to phone_number for rows created before encryption
+        lookups.insert(0, ('phone_hash', hash_phone(phone_number)))
+
+    for match, rank, query in tiers:
+        for phone_column, phone_value in lookups:
+            cursor.execute(
+                _SEARCH_QUERY.format(
+                    columns=columns, table=table, phone_column=phone_column, where=where,
+                    match=match.format(text_column=text_column),
+                    rank=rank.format(text_column=text_column), order_by=order_by,
+                ),
+                {'phone': phone_value, 'query': query}
+            )
+            results = cursor.fetchall()
+            if results:
+                return results
+    return []
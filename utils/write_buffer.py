@@ -0,0 +1,282 @@
+"""
+Write-Behind Buffer
+Moves analytics inserts off the webhook's critical path.
+
+Rows are queued in memory and written in batches by a background thread,
+either every flush interval or as soon as a full batch is waiting. When the
+queue is full, or a batch fails to write, rows spill to a Redis list and are
+replayed once the database accepts writes again. A failed batch is retried
+one row at a time so a single bad row cannot hold back the rest; a row that
+fails MAX_ROW_ATTEMPTS times is discarded with a logged error. Remaining rows
+are flushed at interpreter exit.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+from config import logger
+
+# Writer receives {table: [row, ...]} and must raise if the batch was not committed
+BatchWriter = Callable[[dict[str, list[tuple]]], None]
+
+# How often to poll an empty (or unreachable) spill list for rows to replay
+SPILL_POLL_INTERVAL = 30
+
+# Failed writes after which a row is discarded instead of spilled again
+MAX_ROW_ATTEMPTS = 5
+
+# Queued rows are (table, row, failed write attempts)
+QueuedRow = tuple[str, tuple, int]
+
+
+class RedisSpill:
+    """Durable overflow storage for buffered rows, backed by a Redis list."""
+
+    def __init__(self, redis_url: str, key: str):
+        self._redis_url = redis_url
+        self._key = key
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(self._redis_url, socket_timeout=2, socket_connect_timeout=2)
+        return self._client
+
+    def push(self, items: list[QueuedRow]) -> None:
+        """Append rows to the spill list. Raises if Redis is unavailable."""
+        if items:
+            self._get_client().rpush(
+                self._key, *[json.dumps([table, list(row), attempts]) for table, row, attempts in items]
+            )
+
+    def pop(self, count: int) -> list[QueuedRow]:
+        """Remove and return up to `count` rows from the head of the spill list."""
+        pipe = self._get_client().pipeline()
+        pipe.lrange(self._key, 0, count - 1)
+        pipe.ltrim(self._key, count, -1)
+        raw_items, _ = pipe.execute()
+        items = []
+        for raw in raw_items:
+            # Rows spilled before attempts were recorded have no count
+            table, row, *attempts = json.loads(raw)
+            items.append((table, tuple(row), attempts[0] if attempts else 0))
+        return items
+
+    def size(self) -> int:
+        return self._get_client().llen(self._key)
+
+
+class WriteBehindBuffer:
+    """Bounded in-process queue that writes rows in batches on a background thread."""
+
+    def __init__(
+        self,
+        writer: BatchWriter,
+        max_rows: int,
+        batch_size: int,
+        flush_interval_ms: int,
+        spill: Optional[RedisSpill] = None,
+    ):
+        self._writer = writer
+        self._max_rows = max_rows
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval_ms / 1000
+        self._spill = spill
+        self._pid = None
+        self._thread = None
+        self._closed = False
+        self._next_spill_poll = 0.0
+        self._reset_state()
+        self.stats = {
+            'enqueued': 0,
+            'written': 0,
+            'batches': 0,
+            'flush_errors': 0,
+            'overflows': 0,
+            'spilled': 0,
+            'restored': 0,
+            'dropped': 0,
+            'discarded': 0,
+            'max_depth': 0,
+            'last_flush_ms': None,
+            'last_flush_rows': 0,
+            'last_error': None,
+        }
+
+    def _reset_state(self):
+        # Called again after fork so a child never shares the parent's locks or rows
+        self._rows = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+    def _ensure_started(self):
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset_state()
+                self._pid = os.getpid()
+                self._thread = None
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="write-behind-buffer", daemon=True)
+                self._thread.start()
+
+    def add(self, table: str, row: tuple) -> None:
+        """Queue a row for insertion. Never blocks on the database."""
+        if self._closed:
+            self._writer({table: [row]})
+            return
+        self._ensure_started()
+        with self._lock:
+            if len(self._rows) >= self._max_rows:
+                self.stats['overflows'] += 1
+                overflow = True
+            else:
+                self._rows.append((table, row, 0))
+                overflow = False
+                depth = len(self._rows)
+                self.stats['enqueued'] += 1
+                self.stats['max_depth'] = max(self.stats['max_depth'], depth)
+        if overflow:
+            # Backpressure: the flusher is behind, so park this row durably instead
+            self._spill_rows([(table, row, 0)])
+        elif depth >= self._batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Write everything currently queued. Returns the number of rows written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._rows.popleft() for _ in range(min(self._batch_size, len(self._rows)))]
+                if not batch:
+                    break
+                batch_written = self._write_batch(batch)
+                written += batch_written
+                if batch_written < len(batch):
+                    break
+        return written
+
+    def _write_batch(self, batch: list[QueuedRow]) -> int:
+        """Write a batch, falling back to one row at a time. Returns rows written."""
+        by_table: dict[str, list[tuple]] = {}
+        for table, row, _ in batch:
+            by_table.setdefault(table, []).append(row)
+
+        start = time.perf_counter()
+        try:
+            self._writer(by_table)
+        except Exception as e:
+            self.stats['flush_errors'] += 1
+            self.stats['last_error'] = str(e)[:200]
+            logger.error(f"Write-behind flush failed for {len(batch)} rows, retrying row by row: {e}")
+            return self._write_rows(batch)
+
+        self.stats['written'] += len(batch)
+        self.stats['batches'] += 1
+        self.stats['last_flush_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        self.stats['last_flush_rows'] = len(batch)
+        return len(batch)
+
+    def _write_rows(self, batch: list[QueuedRow]) -> int:
+        """Write rows individually; failed rows are spilled, or discarded once out of attempts."""
+        written = 0
+        failed = []
+        for table, row, attempts in batch:
+            try:
+                self._writer({table: [row]})
+                written += 1
+            except Exception as e:
+                if attempts + 1 >= MAX_ROW_ATTEMPTS:
+                    self.stats['discarded'] += 1
+                    logger.error(f"Write-behind buffer discarded a {table} row after {attempts + 1} failed writes: {e}")
+                else:
+                    failed.append((table, row, attempts + 1))
+        self.stats['written'] += written
+        self._spill_rows(failed)
+        return written
+
+    def _spill_rows(self, items: list[QueuedRow]) -> None:
+        if not items:
+            return
+        if self._spill is not None:
+            try:
+                self._spill.push(items)
+                self.stats['spilled'] += len(items)
+                self._next_spill_poll = 0.0
+                return
+            except Exception as e:
+                logger.error(f"Write-behind spill failed: {e}")
+        self.stats['dropped'] += len(items)
+        logger.error(f"Write-behind buffer dropped {len(items)} rows")
+
+    def _restore_spilled(self) -> None:
+        """Move spilled rows back into the queue while there is room."""
+        if self._spill is None or time.monotonic() < self._next_spill_poll:
+            return
+        with self._lock:
+            room = min(self._batch_size, self._max_rows - len(self._rows))
+        if room <= 0:
+            return
+        try:
+            items = self._spill.pop(room)
+        except Exception as e:
+            logger.warning(f"Could not read write-behind spill list: {e}")
+            items = []
+        if items:
+            with self._lock:
+                self._rows.extend(items)
+            self.stats['restored'] += len(items)
+        else:
+            self._next_spill_poll = time.monotonic() + SPILL_POLL_INTERVAL
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            try:
+                errors_before = self.stats['flush_errors']
+                self.flush()
+                if self.stats['flush_errors'] == errors_before:
+                    self._restore_spilled()
+            except Exception as e:
+                logger.error(f"Write-behind flusher error: {e}")
+
+    def close(self) -> None:
+        """Flush remaining rows; later adds are written synchronously."""
+        self._closed = True
+        if self._pid == os.getpid():
+            self.flush()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Queue depth plus throughput, backpressure and spill counters."""
+        with self._lock:
+            depth = len(self._rows)
+        spill_depth = None
+        if self._spill is not None:
+            try:
+                spill_depth = self._spill.size()
+            except Exception:
+                pass
+        return {
+            **self.stats,
+            'depth': depth,
+            'capacity': self._max_rows,
+            'spill_depth': spill_depth,
+        }
+
+
+def create_write_buffer(writer: BatchWriter, max_rows: int, batch_size: int,
+                        flush_interval_ms: int, spill: Optional[RedisSpill] = None) -> WriteBehindBuffer:
+    """Create a buffer that flushes itself when the interpreter exits."""
+    buffer = WriteBehindBuffer(writer, max_rows, batch_size, flush_interval_ms, spill)
+    atexit.register(buffer.close)
+    return buffer